@@ -0,0 +1,37 @@
+"""Time the math of the camera, which runs on every frame and on every interaction with the view."""
+from scenes import boxes
+
+
+def bench_projection(benchmark, renderer):
+    benchmark.group = "camera"
+    benchmark(renderer.camera.projection, renderer.width, renderer.height)
+
+
+def bench_viewworld(benchmark, renderer):
+    benchmark.group = "camera"
+    benchmark(renderer.camera.viewworld)
+
+
+def bench_ray(benchmark, renderer):
+    benchmark.group = "camera"
+    benchmark(renderer.camera.ray, renderer.width / 2, renderer.height / 2, renderer.width, renderer.height)
+
+
+def bench_rotate_pan_zoom(benchmark, renderer):
+    benchmark.group = "camera"
+    camera = renderer.camera
+
+    def interact():
+        camera.rotate(1, 1)
+        camera.pan(1, 1)
+        camera.zoom(1)
+        camera.zoom(-1)
+
+    benchmark(interact)
+    camera.reset_position()
+
+
+def bench_zoom_extents(benchmark, renderer, scene):
+    benchmark.group = "camera"
+    objects = scene(boxes(1000))
+    benchmark(renderer.camera.zoom_extents, objects)
@@ -0,0 +1,30 @@
+"""Time the construction of objects, the collection of their data and the creation of their buffers."""
+import pytest
+
+from compas_view2.objects import Object
+
+from scenes import DATA
+
+
+@pytest.fixture(params=list(DATA))
+def data(request, size):
+    return DATA[request.param](size)
+
+
+def bench_build(benchmark, data, size, rounds):
+    benchmark.group = "build-{}".format(size)
+    benchmark.pedantic(Object.build, args=(data,), rounds=rounds)
+
+
+def bench_buffer_data(benchmark, data, size, rounds):
+    benchmark.group = "buffer_data-{}".format(size)
+    obj = Object.build(data)
+    benchmark.pedantic(obj.buffer_data, rounds=rounds)
+
+
+def bench_make_buffers(benchmark, renderer, data, size, rounds):
+    benchmark.group = "make_buffers-{}".format(size)
+    obj = Object.build(data)
+    arrays = obj.buffer_data()
+    renderer.context.make_current()
+    benchmark.pedantic(obj.make_buffers, args=(arrays,), teardown=lambda arrays: obj.delete_buffers(), rounds=rounds)
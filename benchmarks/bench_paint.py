@@ -0,0 +1,31 @@
+"""Time the painting of frames.
+
+The frames are painted by an offscreen renderer, with the same drawing code as the view of the app,
+without the picking pass and the overlays of the view, and read back, which waits for the GPU to finish them.
+"""
+from scenes import boxes
+from scenes import mesh
+
+
+def bench_paint_mesh(benchmark, renderer, scene, size, rounds):
+    benchmark.group = "paint-mesh"
+    scene([mesh(size)])
+    benchmark.pedantic(renderer.render, rounds=rounds, warmup_rounds=1)
+
+
+def bench_paint_boxes(benchmark, renderer, scene):
+    benchmark.group = "paint-objects"
+    scene(boxes(1000))
+    benchmark(renderer.render)
+
+
+def bench_paint_transparent_boxes(benchmark, renderer, scene):
+    benchmark.group = "paint-objects"
+    scene(boxes(1000), opacity=0.5)
+    benchmark(renderer.render)
+
+
+def bench_paint_animated_boxes(benchmark, renderer, scene):
+    benchmark.group = "paint-objects"
+    scene(boxes(1000), animated=True)
+    benchmark(renderer.render)
@@ -0,0 +1,94 @@
+"""Time the passes that select objects and their elements, on the GPU with an ID buffer and on the CPU with rays."""
+import numpy as np
+import pytest
+
+from compas_view2.views.picking import ElementPass
+from compas_view2.views.picking import IDBuffer
+from compas_view2.views.picking import RayPicker
+from compas_view2.views.picking import encode_id
+from compas_view2.views.picking import id_coverage
+
+from scenes import boxes
+from scenes import mesh
+
+
+@pytest.fixture
+def idbuffer(renderer):
+    idbuffer = IDBuffer()
+    idbuffer.resize(renderer.width, renderer.height)
+    yield idbuffer
+    idbuffer.delete()
+
+
+def paint_instances(renderer, idbuffer):
+    """Paint the IDs of all objects into the ID buffer, and read them back, like the selection pass of the view."""
+    width, height = renderer.width, renderer.height
+    idbuffer.begin(0, 0, width, height)
+    shader = renderer.shader_instance
+    shader.bind()
+    shader.uniform4x4("viewworld", renderer.camera.viewworld())
+    for obj in renderer.objects.values():
+        obj.draw_instance(shader)
+    shader.release()
+    ids = idbuffer.read(0, 0, width, height)
+    idbuffer.end(0, width, height, renderer.color)
+    return ids[::-1]
+
+
+def paint_elements(renderer, idbuffer, element_pass, kind):
+    """Paint the IDs of the elements of all objects into the ID buffer, read them back and decode them."""
+    width, height = renderer.width, renderer.height
+    idbuffer.begin(0, 0, width, height)
+    shader = renderer.shader_element
+    shader.bind()
+    shader.uniform4x4("viewworld", renderer.camera.viewworld())
+    element_pass.draw(shader, renderer.objects, kind)
+    shader.release()
+    ids = idbuffer.read(0, 0, width, height)
+    idbuffer.end(0, width, height, renderer.color)
+    return element_pass.decode(ids)
+
+
+def bench_instance_pass(benchmark, renderer, scene, idbuffer):
+    benchmark.group = "selection-objects"
+    for index, obj in enumerate(scene(boxes(1000))):
+        obj._instance_color = encode_id(index + 1)
+    benchmark(lambda: id_coverage(paint_instances(renderer, idbuffer), [0, 0, 400, 250]))
+
+
+def bench_ray_pick(benchmark, renderer, scene):
+    benchmark.group = "selection-objects"
+    scene(boxes(1000))
+    picker = RayPicker(renderer.culler)
+    origin, direction = renderer.camera.ray(renderer.width / 2, renderer.height / 2, renderer.width, renderer.height)
+    picker.pick(renderer.objects, origin, direction)
+    benchmark(picker.pick, renderer.objects, origin, direction)
+
+
+def bench_box_select(benchmark, renderer, scene):
+    benchmark.group = "selection-objects"
+    scene(boxes(1000))
+    picker = RayPicker(renderer.culler)
+    width, height = renderer.width, renderer.height
+    matrix = np.asarray(renderer.camera.projection(width, height)) @ np.asarray(renderer.camera.viewworld())
+    benchmark(picker.select, renderer.objects, matrix, width, height, [0, 0, 400, 250])
+
+
+@pytest.mark.parametrize("kind", ["vertices", "edges", "faces"])
+def bench_element_pass(benchmark, renderer, scene, idbuffer, size, rounds, kind):
+    benchmark.group = "selection-{}".format(kind)
+    scene([mesh(size)])
+    element_pass = ElementPass(RayPicker(renderer.culler))
+    benchmark.pedantic(paint_elements, args=(renderer, idbuffer, element_pass, kind), rounds=rounds, warmup_rounds=1)
+    element_pass.delete()
+
+
+@pytest.mark.parametrize("kind", ["vertices", "edges", "faces"])
+def bench_element_pick(benchmark, renderer, scene, size, rounds, kind):
+    benchmark.group = "selection-{}".format(kind)
+    scene([mesh(size)])
+    picker = RayPicker(renderer.culler)
+    width, height = renderer.width, renderer.height
+    matrix = np.asarray(renderer.camera.projection(width, height)) @ np.asarray(renderer.camera.viewworld())
+    args = renderer.objects, kind, matrix, width, height, width / 2, height / 2
+    benchmark.pedantic(picker.pick_element, args=args, rounds=rounds, warmup_rounds=1)
@@ -0,0 +1,60 @@
+import os
+
+# the benchmarks draw without a window,
+# into an EGL context, unless another headless platform, e.g. "osmesa", is chosen
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+
+import pytest  # noqa: E402
+
+# the number of elements of the scenes
+SIZES = [1_000, 100_000]
+LARGE_SIZES = [1_000_000]
+
+# the number of measured rounds per number of elements
+ROUNDS = {1_000: 20, 100_000: 3, 1_000_000: 1}
+
+
+def pytest_addoption(parser):
+    parser.addoption("--large", action="store_true", help="Also run the benchmarks with a million elements.")
+
+
+def pytest_generate_tests(metafunc):
+    if "size" in metafunc.fixturenames:
+        sizes = SIZES + (LARGE_SIZES if metafunc.config.getoption("large") else [])
+        metafunc.parametrize("size", sizes, ids=["{}k".format(size // 1000) for size in sizes])
+
+
+@pytest.fixture(scope="session")
+def renderer():
+    """An offscreen renderer, which provides the GL context of the benchmarks."""
+    from compas_view2.views import OffscreenRenderer
+
+    try:
+        renderer = OffscreenRenderer(800, 500)
+    except Exception as error:
+        pytest.skip("No offscreen GL context: {}".format(error))
+    yield renderer
+    renderer.delete()
+
+
+@pytest.fixture
+def rounds(request):
+    """The number of measured rounds of a benchmark, depending on the number of elements of its scene."""
+    size = request.node.callspec.params.get("size", SIZES[0]) if hasattr(request.node, "callspec") else SIZES[0]
+    return ROUNDS[size]
+
+
+@pytest.fixture
+def scene(renderer):
+    """Add data objects to the renderer, and remove them again after the benchmark."""
+    added = []
+
+    def add(items, **kwargs):
+        objects = [renderer.add(item, **kwargs) for item in items]
+        added.extend(objects)
+        renderer.camera.zoom_extents(objects)
+        return objects
+
+    yield add
+    for obj in added:
+        renderer.remove(obj)
@@ -0,0 +1,67 @@
+"""Data of the scenes of the benchmarks, with a given number of elements.
+
+The data is created once per number of elements, and shared by the benchmarks.
+"""
+from functools import lru_cache
+
+import numpy as np
+from compas.datastructures import Mesh
+from compas.datastructures import Network
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import Pointcloud
+
+from compas_view2.collections import Collection
+
+
+@lru_cache(maxsize=None)
+def points(size):
+    """Random points in a cube with sides of 10."""
+    return np.random.default_rng(0).random((size, 3)) * 10
+
+
+@lru_cache(maxsize=None)
+def mesh(size):
+    """A square grid mesh with about ``size`` quad faces."""
+    n = int(round(size**0.5))
+    return Mesh.from_meshgrid(dx=10, nx=n)
+
+
+@lru_cache(maxsize=None)
+def network(size):
+    """A polyline network with ``size`` nodes, winding through a square grid."""
+    n = int(round(size**0.5))
+    network = Network()
+    for node in range(size):
+        network.add_node(node, x=node % n, y=node // n, z=0)
+    for node in range(size - 1):
+        network.add_edge(node, node + 1)
+    return network
+
+
+@lru_cache(maxsize=None)
+def pointcloud(size):
+    """A pointcloud with ``size`` points."""
+    return Pointcloud(points(size).tolist())
+
+
+@lru_cache(maxsize=None)
+def collection(size):
+    """A collection of ``size`` points."""
+    return Collection([Point(*point) for point in points(size).tolist()])
+
+
+@lru_cache(maxsize=None)
+def boxes(size):
+    """``size`` unit boxes on a square grid."""
+    n = int(np.ceil(size**0.5))
+    return [Box(Frame([2 * (i % n), 2 * (i // n), 0], [1, 0, 0], [0, 1, 0]), 1, 1, 1) for i in range(size)]
+
+
+DATA = {
+    "mesh": mesh,
+    "network": network,
+    "pointcloud": pointcloud,
+    "collection": collection,
+}
@@ -0,0 +1,40 @@
+import importlib.util
+import os
+
+# the tests and the doctests draw without a window,
+# into an EGL context, unless another headless platform, e.g. "osmesa", is chosen
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+os.environ.setdefault("EGL_PLATFORM", "surfaceless")
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import pytest  # noqa: E402
+from qtpy import QtWidgets  # noqa: E402
+
+# the app, its timers and the plots of matplotlib need an application instance
+APP = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+# the doctests of modules with optional dependencies are only collected if these are installed
+collect_ignore = []
+if importlib.util.find_spec("ryvencore_qt") is None:
+    collect_ignore.append("src/compas_view2/flow")
+if importlib.util.find_spec("compas_occ") is None:
+    collect_ignore.append("src/compas_view2/objects/brepobject.py")
+
+
+@pytest.fixture(scope="session")
+def qapp():
+    """The application instance of the tests."""
+    return APP
+
+
+@pytest.fixture(scope="session")
+def renderer(qapp):
+    """An offscreen renderer, which provides the GL context of the tests."""
+    from compas_view2.views import OffscreenRenderer
+
+    try:
+        renderer = OffscreenRenderer(400, 300)
+    except Exception as error:
+        pytest.skip("No offscreen GL context: {}".format(error))
+    yield renderer
+    renderer.delete()
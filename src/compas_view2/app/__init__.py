@@ -1,6 +1,8 @@
 from .worker import Worker  # noqa : F401
 from .timer import Timer  # noqa : F401
 from .selector import Selector  # noqa : F401
+from .recorder import Recorder  # noqa : F401
+from .simulation import Simulation  # noqa : F401
 
 from .controller import Controller  # noqa : F401
 from .app import App  # noqa : F401
@@ -11,8 +11,6 @@ from typing_extensions import Literal
 import sys
 import os
 import json
-import tempfile
-import shutil
 
 from functools import partial
 
@@ -23,14 +21,15 @@ from qtpy.QtGui import QIcon
 
 from compas.data import Data
 from compas.colors import Color
-from compas.utilities import gif_from_images
 
 from compas_view2.views import View120
 from compas_view2.views import View330
+from compas_view2.objects import LabelsObject
 from compas_view2.objects import Object
 from compas_view2.forms.dockform import DockForm
 from compas_view2.forms.sceneform import SceneForm
 from compas_view2.forms.propertyform import PropertyForm
+from compas_view2.forms.profilerform import ProfilerForm
 from compas_view2.forms.treeform import TreeForm
 from compas_view2.forms.tabsform import TabsForm
 
@@ -49,6 +48,8 @@ from .timer import Timer
 from .selector import Selector
 from .controller import Controller
 from .worker import Worker
+from .recorder import Recorder
+from .simulation import Simulation
 from .plot import MplCanvas
 
 HERE = os.path.dirname(__file__)
@@ -79,6 +80,9 @@ class App:
         The viewport of the OpenGL view. It will override the value in the config file.
     show_grid : bool, optional
         Show the XY plane. It will override the value in the config file.
+    flow_parallel : bool, optional
+        Execute the nodes of the flow on worker threads, without blocking the GUI.
+        It will override the value in the config file.
     config : dict | filepath, optional
         A configuration dict for the App, or a path to a JSON file containing such a dict.
         Default is None, in which case the default configuration (a `Rhino-like` preference) is used.
@@ -124,8 +128,8 @@ class App:
     Examples
     --------
     >>> from compas_view2 import app
-    >>> viewer = app.App()
-    >>> viewer.show()
+    >>> viewer = app.App()  # doctest: +SKIP
+    >>> viewer.show()  # doctest: +SKIP
 
     """
 
@@ -147,6 +151,7 @@ class App:
         show_flow: bool = None,
         flow_view_size: Union[Tuple[int], List[int]] = None,
         flow_auto_update: bool = None,
+        flow_parallel: bool = None,
         config: Optional[dict] = None,
         controller_class: Optional[Controller] = None,
     ):
@@ -200,9 +205,11 @@ class App:
         if show_flow is not None:
             config["flow"]["show_flow"] = show_flow
         if flow_view_size is not None:
-            config["app"]["flow_view_size"] = flow_view_size
+            config["flow"]["flow_view_size"] = flow_view_size
         if flow_auto_update is not None:
-            config["app"]["flow_auto_update"] = flow_auto_update
+            config["flow"]["flow_auto_update"] = flow_auto_update
+        if flow_parallel is not None:
+            config["flow"]["flow_parallel"] = flow_parallel
 
         self.config = config["app"]
         self.all_config = config
@@ -241,7 +248,8 @@ class App:
         self.timer = None
         self.frame_count = 0
         self.record = False
-        self.recorded_frames = []
+        self.recorder = None
+        self.simulation = None
 
         self.width = self.config["width"]
         self.height = self.config["height"]
@@ -262,6 +270,7 @@ class App:
         self.dock_slots = {
             "sceneform": None,
             "propertyform": None,
+            "profilerform": None,
         }
 
         self.init(config)
@@ -411,6 +420,57 @@ class App:
                 self.dock_slots["sceneform"].update()
         return obj
 
+    def add_labels(
+        self,
+        data: Data,
+        element: Literal["vertices", "faces", "edges"] = "vertices",
+        text: Union[Callable, Dict, None] = None,
+        **kwargs,
+    ) -> Object:
+        """Add the labels of the vertices, faces or edges of a mesh or network, as one layer of labels.
+
+        Parameters
+        ----------
+        data : :class:`compas.datastructures.Mesh` | :class:`compas.datastructures.Network`
+            The mesh or network.
+        element : Literal["vertices", "faces", "edges"], optional
+            The labelled elements.
+            The vertices of a network are its nodes.
+        text : Union[Callable, Dict, None], optional
+            A function that returns the text of the label of an element from its key,
+            or a dict with the texts of the labels of the labelled elements only.
+            Defaults to the keys of the elements.
+        **kwargs : dict, optional
+            The options of :class:`compas_view2.objects.LabelsObject`,
+            e.g. the color, the height and the font of the labels.
+
+        Returns
+        -------
+        :class:`compas_view2.objects.LabelsObject`
+            The added labels.
+
+        Examples
+        --------
+        .. code-block:: python
+
+            from compas.datastructures import Mesh
+            from compas_view2.app import App
+
+            viewer = App()
+            mesh = Mesh.from_polyhedron(12)
+            viewer.add(mesh)
+            labels = viewer.add_labels(mesh, element="faces", text=lambda face: "f{}".format(face))
+            viewer.show()
+
+        """
+        obj = LabelsObject(data, app=self, element=element, text=text, **kwargs)
+        self.view.objects[obj] = obj
+        if self.view.isValid():
+            obj.init()
+            if self.dock_slots["sceneform"]:
+                self.dock_slots["sceneform"].update()
+        return obj
+
     def add_reference(self, obj: Object, **kwargs) -> Object:
         """Add an object as a reference to another object.
 
@@ -434,7 +494,7 @@ class App:
         return ref
 
     def remove(self, obj: Object) -> None:
-        """Remove an object from the view.
+        """Remove an object and its children from the view, and release their GL resources.
 
         Parameters
         ----------
@@ -446,11 +506,21 @@ class App:
         None
 
         """
+        for child in list(obj.children):
+            self.remove(child)
+        if obj.parent:
+            obj.parent.remove(obj)
         if obj in list(self.view.objects):
             del self.view.objects[obj]
         for key, value in list(self.selector.instances.items()):
             if obj == value:
                 del self.selector.instances[key]
+        self.selector.deselect_elements(obj)
+        if self.view.isValid():
+            self.view.makeCurrent()
+            self.view.batcher.discard([obj])
+            obj.dispose()
+            self.view.doneCurrent()
 
     def show(self) -> None:
         """Show the viewer window.
@@ -464,15 +534,30 @@ class App:
         self.window.show()
         if Flow and self.all_config["flow"]["show_flow"]:
             self.flow.show()
+        if Flow:
+            self._app.aboutToQuit.connect(self.flow.scheduler.shutdown)
 
         if self.dock_slots["sceneform"]:
             self.dock_slots["sceneform"].update()
 
-        self.selector.start_monitor_instance_map()
+        if self.simulation is not None:
+            self._app.aboutToQuit.connect(self.simulation.stop)
+            self.simulation.start()
+
         self._app.exec_()
+        if self.record:
+            self._finish_recording()
 
     run = show
 
+    def _finish_recording(self):
+        """Encode the remaining recorded frames, and finish the recording."""
+        self.record = False
+        self.view.makeCurrent()
+        self.recorder.close()
+        self.view.doneCurrent()
+        print("Recorded to ", self.recorder.path)
+
     def about(self) -> None:
         """Display the about message as defined in the config file.
 
@@ -595,20 +680,29 @@ class App:
         """
         self.statusText.setText(message)
 
-    def fps(self, fps: int) -> None:
+    def fps(self, fps: int, drawn: int = None, culled: int = None) -> None:
         """Update fps info in the status bar.
 
         Parameters
         ----------
         fps : int
             The number of frames per second.
+        drawn : int, optional
+            The number of objects inside the view frustum.
+        culled : int, optional
+            The number of objects outside the view frustum, which were not drawn.
 
         Returns
         -------
         None
 
         """
-        self.statusFps.setText("fps: {}".format(fps))
+        text = "fps: {}".format(fps)
+        if drawn is not None and culled is not None:
+            text += " | drawn: {} | culled: {}".format(drawn, culled)
+        if self.simulation is not None and self.simulation.running:
+            text += " | steps/s: {:.0f} | dropped: {}".format(self.simulation.rate, self.simulation.dropped)
+        self.statusFps.setText(text)
 
     def sidedock(self, title: str = "", slot: str = None, location: str = "right"):
         """Create a side dock widget."""
@@ -654,6 +748,26 @@ class App:
 
         return propertyform
 
+    def profilerform(self):
+        """Create a side form widget with the frame times measured by the profiler of the view.
+
+        The profiler is enabled while the form is visible.
+
+        Returns
+        -------
+        :class:`compas_view2.forms.ProfilerForm`
+
+        """
+        if self.dock_slots["profilerform"]:
+            self.dock_slots["profilerform"].show()
+            return self.dock_slots["profilerform"]
+
+        profilerform = ProfilerForm(self)
+        self.window.addDockWidget(QtCore.Qt.RightDockWidgetArea, profilerform)
+        self.dock_slots["profilerform"] = profilerform
+
+        return profilerform
+
     def treeform(
         self,
         title="tree",
@@ -1125,6 +1239,8 @@ class App:
         record_path: str = "temp/out.gif",
         record_fps: int = None,
         playback_interval: int = None,
+        record_pbo: bool = False,
+        threaded: bool = False,
     ) -> Callable:
         """Decorator for callbacks of a dynamic drawing process.
 
@@ -1138,11 +1254,23 @@ class App:
             The number of frames of the process.
             If no frame number is provided, the process continues until the viewer is closed.
         record : bool, optional
-            If True, record a screenshot of every frame.
+            If True, record every frame.
         record_path : str, optional
             The path where the recording should be saved.
+            GIF and animated PNG files are written by the viewer,
+            other formats, e.g. MP4 or WebM, are encoded with ffmpeg.
+        record_fps : int, optional
+            The frame rate of the recording.
+            Defaults to the rate of the calls to the function.
         playback_interval : int, optional
             Interval between frames in the recording, in milliseconds.
+        record_pbo : bool, optional
+            If True, read the frames asynchronously with pixel buffer objects.
+        threaded : bool, optional
+            If True, call the function on a worker thread, and display the latest state it returns on the GUI thread.
+            The function should not modify the objects of the view, but return a snapshot of the new state,
+            for example a dict mapping objects to their vertices and the new coordinates of these vertices.
+            See :class:`compas_view2.app.Simulation`.
 
         Returns
         -------
@@ -1154,6 +1282,10 @@ class App:
         the time between subsequent calls to the callback, without taking into account the duration of the execution of the call,
         whereas the latter indicates a pause after the completed execution of the previous call, before starting the next one.
 
+        In threaded mode, the simulation runs at its own pace, independently of the frame rate of the view.
+        States that are not displayed before the next one is ready are dropped,
+        and the number of steps per second is shown in the status bar next to the frame rate.
+
         Examples
         --------
         .. code-block:: python
@@ -1165,17 +1297,28 @@ class App:
                 obj.rotation = [0, 0, frame * angle]
                 obj.update()
 
+            @viewer.on(interval=10, threaded=True)
+            def simulate(frame):
+                X[:] = step(X)
+                return {obj: (vertices, X)}
+
         """
         if (not interval and not timeout) or (interval and timeout):
             raise ValueError("Must specify either interval or timeout")
 
         if record:
-            # check if record_path is writable
-            # create temp dir for frames
-            self.tempdir = tempfile.mkdtemp()
-            record_fps = record_fps or 1000 / interval
+            # frames are streamed to a background encoder while they are painted
+            record_fps = record_fps or 1000 / (interval or timeout)
+            self.recorder = Recorder(record_path, fps=record_fps, pbo=record_pbo)
 
         def outer(func: Callable):
+            self.frame_count = 0
+            self.record = record
+
+            if threaded:
+                self.simulation = Simulation(self, func, interval=interval, timeout=timeout, frames=frames)
+                return
+
             def render():
                 func(self.frame_count)
                 self.view.update()
@@ -1183,28 +1326,13 @@ class App:
                 if frames is not None and self.frame_count >= frames:
                     self.timer.stop()
                     if self.record:
-                        self.record = False
-                        # self.recorded_frames[0].save(
-                        #     record_path, save_all=True, optimize=False,
-                        #     duration=playback_interval or interval,
-                        #     append_images=self.recorded_frames[1:],
-                        #     loop=100)
-                        files = [os.path.join(self.tempdir, f"{i}.png") for i in range(frames)]
-                        gif_from_images(
-                            files=files,
-                            gif_path=record_path,
-                            fps=record_fps,
-                            delete_files=True,
-                        )
-                        shutil.rmtree(self.tempdir)
-                        print("Recorded to ", record_path)
+                        # paint and record the last frame before finishing the recording
+                        self.view.repaint()
+                        self._finish_recording()
 
             if interval:
                 self.timer = Timer(interval=interval, callback=render)
             if timeout:
                 self.timer = Timer(interval=timeout, callback=render, singleshot=True)
 
-            self.frame_count = 0
-            self.record = record
-
         return outer
@@ -475,6 +475,20 @@ class Controller:
         self.app.view.update_projection()
         self.app.view.update()
 
+    def view_profiler(self):
+        """Show or hide the frame times measured by the profiler of the view.
+
+        Returns
+        -------
+        None
+
+        """
+        form = self.app.dock_slots["profilerform"]
+        if form and form.isVisible():
+            form.hide()
+        else:
+            self.app.profilerform()
+
     def zoom_selected(self):
         if self.app.selector.selected:
             self.app.view.camera.zoom_extents(self.app.selector.selected)
@@ -538,6 +552,8 @@ class Controller:
         if self.mouse_check(event, self.mouse_key["selection"]["mouse"]):
             if self.app.selector.wait_for_selection_on_plane:
                 self.app.selector.finish_selection_on_plane(event.pos().x(), event.pos().y())
+            elif self.app.selector.picking == "cpu":
+                self.app.selector.select_at(event.pos().x(), event.pos().y())
             else:
                 self.app.selector.enabled = True
 
@@ -0,0 +1,413 @@
+import io
+import os
+import queue
+import shutil
+import struct
+import subprocess
+import threading
+import zlib
+from ctypes import c_void_p
+
+import numpy as np
+from OpenGL import GL
+
+from compas_view2.gl import Buffer
+
+
+class FFmpegEncoder:
+    """Encode frames into a video, by piping their raw pixels to an ffmpeg process.
+
+    Parameters
+    ----------
+    path : str
+        The path of the video file.
+        The codec is chosen by the extension: H.264 for ".mp4", ".mov" and ".mkv", VP9 for ".webm".
+    width : int
+        The width of the frames in pixels.
+    height : int
+        The height of the frames in pixels.
+    fps : float
+        The frame rate of the video.
+    executable : str, optional
+        The path of the ffmpeg executable.
+        Defaults to ffmpeg on the system path, or the one of the ``imageio-ffmpeg`` package.
+
+    """
+
+    CODECS = {
+        ".mp4": ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+        ".mov": ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+        ".mkv": ["-c:v", "libx264", "-pix_fmt", "yuv420p"],
+        ".webm": ["-c:v", "libvpx-vp9", "-pix_fmt", "yuv420p"],
+    }
+
+    def __init__(self, path, width, height, fps, executable=None):
+        executable = executable or shutil.which("ffmpeg")
+        if not executable:
+            try:
+                import imageio_ffmpeg
+            except ImportError:
+                raise RuntimeError("Recording videos requires ffmpeg on the system path, or imageio-ffmpeg.")
+            executable = imageio_ffmpeg.get_ffmpeg_exe()
+        extension = os.path.splitext(path)[1].lower()
+        command = [executable, "-y", "-loglevel", "error"]
+        command += ["-f", "rawvideo", "-pix_fmt", "rgb24", "-s", "{}x{}".format(width, height), "-r", str(fps)]
+        # the frames are read bottom row first, and yuv420p needs even dimensions
+        command += ["-i", "-", "-vf", "vflip,pad=ceil(iw/2)*2:ceil(ih/2)*2"]
+        command += self.CODECS.get(extension, []) + [path]
+        self._process = subprocess.Popen(command, stdin=subprocess.PIPE)
+
+    def write(self, frame):
+        """Encode a frame.
+
+        Parameters
+        ----------
+        frame : :class:`numpy.ndarray`
+            The RGB pixels of the frame as unsigned bytes, of shape (height, width, 3), with the bottom row first.
+
+        Returns
+        -------
+        None
+        """
+        self._process.stdin.write(frame.data)
+
+    def close(self):
+        """Finish the video.
+
+        Returns
+        -------
+        None
+        """
+        self._process.stdin.close()
+        if self._process.wait():
+            raise RuntimeError("ffmpeg failed with exit code {}".format(self._process.returncode))
+
+
+class GifEncoder:
+    """Encode frames into an animated GIF, frame by frame.
+
+    Every frame is quantized to its own palette of 256 colors and compressed by Pillow,
+    and is appended to the file with a local color table, such that no frames are kept in memory.
+
+    Parameters
+    ----------
+    path : str
+        The path of the GIF file.
+    width : int
+        The width of the frames in pixels.
+    height : int
+        The height of the frames in pixels.
+    fps : float
+        The frame rate of the animation.
+    loop : int, optional
+        The number of times the animation is played, or 0 to play it forever.
+
+    """
+
+    def __init__(self, path, width, height, fps, loop=0):
+        # GIF delays are in hundredths of a second, and most viewers treat delays under 2 as 10
+        self._delay = max(int(round(100 / fps)), 2)
+        self._file = open(path, "wb")
+        self._file.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0, 0, 0))
+        self._file.write(b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    def write(self, frame):
+        """Encode a frame.
+
+        Parameters
+        ----------
+        frame : :class:`numpy.ndarray`
+            The RGB pixels of the frame as unsigned bytes, of shape (height, width, 3), with the bottom row first.
+
+        Returns
+        -------
+        None
+        """
+        from PIL import Image
+
+        image = Image.fromarray(np.ascontiguousarray(frame[::-1])).quantize(256, Image.Quantize.FASTOCTREE)
+        stream = io.BytesIO()
+        image.save(stream, "GIF")
+        data = stream.getvalue()
+        # move the global color table of the single-frame GIF to a local color table of its image descriptor
+        flags = data[10]
+        start = 13 + (3 << ((flags & 7) + 1) if flags & 0x80 else 0)
+        table = data[13:start]
+        position = start
+        while data[position] == 0x21:
+            position += 2
+            while data[position]:
+                position += data[position] + 1
+            position += 1
+        descriptor = bytearray(data[position : position + 10])
+        if table:
+            descriptor[9] = (descriptor[9] & 0x40) | 0x80 | (flags & 7)
+        self._file.write(b"!\xf9\x04\x00" + struct.pack("<H", self._delay) + b"\x00\x00")
+        self._file.write(bytes(descriptor) + table + data[position + 10 : -1])
+
+    def close(self):
+        """Finish the animation.
+
+        Returns
+        -------
+        None
+        """
+        self._file.write(b";")
+        self._file.close()
+
+
+class ApngEncoder:
+    """Encode frames into an animated PNG, frame by frame.
+
+    Parameters
+    ----------
+    path : str
+        The path of the PNG file.
+    width : int
+        The width of the frames in pixels.
+    height : int
+        The height of the frames in pixels.
+    fps : float
+        The frame rate of the animation.
+    loop : int, optional
+        The number of times the animation is played, or 0 to play it forever.
+    compression : int, optional
+        The zlib compression level of the frames, from 1 (fastest) to 9 (smallest).
+
+    """
+
+    def __init__(self, path, width, height, fps, loop=0, compression=6):
+        self._width = width
+        self._height = height
+        self._loop = loop
+        self._compression = compression
+        self._delay = (int(round(1000 / fps)), 1000)
+        self._frames = 0
+        self._sequence = 0
+        self._file = open(path, "wb")
+        self._file.write(b"\x89PNG\r\n\x1a\n")
+        self._chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+        # the number of frames is written when the animation is finished
+        self._control = self._file.tell()
+        self._chunk(b"acTL", struct.pack(">II", 0, loop))
+
+    def _chunk(self, kind, data):
+        self._file.write(struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data)))
+
+    def write(self, frame):
+        """Encode a frame.
+
+        Parameters
+        ----------
+        frame : :class:`numpy.ndarray`
+            The RGB pixels of the frame as unsigned bytes, of shape (height, width, 3), with the bottom row first.
+
+        Returns
+        -------
+        None
+        """
+        rows = frame[::-1].reshape(self._height, -1)
+        # every scanline is filtered with the "up" filter, i.e. as the difference with the previous scanline
+        scanlines = np.empty((self._height, rows.shape[1] + 1), dtype=np.uint8)
+        scanlines[:, 0] = 2
+        scanlines[:, 1:] = rows
+        scanlines[1:, 1:] -= rows[:-1]
+        data = zlib.compress(scanlines, self._compression)
+        control = struct.pack(">IIIIIHHBB", self._sequence, self._width, self._height, 0, 0, *self._delay, 0, 0)
+        self._chunk(b"fcTL", control)
+        self._sequence += 1
+        if self._frames:
+            self._chunk(b"fdAT", struct.pack(">I", self._sequence) + data)
+            self._sequence += 1
+        else:
+            self._chunk(b"IDAT", data)
+        self._frames += 1
+
+    def close(self):
+        """Finish the animation.
+
+        Returns
+        -------
+        None
+        """
+        self._chunk(b"IEND", b"")
+        self._file.seek(self._control)
+        self._chunk(b"acTL", struct.pack(">II", self._frames, self._loop))
+        self._file.close()
+
+
+class Recorder:
+    """Record the frames of a view into a video or an animated image, while the view is painted.
+
+    The pixels of every frame are read into one of a fixed number of reusable arrays,
+    and are encoded by a background thread.
+    When all arrays are waiting to be encoded, recording waits for the encoder,
+    such that the memory use is bounded, also for long recordings.
+
+    Parameters
+    ----------
+    path : str
+        The path of the recording.
+        GIF files (".gif") and animated PNG files (".png", ".apng") are written frame by frame,
+        all other formats, e.g. ".mp4" and ".webm", are encoded with ffmpeg.
+    fps : float, optional
+        The frame rate of the recording.
+    pbo : bool, optional
+        Whether to read the pixels asynchronously into pixel buffer objects.
+        The pixels of a frame are then handed to the encoder when the next frame is captured,
+        such that the GPU does not have to finish the frame first.
+    queue_size : int, optional
+        The number of frames that can wait to be encoded.
+
+    Attributes
+    ----------
+    path : str
+        The path of the recording.
+    fps : float
+        The frame rate of the recording.
+    pbo : bool
+        Whether the pixels are read into pixel buffer objects.
+    frames : int
+        The number of captured frames.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        recorder = Recorder("out.mp4", fps=30)
+        # in the paint function of the view, after painting
+        recorder.capture(width, height)
+        # when the recording is done, with the GL context of the view current
+        recorder.close()
+
+    """
+
+    ENCODERS = {".gif": GifEncoder, ".png": ApngEncoder, ".apng": ApngEncoder}
+
+    def __init__(self, path, fps=10, pbo=False, queue_size=8):
+        self.path = path
+        self.fps = fps
+        self.pbo = pbo
+        self.frames = 0
+        self._queue_size = queue_size
+        self._encoder = None
+        self._thread = None
+        self._error = None
+        self._last = None
+        self._size = None
+        self._pbos = []
+        self._pending = None
+        self._free = queue.Queue()
+        self._frames = queue.Queue()
+
+    def capture(self, width, height, frame=None):
+        """Read the pixels of the current framebuffer, and queue them for encoding.
+
+        This has to be called with the GL context of the view current, after the frame is painted.
+
+        Parameters
+        ----------
+        width : int
+            The width of the framebuffer in pixels.
+        height : int
+            The height of the framebuffer in pixels.
+        frame : int, optional
+            The number of the frame.
+            If given, a frame is captured only once, also if it is painted several times.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The size of the recording is the size of the first frame.
+        If the framebuffer is resized, the lower left part of it is recorded.
+        """
+        if frame is not None:
+            if frame == self._last:
+                return
+            self._last = frame
+        if self._error:
+            raise self._error
+        if self._encoder is None:
+            self._start(width, height)
+        width, height = self._size
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        if self.pbo:
+            pbo = self._pbos[self.frames % 2]
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glReadPixels(0, 0, width, height, GL.GL_RGB, GL.GL_UNSIGNED_BYTE, c_void_p(0))
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+            if self._pending is not None:
+                self._queue_pbo(self._pending)
+            self._pending = pbo
+        else:
+            pixels = self._free.get()
+            GL.glReadPixels(0, 0, width, height, GL.GL_RGB, GL.GL_UNSIGNED_BYTE, pixels)
+            self._frames.put(pixels)
+        self.frames += 1
+
+    def _start(self, width, height):
+        """Allocate the arrays and buffers for frames of a given size, and start the encoder."""
+        width, height = int(round(width)), int(round(height))
+        self._size = width, height
+        extension = os.path.splitext(self.path)[1].lower()
+        self._encoder = self.ENCODERS.get(extension, FFmpegEncoder)(self.path, width, height, self.fps)
+        for _ in range(self._queue_size):
+            self._free.put(np.empty((height, width, 3), dtype=np.uint8))
+        if self.pbo:
+            for _ in range(2):
+                pbo = Buffer(GL.GL_PIXEL_PACK_BUFFER)
+                pbo.allocate(width * height * 3)
+                self._pbos.append(pbo)
+        self._thread = threading.Thread(target=self._encode, daemon=True)
+        self._thread.start()
+
+    def _queue_pbo(self, pbo):
+        """Copy the pixels of a pixel buffer object into a free array, and queue it for encoding."""
+        pixels = self._free.get()
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        GL.glGetBufferSubData(GL.GL_PIXEL_PACK_BUFFER, 0, pixels.nbytes, pixels)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        self._frames.put(pixels)
+
+    def _encode(self):
+        """Encode the queued frames until the recording is closed."""
+        while True:
+            pixels = self._frames.get()
+            if pixels is None:
+                break
+            if not self._error:
+                try:
+                    self._encoder.write(pixels)
+                except Exception as error:
+                    self._error = error
+            self._free.put(pixels)
+        try:
+            self._encoder.close()
+        except Exception as error:
+            self._error = self._error or error
+
+    def close(self):
+        """Encode the remaining frames, and finish the recording.
+
+        With pixel buffer objects, this has to be called with the GL context of the view current.
+
+        Returns
+        -------
+        None
+        """
+        if self._encoder is None:
+            return
+        if self._pending is not None:
+            self._queue_pbo(self._pending)
+            self._pending = None
+        for pbo in self._pbos:
+            pbo.delete()
+        self._pbos = []
+        self._frames.put(None)
+        self._thread.join()
+        self._encoder = None
+        if self._error:
+            raise self._error
@@ -1,8 +1,12 @@
-import time
-from random import randint
+import asyncio
+from concurrent.futures import Future
+
 import numpy as np
+from qtpy import QtCore
 
-from .worker import Ticker
+from compas_view2.views.picking import encode_id
+from compas_view2.views.picking import id_coverage
+from compas_view2.views.picking import nearest_id
 
 
 class Selector:
@@ -25,26 +29,51 @@ class Selector:
         Selectable types.
     select_from : "pixel" | "box"
         The selection mechanism.
+    picking : "gpu" | "cpu"
+        How objects are picked from a pixel.
+        With "gpu", the pixel is read back from an ID buffer painted by the view on the next redraw.
+        With "cpu", a ray through the pixel is intersected with the faces of the objects, without a redraw.
+    elements : None | "vertices" | "edges" | "faces"
+        The kind of element to select individually, or None to select whole objects.
+    tolerance : int
+        The distance in pixels around the mouse within which vertices and edges are picked.
+    box_mode : "crossing" | "window" | "auto"
+        How objects are selected with a box.
+        With "crossing", objects are selected if they are visible inside the box.
+        With "window", objects are selected only if all their visible pixels lie inside the box.
+        With "auto", boxes dragged from left to right are window selections, and other boxes crossing selections.
+    min_coverage : float
+        The fraction of the visible pixels of an object that has to lie inside the box
+        for a crossing selection to select it, e.g. 0.5 to select objects only if more than half of them is inside.
+        Defaults to 0, i.e. any pixel.
+    coverage : dict[:class:`compas_view2.objects.Object`, tuple[int, float]]
+        The number of pixels of every object inside the box of the last box selection,
+        and the fraction of the visible pixels of the object they are.
     enabled : bool
         Flag indicating to the view that an instance map should be drawn.
     wait_for_selection : bool
-        Flag indicating to wait for the interatice selection to finish
+        Flag indicating that an interactive selection session is in progress
     wait_for_selection_on_plane : bool
-        Flag indicating to wait for the user to pick a location on plane
+        Flag indicating that the user is picking a location on plane
     snap_to_grid : bool
         Turn grid snap on or off.
-    colors_to_exclude : list[tuple[int, int, int]]
-        The instance colors to exclude from the selection process.
-    instances : dict
-        Mapping between pixel colors and scene objects.
-    instance_map : np.array with shape (?,?,3)
-        The painted instance map as np array
+    instances : dict[int, :class:`compas_view2.objects.Object`]
+        Mapping between integer IDs and scene objects.
+        The ID 0 is reserved for the background.
     box_select_coords : list of 4 floats
-        The 2D box selection coordinates on view window: [minX, minY, maxX, maxY]
+        The 2D box selection coordinates on view window: [startX, startY, endX, endY]
     location_on_plane :
         The selected location on plane
     selected : list of instances
         The instances that are selected
+    selected_elements : dict
+        The keys of the selected elements per kind of element, per object, e.g. ``{obj: {"faces": [0, 1]}}``.
+
+    Notes
+    -----
+    The selector does not poll the view.
+    The view emits its ``picked`` signal with the instance map right after painting it,
+    and interactive selection sessions are futures that are resolved when they are finished.
 
     """
 
@@ -55,22 +84,25 @@ class Selector:
         self.overwrite_mode = None
         self.types = []
         self.select_from = "pixel"  # or "box"
+        self.picking = "gpu"  # or "cpu"
+        self.elements = None  # or "vertices", "edges", "faces"
+        self.tolerance = 5
+        self.box_mode = "crossing"  # or "window", "auto"
+        self.min_coverage = 0.0
         # Selector state flags
         self.enabled = False
         self.wait_for_selection = False
         self.wait_for_selection_on_plane = False
         self.snap_to_grid = False
         # Selector data
-        self.colors_to_exclude = [
-            (
-                0,
-                0,
-                0,
-            ),
-            (255, 255, 255),
-        ]
         self.instances = {}
-        self.instance_map = None
+        self.coverage = {}
+        self._next_id = 1
+        self._selected_elements = {}
+        self._selection = None
+        self._selection_on_plane = None
+        # the instance map is handled after the paint event in which it was painted
+        self.app.view.picked.connect(self.on_picked, QtCore.Qt.QueuedConnection)
         self.box_select_coords = np.zeros((4,), int)
         self.location_on_plane = None
 
@@ -82,6 +114,27 @@ class Selector:
     def selected(self):
         return [self.instances[key] for key in self.instances if self.instances[key].is_selected]
 
+    @property
+    def window(self):
+        """bool: Whether the current box selection only selects objects that lie entirely inside the box."""
+        if self.box_mode == "auto":
+            return bool(self.box_select_coords[2] > self.box_select_coords[0])
+        return self.box_mode == "window"
+
+    @property
+    def paints_whole_view(self):
+        """bool: Whether the current box selection needs the instance map of the whole view,
+        to relate the pixels of the objects inside the box to all their visible pixels."""
+        return self.select_from == "box" and not self.elements and (self.window or self.min_coverage > 0)
+
+    @property
+    def selected_elements(self):
+        return {
+            obj: {kind: list(keys) for kind, keys in elements.items() if keys}
+            for obj, elements in self._selected_elements.items()
+            if any(elements.values())
+        }
+
     # -------------------------------------------------------------------------
     # methods
     # -------------------------------------------------------------------------
@@ -106,72 +159,66 @@ class Selector:
         self.snap_to_grid = False
         self.deselect()
 
-    def start_monitor_instance_map(self):
-        """This function triggers a monitor loop to watch the instance map attribute,
-        Once an instance map is painted, the actual selection operation is triggered here.
+    def on_picked(self, instance_map):
+        """Perform the actual selection operation, once the view has painted an instance map.
+
+        Parameters
+        ----------
+        instance_map: np.array
+            instance map of the painted region of the view
 
         Returns
         -------
         None
 
         """
+        if self.elements:
+            # Pick elements from the mouse region or the box selection
+            self.select_elements_from_instance_map(instance_map)
+            self.select_from = "pixel"
+        elif self.select_from == "pixel":
+            # Pick an object from mouse pixel
+            self.select_one_from_instance_map(instance_map)
+        elif self.select_from == "box":
+            # Pick objects from box selection, cropped from the instance map of the whole view if necessary
+            self.select_all_from_instance_map(
+                instance_map, self.box_select_coords.tolist() if self.paints_whole_view else None
+            )
+            self.select_from = "pixel"
+        self.selection_changed()
+
+    def selection_changed(self):
+        """Update the view and the forms, and notify the listeners, after a selection.
 
-        def select():
-            if self.instance_map is not None:
-                instance_map = self.instance_map
-                if self.select_from == "pixel":
-                    # Pick an object from mouse pixel
-                    x = self.app.controller.mouse.last_pos.x()
-                    y = self.app.controller.mouse.last_pos.y()
-                    self.select_one_from_instance_map(x, y, instance_map)
-                if self.select_from == "box":
-                    # Pick objects from box selection
-                    self.select_all_from_instance_map(instance_map)
-                    self.select_from = "pixel"
-                self.app.view.update()
-                self.instance_map = None
-
-                if self.app.dock_slots["propertyform"] is not None and self.selected:
-                    self.app.dock_slots["propertyform"].set_object(self.selected[0])
-                if self.app.dock_slots["sceneform"] is not None:
-                    self.app.dock_slots["sceneform"].select(self.selected)
-                for func in self.app.on_object_selected:
-                    func(self.selected)
-
-        # Start monitor loop in a separate worker thread
-        ticker = Ticker(interval=0.02)
-        ticker.signals.tick.connect(select)
-        Ticker.pool.start(ticker)
-
-        self.app._app.aboutToQuit.connect(ticker.stop)
-
-    def get_rgb_key(self):
-        """
         Returns
         -------
-        rgb_key
-            a tuple of rgb color value in integer
+        None
+
         """
-        while True:
-            rgb_key = (randint(0, 255), randint(0, 255), randint(0, 255))
-            if rgb_key not in self.instances and rgb_key not in self.colors_to_exclude:
-                return rgb_key
+        self.app.view.update()
+        if self.app.dock_slots["propertyform"] is not None and self.selected:
+            self.app.dock_slots["propertyform"].set_object(self.selected[0])
+        if self.app.dock_slots["sceneform"] is not None:
+            self.app.dock_slots["sceneform"].select(self.selected)
+        for func in self.app.on_object_selected:
+            func(self.selected)
 
     def add(self, obj):
-        """Add an object to the list of selector instances, each object will be assigned a unique hex color key
+        """Add an object to the list of selector instances, each object will be assigned a unique integer ID.
 
         Returns
         -------
-        rgb_key
-            a rgb tuple key that represents this object
+        int
+            The ID that represents this object in the instance map.
         """
-        rgb_key = self.get_rgb_key()
-        self.instances[rgb_key] = obj
-        obj._instance_color = np.array(rgb_key) / 255
-        return rgb_key
+        index = self._next_id
+        self._next_id += 1
+        self.instances[index] = obj
+        obj._instance_color = encode_id(index)
+        return index
 
-    def select_one_from_instance_map(self, x, y, instance_map):
-        """Select the object at given pixel location of the instance map
+    def pick(self, x, y):
+        """Pick the nearest object under a pixel of the view, with a ray on the CPU.
 
         Parameters
         ----------
@@ -179,36 +226,178 @@ class Selector:
             x coordinate of the pixel
         y : int
             y coordinate of the pixel
+
+        Returns
+        -------
+        :class:`compas_view2.objects.Object` | None
+            The picked object, if any.
+        """
+        view = self.app.view
+        origin, direction = view.camera.ray(x, y, self.app.width, self.app.height)
+        obj, _ = view.picker.pick(view.objects, origin, direction)
+        return obj
+
+    def select_at(self, x, y):
+        """Select the object or element under a pixel of the view, or in the selection box, on the CPU,
+        without a redraw of the instance map.
+
+        Parameters
+        ----------
+        x : int
+            x coordinate of the pixel
+        y : int
+            y coordinate of the pixel
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Box selections select the objects whose bounding box centers, or the elements whose centers,
+        lie inside the box, whether they are hidden behind other objects or not.
+        Window selections select the objects whose bounding boxes lie entirely inside the box,
+        and :attr:`min_coverage` is ignored.
+        """
+        view = self.app.view
+        width, height = self.app.width, self.app.height
+        matrix = np.dot(view.camera.projection(width, height), view.camera.viewworld())
+        if self.select_from == "box":
+            box = self.box_select_coords.tolist()
+            if self.elements:
+                self.select_elements(
+                    view.picker.select_elements(view.objects, self.elements, matrix, width, height, box)
+                )
+            else:
+                for obj in view.picker.select(view.objects, matrix, width, height, box, self.window):
+                    self.select(obj)
+            self.select_from = "pixel"
+        elif self.elements:
+            obj, key = view.picker.pick_element(
+                view.objects, self.elements, matrix, width, height, x, y, self.tolerance
+            )
+            self.select_elements({obj: [key]} if obj else {})
+        else:
+            self.select(self.pick(x, y))
+        self.selection_changed()
+
+    def select_elements_from_instance_map(self, instance_map):
+        """Select the elements that appear in an instance map of elements.
+
+        For a selection box, all elements in the map are selected,
+        otherwise only the element nearest to the center of the map.
+
+        Parameters
+        ----------
+        instance_map: np.array
+            instance map of elements of the current camera view
+
+        Returns
+        -------
+        None
+        """
+        if self.select_from == "pixel":
+            instance_map = [nearest_id(instance_map)]
+        self.select_elements(self.app.view.element_pass.decode(instance_map))
+
+    def select_elements(self, selection, kind=None, mode=None):
+        """Select elements of objects.
+
+        Parameters
+        ----------
+        selection : dict
+            The keys of the elements per object.
+        kind : "vertices" | "edges" | "faces", optional
+            The kind of the elements.
+            Defaults to the kind of element of the selector.
+        mode : string
+            the selection mode, can be "single", "multi" or "deselect"
+
+        Returns
+        -------
+        None
+        """
+        mode = mode or self.mode
+        kind = kind or self.elements
+        if mode == "single":
+            if not selection:
+                return
+            self._selected_elements = {}
+        for obj, keys in selection.items():
+            selected = self._selected_elements.setdefault(obj, {}).setdefault(kind, {})
+            if mode == "deselect":
+                for key in keys:
+                    selected.pop(key, None)
+            elif mode in ("single", "multi"):
+                # a dict keeps the order of selection, without duplicates
+                selected.update(dict.fromkeys(keys))
+            else:
+                raise NotImplementedError
+
+    def deselect_elements(self, obj=None):
+        """Deselect the elements of an object, or of all objects.
+
+        Parameters
+        ----------
+        obj : compas_view2.objects.Object, optional
+            the target object
+
+        Returns
+        -------
+        None
+        """
+        if obj:
+            self._selected_elements.pop(obj, None)
+        else:
+            self._selected_elements = {}
+
+    def select_one_from_instance_map(self, instance_map):
+        """Select the object at the center pixel of the instance map
+
+        Parameters
+        ----------
         instance_map: np.array
-            instance map of the current camera view
+            instance map of the region around the mouse
 
         Returns
         -------
         None
         """
-        rgb_key = tuple(instance_map[y][x])
-        obj = None
-        if rgb_key in self.instances:
-            obj = self.instances[rgb_key]
+        height, width = instance_map.shape
+        obj = self.instances.get(int(instance_map[height // 2, width // 2]))
         self.select(obj)
 
-    def select_all_from_instance_map(self, instance_map):
-        """Select all the objects that appear in the instance map
+    def select_all_from_instance_map(self, instance_map, box=None):
+        """Select the objects that appear in the instance map, according to the box selection mode.
 
         Parameters
         ----------
         instance_map: np.array
-            instance map of the current camera view
+            instance map of the selection box, or of the whole view
+        box: list of 4 int, optional
+            The coordinates of the selection box, if the instance map is of the whole view.
 
         Returns
         -------
         None
+
+        Notes
+        -----
+        The pixels of every object are counted at once, and stored in :attr:`coverage`.
+        The visible pixels of objects outside the box are only known if the instance map is of the whole view.
         """
-        unique_rgbs = np.unique(instance_map.reshape(-1, instance_map.shape[2]), axis=0)
-        for rgb in unique_rgbs:
-            rgb_key = tuple(rgb)
-            if rgb_key in self.instances:
-                obj = self.instances[rgb_key]
+        ids, pixels, fractions = id_coverage(instance_map, box)
+        if self.window:
+            selected = fractions >= 1
+        else:
+            selected = fractions > self.min_coverage
+        self.coverage = {}
+        for index, count, fraction, select in zip(ids.tolist(), pixels.tolist(), fractions.tolist(), selected):
+            obj = self.instances.get(index)
+            if obj is None:
+                continue
+            self.coverage[obj] = count, fraction
+            if select:
                 self.select(obj)
 
     def select(self, obj=None, mode=None, types=None, update=False):
@@ -270,11 +459,42 @@ class Selector:
         else:
             for key in self.instances:
                 self.instances[key].is_selected = False
+        self.deselect_elements(obj)
         if update:
             self.app.view.update()
 
+    def request_selection(self, types=None, mode="multi", returns="data"):
+        """Start an interactive selection session, without waiting for it to finish.
+
+        Parameters
+        ----------
+        types : list of type
+            the allowed types of object data
+        mode : string
+            the selection mode of the session, default to "multi"
+        returns : string
+            controls whether to return the objects or the data of objects
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future`
+            A future of the list of selected objects or object data,
+            which is resolved when the session is finished with :meth:`finish_selection`.
+        """
+        if returns not in ("data", "object"):
+            raise ValueError("must choose to return 'data' or 'object'")
+        if not isinstance(types, list) and types is not None:
+            types = [types]
+        self.deselect(update=True)
+        self.mode = self.overwrite_mode = mode
+        self.types = types
+        self.wait_for_selection = True
+        self._selection = Future()
+        self._selection.returns = returns
+        return self._selection
+
     def start_selection(self, types=None, mode="multi", returns="data"):
-        """Start an interactive selection session.
+        """Start an interactive selection session, and wait for it to finish.
 
         Parameters
         ----------
@@ -293,23 +513,47 @@ class Selector:
         -----
         This function has to be called inside a interactive (non-blocking) session,
         Otherwise it will freeze the main programme.
+        The calling thread sleeps until the session is finished, without polling.
+        In a coroutine, await :meth:`select_async` instead.
         """
-        if not isinstance(types, list) and types is not None:
-            types = [types]
-        self.deselect(update=True)
-        self.mode = self.overwrite_mode = mode
-        self.types = types
-        self.wait_for_selection = True
-        while self.wait_for_selection:
-            time.sleep(0.05)
-        if returns == "data":
-            selected = [obj._data for obj in self.selected]
-        if returns == "object":
-            selected = [obj for obj in self.selected]
-        else:
-            raise ValueError("must choose to return 'data' or 'object'")
-        self.reset()
-        return selected
+        return self.request_selection(types=types, mode=mode, returns=returns).result()
+
+    async def select_async(self, types=None, mode="multi", returns="data"):
+        """Start an interactive selection session, and await it without blocking the event loop.
+
+        Parameters
+        ----------
+        types : list of type
+            the allowed types of object data
+        mode : string
+            the selection mode of the session, default to "multi"
+        returns : string
+            controls whether to return the objects or the data of objects
+
+        Returns
+        -------
+        list of selected object data
+        """
+        return await asyncio.wrap_future(self.request_selection(types=types, mode=mode, returns=returns))
+
+    def request_selection_on_plane(self, snap_to_grid=False):
+        """Start an interactive selection session to pick a location on the grid plane, without waiting for it.
+
+        Parameters
+        ----------
+        snap_to_grid : bool
+            Whether to snap the location on the grid
+
+        Returns
+        -------
+        :class:`concurrent.futures.Future`
+            A future of the selected location on the plane, or None if the user clicked outside of the grid,
+            which is resolved by :meth:`finish_selection_on_plane` or :meth:`finish_selection`.
+        """
+        self.wait_for_selection_on_plane = True
+        self.snap_to_grid = snap_to_grid
+        self._selection_on_plane = Future()
+        return self._selection_on_plane
 
     def start_selection_on_plane(self, snap_to_grid=False):
         """Start an interactive selection session to pick a location on the grid plane.
@@ -327,12 +571,24 @@ class Selector:
         -----
         This function has to be called inside a interactive (non-blocking) session,
         Otherwise it will freeze the main programme.
+        The calling thread sleeps until the location is picked, without polling.
+        In a coroutine, await :meth:`select_on_plane_async` instead.
         """
-        self.wait_for_selection_on_plane = True
-        self.snap_to_grid = snap_to_grid
-        while self.wait_for_selection_on_plane:
-            time.sleep(0.05)
-        return self.location_on_plane
+        return self.request_selection_on_plane(snap_to_grid=snap_to_grid).result()
+
+    async def select_on_plane_async(self, snap_to_grid=False):
+        """Pick a location on the grid plane, and await it without blocking the event loop.
+
+        Parameters
+        ----------
+        snap_to_grid : bool
+            Whether to snap the location on the grid
+
+        Returns
+        -------
+        List of 3 float numbers, selected location on the plane
+        """
+        return await asyncio.wrap_future(self.request_selection_on_plane(snap_to_grid=snap_to_grid))
 
     def finish_selection_on_plane(self, x, y):
         """Finish selecting location on the grid plane.
@@ -361,12 +617,27 @@ class Selector:
                 x = round(x / self.app.view.grid.cell_size) * self.app.view.grid.cell_size
                 y = round(y / self.app.view.grid.cell_size) * self.app.view.grid.cell_size
             self.location_on_plane = [x, y, 0]
-        self.wait_for_selection_on_plane = False
+        self._resolve_selection_on_plane()
 
     def finish_selection(self):
         """Finish the interactive selection session."""
-        self.wait_for_selection = False
+        self._resolve_selection_on_plane()
+        if not self.wait_for_selection:
+            return
+        selection, self._selection = self._selection, None
+        if selection.returns == "data":
+            selected = [obj._data for obj in self.selected]
+        else:
+            selected = [obj for obj in self.selected]
+        self.reset()
+        selection.set_result(selected)
+
+    def _resolve_selection_on_plane(self):
+        """Resolve the pending selection on plane, if any, with the selected location."""
         self.wait_for_selection_on_plane = False
+        selection, self._selection_on_plane = self._selection_on_plane, None
+        if selection is not None:
+            selection.set_result(self.location_on_plane)
 
     def reset_box_selection(self, x, y):
         """Reset box selection start position
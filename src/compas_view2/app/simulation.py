@@ -0,0 +1,212 @@
+import threading
+import time
+
+import numpy as np
+
+from .timer import Timer
+from .worker import Worker
+
+# the minimum rate at which the GUI thread looks for new states, in milliseconds
+DISPLAY_INTERVAL = 16
+
+
+class Simulation:
+    """Run the callback of a dynamic process on a worker thread, and display its latest state on the GUI thread.
+
+    The callback computes the next state of the process and returns a snapshot of it,
+    without touching the objects of the view or the GL context.
+    Only the latest snapshot is kept.
+    A timer on the GUI thread takes the latest snapshot, applies it to the objects and updates the view.
+    Snapshots that are replaced by a newer one before they could be displayed are dropped,
+    such that a slow view never slows down the process, and a slow process never blocks the view.
+
+    Parameters
+    ----------
+    app : :class:`compas_view2.app.App`
+        The viewer app.
+    func : callable
+        The callback, which takes the number of the step as argument, and returns a snapshot.
+        A snapshot is either a dict mapping objects to pairs of vertex identifiers and their new coordinates,
+        a callable that applies the new state on the GUI thread, or None.
+    interval : int, optional
+        The minimum time between the start of subsequent steps, in milliseconds.
+    timeout : int, optional
+        The pause after every step, in milliseconds.
+    frames : int, optional
+        The number of steps of the process.
+        If no number is provided, the process continues until it is stopped.
+
+    Attributes
+    ----------
+    steps : int
+        The number of computed steps.
+    displayed : int
+        The number of displayed snapshots.
+    dropped : int
+        The number of snapshots that were replaced before they could be displayed.
+    rate : float
+        The number of steps per second, measured over the last second.
+
+    Notes
+    -----
+    The objects of a dict snapshot are updated with ``set_vertex_positions``.
+    The coordinates are compared with those of the previously displayed snapshot of the same object,
+    and only the vertices that have moved are uploaded.
+    The snapshot is copied on the worker thread, so the callback can keep modifying its own arrays.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        @viewer.on(interval=10, threaded=True)
+        def step(frame):
+            X[:] = solve(X)
+            return {obj: (vertices, X)}
+
+    """
+
+    def __init__(self, app, func, interval=None, timeout=None, frames=None):
+        self.app = app
+        self.func = func
+        self.interval = interval
+        self.timeout = timeout
+        self.frames = frames
+        self.steps = 0
+        self.displayed = 0
+        self.dropped = 0
+        self.rate = 0.0
+        self.running = False
+        self._latest = None
+        self._lock = threading.Lock()
+        # the runs are numbered, such that a worker only continues as long as its run is the current one,
+        # and the steps of the workers are serialized, such that the callback never runs twice at the same time
+        self._run_id = 0
+        self._step_lock = threading.Lock()
+        self._applied = {}
+        self.timer = None
+        self.worker = None
+
+    def start(self):
+        """Start computing steps on a worker thread.
+
+        Returns
+        -------
+        None
+        """
+        if self.running:
+            return
+        self.running = True
+        self._run_id += 1
+        # the thread pool deletes a worker once it has run, so every start needs a new one
+        # the worker of a previous run may still be finishing its last step, after which it stops
+        self.worker = Worker(self._run, args=[self._run_id])
+        Worker.pool.start(self.worker)
+        if self.timer is not None:
+            self.timer.stop()
+        interval = min(self.interval or self.timeout or DISPLAY_INTERVAL, DISPLAY_INTERVAL)
+        self.timer = Timer(interval=interval, callback=self._display)
+
+    def stop(self):
+        """Stop computing steps after the current one.
+
+        Returns
+        -------
+        None
+        """
+        self.running = False
+        self._run_id += 1
+
+    def _current(self, run_id):
+        """Whether a run is the current one, and should compute another step."""
+        return run_id == self._run_id and self.running and (self.frames is None or self.steps < self.frames)
+
+    def _run(self, run_id):
+        counted = 0
+        since = time.perf_counter()
+        try:
+            while True:
+                start = time.perf_counter()
+                with self._step_lock:
+                    if not self._current(run_id):
+                        break
+                    snapshot = _copy(self.func(self.steps))
+                    with self._lock:
+                        if self._latest is not None:
+                            self.dropped += 1
+                        self._latest = self.steps, snapshot
+                        self.steps += 1
+                now = time.perf_counter()
+                counted += 1
+                if now - since >= 1:
+                    self.rate = counted / (now - since)
+                    counted = 0
+                    since = now
+                if self.interval:
+                    pause = self.interval / 1000 - (now - start)
+                else:
+                    pause = (self.timeout or 0) / 1000
+                if pause > 0:
+                    time.sleep(pause)
+        finally:
+            # a run that was stopped, and replaced by a new one, leaves the new one running
+            if run_id == self._run_id:
+                self.running = False
+
+    def _display(self):
+        view = self.app.view
+        if not view.isValid():
+            # the GL context of the view does not exist yet
+            return
+        # once the worker has stopped, it will not publish any more states
+        running = self.running
+        with self._lock:
+            latest, self._latest = self._latest, None
+        if latest is None:
+            if not running:
+                self.timer.stop()
+            return
+        frame, snapshot = latest
+        view.makeCurrent()
+        self.apply(snapshot)
+        view.doneCurrent()
+        self.displayed += 1
+        self.app.frame_count = frame + 1
+        view.update()
+        if self.frames is not None and frame + 1 >= self.frames and self.app.record:
+            # paint and record the last frame before finishing the recording
+            view.repaint()
+            self.app._finish_recording()
+
+    def apply(self, snapshot):
+        """Apply a snapshot of the process to the objects of the view.
+
+        Parameters
+        ----------
+        snapshot : dict | callable | None
+            The snapshot.
+
+        Returns
+        -------
+        None
+        """
+        if snapshot is None:
+            return
+        if callable(snapshot):
+            snapshot()
+            return
+        for obj, (keys, xyz) in snapshot.items():
+            applied = self._applied.get(obj)
+            if applied is not None and applied[0] == keys:
+                moved = np.nonzero((xyz != applied[1]).any(axis=1))[0]
+                if len(moved):
+                    obj.set_vertex_positions([keys[index] for index in moved], xyz[moved])
+            else:
+                obj.set_vertex_positions(keys, xyz)
+            self._applied[obj] = keys, xyz
+
+
+def _copy(snapshot):
+    """Copy the vertex coordinates of a snapshot, such that the callback can keep modifying its own arrays."""
+    if isinstance(snapshot, dict):
+        return {obj: (list(keys), np.array(xyz, dtype=float).reshape(-1, 3)) for obj, (keys, xyz) in snapshot.items()}
+    return snapshot
@@ -1 +1,2 @@
 from .collection import Collection  # noqa: F401
+from .instances import Instances  # noqa: F401
@@ -0,0 +1,48 @@
+from typing import List
+
+from compas.colors import Color
+from compas.geometry import Shape
+
+
+class Instances:
+    """A collection of shapes of the same type, which are displayed as instances of one tessellated shape.
+
+    Parameters
+    ----------
+    shapes : list[:class:`compas.geometry.Shape`]
+        Boxes, spheres, cylinders or arrows, all of the same type.
+    colors : list[:class:`compas.colors.Color`], optional
+        The color per shape.
+        If not provided, all shapes have the face color of their object.
+
+    Attributes
+    ----------
+    shapes : list[:class:`compas.geometry.Shape`]
+        The shapes.
+    colors : list[:class:`compas.colors.Color`] | None
+        The color per shape.
+
+    Examples
+    --------
+    >>> from compas.geometry import Sphere
+    >>> instances = Instances([Sphere([i, 0, 0], 0.5) for i in range(10)])
+    >>> instances.shape_type.__name__
+    'Sphere'
+
+    """
+
+    def __init__(self, shapes: List[Shape], colors: List[Color] = None):
+        super().__init__()
+        self.shapes = list(shapes)
+        self.colors = None if colors is None else list(colors)
+        if not self.shapes:
+            raise ValueError("Instances require at least one shape.")
+        if len({type(shape) for shape in self.shapes}) > 1:
+            raise TypeError("All shapes of instances should be of the same type.")
+        if self.colors is not None and len(self.colors) != len(self.shapes):
+            raise ValueError("The number of colors should be equal to the number of shapes.")
+
+    @property
+    def shape_type(self):
+        """The type of the shapes."""
+        return type(self.shapes[0])
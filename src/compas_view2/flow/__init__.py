@@ -1,5 +1,6 @@
 from .flow import Flow  # noqa: F401
 from .node import Node  # noqa: F401
+from .scheduler import Scheduler  # noqa: F401
 from .values import ValueNode  # noqa: F401
 from .values import IntegerNode  # noqa: F401
 from .values import FloatNode  # noqa: F401
@@ -2,6 +2,7 @@ import ryvencore_qt as rc
 import ryvencore
 from compas.datastructures import Graph
 from typing import Union, Tuple, Dict
+from .scheduler import Scheduler
 
 
 class Flow(Graph):
@@ -17,6 +18,16 @@ class Flow(Graph):
     flow_view_size : Tuple[int, int]
         Window size of the flow view.
         Defaults to (800, 500).
+    flow_parallel : bool
+        Whether to execute the nodes on worker threads, independent nodes concurrently.
+        Defaults to False.
+
+    Attributes
+    ----------
+    parallel : bool
+        Whether the nodes are executed on worker threads, without blocking the GUI.
+    scheduler : :class:`compas_view2.flow.Scheduler`
+        The scheduler that executes the nodes on worker threads, if the flow is parallel.
 
     """
 
@@ -24,6 +35,8 @@ class Flow(Graph):
         super().__init__()
         self.app = app
         self.flow_auto_update = flow_config["flow_auto_update"]
+        self.parallel = flow_config.get("flow_parallel", False)
+        self.scheduler = Scheduler(self)
         self.session = rc.Session()
         self.session.design.set_flow_theme(name="pure dark")
         self.script = self.session.create_script(flow_view_size=flow_config["flow_view_size"])
@@ -31,8 +44,34 @@ class Flow(Graph):
         self.script.flow.set_algorithm_mode("data opt")
         self.init_run = False
 
-    def run_all(self):
-        """Execute all the ryven nodes in the order of data flow."""
+    def run_all(self, force=False):
+        """Execute all the ryven nodes in the order of data flow.
+
+        Nodes whose inputs have not changed since their last execution are not executed again,
+        such that only the nodes downstream of a change are recomputed.
+
+        If the flow is parallel, the nodes are scheduled on worker threads, and this function returns immediately.
+        Nodes that are still running from a previous call are cancelled, and executed again.
+
+        Parameters
+        ----------
+        force : bool, optional
+            If True, all nodes are executed, whether their inputs have changed or not.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.parallel:
+            nodes = list(self.flow_view.node_items)
+            if force:
+                for node in nodes:
+                    if hasattr(node, "memo"):
+                        node.memo = None
+            self.scheduler.request(nodes, downstream=False)
+            return
+
         # print("running all nodes")
         executed = set()
         node_update_states = {node: node.block_updates for node in self.flow_view.node_items}
@@ -45,7 +84,10 @@ class Flow(Graph):
                 for connection in port.connections:
                     traverse_upwards(connection.out.node)
             # print("executing", node)
-            node.update_event()
+            if force and hasattr(node, "execute"):
+                node.execute()
+            else:
+                node.update_event()
             executed.add(node)
 
         for node in self.flow_view.node_items:
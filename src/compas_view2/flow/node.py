@@ -1,12 +1,44 @@
 import ryvencore_qt as rc
 import inspect
+import time
 from compas_view2.objects import DATA_OBJECT
+from compas_view2.objects import BufferObject
 from qtpy.QtGui import QColor
 from .widgets import ExecutionControl
 from compas.colors import Color
+from compas.geometry import Point
+from compas.geometry import Vector
 from typing import Union
 import traceback
 
+# the colors of nodes whose function is running on a worker thread, or whose execution was cancelled
+STATUS_COLORS = {"running": "#F0A30A", "cancelled": "#808080"}
+
+
+def _value_key(value):
+    """A hashable key that identifies a value by its contents,
+    or None if the value can not be compared by its contents at little cost."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return type(value), value
+    if isinstance(value, (list, tuple, Point, Vector)):
+        keys = tuple(_value_key(item) for item in value)
+        if None not in keys:
+            return type(value), keys
+    return None
+
+
+def _input_key(port, value):
+    """A hashable key that identifies the value of an input,
+    by its contents, or by the version of the output of the connected node,
+    or None if the value can not be identified."""
+    key = _value_key(value)
+    if key is None and port.connections:
+        node = port.connections[0].out.node
+        version = getattr(node, "version", None)
+        if version is not None:
+            key = node.GLOBAL_ID, version
+    return key
+
 
 def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bool = None, **kwargs):
     """Decorator for creating a custom ryven node in compas_view2 flow.
@@ -29,6 +61,23 @@ def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bo
     callable
         A CustomNode class that wraps the decorated function.
 
+    Notes
+    -----
+    The output of a node is memoized by its inputs.
+    If none of the inputs have changed since the last execution, the function is not executed again,
+    and the nodes downstream are not updated.
+    Inputs are compared by their contents if they are numbers, strings, points, vectors, or lists of these,
+    and by the version of the output of the connected node otherwise,
+    which changes every time the output of that node changes.
+    Running the node from its widget always executes the function.
+
+    If the output has the same type as the previous output,
+    the object that displays it in the scene is updated in place instead of being created again.
+
+    If the flow executes its nodes in parallel, the function runs on a worker thread of
+    :attr:`compas_view2.flow.Flow.scheduler`, and the node is colored while it is running.
+    The function should then only compute its output from its inputs, without modifying them.
+
     """
 
     if Color.is_hex(color):
@@ -54,6 +103,7 @@ def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bo
             """Class that wraps the decorated function."""
 
             title = func.__name__
+            function = staticmethod(func)
             init_inputs = [rc.NodeInputBP(label=name) for name in signature.parameters.keys() if name != "self"]
             init_outputs = [rc.NodeOutputBP(signature.return_annotation.__name__)]
             color = node_color
@@ -63,7 +113,7 @@ def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bo
             def __init__(self, params):
                 super().__init__(params)
                 self.block_updates = not _auto_update
-                self.actions["execute"] = {"method": self.update_event}
+                self.actions["execute"] = {"method": self.execute}
                 self.actions["show_object"] = {"method": self.show_object}
                 self.actions["hide_object"] = {"method": self.hide_object}
                 self.actions["select_object"] = {"method": self.select_object}
@@ -72,6 +122,13 @@ def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bo
                 self.object_properties = kwargs
                 if not self.object_properties.get("facecolor"):
                     self.object_properties["facecolor"] = color
+                # the keys of the inputs of the last successful execution
+                self.memo = None
+                # incremented every time the output changes
+                self.version = 0
+                # the execution time of the function in seconds
+                self.time = None
+                self._output_key = None
 
             def __repr__(self) -> str:
                 return f"<{self.__class__.__name__}({self.title})>"
@@ -116,36 +173,137 @@ def Node(app, color: Union[Color, str, list, tuple] = "#0092D2", auto_update: bo
                     app.remove(self.object)
                     app.view.update()
 
-            def update_event(self, inp=-1):
-                """execute wrapped function."""
+            def execute(self):
+                """Execute the wrapped function, even if its inputs have not changed."""
+                self.update_event(force=True)
+
+            def update_event(self, inp=-1, force=False):
+                """execute wrapped function, unless its inputs have not changed since the last execution.
+
+                If the flow executes its nodes in parallel, the node and the nodes downstream of it are scheduled instead.
+                """
 
                 if not self.app.started:
                     return
 
-                _inputs = [self.input(i) for i in range(len(self.init_inputs))]
+                if self.app.flow.parallel:
+                    if force:
+                        self.memo = None
+                    self.app.flow.scheduler.request([self])
+                    return
+
+                prepared = self.prepare(force)
+                if prepared is None:
+                    return
+                _inputs, keys = prepared
                 try:
+                    start = time.perf_counter()
                     _output = func(*_inputs)
+                except Exception as e:
+                    self.finish(keys, error=e)
+                else:
+                    self.finish(keys, _output, time.perf_counter() - start)
+
+            def prepare(self, force=False):
+                """Read the inputs of the node, unless they have not changed since the last execution.
+
+                Parameters
+                ----------
+                force : bool, optional
+                    If True, the inputs are returned even if they have not changed.
+
+                Returns
+                -------
+                tuple[list, tuple] | None
+                    The inputs and their keys, or None if the function does not need to be executed.
+
+                """
+                if not self.app.started:
+                    return None
+
+                _inputs = [self.input(i) for i in range(len(self.init_inputs))]
+                keys = tuple(_input_key(port, value) for port, value in zip(self.inputs, _inputs))
+                if not force and self.memo is not None and keys == self.memo:
+                    self.item.main_widget.set_time(cached=True)
+                    self.change_color()
+                    return None
+                return _inputs, keys
+
+            def finish(self, keys, output=None, elapsed=None, error=None):
+                """Pass on the output of an execution of the function to the scene and the nodes downstream.
+
+                Parameters
+                ----------
+                keys : tuple
+                    The keys of the inputs of the execution.
+                output : object, optional
+                    The output of the function.
+                elapsed : float, optional
+                    The execution time of the function in seconds.
+                error : Exception, optional
+                    The exception raised by the function, if it failed.
+
+                Returns
+                -------
+                None
+
+                """
+                if error is None:
+                    self.time = elapsed
+                    self.memo = None if None in keys else keys
                     # Restore to default color if the function succeeded
                     self.item.main_widget.set_message()
                     self.change_color()
-
-                except Exception as e:
-                    _output = None
+                else:
+                    output = None
+                    self.time = None
+                    self.memo = None
                     # Change node color and display error message
                     print("Function failed at", self)
-                    print(traceback.format_exc())
-                    self.item.main_widget.set_message(str(e))
+                    print("".join(traceback.format_exception(type(error), error, error.__traceback__)))
+                    self.item.main_widget.set_message(str(error))
                     self.change_color("#FF0000")
 
-                finally:
-                    if self.object:
-                        app.remove(self.object)
+                self.item.main_widget.set_time(self.time)
+                output_key = _value_key(output)
+                if output_key is None or output_key != self._output_key:
+                    self.version += 1
+                self._output_key = output_key
 
-                    if _output and _output.__class__ in DATA_OBJECT:
-                        self.object = app.add(_output, **self.object_properties)
+                self.update_object(output)
+                app.view.update()
+                self.set_output_val(0, output)
 
-                    app.view.update()
-                    self.set_output_val(0, _output)
+            def set_status(self, status):
+                """Show that the function of the node is "running", or that its execution was "cancelled"."""
+                self.change_color(STATUS_COLORS[status])
+                self.item.main_widget.set_status(status)
+
+            def update_object(self, output):
+                """Display the output in the scene.
+
+                If the output has the same type as the data of the current object,
+                the object is updated in place, otherwise it is replaced by a new object.
+                """
+                obj = self.object
+                if (
+                    isinstance(obj, BufferObject)
+                    and obj.replaceable_data
+                    and type(output) is type(obj.data)
+                    and app.view.isValid()
+                ):
+                    obj.data = output
+                    app.view.makeCurrent()
+                    obj.update()
+                    app.view.doneCurrent()
+                    return
+
+                if obj:
+                    app.remove(obj)
+                    self.object = None
+
+                if output and output.__class__ in DATA_OBJECT:
+                    self.object = app.add(output, **self.object_properties)
 
             def change_color(self, color=None):
                 """Change the theme color of the node."""
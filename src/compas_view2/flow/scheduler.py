@@ -0,0 +1,267 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from qtpy import QtCore
+
+# the rate at which the GUI thread collects the results of finished nodes, in milliseconds
+POLL_INTERVAL = 16
+
+
+class Job:
+    """The execution of the function of a node on a worker thread.
+
+    Parameters
+    ----------
+    node : :class:`ryvencore_qt.Node`
+        The node.
+    keys : tuple
+        The keys of the inputs of the node.
+    future : :class:`concurrent.futures.Future`
+        The future of the output and the execution time of the function.
+
+    """
+
+    __slots__ = ("node", "keys", "future")
+
+    def __init__(self, node, keys, future):
+        self.node = node
+        self.keys = keys
+        self.future = future
+
+
+class Scheduler:
+    """Execute the nodes of a flow concurrently on a pool of worker threads, without blocking the GUI thread.
+
+    Nodes that need to be executed are marked as pending, together with all the nodes downstream of them.
+    A pending node is started as soon as none of the nodes directly upstream of it are pending or running,
+    such that independent nodes, for example of the same topological level of the flow graph, run concurrently.
+    The inputs of a node are read on the GUI thread when it is started,
+    and only its function is executed on a worker thread.
+    A timer on the GUI thread collects the outputs of finished nodes,
+    and passes them on to the nodes downstream and to the scene.
+
+    If a node is requested again while it is running, because one of its inputs has changed,
+    its running job and those of the nodes downstream of it are stale.
+    They are cancelled if they have not started yet, their results are discarded otherwise,
+    and the nodes are executed again with the new inputs.
+
+    Parameters
+    ----------
+    flow : :class:`compas_view2.flow.Flow`
+        The flow.
+    max_workers : int, optional
+        The number of worker threads.
+        Defaults to the default of :class:`concurrent.futures.ThreadPoolExecutor`.
+
+    Attributes
+    ----------
+    pending : list[:class:`ryvencore_qt.Node`]
+        The nodes that are waiting to be executed, in the order in which they were requested.
+    jobs : dict[:class:`ryvencore_qt.Node`, :class:`Job`]
+        The running job per node.
+    cancelled : int
+        The number of jobs that were cancelled or discarded because they were stale.
+
+    Notes
+    -----
+    Functions of nodes run concurrently with the GUI thread, and with each other.
+    They should only compute their output from their inputs,
+    and not modify their inputs, or access the view or the scene.
+
+    """
+
+    def __init__(self, flow, max_workers=None):
+        self.flow = flow
+        self.max_workers = max_workers
+        self.pending = []
+        self.jobs = {}
+        self.cancelled = 0
+        self._executor = None
+        # nodes that pass on their outputs request the nodes downstream, while the scheduler is starting nodes
+        self._busy = False
+        self.timer = QtCore.QTimer()
+        self.timer.setInterval(POLL_INTERVAL)
+        self.timer.timeout.connect(self._poll)
+
+    @property
+    def executor(self):
+        """:class:`concurrent.futures.ThreadPoolExecutor` - The pool of worker threads, created when first needed."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="flow")
+        return self._executor
+
+    @property
+    def running(self):
+        """bool - True if any nodes are pending or running."""
+        return bool(self.pending or self.jobs)
+
+    def request(self, nodes, downstream=True):
+        """Request the execution of nodes, and of the nodes downstream of them.
+
+        Parameters
+        ----------
+        nodes : list[:class:`ryvencore_qt.Node`]
+            The nodes.
+        downstream : bool, optional
+            If True, the nodes downstream of the requested nodes are executed as well,
+            as far as they update automatically.
+
+        Returns
+        -------
+        None
+
+        """
+        requested = _downstream(nodes) if downstream else list(nodes)
+        for node in requested:
+            job = self.jobs.pop(node, None)
+            if job is not None:
+                self._cancel(job)
+            if node not in self.pending:
+                self.pending.append(node)
+        if self._busy:
+            return
+        self._dispatch()
+        if self.running and not self.timer.isActive():
+            self.timer.start()
+
+    def cancel(self):
+        """Cancel the execution of all pending and running nodes.
+
+        Returns
+        -------
+        None
+
+        """
+        for job in list(self.jobs.values()):
+            self._cancel(job)
+        for node in self.pending:
+            node.set_status("cancelled")
+        self.jobs.clear()
+        self.pending.clear()
+        self.timer.stop()
+
+    def wait(self, timeout=None):
+        """Process the events of the GUI thread until all nodes have finished.
+
+        Parameters
+        ----------
+        timeout : float, optional
+            The maximum time to wait, in seconds.
+
+        Returns
+        -------
+        bool
+            True if all nodes have finished, False if the time ran out.
+
+        """
+        start = time.perf_counter()
+        while self.running:
+            if timeout is not None and time.perf_counter() - start > timeout:
+                return False
+            QtCore.QCoreApplication.processEvents()
+            self._poll()
+            time.sleep(0.001)
+        return True
+
+    def shutdown(self):
+        """Cancel all nodes, and stop the worker threads once their current functions have returned.
+
+        Returns
+        -------
+        None
+
+        """
+        # the futures of all jobs are cancelled by the scheduler, since executors only do so from Python 3.9
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _cancel(self, job):
+        # a job that has already started can not be stopped, but its result is never collected
+        job.future.cancel()
+        job.node.set_status("cancelled")
+        self.cancelled += 1
+
+    def _poll(self):
+        self._busy = True
+        try:
+            for node, job in list(self.jobs.items()):
+                if not job.future.done():
+                    continue
+                del self.jobs[node]
+                if node not in self.flow.flow_view.node_items:
+                    # the node was removed from the flow
+                    continue
+                try:
+                    output, elapsed = job.future.result()
+                except Exception as error:
+                    node.finish(job.keys, error=error)
+                else:
+                    node.finish(job.keys, output, elapsed)
+        finally:
+            self._busy = False
+        self._dispatch()
+        if not self.running:
+            self.timer.stop()
+
+    def _dispatch(self):
+        """Start the pending nodes whose inputs are final."""
+        self._busy = True
+        try:
+            self._start_pending()
+        finally:
+            self._busy = False
+
+    def _start_pending(self):
+        started = True
+        while started:
+            started = False
+            for node in list(self.pending):
+                if any(upstream in self.jobs or upstream in self.pending for upstream in _upstream(node)):
+                    continue
+                self.pending.remove(node)
+                started = True
+                if node not in self.flow.flow_view.node_items:
+                    # the node was removed from the flow
+                    continue
+                if not hasattr(node, "prepare"):
+                    # value nodes only pass on the values of their widgets
+                    node.update_event()
+                    continue
+                prepared = node.prepare()
+                if prepared is None:
+                    continue
+                inputs, keys = prepared
+                node.set_status("running")
+                self.jobs[node] = Job(node, keys, self.executor.submit(_call, node.function, inputs))
+
+
+def _call(func, inputs):
+    """Call a function on a worker thread, and measure its execution time."""
+    start = time.perf_counter()
+    output = func(*inputs)
+    return output, time.perf_counter() - start
+
+
+def _upstream(node):
+    """The nodes directly upstream of a node."""
+    return [connection.out.node for port in node.inputs for connection in port.connections]
+
+
+def _downstream(nodes):
+    """The nodes, and the nodes downstream of them that update automatically."""
+    visited = []
+
+    def visit(node):
+        if node in visited:
+            return
+        visited.append(node)
+        for port in node.outputs:
+            for connection in port.connections:
+                if not connection.inp.node.block_updates:
+                    visit(connection.inp.node)
+
+    for node in nodes:
+        visit(node)
+    return visited
@@ -23,6 +23,10 @@ class ExecutionControl(QWidget):
         self.button.setStyleSheet("background-color: #0092D2;")
         h_layout.addWidget(self.button)
 
+        self.timing = QLabel()
+        self.timing.setStyleSheet("color: #a0a0a0;")
+        h_layout.addWidget(self.timing)
+
         self.message = QLabel()
         self.message.setMaximumWidth(200)
         layout.addWidget(self.message)
@@ -47,6 +51,19 @@ class ExecutionControl(QWidget):
         else:
             self.message.setVisible(False)
 
+    def set_time(self, time=None, cached=False):
+        """Show the execution time of the node in seconds, or that its output was taken from the cache."""
+        if cached:
+            self.set_status("cached")
+        elif time is None:
+            self.set_status()
+        else:
+            self.set_status("{:.1f} ms".format(time * 1000))
+
+    def set_status(self, status=None):
+        """Show the status of the execution of the node."""
+        self.timing.setText(status or "")
+
     def set_auto_update(self, _, value=None, update_node=True):
         if self.pause_event:
             return
@@ -65,7 +82,7 @@ class ExecutionControl(QWidget):
             self.update_node()
 
     def update_node(self):
-        self.node.update_event()
+        self.node.execute()
 
     def get_state(self) -> dict:
         data = {}
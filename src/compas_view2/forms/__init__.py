@@ -1,6 +1,7 @@
 from .form import Form  # noqa: F401
 from .propertyform import PropertyForm  # noqa: F401
 from .addform import AddForm  # noqa: F401
+from .profilerform import ProfilerForm  # noqa: F401
 
 # from .point import PointForm  # noqa: F401
 # from .line import LineForm  # noqa: F401
@@ -1,7 +1,9 @@
-from .editform import EditForm
+from qtpy import QtWidgets
 
+from .propertyform import PropertyForm
 
-class PointEditForm(EditForm):
+
+class PointEditForm(PropertyForm):
     """Form class for real-time editing of PointObjects
 
     Parameters
@@ -13,7 +15,13 @@ class PointEditForm(EditForm):
     """
 
     def __init__(self, pointobject, on_update=None):
-        super().__init__("Edit Point", on_update=on_update)
-        self.map_number(pointobject._data, "x")
-        self.map_number(pointobject._data, "y")
-        self.map_number(pointobject._data, "z")
+        super().__init__("Edit Point")
+        content = QtWidgets.QWidget()
+        self.setWidget(content)
+        self._inputs = QtWidgets.QVBoxLayout(content)
+        self.obj = pointobject
+        self.on_update = on_update
+        self.map_number(pointobject._data, "x", update_data=True)
+        self.map_number(pointobject._data, "y", update_data=True)
+        self.map_number(pointobject._data, "z", update_data=True)
+        self._inputs.addStretch()
@@ -0,0 +1,183 @@
+from qtpy import QtCore
+from qtpy import QtGui
+from qtpy import QtWidgets
+
+COLORS = ["#4e79a7", "#f28e2b", "#e15759", "#76b7b2", "#59a14f", "#edc948", "#b07aa1", "#ff9da7", "#9c755f", "#bab0ac"]
+
+# the frame time of 60 fps, in milliseconds
+BUDGET = 1000 / 60
+
+
+class FrameGraph(QtWidgets.QWidget):
+    """Rolling graph of the CPU times of the stages of the last frames, stacked per frame."""
+
+    def __init__(self, profiler, stages):
+        super().__init__()
+        self.profiler = profiler
+        self.stages = stages
+        self.setMinimumHeight(120)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#202020"))
+        frames = list(self.profiler.frames)
+        width, height = self.width(), self.height()
+        if frames:
+            scale = height / max(2 * BUDGET, max(frame["cpu"].get("frame", 0) for frame in frames))
+            bar = width / self.profiler.history
+            x = width - len(frames) * bar
+            for frame in frames:
+                y = height
+                for index, stage in enumerate(self.stages()):
+                    h = frame["cpu"].get(stage, 0) * scale
+                    painter.fillRect(QtCore.QRectF(x, y - h, max(bar - 1, 1), h), QtGui.QColor(COLORS[index % 10]))
+                    y -= h
+                x += bar
+            painter.setPen(QtGui.QColor("#ffffff"))
+            y = height - BUDGET * scale
+            painter.drawLine(QtCore.QPointF(0, y), QtCore.QPointF(width, y))
+            painter.drawText(QtCore.QPointF(4, y - 4), "16.7 ms")
+        painter.end()
+
+
+class FrameHistogram(QtWidgets.QWidget):
+    """Histogram of the CPU times of the last frames."""
+
+    def __init__(self, profiler, bins=30):
+        super().__init__()
+        self.profiler = profiler
+        self.bins = bins
+        self.setMinimumHeight(80)
+
+    def paintEvent(self, event):
+        painter = QtGui.QPainter(self)
+        painter.fillRect(self.rect(), QtGui.QColor("#202020"))
+        counts, edges = self.profiler.histogram(bins=self.bins)
+        width, height = self.width(), self.height() - 16
+        if counts.any():
+            bar = width / len(counts)
+            scale = height / counts.max()
+            for index, count in enumerate(counts):
+                h = count * scale
+                painter.fillRect(QtCore.QRectF(index * bar, height - h, max(bar - 1, 1), h), QtGui.QColor(COLORS[0]))
+            painter.setPen(QtGui.QColor("#ffffff"))
+            painter.drawText(QtCore.QPointF(2, height + 13), "0 ms")
+            label = "{:.1f} ms".format(edges[-1])
+            painter.drawText(
+                QtCore.QPointF(width - painter.fontMetrics().horizontalAdvance(label) - 2, height + 13), label
+            )
+        painter.end()
+
+
+class ProfilerForm(QtWidgets.QDockWidget):
+    """Dock widget with the frame times measured by the profiler of the view.
+
+    The profiler is enabled while the form is visible.
+    It shows a rolling graph of the CPU times of the stages of the last frames,
+    a histogram of the frame times, statistics of the CPU and GPU times per stage,
+    and the objects that are most expensive to draw.
+    The measurements can be exported as JSON or as a Chrome trace.
+
+    Parameters
+    ----------
+    app : :class:`compas_view2.app.App`
+        The parent application.
+    title : str, optional
+        The title of the form.
+
+    """
+
+    def __init__(self, app, title="Profiler"):
+        super().__init__(title)
+        self.app = app
+        self.profiler = app.view.profiler
+        self.setMinimumWidth(300)
+        scroll = QtWidgets.QScrollArea()
+        self.setWidget(scroll)
+        content = QtWidgets.QWidget()
+        scroll.setWidget(content)
+        scroll.setWidgetResizable(True)
+        layout = QtWidgets.QVBoxLayout(content)
+
+        self.graph = FrameGraph(self.profiler, self.top_stages)
+        layout.addWidget(self.graph)
+        self.histogram = FrameHistogram(self.profiler)
+        layout.addWidget(self.histogram)
+        self.table = QtWidgets.QLabel()
+        self.table.setTextFormat(QtCore.Qt.RichText)
+        self.table.setAlignment(QtCore.Qt.AlignTop)
+        layout.addWidget(self.table)
+
+        buttons = QtWidgets.QHBoxLayout()
+        for text, slot in (
+            ("Reset", self.reset),
+            ("Export JSON", self.export_json),
+            ("Export trace", self.export_trace),
+        ):
+            button = QtWidgets.QPushButton(text)
+            button.clicked.connect(lambda checked=False, slot=slot: slot())
+            buttons.addWidget(button)
+        layout.addLayout(buttons)
+        layout.addStretch()
+
+        self.timer = QtCore.QTimer()
+        self.timer.setInterval(500)
+        self.timer.timeout.connect(self.refresh)
+
+    def top_stages(self):
+        """The stages directly within a frame."""
+        depth = self.profiler.frames[-1]["depth"] if self.profiler.frames else {}
+        return [stage for stage in self.profiler.stages if depth.get(stage) == 1]
+
+    def showEvent(self, event):
+        self.profiler.enabled = True
+        self.timer.start()
+        self.app.view.update()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        self.profiler.enabled = False
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        """Redraw the graphs and the statistics with the latest measurements."""
+        self.graph.update()
+        self.histogram.update()
+        top = self.top_stages()
+        rows = ["<tr><th align='left'>stage</th><th>cpu mean</th><th>p95</th><th>gpu mean</th></tr>"]
+        for stage, stats in self.profiler.summary().items():
+            if stats["cpu"] is None:
+                continue
+            color = COLORS[top.index(stage) % 10] if stage in top else "transparent"
+            name = "&nbsp;&nbsp;" * max(stats["depth"] - 1, 0) + stage
+            gpu = "{:.2f}".format(stats["gpu"]["mean"]) if stats.get("gpu") else "-"
+            rows.append(
+                "<tr><td><span style='color:{}'>&#9632;</span> {}</td>"
+                "<td align='right'>{:.2f}</td><td align='right'>{:.2f}</td><td align='right'>{}</td></tr>".format(
+                    color, name, stats["cpu"]["mean"], stats["cpu"]["p95"], gpu
+                )
+            )
+        costs = self.profiler.object_costs(5)
+        if costs:
+            rows.append("<tr><th align='left'>object</th><th>cpu mean</th></tr>")
+            for name, cost in costs:
+                rows.append("<tr><td>{}</td><td align='right'>{:.3f}</td></tr>".format(name, cost))
+        self.table.setText("<table cellspacing='4'>{}</table><p>times in ms</p>".format("".join(rows)))
+
+    def reset(self):
+        """Forget all measurements."""
+        self.profiler.reset()
+        self.refresh()
+
+    def export_json(self, filepath=None):
+        """Save the measurements as JSON."""
+        filepath = filepath or QtWidgets.QFileDialog.getSaveFileName(caption="File name", filter="JSON (*.json)")[0]
+        if filepath:
+            self.profiler.to_json(filepath)
+
+    def export_trace(self, filepath=None):
+        """Save the measurements as a Chrome trace."""
+        filepath = filepath or QtWidgets.QFileDialog.getSaveFileName(caption="File name", filter="JSON (*.json)")[0]
+        if filepath:
+            self.profiler.to_trace(filepath)
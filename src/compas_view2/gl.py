@@ -1,6 +1,9 @@
-import ctypes as ct
+import numpy as np
 from OpenGL import GL
 
+LIVE_HANDLES = {"buffers": 0, "textures": 0}
+_INSTANCING = {}
+
 
 def gl_info():
     """Return formatted information about the current GL implementation.
@@ -24,20 +27,408 @@ def gl_info():
     return info
 
 
+def live_handles():
+    """Count the GL buffers and textures that were created by the viewer and have not been deleted yet.
+
+    Returns
+    -------
+    dict[str, int]
+        The number of live handles per type of resource.
+
+    Notes
+    -----
+    This is meant for debugging, e.g. to verify in tests that removing objects does not leak GPU memory.
+
+    Examples
+    --------
+    >>> before = live_handles()
+    >>> buffer = Buffer()
+    >>> live_handles()["buffers"] - before["buffers"]
+    1
+    >>> buffer.delete()
+    >>> live_handles() == before
+    True
+
+    """
+    return dict(LIVE_HANDLES)
+
+
+def instancing():
+    """Find the GL functions for instanced drawing in the current context.
+
+    Returns
+    -------
+    tuple[callable, callable] | None
+        The functions to draw instances of elements and to set the divisor of a vertex attribute,
+        i.e. ``glDrawElementsInstanced`` and ``glVertexAttribDivisor``, or their ARB equivalents.
+        None if the context does not support instanced drawing.
+
+    Notes
+    -----
+    Instanced drawing is core functionality since OpenGL 3.3.
+    Contexts for OpenGL 2.1 may still provide it through the ``ARB_draw_instanced`` and ``ARB_instanced_arrays`` extensions.
+
+    """
+    if "functions" not in _INSTANCING:
+        from OpenGL.GL.ARB.draw_instanced import glDrawElementsInstancedARB
+        from OpenGL.GL.ARB.instanced_arrays import glVertexAttribDivisorARB
+
+        functions = None
+        for draw, divisor in [
+            (GL.glDrawElementsInstanced, GL.glVertexAttribDivisor),
+            (glDrawElementsInstancedARB, glVertexAttribDivisorARB),
+        ]:
+            if bool(draw) and bool(divisor):
+                functions = draw, divisor
+                break
+        _INSTANCING["functions"] = functions
+    return _INSTANCING["functions"]
+
+
+def as_vertex_array(data):
+    """Convert vertex data to a contiguous array of float32 values.
+
+    Parameters
+    ----------
+    data: list[float] | :class:`numpy.ndarray`
+        A flat list of floats, or an array of floats of any shape.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The data as contiguous float32 array.
+        If the input already is such an array, it is returned as-is.
+
+    """
+    return np.ascontiguousarray(data, dtype=np.float32)
+
+
+def as_index_array(data):
+    """Convert element data to a contiguous array of uint32 values.
+
+    Parameters
+    ----------
+    data: list[int] | :class:`numpy.ndarray`
+        A flat list of ints, or an array of ints of any shape.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The data as contiguous uint32 array.
+        If the input already is such an array, it is returned as-is.
+
+    """
+    return np.ascontiguousarray(data, dtype=np.uint32)
+
+
+class Buffer(int):
+    """A GL buffer that keeps track of the size of its allocated storage.
+
+    The buffer behaves as its integer ID, so it can be passed to any GL function that expects a buffer name.
+    The ID of the buffer does not change when its storage is reallocated.
+
+    Parameters
+    ----------
+    target : int, optional
+        The buffer binding target, e.g. ``GL.GL_ARRAY_BUFFER`` or ``GL.GL_ELEMENT_ARRAY_BUFFER``.
+    dynamic : bool, optional
+        If True, the buffer is optimized for dynamic access,
+        and its storage is orphaned whenever it is overwritten completely.
+
+    Attributes
+    ----------
+    target : int
+        The buffer binding target.
+    dynamic : bool
+        Whether the buffer is optimized for dynamic access.
+    capacity : int
+        The number of bytes allocated for the buffer.
+    size : int
+        The number of bytes of the data in the buffer.
+    is_deleted : bool
+        Whether the GL name of the buffer has been deleted.
+
+    Examples
+    --------
+    >>> import numpy as np
+    >>> buffer = Buffer(GL.GL_ARRAY_BUFFER)
+    >>> buffer.write(np.zeros((4, 3), dtype=np.float32))
+    >>> buffer.capacity
+    48
+    >>> buffer.write(np.zeros((5, 3), dtype=np.float32))
+    >>> buffer.capacity
+    96
+    >>> buffer.delete()
+
+    """
+
+    def __new__(cls, target=GL.GL_ARRAY_BUFFER, dynamic=False):
+        buffer = super().__new__(cls, GL.glGenBuffers(1))
+        buffer.target = target
+        buffer.dynamic = dynamic
+        buffer.capacity = 0
+        buffer.size = 0
+        buffer.is_deleted = False
+        LIVE_HANDLES["buffers"] += 1
+        return buffer
+
+    @property
+    def usage(self):
+        if self.target == GL.GL_PIXEL_PACK_BUFFER:
+            return GL.GL_STREAM_READ
+        return GL.GL_DYNAMIC_DRAW if self.dynamic else GL.GL_STATIC_DRAW
+
+    def allocate(self, capacity, data=None):
+        """Allocate new storage for the buffer, discarding the current contents.
+
+        Parameters
+        ----------
+        capacity : int
+            The number of bytes to allocate.
+        data : :class:`numpy.ndarray`, optional
+            Data to fill the new storage with.
+            If provided, its size should be equal to the capacity.
+
+        Returns
+        -------
+        None
+
+        """
+        GL.glBindBuffer(self.target, self)
+        GL.glBufferData(self.target, capacity, data, self.usage)
+        GL.glBindBuffer(self.target, 0)
+        self.capacity = capacity
+
+    def write(self, data, offset=None):
+        """Write data to the buffer, growing its storage if needed.
+
+        Parameters
+        ----------
+        data : :class:`numpy.ndarray`
+            A contiguous array.
+        offset : int, optional
+            The offset in bytes from the start of the buffer at which the data is written.
+            If None, the data replaces the contents of the buffer.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If a range is written past the end of the buffer.
+            Only complete rewrites of the buffer can grow its storage.
+
+        Notes
+        -----
+        The storage grows geometrically, to at least twice its previous capacity,
+        such that a buffer that grows steadily is reallocated only a logarithmic number of times.
+        The storage of dynamic buffers is orphaned before they are rewritten completely,
+        such that the driver does not have to wait for pending draw calls that still use the old contents.
+
+        """
+        nbytes = data.nbytes
+        if offset is not None:
+            if offset + nbytes > self.capacity:
+                raise ValueError(
+                    "Writing {} bytes at offset {} exceeds the buffer capacity of {} bytes.".format(
+                        nbytes, offset, self.capacity
+                    )
+                )
+            self.size = max(self.size, offset + nbytes)
+        elif nbytes > self.capacity:
+            if nbytes >= 2 * self.capacity:
+                self.allocate(nbytes, data)
+                self.size = nbytes
+                return
+            self.allocate(2 * self.capacity)
+            self.size = nbytes
+        else:
+            if self.dynamic and nbytes:
+                self.allocate(self.capacity)
+            self.size = nbytes
+        if nbytes:
+            GL.glBindBuffer(self.target, self)
+            GL.glBufferSubData(self.target, offset or 0, nbytes, data)
+            GL.glBindBuffer(self.target, 0)
+
+    def read(self, dtype=np.float32):
+        """Read the data of the buffer back from the GPU.
+
+        Parameters
+        ----------
+        dtype : :class:`numpy.dtype`, optional
+            The type of the values in the buffer.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            A flat array with the data of the buffer.
+
+        """
+        if not self.size:
+            return np.zeros(0, dtype=dtype)
+        GL.glBindBuffer(self.target, self)
+        data = GL.glGetBufferSubData(self.target, 0, self.size)
+        GL.glBindBuffer(self.target, 0)
+        return np.frombuffer(data, dtype=dtype)
+
+    def delete(self):
+        """Delete the GL name of the buffer, and release its storage.
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.is_deleted:
+            GL.glDeleteBuffers(1, [int(self)])
+            self.is_deleted = True
+            self.capacity = 0
+            self.size = 0
+            LIVE_HANDLES["buffers"] -= 1
+
+
+class Texture(int):
+    """A GL texture that can be deleted once.
+
+    The texture behaves as its integer ID, so it can be passed to any GL function that expects a texture name.
+
+    Parameters
+    ----------
+    target : int, optional
+        The texture binding target.
+
+    Attributes
+    ----------
+    target : int
+        The texture binding target.
+    capacity : int
+        The number of bytes of the image data of the texture, as recorded by its owner.
+    is_deleted : bool
+        Whether the GL name of the texture has been deleted.
+
+    """
+
+    def __new__(cls, target=GL.GL_TEXTURE_2D):
+        texture = super().__new__(cls, GL.glGenTextures(1))
+        texture.target = target
+        texture.capacity = 0
+        texture.is_deleted = False
+        LIVE_HANDLES["textures"] += 1
+        return texture
+
+    def delete(self):
+        """Delete the GL name of the texture, and release its storage.
+
+        Returns
+        -------
+        None
+
+        """
+        if not self.is_deleted:
+            GL.glDeleteTextures(1, [int(self)])
+            self.is_deleted = True
+            self.capacity = 0
+            LIVE_HANDLES["textures"] -= 1
+
+
+class Framebuffer:
+    """An offscreen framebuffer with a color attachment of 8 bits per RGBA component and a 24-bit depth attachment.
+
+    The attachments are renderbuffers, which are (re)allocated when the size of the framebuffer changes.
+
+    Attributes
+    ----------
+    width : int
+        The width of the framebuffer in pixels.
+    height : int
+        The height of the framebuffer in pixels.
+
+    """
+
+    def __init__(self):
+        self.width = 0
+        self.height = 0
+        self._framebuffer = None
+        self._color = None
+        self._depth = None
+
+    def resize(self, width, height):
+        """Make sure the framebuffer has a given size.
+
+        Parameters
+        ----------
+        width : int
+            The width in pixels.
+        height : int
+            The height in pixels.
+
+        Returns
+        -------
+        None
+        """
+        width, height = max(int(width), 1), max(int(height), 1)
+        if self._framebuffer is not None and (width, height) == (self.width, self.height):
+            return
+        if self._framebuffer is None:
+            self._framebuffer = GL.glGenFramebuffers(1)
+            self._color, self._depth = GL.glGenRenderbuffers(2)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self._color)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self._depth)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH_COMPONENT24, width, height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, 0)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self._framebuffer)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self._color)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_ATTACHMENT, GL.GL_RENDERBUFFER, self._depth)
+        status = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, 0)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise RuntimeError("The framebuffer is incomplete: {}".format(status))
+        self.width, self.height = width, height
+
+    def bind(self):
+        """Bind the framebuffer, and set the viewport to all of it.
+
+        Returns
+        -------
+        None
+        """
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self._framebuffer)
+        GL.glViewport(0, 0, self.width, self.height)
+
+    def delete(self):
+        """Delete the framebuffer and its attachments.
+
+        Returns
+        -------
+        None
+        """
+        if self._framebuffer is None:
+            return
+        GL.glDeleteRenderbuffers(2, [self._color, self._depth])
+        GL.glDeleteFramebuffers(1, [self._framebuffer])
+        self._framebuffer = self._color = self._depth = None
+        self.width = self.height = 0
+
+
 def make_vertex_buffer(data, dynamic=False):
     """Make a vertex buffer from the given data.
 
     Parameters
     ----------
-    data: list[float]
-        A flat list of floats.
+    data: list[float] | :class:`numpy.ndarray`
+        A flat list of floats, or an array of floats.
+        Contiguous float32 arrays are uploaded directly, without copying.
     dynamic : bool, optional
         If True, the buffer is optimized for dynamic access.
 
     Returns
     -------
-    int
-        Vertex buffer ID.
+    :class:`Buffer`
+        Vertex buffer, which is also its ID.
 
     Examples
     --------
@@ -45,15 +436,12 @@ def make_vertex_buffer(data, dynamic=False):
     >>> vertices = [[0, 0, 0], [1, 0, 0], [2, 0, 0], [3, 0, 0]]
     >>> buffer = make_vertex_buffer(list(flatten(vertices)))
 
+    >>> import numpy as np
+    >>> buffer = make_vertex_buffer(np.array(vertices, dtype=np.float32))
+
     """
-    access = GL.GL_DYNAMIC_DRAW if dynamic else GL.GL_STATIC_DRAW
-    n = len(data)
-    size = n * ct.sizeof(ct.c_float)
-    vbo = GL.glGenBuffers(1)
-    data = (ct.c_float * n)(*data)
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, vbo)
-    GL.glBufferData(GL.GL_ARRAY_BUFFER, size, data, access)
-    GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
+    vbo = Buffer(GL.GL_ARRAY_BUFFER, dynamic=dynamic)
+    vbo.write(as_vertex_array(data))
     return vbo
 
 
@@ -62,15 +450,16 @@ def make_index_buffer(data, dynamic=False):
 
     Parameters
     ----------
-    data: list[int]
-        A flat list of ints.
+    data: list[int] | :class:`numpy.ndarray`
+        A flat list of ints, or an array of ints.
+        Contiguous uint32 arrays are uploaded directly, without copying.
     dynamic : bool, optional
         If True, the buffer is optimized for dynamic access.
 
     Returns
     -------
-    int
-        Element buffer ID.
+    :class:`Buffer`
+        Element buffer, which is also its ID.
 
     Examples
     --------
@@ -79,58 +468,72 @@ def make_index_buffer(data, dynamic=False):
     >>> buffer = make_index_buffer(list(flatten(edges)))
 
     """
-    access = GL.GL_DYNAMIC_DRAW if dynamic else GL.GL_STATIC_DRAW
-    n = len(data)
-    size = n * ct.sizeof(ct.c_uint)
-    vbo = GL.glGenBuffers(1)
-    data = (ct.c_int * n)(*data)
-    GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, vbo)
-    GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, size, data, access)
-    GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
+    vbo = Buffer(GL.GL_ELEMENT_ARRAY_BUFFER, dynamic=dynamic)
+    vbo.write(as_index_array(data))
     return vbo
 
 
-def update_vertex_buffer(data, buffer):
+def update_vertex_buffer(data, buffer, offset=None):
     """Update a vertex buffer with new data.
 
     Parameters
     ----------
-    data: list[float]
-        A flat list of floats.
-    buffer : int
-        The ID of the buffer.
+    data: list[float] | :class:`numpy.ndarray`
+        A flat list of floats, or an array of floats.
+    buffer : :class:`Buffer` | int
+        The buffer, or the ID of the buffer.
+    offset : int, optional
+        The offset in bytes from the start of the buffer at which the data is written.
+        This allows a range of a buffer to be updated without uploading the rest.
+        If None, the data replaces the contents of the buffer.
 
     Returns
     -------
     None
 
+    Notes
+    -----
+    A :class:`Buffer` grows when the data does not fit in its storage.
+    A plain buffer ID is assumed to be large enough.
+
     """
-    n = len(data)
-    size = n * ct.sizeof(ct.c_float)
-    data = (ct.c_float * n)(*data)
+    data = as_vertex_array(data)
+    if isinstance(buffer, Buffer):
+        buffer.write(data, offset)
+        return
     GL.glBindBuffer(GL.GL_ARRAY_BUFFER, buffer)
-    GL.glBufferSubData(GL.GL_ARRAY_BUFFER, 0, size, data)
+    GL.glBufferSubData(GL.GL_ARRAY_BUFFER, offset or 0, data.nbytes, data)
     GL.glBindBuffer(GL.GL_ARRAY_BUFFER, 0)
 
 
-def update_index_buffer(data, buffer):
+def update_index_buffer(data, buffer, offset=None):
     """Update an index buffer with new data.
 
     Parameters
     ----------
-    data: list[int]
-        A flat list of ints.
-    buffer : int
-        The ID of the buffer.
+    data: list[int] | :class:`numpy.ndarray`
+        A flat list of ints, or an array of ints.
+    buffer : :class:`Buffer` | int
+        The buffer, or the ID of the buffer.
+    offset : int, optional
+        The offset in bytes from the start of the buffer at which the data is written.
+        This allows a range of a buffer to be updated without uploading the rest.
+        If None, the data replaces the contents of the buffer.
 
     Returns
     -------
     None
 
+    Notes
+    -----
+    A :class:`Buffer` grows when the data does not fit in its storage.
+    A plain buffer ID is assumed to be large enough.
+
     """
-    n = len(data)
-    size = n * ct.sizeof(ct.c_uint)
-    data = (ct.c_int * n)(*data)
+    data = as_index_array(data)
+    if isinstance(buffer, Buffer):
+        buffer.write(data, offset)
+        return
     GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, buffer)
-    GL.glBufferSubData(GL.GL_ELEMENT_ARRAY_BUFFER, 0, size, data)
+    GL.glBufferSubData(GL.GL_ELEMENT_ARRAY_BUFFER, offset or 0, data.nbytes, data)
     GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, 0)
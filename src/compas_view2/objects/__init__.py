@@ -23,6 +23,7 @@ from compas.robots import RobotModel
 from compas_view2.shapes import Arrow
 from compas_view2.shapes import Text
 from compas_view2.collections import Collection
+from compas_view2.collections import Instances
 
 from .object import Object
 from .bufferobject import BufferObject  # noqa : F401
@@ -36,13 +37,17 @@ from .frameobject import FrameObject
 
 from .networkobject import NetworkObject
 from .meshobject import MeshObject
+from .tessellation import TessellationCache  # noqa : F401
+from .shapeobject import ShapeObject  # noqa : F401
 
 from .boxobject import BoxObject
 from .sphereobject import SphereObject
 from .torusobject import TorusObject
 from .arrowobject import ArrowObject
 from .textobject import TextObject
+from .labelsobject import LabelsObject  # noqa : F401
 from .collectionobject import CollectionObject
+from .instancesobject import InstancesObject
 from .gridobject import GridObject  # noqa : F401
 from .cylinderobject import CylinderObject
 from .planeobject import PlaneObject
@@ -96,6 +101,7 @@ Object.register(Network, NetworkObject)
 Object.register(Mesh, MeshObject)
 
 Object.register(Collection, CollectionObject)
+Object.register(Instances, InstancesObject)
 Object.register(RobotModel, RobotObject)
 
 if BRep and BRepObject:
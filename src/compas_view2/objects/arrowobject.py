@@ -1,20 +1,17 @@
-from compas.datastructures import Mesh
 from compas_view2.shapes import Arrow
-from .meshobject import MeshObject
+from .shapeobject import ShapeObject
 
 
-class ArrowObject(MeshObject):
+class ArrowObject(ShapeObject):
     """Object for displaying COMPAS arrow geometry."""
 
     def __init__(self, data, u=16, **kwargs):
-        super().__init__(Mesh.from_shape(data, u=u), **kwargs)
-        self.u = u
-        self._data = data
+        super().__init__(data, u=u, **kwargs)
 
-    def update(self):
-        self._mesh = Mesh.from_shape(self._data, u=self.u)
-        self.init()
-        super().update()
+    def _unit_shape(self):
+        arrow = self._data
+        parameters = arrow.head_portion, arrow.head_width, arrow.body_width
+        return Arrow([0, 0, 0], [0, 0, 1], *parameters), parameters
 
     @property
     def properties(self):
@@ -23,7 +23,7 @@ class BRepObject(BufferObject):
 
     @property
     def brep(self):
-        return self.item
+        return self._data
 
     @property
     def mesh(self):
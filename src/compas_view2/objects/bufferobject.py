@@ -3,6 +3,8 @@ import numpy as np
 from compas.utilities import flatten
 from compas.geometry import transform_points_numpy
 
+from compas_view2.gl import as_index_array
+from compas_view2.gl import as_vertex_array
 from compas_view2.gl import make_index_buffer
 from compas_view2.gl import make_vertex_buffer
 from compas_view2.gl import update_vertex_buffer
@@ -10,6 +12,11 @@ from compas_view2.gl import update_index_buffer
 
 from .object import Object
 
+BUFFER_NAMES = ("points", "lines", "frontfaces", "backfaces")
+
+# per kind of element: the buffer of its primitives, and the number of corners per primitive
+ELEMENT_BUFFERS = {"vertices": ("points", 1), "edges": ("lines", 2), "faces": ("frontfaces", 3)}
+
 
 class BufferObject(Object):
     """A shared object to handle GL buffer creation and drawings
@@ -18,8 +25,23 @@ class BufferObject(Object):
     ----------
     visualisation : list[str], read-only
         List of visualisation properties which can be edited in the GUI.
+
+    Notes
+    -----
+    Subclasses provide their geometry through any of the methods
+    ``_points_data``, ``_lines_data``, ``_frontfaces_data`` and ``_backfaces_data``.
+    Each of these returns a tuple of positions, colors and elements.
+    These can be nested lists, or (preferably) NumPy arrays of shape (n, 3) for positions and colors,
+    and of any shape for the elements.
+    Contiguous float32 positions/colors and uint32 elements are uploaded to the GPU without any conversion.
+
     """
 
+    _arrays = None
+    _buffer_arrays = None
+    _vertex_buffers = None
+    _released = False
+
     @property
     def visualisation(self):
         options = ["opacity"]
@@ -31,6 +53,62 @@ class BufferObject(Object):
             options += ["facecolor", "show_faces"]
         return options
 
+    @staticmethod
+    def buffer_arrays(data):
+        """Convert point/line/face data to arrays that can be uploaded to the GPU.
+
+        Parameters
+        ----------
+        data: tuple
+            Contains positions, colors, elements for the buffer,
+            as nested lists or as NumPy arrays.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            Float32 positions and colors of shape (n, 3), and a flat uint32 array of elements.
+            Input arrays of the correct type and shape are returned as-is.
+        """
+        positions, colors, elements = data
+        positions = _as_array(positions, as_vertex_array)
+        colors = _as_array(colors, as_vertex_array)
+        elements = _as_array(elements, as_index_array)
+        if positions.ndim != 2:
+            positions = positions.reshape(-1, 3)
+        if colors.ndim != 2:
+            colors = colors.reshape(-1, 3)
+        if elements.ndim != 1:
+            elements = elements.reshape(-1)
+        return positions, colors, elements
+
+    def _merge_data(self, objects, name):
+        """Concatenate the point/line/face data of several objects into a single set of arrays.
+
+        Parameters
+        ----------
+        objects: list[:class:`BufferObject`]
+            The objects to merge.
+        name: str
+            The name of the data method, e.g. "_lines_data".
+
+        Returns
+        -------
+        tuple
+            Contains positions, colors, elements for the buffer
+        """
+        positions, colors, elements = [], [], []
+        n = 0
+        for obj in objects:
+            if hasattr(obj, name):
+                p, c, e = self.buffer_arrays(getattr(obj, name)())
+                positions.append(p)
+                colors.append(c)
+                elements.append(e + n)
+                n += len(p)
+        if not positions:
+            return [], [], []
+        return np.concatenate(positions), np.concatenate(colors), np.concatenate(elements)
+
     def make_buffer_from_data(self, data):
         """Create buffers from point/line/face data.
 
@@ -44,12 +122,12 @@ class BufferObject(Object):
         buffer_dict
            A dict with created buffer indexes
         """
-        positions, colors, elements = data
+        positions, colors, elements = self.buffer_arrays(data)
         return {
-            "positions": make_vertex_buffer(list(flatten(positions))),
-            "colors": make_vertex_buffer(list(flatten(colors))),
-            "elements": make_index_buffer(list(flatten(elements))),
-            "n": len(list(flatten(elements))),
+            "positions": make_vertex_buffer(positions),
+            "colors": make_vertex_buffer(colors),
+            "elements": make_index_buffer(elements),
+            "n": len(elements),
         }
 
     def update_buffer_from_data(self, data, buffer, update_positions=True, update_colors=True, update_elements=True):
@@ -68,76 +146,270 @@ class BufferObject(Object):
         update_elements : bool
             Whether to update elements in the buffer dict
         """
-        positions, colors, elements = data
+        positions, colors, elements = self.buffer_arrays(data)
         if update_positions:
-            update_vertex_buffer(list(flatten(positions)), buffer["positions"])
+            update_vertex_buffer(positions, buffer["positions"])
         if update_colors:
-            update_vertex_buffer(list(flatten(colors)), buffer["colors"])
+            update_vertex_buffer(colors, buffer["colors"])
         if update_elements:
-            update_index_buffer(list(flatten(elements)), buffer["elements"])
-        buffer["n"] = len(list(flatten(elements)))
+            update_index_buffer(elements, buffer["elements"])
+        buffer["n"] = len(elements)
 
-    def make_buffers(self):
-        """Create all buffers from object's data"""
-        if hasattr(self, "_points_data"):
-            data = self._points_data()
-            self._points_buffer = self.make_buffer_from_data(data)
-            if data[0]:
-                self._update_bounding_box(data[0])
-        if hasattr(self, "_lines_data"):
-            data = self._lines_data()
-            self._lines_buffer = self.make_buffer_from_data(data)
-            if data[0] and self._bounding_box_center is None:
-                self._update_bounding_box(data[0])
-        if hasattr(self, "_frontfaces_data"):
-            data = self._frontfaces_data()
-            self._frontfaces_buffer = self.make_buffer_from_data(data)
-            if data[0] and self._bounding_box_center is None:
-                self._update_bounding_box(data[0])
-        if hasattr(self, "_backfaces_data"):
-            data = self._backfaces_data()
-            self._backfaces_buffer = self.make_buffer_from_data(data)
-            if data[0] and self._bounding_box_center is None:
-                self._update_bounding_box(data[0])
+    def buffer_data(self):
+        """Collect the point/line/face data of the object as arrays.
+
+        Returns
+        -------
+        dict[str, tuple]
+            The positions, colors and elements per buffer name,
+            for every data method implemented by the object.
+        """
+        self._clear_arrays()
+        data = {}
+        for name in BUFFER_NAMES:
+            method = getattr(self, "_{}_data".format(name), None)
+            if method:
+                data[name] = self.buffer_arrays(method())
+        return data
+
+    def element_data(self):
+        """Collect the primitives of every kind of element of the object, for picking elements individually.
+
+        Returns
+        -------
+        dict[str, tuple]
+            Per kind of element, ``"vertices"``, ``"edges"`` or ``"faces"``,
+            the positions of the corners of its primitives as an array of shape (n, 3),
+            the index of the element of every corner as an array of shape (n,),
+            and the key of every element.
+
+        Notes
+        -----
+        By default, every point, line and triangle is an element, and its key is its index.
+        Subclasses map primitives to the keys of their data through :meth:`_element_index`.
+        """
+        data = self.buffer_data()
+        elements = {}
+        for kind, (name, size) in ELEMENT_BUFFERS.items():
+            if name not in data:
+                continue
+            positions, _, primitives = data[name]
+            primitives = primitives.reshape(-1, size)
+            index, keys = self._element_index(kind, len(primitives))
+            positions = positions.reshape(-1, 3)[primitives.reshape(-1)]
+            elements[kind] = positions, np.repeat(index, size), keys
+        return elements
+
+    def _element_index(self, kind, count):
+        """The index of the element of every primitive of a kind of element, and the keys of the elements.
+
+        This is called by :meth:`element_data`, after the data methods, such that the ``_arrays`` they shared are available.
+        """
+        return np.arange(count), list(range(count))
+
+    def _clear_arrays(self):
+        """Clear the arrays that the data methods cached and shared during the previous (re)build."""
+        self._arrays = None
+
+    def make_buffers(self, data=None):
+        """Create all buffers from object's data
+
+        Buffers that receive the very same positions or colors array share a single GL buffer.
+        This allows for example points, lines and faces to be drawn from one set of vertex positions,
+        using only their element buffers to index into it.
+        Data methods can share arrays through the ``_arrays`` cache, which is cleared before every (re)build.
+
+        Objects that store their vertex coordinates in ``_arrays["xyz"]``,
+        and register the rows of ``"xyz"`` that other positions arrays were taken from in ``_arrays["sources"]``,
+        support partial updates of their vertex positions with :meth:`update_vertex_buffers`.
+
+        Parameters
+        ----------
+        data: dict[str, tuple], optional
+            The data per buffer name, as returned by :meth:`buffer_data`.
+        """
+        data = data or self.buffer_data()
+        # buffers of a previous initialisation would otherwise leak
+        self.delete_buffers()
+        shared = {}
+
+        def make_vertex(array):
+            return make_vertex_buffer(array, dynamic=self.animated)
+
+        for name, (positions, colors, elements) in data.items():
+            buffer = {
+                "positions": _shared(positions, make_vertex, shared),
+                "colors": _shared(colors, make_vertex, shared),
+                "elements": make_index_buffer(elements, dynamic=self.animated),
+                "n": len(elements),
+            }
+            setattr(self, "_{}_buffer".format(name), buffer)
+        positions = _bounding_box_positions(data)
+        if positions is not None:
+            self._update_bounding_box(positions)
+        self._buffer_layout = _layout(data)
+        self._touch()
+        self._released = False
+        self._buffer_arrays = self._arrays
+        self._vertex_buffers = self._collect_vertex_buffers(data, shared)
+
+    def _collect_vertex_buffers(self, data, shared):
+        """Collect the position buffers that are derived from the vertex coordinates of the last (re)build.
+
+        Returns
+        -------
+        list[dict] | None
+            The GL buffer, the positions array and the rows of the vertex coordinates the positions were taken from,
+            per distinct positions array.
+            None if any of the positions can not be traced back to the vertex coordinates.
+        """
+        arrays = self._arrays
+        if not arrays or "xyz" not in arrays:
+            return None
+        xyz = arrays["xyz"]
+        sources = arrays.get("sources", {})
+        buffers = {}
+        for positions, _, _ in data.values():
+            key = id(positions)
+            if key in buffers:
+                continue
+            if positions is xyz:
+                source = None
+            elif key in sources and sources[key] is not None:
+                source = sources[key][1]
+            else:
+                return None
+            buffers[key] = {"buffer": shared[key][1], "positions": positions, "source": source}
+        return list(buffers.values())
+
+    def _register_source(self, positions, source):
+        """Register the rows of ``_arrays["xyz"]`` that the rows of a positions array were taken from."""
+        # the array is stored with the rows to keep its id from being reused
+        self._arrays.setdefault("sources", {})[id(positions)] = positions, source
 
     def update_buffers(self):
-        """Update all buffers from object's data"""
-        if hasattr(self, "_points_data"):
-            self.update_buffer_from_data(self._points_data(), self._points_buffer)
-        if hasattr(self, "_lines_data"):
-            self.update_buffer_from_data(self._lines_data(), self._lines_buffer)
-        if hasattr(self, "_frontfaces_data"):
-            self.update_buffer_from_data(self._frontfaces_data(), self._frontfaces_buffer)
-        if hasattr(self, "_backfaces_data"):
-            self.update_buffer_from_data(self._backfaces_data(), self._backfaces_buffer)
+        """Update all buffers, and the bounding box, from object's data
+
+        If the sharing of positions or colors between the buffers has changed since they were created,
+        or the buffers were released, the buffers are recreated instead.
+        """
+        data = self.buffer_data()
+        if self._released or _layout(data) != getattr(self, "_buffer_layout", None):
+            self.make_buffers(data)
+            return
+        self._touch()
+        shared = {}
+        for name, (positions, colors, elements) in data.items():
+            buffer = getattr(self, "_{}_buffer".format(name))
+            _shared(positions, lambda array: update_vertex_buffer(array, buffer["positions"]), shared)
+            _shared(colors, lambda array: update_vertex_buffer(array, buffer["colors"]), shared)
+            update_index_buffer(elements, buffer["elements"])
+            buffer["n"] = len(elements)
+        positions = _bounding_box_positions(data)
+        if positions is not None:
+            self._update_bounding_box(positions)
+
+    def release_buffers(self):
+        """Delete the GL buffers of the object while it is drawn from the buffers of another owner, e.g. a batch.
+
+        The buffers are recreated from the data of the object by :meth:`restore_buffers`, or when the object is updated.
+        The GL context of the view should be current.
+        """
+        if not self._released:
+            self.delete_buffers()
+            self._vertex_buffers = None
+            self._released = True
+
+    def restore_buffers(self):
+        """Recreate the GL buffers of the object, if they were released with :meth:`release_buffers`.
+
+        The version of the object does not change, since the object is drawn as before.
+        The GL context of the view should be current.
+        """
+        if self._released:
+            version = self.version
+            self.make_buffers()
+            self.__dict__["version"] = version
 
     def init(self):
         """Initialize the object"""
         self.make_buffers()
         self._update_matrix()
 
-    def update(self):
-        """Update the object"""
+    def update(self, vertices=None):
+        """Update the object
+
+        Parameters
+        ----------
+        vertices : list, optional
+            The identifiers of the vertices of the data whose coordinates have changed.
+            If provided, and the object supports it, only the affected ranges of the position buffers are uploaded.
+            Otherwise, all buffers are updated.
+        """
         self._update_matrix()
-        self.update_buffers()
+        if vertices is not None and self._vertex_buffers is not None:
+            self.update_vertex_buffers(*self._vertex_positions(vertices))
+        else:
+            self.update_buffers()
+
+    def _vertex_positions(self, vertices):
+        """The rows of ``_arrays["xyz"]`` and the current coordinates of the given vertices of the data."""
+        raise NotImplementedError
+
+    def _dependent_rows(self, rows):
+        """Update the rows of ``_arrays["xyz"]`` that are derived from other rows, and return all changed rows."""
+        return rows
+
+    def update_vertex_buffers(self, rows, xyz):
+        """Update the coordinates of some rows of the vertex coordinates in all buffers that use them.
+
+        Only the ranges of the position buffers that contain these vertices are uploaded,
+        using the same CPU-side arrays as the last (re)build of the buffers.
+        The topology and colors of the buffers are not changed.
+
+        Parameters
+        ----------
+        rows : list[int] | :class:`numpy.ndarray`
+            The rows of ``_arrays["xyz"]`` to update.
+        xyz : list[list[float]] | :class:`numpy.ndarray`
+            The new coordinates per row.
+        """
+        self._touch()
+        vertices = self._buffer_arrays["xyz"]
+        rows = np.asarray(rows, dtype=np.int64).reshape(-1)
+        vertices[rows] = np.asarray(xyz, dtype=np.float32).reshape(-1, 3)
+        rows = np.unique(self._dependent_rows(rows))
+        for buffer in self._vertex_buffers:
+            positions = buffer["positions"]
+            if buffer["source"] is None:
+                changed = rows
+            else:
+                changed = _source_rows(buffer, rows)
+                positions[changed] = vertices[buffer["source"][changed]]
+            _upload_rows(positions, buffer["buffer"], changed)
+        if len(vertices):
+            self._update_bounding_box(vertices)
 
     def _update_bounding_box(self, positions=None):
         """Update the bounding box of the object"""
         if positions is None:
+            self._clear_arrays()
             positions = []
             if hasattr(self, "_points_data"):
-                positions += self._points_data()[0]
+                positions.append(self.buffer_arrays(self._points_data())[0])
             if hasattr(self, "_lines_data"):
-                positions += self._lines_data()[0]
+                positions.append(self.buffer_arrays(self._lines_data())[0])
             if hasattr(self, "_frontfaces_data"):
-                positions += self._frontfaces_data()[0]
-            if not positions:
+                positions.append(self.buffer_arrays(self._frontfaces_data())[0])
+            positions = np.concatenate(positions) if positions else []
+            if not len(positions):
                 return
 
-        positions = np.array(positions)
-        self._bounding_box = transform_points_numpy(
-            np.array([positions.min(axis=0), positions.max(axis=0)]), self._transformation
-        )
+        positions = np.asarray(positions).reshape(-1, 3)
+        # reducing the columns one by one is much faster than reducing along the first axis of an (n, 3) array
+        corners = [[positions[:, i].min() for i in range(3)], [positions[:, i].max() for i in range(3)]]
+        self._local_bounding_box = np.array(corners, dtype=float)
+        self._bounding_box = transform_points_numpy(self._local_bounding_box, self._transformation)
         self._bounding_box_center = np.average(self.bounding_box, axis=0)
 
     def draw(self, shader, wireframe=False, is_lighted=False):
@@ -208,7 +480,7 @@ class BufferObject(Object):
     def draw_instance(self, shader, wireframe=False):
         """Draw the object instance for picking"""
         shader.enable_attribute("position")
-        shader.uniform3f("instance_color", self._instance_color)
+        shader.uniform4f("instance_color", self._instance_color)
         if self._matrix_buffer is not None:
             shader.uniform4x4("transform", self._matrix_buffer)
         if hasattr(self, "_points_buffer") and self.show_points:
@@ -226,5 +498,71 @@ class BufferObject(Object):
             shader.draw_triangles(elements=self._backfaces_buffer["elements"], n=self._backfaces_buffer["n"])
         if self._matrix_buffer is not None:
             shader.uniform4x4("transform", np.identity(4).flatten())
-        shader.uniform3f("instance_color", [0, 0, 0])
+        shader.uniform4f("instance_color", [0, 0, 0, 0])
         shader.disable_attribute("position")
+
+
+def _as_array(data, convert):
+    """Convert (nested) buffer data to a contiguous array with the given conversion function."""
+    try:
+        return convert(data)
+    except (TypeError, ValueError):
+        # ragged nested lists have to be flattened element by element
+        return convert(list(flatten(data)))
+
+
+def _shared(array, func, shared):
+    """Apply a buffer function once per distinct array, and return the (cached) result."""
+    key = id(array)
+    if key not in shared:
+        # the array is stored with the result to keep its id from being reused
+        shared[key] = array, func(array)
+    return shared[key][1]
+
+
+def _source_rows(buffer, rows):
+    """Find the rows of a positions array that were taken from the given rows of the vertex coordinates."""
+    if "order" not in buffer:
+        # sorting the source rows once makes every later lookup proportional to the number of changed rows
+        source = buffer["source"]
+        buffer["order"] = np.argsort(source, kind="stable")
+        buffer["starts"] = np.searchsorted(source[buffer["order"]], np.arange(len(source) and source.max() + 2))
+    starts = buffer["starts"]
+    rows = rows[rows < len(starts) - 1]
+    first = starts[rows]
+    counts = starts[rows + 1] - first
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.sort(buffer["order"][np.repeat(first, counts) + offsets])
+
+
+def _upload_rows(array, buffer, rows, gap=256):
+    """Upload the given sorted rows of an array to a buffer, as ranges of consecutive rows.
+
+    Rows that are less than ``gap`` rows apart are uploaded as a single range,
+    to avoid issuing many tiny uploads.
+    """
+    if not len(rows):
+        return
+    breaks = np.nonzero(np.diff(rows) > gap)[0]
+    starts = np.concatenate([rows[:1], rows[breaks + 1]])
+    ends = np.concatenate([rows[breaks], rows[-1:]]) + 1
+    for start, end in zip(starts.tolist(), ends.tolist()):
+        update_vertex_buffer(array[start:end], buffer, offset=start * array.strides[0])
+
+
+def _bounding_box_positions(data):
+    """The positions to compute the bounding box from: those of the points, or else the first non-empty ones."""
+    if "points" in data and len(data["points"][0]):
+        return data["points"][0]
+    for positions, _, _ in data.values():
+        if len(positions):
+            return positions
+    return None
+
+
+def _layout(data):
+    """Describe which buffers share their positions and colors arrays."""
+    names = list(data)
+    positions = [id(data[name][0]) for name in names]
+    colors = [id(data[name][1]) for name in names]
+    return tuple((positions.index(p), colors.index(c)) for p, c in zip(positions, colors))
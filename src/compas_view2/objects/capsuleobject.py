@@ -1,23 +1,18 @@
-from compas.datastructures import Mesh
 from compas.geometry import Capsule
 from compas.geometry import Line
 
-from .meshobject import MeshObject
+from .shapeobject import ShapeObject
 
 
-class CapsuleObject(MeshObject):
+class CapsuleObject(ShapeObject):
     """Object for displaying COMPAS Capsule geometry."""
 
     def __init__(self, data, u=10, v=10, **kwargs):
-        super().__init__(Mesh.from_shape(data, u=u, v=v), **kwargs)
-        self.u = u
-        self.v = v
-        self._data = data
+        super().__init__(data, u=u, v=v, **kwargs)
 
-    def update(self):
-        self._mesh = Mesh.from_shape(self._data, u=self.u, v=self.v)
-        self.init()
-        super().update()
+    def _unit_shape(self):
+        ratio = self._data.line.length / self._data.radius
+        return Capsule(Line((0, 0, -ratio / 2), (0, 0, ratio / 2)), 1), (ratio,)
 
     @property
     def properties(self):
@@ -1,5 +1,3 @@
-import numpy as np
-
 from compas_view2.collections import Collection
 from .object import Object
 from .bufferobject import BufferObject
@@ -8,6 +6,9 @@ from .bufferobject import BufferObject
 class CollectionObject(BufferObject):
     """Object for displaying COMPAS collection."""
 
+    # the objects of the items are created with the object, from the initial data
+    replaceable_data = False
+
     def __init__(self, collection: Collection, **kwargs):
         super().__init__(collection, **kwargs)
 
@@ -24,54 +25,24 @@ class CollectionObject(BufferObject):
             self.show_faces = self.show_faces or self._objects[0].show_faces
         self._is_collection = True
 
-    def _points_data(self):
-        positions = []
-        colors = []
-        elements = []
+    @BufferObject.data.setter
+    def data(self, data):
+        raise NotImplementedError("The objects of the items of a collection are created with the collection object.")
+
+    def _clear_arrays(self):
+        super()._clear_arrays()
         for obj in self._objects:
-            if hasattr(obj, "_points_data"):
-                p, c, e = obj._points_data()
-                e = (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-                elements += e
-        return positions, colors, elements
+            if isinstance(obj, BufferObject):
+                obj._clear_arrays()
+
+    def _points_data(self):
+        return self._merge_data(self._objects, "_points_data")
 
     def _lines_data(self):
-        positions = []
-        colors = []
-        elements = []
-        for obj in self._objects:
-            if hasattr(obj, "_lines_data"):
-                p, c, e = obj._lines_data()
-                e = (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-                elements += e
-        return positions, colors, elements
+        return self._merge_data(self._objects, "_lines_data")
 
     def _frontfaces_data(self):
-        positions = []
-        colors = []
-        elements = []
-        for obj in self._objects:
-            if hasattr(obj, "_frontfaces_data"):
-                p, c, e = obj._frontfaces_data()
-                e = (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-                elements += e
-        return positions, colors, elements
+        return self._merge_data(self._objects, "_frontfaces_data")
 
     def _backfaces_data(self):
-        positions = []
-        colors = []
-        elements = []
-        for obj in self._objects:
-            if hasattr(obj, "_backfaces_data"):
-                p, c, e = obj._backfaces_data()
-                e = (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-                elements += e
-        return positions, colors, elements
+        return self._merge_data(self._objects, "_backfaces_data")
@@ -1,51 +1,34 @@
-import numpy as np
-
 from .bufferobject import BufferObject
 
 
 class CompositeObject(BufferObject):
     """Object for displaying a composition of View2 objects."""
 
+    # the objects of the items are created with the object, from the initial data
+    replaceable_data = False
+
     def __init__(self, objects, **kwargs):
         self.objects = objects
         super().__init__([obj._data for obj in objects], **kwargs)
 
-    def _points_data(self):
-        positions, colors, elements = [], [], []
+    @BufferObject.data.setter
+    def data(self, data):
+        raise NotImplementedError("The objects of a composition are created with the composite object.")
+
+    def _clear_arrays(self):
+        super()._clear_arrays()
         for obj in self.objects:
-            if hasattr(obj, "_points_data"):
-                p, c, e = obj._points_data()
-                positions += p
-                colors += c
-                elements += e
-        return positions, colors, elements
+            if isinstance(obj, BufferObject):
+                obj._clear_arrays()
+
+    def _points_data(self):
+        return self._merge_data(self.objects, "_points_data")
 
     def _lines_data(self):
-        positions, colors, elements = [], [], []
-        for obj in self.objects:
-            if hasattr(obj, "_lines_data"):
-                p, c, e = obj._lines_data()
-                elements += (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-        return positions, colors, elements
+        return self._merge_data(self.objects, "_lines_data")
 
     def _frontfaces_data(self):
-        positions, colors, elements = [], [], []
-        for obj in self.objects:
-            if hasattr(obj, "_frontfaces_data"):
-                p, c, e = obj._frontfaces_data()
-                elements += (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-        return positions, colors, elements
+        return self._merge_data(self.objects, "_frontfaces_data")
 
     def _backfaces_data(self):
-        positions, colors, elements = [], [], []
-        for obj in self.objects:
-            if hasattr(obj, "_backfaces_data"):
-                p, c, e = obj._backfaces_data()
-                elements += (np.array(e) + len(positions)).tolist()
-                positions += p
-                colors += c
-        return positions, colors, elements
+        return self._merge_data(self.objects, "_backfaces_data")
@@ -1,23 +1,18 @@
-from compas.datastructures import Mesh
 from compas.geometry import Circle
 from compas.geometry import Plane
 from compas.geometry import Cylinder
 
-from .meshobject import MeshObject
+from .shapeobject import ShapeObject
 
 
-class CylinderObject(MeshObject):
+class CylinderObject(ShapeObject):
     """Object for displaying COMPAS cylinder geometry."""
 
     def __init__(self, data, u=16, **kwargs):
-        super().__init__(Mesh.from_shape(data, u=u), **kwargs)
-        self.u = u
-        self._data = data
+        super().__init__(data, u=u, **kwargs)
 
-    def update(self):
-        self._mesh = Mesh.from_shape(self._data, u=self.u)
-        self.init()
-        super().update()
+    def _unit_shape(self):
+        return Cylinder(Circle(Plane([0, 0, 0], [0, 0, 1]), 1), 1), ()
 
     @property
     def properties(self):
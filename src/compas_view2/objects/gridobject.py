@@ -77,7 +77,7 @@ class GridObject(BufferObject):
         color = [[0, 0, 0], [1, 0, 0], [1, 1, 0], [0, 1, 0]]
         elements = [[0, 1, 3], [1, 2, 3], [1, 0, 3], [2, 1, 3]]
 
-        self._uvplane = {
+        self._uvplane_buffer = {
             "positions": make_vertex_buffer(list(flatten(positions))),
             "colors": make_vertex_buffer(list(flatten(color))),
             "elements": make_index_buffer(list(flatten(elements))),
@@ -99,8 +99,8 @@ class GridObject(BufferObject):
     def draw_plane(self, shader):
         shader.enable_attribute("position")
         shader.enable_attribute("color")
-        shader.bind_attribute("position", self._uvplane["positions"])
-        shader.bind_attribute("color", self._uvplane["colors"])
-        shader.draw_triangles(elements=self._uvplane["elements"], n=self._uvplane["n"])
+        shader.bind_attribute("position", self._uvplane_buffer["positions"])
+        shader.bind_attribute("color", self._uvplane_buffer["colors"])
+        shader.draw_triangles(elements=self._uvplane_buffer["elements"], n=self._uvplane_buffer["n"])
         shader.disable_attribute("position")
         shader.disable_attribute("color")
@@ -0,0 +1,275 @@
+from itertools import product
+
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Circle
+from compas.geometry import Cylinder
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Sphere
+from compas_view2.collections import Instances
+from compas_view2.gl import Buffer
+from compas_view2.gl import instancing
+from compas_view2.shapes import Arrow
+
+from .bufferobject import BufferObject
+from .meshobject import MeshObject
+from .shapeobject import ShapeObject
+from .tessellation import SHAPE_MATRICES
+from .tessellation import Tessellation
+
+
+class InstancesObject(BufferObject):
+    """Object for displaying many shapes of the same type as instances of one tessellated shape.
+
+    The shape is tessellated once, in unit size, and its buffers are uploaded once.
+    The transformation matrix and the color of every instance are stored in an instance buffer,
+    such that all instances are drawn with a single instanced draw call per kind of element.
+    If the GL context does not support instanced drawing, the instances are drawn one by one from the same buffers.
+
+    Parameters
+    ----------
+    data : :class:`compas_view2.collections.Instances`
+        The shapes to display.
+    u : int, optional
+        The resolution of the shapes in the "u" direction.
+    v : int, optional
+        The resolution of spheres in the "v" direction.
+
+    Attributes
+    ----------
+    matrices : :class:`numpy.ndarray`
+        The transformation matrices of the instances, of shape (n, 4, 4).
+    colors : :class:`numpy.ndarray` | None
+        The colors of the instances, of shape (n, 3).
+
+    Examples
+    --------
+    >>> from compas.geometry import Sphere
+    >>> from compas_view2.collections import Instances
+    >>> spheres = Instances([Sphere([x, 0, 0], 0.3) for x in range(1000)])
+    >>> obj = InstancesObject(spheres, u=8, v=8)
+    >>> obj.matrices.shape
+    (1000, 4, 4)
+
+    """
+
+    def __init__(self, data: Instances, u=16, v=16, **kwargs):
+        super().__init__(data, **kwargs)
+        self._instances = data
+        self.u = u
+        self.v = v
+        self._base = None
+        self._resolution = None
+        self._unit_extent = None
+        self.matrices = None
+        self.colors = None
+        self._update_instances()
+
+    @property
+    def properties(self):
+        return ["u", "v"]
+
+    @BufferObject.data.setter
+    def data(self, data):
+        self._data = self._instances = data
+
+    @property
+    def n(self):
+        """The number of instances."""
+        return len(self.matrices)
+
+    def _update_instances(self):
+        """Compute the matrices and colors of the instances from the shapes."""
+        shapes = self._instances.shapes
+        self.matrices = SHAPE_MATRICES[self._instances.shape_type](shapes)
+        colors = self._instances.colors
+        self.colors = None if colors is None else np.array([list(color) for color in colors], dtype=np.float32)
+
+    def _base_object(self):
+        """The mesh object of the tessellated unit shape, shared by all instances."""
+        if self._base is None or self._resolution != (self.u, self.v):
+            unit, resolution = INSTANCE_SHAPES[self._instances.shape_type](self._instances.shapes[0])
+            kwargs = {key: getattr(self, key) for key in resolution}
+            key = type(unit), _unit_parameters(unit), tuple(kwargs.values())
+            # the instance matrices map the local coordinates of the unit shape to the coordinates of the shapes
+            tessellation = ShapeObject.tessellations.get(key, lambda: Tessellation.from_shape(unit, **kwargs))
+            self._base = MeshObject(tessellation.mesh)
+            self._resolution = self.u, self.v
+        return self._base
+
+    def _clear_arrays(self):
+        super()._clear_arrays()
+        self._base_object()._clear_arrays()
+
+    def _points_data(self):
+        return self._base_object()._points_data()
+
+    def _lines_data(self):
+        return self._base_object()._lines_data()
+
+    def _frontfaces_data(self):
+        return self._base_object()._frontfaces_data()
+
+    def _backfaces_data(self):
+        return self._base_object()._backfaces_data()
+
+    def make_buffers(self, data=None):
+        """Create the buffers of the unit shape, and the instance buffer with the matrices and colors of the instances.
+
+        Parameters
+        ----------
+        data: dict[str, tuple], optional
+            The data per buffer name, as returned by :meth:`buffer_data`.
+        """
+        super().make_buffers(data)
+        self._instances_buffer = {
+            "matrices": Buffer(dynamic=self.animated),
+            "colors": Buffer(dynamic=self.animated),
+            "n": 0,
+        }
+        self._write_instances()
+
+    def _write_instances(self):
+        """Upload the matrices and colors of the instances."""
+        # a mat4 attribute reads the columns of the matrix from consecutive locations
+        self._instances_buffer["matrices"].write(np.ascontiguousarray(self.matrices.transpose(0, 2, 1), np.float32))
+        if self.colors is not None:
+            self._instances_buffer["colors"].write(self.colors)
+        self._instances_buffer["n"] = self.n
+        self._touch()
+        self._update_bounding_box()
+
+    def update(self):
+        """Update the instances from the shapes.
+
+        Only the instance buffer is uploaded again, unless the resolution of the shapes has changed.
+        """
+        self._update_matrix()
+        self._update_instances()
+        if self._resolution != (self.u, self.v) or not hasattr(self, "_instances_buffer"):
+            self.make_buffers()
+        else:
+            self._write_instances()
+
+    def _update_bounding_box(self, positions=None):
+        """Update the bounding box of the object from the bounding boxes of the instances"""
+        if positions is not None:
+            positions = np.asarray(positions).reshape(-1, 3)
+            self._unit_extent = positions.min(axis=0), positions.max(axis=0)
+        if self._unit_extent is None or self.matrices is None or not self.n:
+            return
+        corners = np.array(list(product(*zip(*self._unit_extent))))
+        matrices = self.matrices
+        points = corners @ matrices[:, :3, :3].transpose(0, 2, 1) + matrices[:, None, :3, 3]
+        super()._update_bounding_box(points.reshape(-1, 3))
+
+    def draw(self, shader, wireframe=False, is_lighted=False):
+        """Draw all instances, with a single draw call per kind of element if the context supports it"""
+        if not hasattr(self, "_instances_buffer"):
+            return
+        shader.enable_attribute("position")
+        shader.enable_attribute("color")
+        shader.uniform1i("is_selected", self.is_selected)
+        shader.uniform1f("object_opacity", self.opacity)
+        kinds = []
+        if self.show_faces and not wireframe:
+            kinds += [("frontfaces", 2, self.facecolor, is_lighted), ("backfaces", 2, self.facecolor, is_lighted)]
+        if self.show_lines or wireframe:
+            kinds.append(("lines", 1, self.linecolor, False))
+        if self.show_points:
+            kinds.append(("points", 0, self.pointcolor, False))
+        for kind, element_type, color, lighted in kinds:
+            shader.uniform1i("is_lighted", lighted)
+            shader.uniform1i("element_type", element_type)
+            buffer = getattr(self, "_{}_buffer".format(kind))
+            shader.bind_attribute("position", buffer["positions"])
+            if element_type == 2 and self.colors is not None:
+                self._draw_instances(shader, kind, buffer, colors=self.colors)
+            else:
+                shader.uniform1i("use_single_color", True)
+                shader.uniform3f("single_color", color)
+                shader.bind_attribute("color", buffer["colors"])
+                self._draw_instances(shader, kind, buffer)
+        shader.uniform1i("is_lighted", False)
+        shader.uniform1i("is_selected", 0)
+        shader.uniform1f("object_opacity", 1)
+        shader.disable_attribute("position")
+        shader.disable_attribute("color")
+
+    def draw_instance(self, shader, wireframe=False):
+        """Draw all instances for picking"""
+        if not hasattr(self, "_instances_buffer"):
+            return
+        shader.enable_attribute("position")
+        shader.uniform4f("instance_color", self._instance_color)
+        kinds = []
+        if self.show_points:
+            kinds.append("points")
+        if self.show_lines or wireframe:
+            kinds.append("lines")
+        if self.show_faces and not wireframe:
+            kinds += ["frontfaces", "backfaces"]
+        for kind in kinds:
+            buffer = getattr(self, "_{}_buffer".format(kind))
+            shader.bind_attribute("position", buffer["positions"])
+            self._draw_instances(shader, kind, buffer)
+        shader.uniform4f("instance_color", [0, 0, 0, 0])
+        shader.disable_attribute("position")
+
+    def _draw_instances(self, shader, kind, buffer, colors=None):
+        """Draw the elements of a buffer for all instances, optionally with a color per instance."""
+        if kind == "lines":
+
+            def draw():
+                shader.draw_lines(width=self.linewidth, elements=buffer["elements"], n=buffer["n"])
+
+        elif kind == "points":
+
+            def draw():
+                shader.draw_points(size=self.pointsize, elements=buffer["elements"], n=buffer["n"])
+
+        else:
+
+            def draw():
+                shader.draw_triangles(elements=buffer["elements"], n=buffer["n"])
+
+        transform = np.asarray(self._matrix_buffer if self._matrix_buffer is not None else np.identity(4).flatten())
+        if instancing():
+            shader.uniform4x4("transform", transform)
+            shader.uniform1i("is_instanced", True)
+            if colors is not None:
+                shader.uniform1i("use_single_color", False)
+                shader.bind_attribute("color", self._instances_buffer["colors"], divisor=1)
+            shader.enable_instances(self._instances_buffer["matrices"], self._instances_buffer["n"])
+            draw()
+            shader.disable_instances()
+            shader.uniform1i("is_instanced", False)
+        else:
+            # without instanced drawing, every instance is drawn with its own transformation and color uniforms
+            transform = transform.reshape(4, 4)
+            if colors is not None:
+                shader.uniform1i("use_single_color", True)
+            for index, matrix in enumerate(self.matrices):
+                shader.uniform4x4("transform", transform @ matrix)
+                if colors is not None:
+                    shader.uniform3f("single_color", colors[index])
+                draw()
+        shader.uniform4x4("transform", np.identity(4).flatten())
+
+
+# per type of shape: the unit shape and the names of its resolution parameters
+INSTANCE_SHAPES = {
+    Box: lambda box: (Box(Frame.worldXY(), 1, 1, 1), ()),
+    Sphere: lambda sphere: (Sphere([0, 0, 0], 1), ("u", "v")),
+    Cylinder: lambda cylinder: (Cylinder(Circle(Plane([0, 0, 0], [0, 0, 1]), 1), 1), ("u",)),
+    Arrow: lambda arrow: (Arrow([0, 0, 0], [0, 0, 1], arrow.head_portion, arrow.head_width, arrow.body_width), ("u",)),
+}
+
+
+def _unit_parameters(unit):
+    """The parameters that define the proportions of a unit shape, as in the tessellations of shape objects."""
+    if isinstance(unit, Arrow):
+        return unit.head_portion, unit.head_width, unit.body_width
+    return ()
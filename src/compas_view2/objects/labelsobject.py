@@ -0,0 +1,224 @@
+from itertools import chain
+
+import numpy as np
+from compas.datastructures import Mesh
+
+from .object import Object
+
+# attributes that change the glyphs of the labels, and not only where they are drawn
+LABEL_ATTRIBUTES = frozenset(["color", "opacity", "height", "font", "absolute_height"])
+
+# attributes that change which labels are drawn
+SELECTION_ATTRIBUTES = frozenset(["occlusion", "thinning", "spacing"])
+
+
+class LabelsObject(Object):
+    """Object for displaying the labels of the vertices, faces or edges of a mesh or network, as one layer.
+
+    The labels are drawn in batches, by :class:`compas_view2.views.labels.LabelRenderer`,
+    from the glyph atlas of their font.
+    Labels outside the view, or behind the geometry of the scene, are not drawn,
+    and overlapping labels are thinned out, such that the labels nearest to the camera remain.
+
+    Parameters
+    ----------
+    data : :class:`compas.datastructures.Mesh` | :class:`compas.datastructures.Network`
+        The mesh or network.
+    element : Literal["vertices", "faces", "edges"], optional
+        The labelled elements.
+        The vertices of a network are its nodes.
+    text : callable | dict | None, optional
+        A function that returns the text of the label of an element from its key,
+        or a dict with the texts of the labels of the labelled elements only.
+        Defaults to the keys of the elements.
+    color : :class:`compas.colors.Color`, optional
+        The color of the labels.
+        Default to black.
+    height : float, optional
+        The height of the labels in pixels, or, if the height is absolute, in units of the model at a distance of 10.
+        Default to 12.
+    font : str, optional
+        The name of the font.
+        Defaults to the default font of the viewer.
+    absolute_height : bool, optional
+        Whether the labels get smaller with the distance to the camera.
+        Default to False.
+    occlusion : bool, optional
+        Whether labels behind the geometry of the scene are hidden.
+        If False, the labels are drawn in front of all geometry.
+        Default to True.
+    thinning : bool, optional
+        Whether overlapping labels are thinned out.
+        Default to True.
+    spacing : float, optional
+        The minimum distance between labels that are not thinned out, in pixels.
+        Default to 2.
+    **kwargs : dict, optional
+        The options of :class:`compas_view2.objects.Object`.
+
+    Attributes
+    ----------
+    keys : list
+        The keys of the labelled elements.
+    texts : list[str]
+        The text of the label of every element.
+    positions : :class:`numpy.ndarray`
+        The anchors of the labels, of shape (n, 3):
+        the vertices, the centroids of the faces, or the midpoints of the edges.
+    layout_version : int, read-only
+        A counter that is incremented whenever the texts or the glyphs of the labels change.
+
+    Examples
+    --------
+    >>> from compas.datastructures import Mesh
+    >>> mesh = Mesh.from_polyhedron(6)
+    >>> labels = LabelsObject(mesh, element="faces", text=lambda face: "f{}".format(face))
+    >>> labels.texts[:2]
+    ['f0', 'f1']
+    >>> labels.positions.shape
+    (6, 3)
+
+    """
+
+    layout_version = 0
+
+    def __init__(
+        self,
+        data,
+        element="vertices",
+        text=None,
+        color=None,
+        height=12,
+        font=None,
+        absolute_height=False,
+        occlusion=True,
+        thinning=True,
+        spacing=2,
+        **kwargs,
+    ):
+        super().__init__(data, **kwargs)
+        if element not in ("vertices", "faces", "edges"):
+            raise ValueError("Labels can be added to vertices, faces or edges, not to {}.".format(element))
+        if element == "faces" and not isinstance(data, Mesh):
+            raise ValueError("Only the faces of meshes can be labelled.")
+        self.element = element
+        self.text = text
+        self.color = color or [0, 0, 0]
+        self.height = height
+        self.font = font
+        self.absolute_height = absolute_height
+        self.occlusion = occlusion
+        self.thinning = thinning
+        self.spacing = spacing
+        self._relabel()
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in LABEL_ATTRIBUTES:
+            self.__dict__["layout_version"] = self.layout_version + 1
+            self._touch()
+        elif name in SELECTION_ATTRIBUTES:
+            Object.changes += 1
+
+    def _element_keys(self):
+        data = self._data
+        if self.element == "faces":
+            return list(data.faces())
+        if self.element == "edges":
+            return list(data.edges())
+        if isinstance(data, Mesh):
+            return list(data.vertices())
+        return list(data.nodes())
+
+    def _labelled_keys(self):
+        keys = self._element_keys()
+        if isinstance(self.text, dict):
+            return [key for key in keys if key in self.text]
+        return keys
+
+    def _relabel(self):
+        """Collect the labelled elements and their texts."""
+        keys = self._labelled_keys()
+        text = self.text
+        if text is None:
+            texts = [str(key) for key in keys]
+        elif isinstance(text, dict):
+            texts = [str(text[key]) for key in keys]
+        else:
+            texts = [str(text(key)) for key in keys]
+        self.keys = keys
+        self.texts = texts
+        self.positions = self._element_positions()
+        self.__dict__["layout_version"] = self.layout_version + 1
+        self._touch()
+
+    def _element_positions(self):
+        """The anchors of the labels, computed from the coordinates of the vertices in one pass."""
+        data = self._data
+        if isinstance(data, Mesh):
+            vertices = list(data.vertices())
+            xyz = data.vertices_attributes("xyz")
+        else:
+            vertices = list(data.nodes())
+            xyz = data.nodes_attributes("xyz")
+        xyz = np.array(xyz, dtype=np.float32).reshape(-1, 3)
+        if self.element == "vertices":
+            if len(self.keys) == len(vertices):
+                return xyz
+            index = {vertex: row for row, vertex in enumerate(vertices)}
+            return xyz[[index[key] for key in self.keys]].reshape(-1, 3)
+        index = {vertex: row for row, vertex in enumerate(vertices)}
+        if self.element == "edges":
+            rows = np.array([[index[u], index[v]] for u, v in self.keys], dtype=np.int64).reshape(-1, 2)
+            return (xyz[rows[:, 0]] + xyz[rows[:, 1]]) / 2
+        # the centroid of a face is the average of its vertices
+        face_vertices = [data.face_vertices(face) for face in self.keys]
+        degrees = np.fromiter(map(len, face_vertices), dtype=np.int64, count=len(face_vertices))
+        if not len(degrees):
+            return np.zeros((0, 3), dtype=np.float32)
+        rows = np.fromiter((index[vertex] for vertex in chain.from_iterable(face_vertices)), dtype=np.int64)
+        offsets = np.cumsum(degrees) - degrees
+        return np.add.reduceat(xyz[rows], offsets) / degrees[:, None].astype(np.float32)
+
+    def world_positions(self):
+        """The anchors of the labels, transformed by the world matrix of the object.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The anchors, of shape (n, 3).
+        """
+        if self._matrix_buffer is None:
+            return self.positions
+        matrix = np.asarray(self._matrix_buffer, dtype=np.float32).reshape(4, 4)
+        return self.positions @ matrix[:3, :3].T + matrix[:3, 3]
+
+    def init(self):
+        self._update_matrix()
+
+    def draw(self, shader, *args):
+        """Labels are drawn in batches, by the label renderer of the view."""
+        pass
+
+    def update(self, texts=False):
+        """Update the labels after the mesh or network has changed.
+
+        If the labelled elements are still the same, only the positions of the labels are updated, in place,
+        and their glyphs are not laid out again.
+        Otherwise, the elements and the texts of the labels are collected again.
+
+        Parameters
+        ----------
+        texts : bool, optional
+            If True, the texts of the labels are collected again as well,
+            e.g. after the attributes they show have changed.
+
+        Returns
+        -------
+        None
+        """
+        if texts or self._labelled_keys() != self.keys:
+            self._relabel()
+        else:
+            self.positions[:] = self._element_positions()
+        self._update_matrix()
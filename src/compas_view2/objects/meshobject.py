@@ -1,5 +1,9 @@
-from compas.utilities import pairwise
-from compas.geometry import centroid_points
+from itertools import chain
+from operator import itemgetter
+
+import numpy as np
+
+from compas.datastructures import Mesh
 from compas.geometry import is_coplanar
 from compas.colors import Color
 from .bufferobject import BufferObject
@@ -40,6 +44,9 @@ class MeshObject(BufferObject):
         Subset of edges to be displayed
     faces : list
         Subset of faces to be displayed
+    indexed : bool
+        True to upload the vertex positions once and share them between points, lines and faces.
+        False to give every triangle corner its own position and color.
 
     Attributes
     ----------
@@ -63,11 +70,21 @@ class MeshObject(BufferObject):
         Subset of edges to be displayed
     faces : list
         Subset of faces to be displayed
+    indexed : bool
+        True to share the vertex positions between points, lines and faces.
 
     """
 
     def __init__(
-        self, data, vertices=None, edges=None, faces=None, hide_coplanaredges=False, use_vertex_color=False, **kwargs
+        self,
+        data,
+        vertices=None,
+        edges=None,
+        faces=None,
+        hide_coplanaredges=False,
+        use_vertex_color=False,
+        indexed=True,
+        **kwargs
     ):
         super().__init__(data, **kwargs)
         self._mesh = data
@@ -76,191 +93,321 @@ class MeshObject(BufferObject):
         self.vertices = vertices
         self.edges = edges
         self.faces = faces
+        self.indexed = indexed
 
-    def _points_data(self):
+    @BufferObject.data.setter
+    def data(self, data):
+        self._data = data
+        # objects of shapes derive their mesh from the shape when they are updated
+        if isinstance(data, Mesh):
+            self._mesh = data
+
+    def _mesh_arrays(self):
+        """Compute the vertex coordinates and the triangulation of the faces of the mesh as arrays.
+
+        The arrays are computed once per buffer (re)build and shared by all data methods.
+
+        Returns
+        -------
+        dict
+            ``"keys"``: the vertex keys per row of ``"xyz"``,
+            ``"vertex_index"``: array mapping vertex keys to rows of ``"xyz"``,
+            ``"xyz"``: vertex coordinates of shape (V, 3), followed by the centroids of faces with more than 4 vertices,
+            ``"triangles"``: rows of ``"xyz"`` per triangle of shape (T, 3),
+            ``"triangle_face"``: the index of the face in ``"faces"`` per triangle,
+            ``"faces"``: the displayed faces.
+
+        """
+        if self._arrays is not None:
+            return self._arrays
+
+        mesh = self._mesh
+        keys = np.fromiter(mesh.vertex, dtype=np.int64, count=len(mesh.vertex))
+        vertex_index = np.zeros(keys.max() + 1 if len(keys) else 0, dtype=np.int64)
+        vertex_index[keys] = np.arange(len(keys))
+
+        try:
+            # reading the attribute dicts directly avoids merging the defaults per vertex
+            xyz = np.fromiter(
+                chain.from_iterable(map(itemgetter("x", "y", "z"), mesh.vertex.values())),
+                dtype=np.float32,
+                count=3 * len(keys),
+            )
+        except KeyError:
+            xyz = np.array(mesh.vertices_attributes("xyz"), dtype=np.float32)
+        xyz = xyz.reshape(-1, 3)
+
+        if self.faces:
+            faces = list(self.faces)
+            face_vertices = [mesh.face_vertices(face) for face in faces]
+        else:
+            faces = list(mesh.face)
+            face_vertices = list(mesh.face.values())
+        degrees = np.fromiter(map(len, face_vertices), dtype=np.int64, count=len(faces))
+        corners = np.fromiter(chain.from_iterable(face_vertices), dtype=np.int64, count=degrees.sum())
+        corners = vertex_index[corners]
+        offsets = np.cumsum(degrees) - degrees
+
+        # triangles and quads are fan-triangulated from their first vertex
+        small = np.nonzero(degrees <= 4)[0]
+        count = degrees[small] - 2
+        small_face = np.repeat(small, count)
+        k = np.arange(len(small_face)) - np.repeat(np.cumsum(count) - count, count) + 1
+        start = offsets[small_face]
+        small_triangles = np.stack([corners[start], corners[start + k], corners[start + k + 1]], axis=1)
+
+        # larger polygons are fan-triangulated from their centroid
+        large = np.nonzero(degrees > 4)[0]
+        count = degrees[large]
+        large_face = np.repeat(large, count)
+        k = np.arange(len(large_face)) - np.repeat(np.cumsum(count) - count, count)
+        start = offsets[large_face]
+        degree = degrees[large_face]
+        centroid = len(xyz) + np.repeat(np.arange(len(large)), count)
+        large_corners = corners[start + k]
+        large_triangles = np.stack([large_corners, corners[start + (k + 1) % degree], centroid], axis=1)
+
+        triangles = np.concatenate([small_triangles, large_triangles])
+        triangle_face = np.concatenate([small_face, large_face])
+        if len(large):
+            # keep the triangles in the order of the faces
+            order = np.argsort(triangle_face, kind="stable")
+            triangles = triangles[order]
+            triangle_face = triangle_face[order]
+
+        self._arrays = {
+            "keys": keys,
+            "vertex_index": vertex_index,
+            "corners": corners,
+            "offsets": offsets,
+            "degrees": degrees,
+            "large": large,
+            "large_corners": large_corners,
+            "faces": faces,
+            "triangles": triangles,
+            "triangle_face": triangle_face,
+        }
+        self._arrays["xyz"] = self._append_centroid_values(xyz)
+        return self._arrays
+
+    def _append_centroid_values(self, values):
+        """Append the average of per-vertex values over each face with more than 4 vertices."""
+        centroids = self._centroid_values(self._arrays, values)
+        if centroids is None:
+            return values
+        return np.concatenate([values, centroids.astype(values.dtype)])
+
+    def _centroid_values(self, arrays, values):
+        """The average of per-vertex values over each face with more than 4 vertices."""
+        large = arrays["large"]
+        if not len(large):
+            return None
+        degrees = arrays["degrees"][large]
+        return np.add.reduceat(values[arrays["large_corners"]], np.cumsum(degrees) - degrees) / degrees[:, None]
+
+    def _vertex_colors(self):
+        """The colors of the vertices of the mesh, followed by the average colors of the face centroids."""
         mesh = self._mesh
-        vertex_xyz = {vertex: mesh.vertex_attributes(vertex, "xyz") for vertex in mesh.vertices()}
-        positions = []
-        colors = []
-        elements = []
-        i = 0
-        vertices = self.vertices or mesh.vertices()
-        for vertex in vertices:
-            positions.append(vertex_xyz[vertex])
-            colors.append(self.pointcolors.get(vertex, self.pointcolor))
-            elements.append([i])
-            i += 1
+        colors = [mesh.vertex_attribute(vertex, "color") or Color.grey() for vertex in mesh.vertices()]
+        return self._append_centroid_values(np.array(colors, dtype=np.float32).reshape(-1, 3))
+
+    def _colors_array(self, keys, colors, default):
+        """The colors of the given keys, with a default for missing items, as an array of shape (n, 3)."""
+        if not colors:
+            return _tile(default, len(keys))
+        return np.array([colors.get(key, default) for key in keys], dtype=np.float32).reshape(-1, 3)
+
+    def _points_data(self):
+        arrays = self._mesh_arrays()
+        if self.vertices:
+            vertices = list(self.vertices)
+            index = arrays["vertex_index"][np.fromiter(vertices, dtype=np.int64, count=len(vertices))]
+        else:
+            vertices = list(self._mesh.vertex)
+            index = np.arange(len(vertices))
+        arrays["point_keys"] = vertices
+        if self.indexed:
+            # the points index into the vertex positions shared with the lines and faces
+            positions = arrays["xyz"]
+            colors = _tile(self.pointcolor, len(positions))
+            if self.pointcolors:
+                colors[index] = self._colors_array(vertices, self.pointcolors, self.pointcolor)
+            return positions, colors, index
+        positions = arrays["xyz"][index]
+        self._register_source(positions, index)
+        colors = self._colors_array(vertices, self.pointcolors, self.pointcolor)
+        elements = np.arange(len(vertices), dtype=np.uint32)
         return positions, colors, elements
 
     def _lines_data(self):
         mesh = self._mesh
-        vertex_xyz = {vertex: mesh.vertex_attributes(vertex, "xyz") for vertex in mesh.vertices()}
-        positions = []
-        colors = []
-        elements = []
-        i = 0
-        edges = self.edges or mesh.edges()
-        for u, v in edges:
-            color = self.linecolors.get((u, v), self.linecolor)
+        arrays = self._mesh_arrays()
+        if self.indexed and not self.linecolors and not self.edges and not self.hide_coplanaredges and not self.faces:
+            # the edges of a mesh are the unique sides of its faces
+            index = self._face_sides()
+        else:
+            edges = list(self.edges or mesh.edges())
             if self.hide_coplanaredges:
-                # hide the edge if neighbor faces are coplanar
-                fkeys = mesh.edge_faces(u, v)
-                if not mesh.is_edge_on_boundary(u, v):
-                    ps = [mesh.face_center(fkeys[0]), mesh.face_center(fkeys[1]), *mesh.edge_coordinates(u, v)]
-                    if is_coplanar(ps, tol=1e-5):
-                        continue
-            positions.append(vertex_xyz[u])
-            positions.append(vertex_xyz[v])
-            colors.append(color)
-            colors.append(color)
-            elements.append([i + 0, i + 1])
-            i += 2
+                edges = [(u, v) for u, v in edges if not self._is_coplanar_edge(u, v)]
+            index = np.fromiter(chain.from_iterable(edges), dtype=np.int64, count=2 * len(edges))
+            index = arrays["vertex_index"][index]
+        arrays["line_rows"] = index
+        if self.indexed and not self.linecolors:
+            # without individual edge colors, the lines index into the shared vertex positions
+            positions = arrays["xyz"]
+            colors = _tile(self.linecolor, len(positions))
+            return positions, colors, index
+        positions = arrays["xyz"][index]
+        self._register_source(positions, index)
+        colors = np.repeat(self._colors_array([(u, v) for u, v in edges], self.linecolors, self.linecolor), 2, axis=0)
+        elements = np.arange(len(index), dtype=np.uint32)
         return positions, colors, elements
 
-    def _frontfaces_data(self):
+    def _element_index(self, kind, count):
+        arrays = self._arrays
+        if kind == "vertices":
+            return np.arange(count), arrays["point_keys"]
+        if kind == "edges":
+            return np.arange(count), list(map(tuple, arrays["keys"][arrays["line_rows"].reshape(-1, 2)].tolist()))
+        return arrays["triangle_face"], arrays["faces"]
+
+    def set_vertex_positions(self, vertices, xyz):
+        """Move vertices of the mesh, and upload only the affected ranges of the buffers.
+
+        Parameters
+        ----------
+        vertices : list[int]
+            The keys of the vertices.
+        xyz : list[list[float]] | :class:`numpy.ndarray`
+            The new coordinates per vertex.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The coordinates are also set in the mesh data structure.
+        If the object was created with ``animated=True``, its buffers are optimized for frequent updates.
+
+        Examples
+        --------
+        >>> obj = viewer.add(mesh, animated=True)  # doctest: +SKIP
+        >>> obj.set_vertex_positions([0, 1], [[0, 0, 1], [1, 0, 1]])  # doctest: +SKIP
+
+        """
+        vertices = list(vertices)
+        for vertex, point in zip(vertices, np.asarray(xyz).reshape(-1, 3).tolist()):
+            self._mesh.vertex_attributes(vertex, "xyz", point)
+        self.update(vertices=vertices)
+
+    def _vertex_positions(self, vertices):
         mesh = self._mesh
-        vertex_xyz = {vertex: mesh.vertex_attributes(vertex, "xyz") for vertex in mesh.vertices()}
-        if self.use_vertex_color:
-            vertex_color = {
-                vertex: mesh.vertex_attribute(vertex, "color") or Color.grey() for vertex in mesh.vertices()
-            }
-        positions = []
-        colors = []
-        elements = []
-        i = 0
-        faces = self.faces or mesh.faces()
-        for face in faces:
-            vertices = mesh.face_vertices(face)
-            color = self.facecolors.get(face, self.facecolor)
-            if len(vertices) == 3:
-                a, b, c = vertices
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[b])
-                positions.append(vertex_xyz[c])
-                if self.use_vertex_color:
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[b])
-                    colors.append(vertex_color[c])
-                else:
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                elements.append([i + 0, i + 1, i + 2])
-                i += 3
-            elif len(vertices) == 4:
-                a, b, c, d = vertices
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[b])
-                positions.append(vertex_xyz[c])
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[c])
-                positions.append(vertex_xyz[d])
-                if self.use_vertex_color:
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[b])
-                    colors.append(vertex_color[c])
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[c])
-                    colors.append(vertex_color[d])
-                else:
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                elements.append([i + 0, i + 1, i + 2])
-                elements.append([i + 3, i + 4, i + 5])
-                i += 6
-            else:
-                points = [vertex_xyz[vertex] for vertex in vertices]
-                c = centroid_points(points)
-                for a, b in pairwise(points + points[:1]):
-                    positions.append(a)
-                    positions.append(b)
-                    positions.append(c)
-                    if self.use_vertex_color:
-                        colors.append(vertex_color[a])
-                        colors.append(vertex_color[b])
-                        colors.append(vertex_color[c])
-                    else:
-                        colors.append(color)
-                        colors.append(color)
-                        colors.append(color)
-                    elements.append([i + 0, i + 1, i + 2])
-                    i += 3
-        return positions, colors, elements
+        vertices = list(vertices)
+        rows = self._buffer_arrays["vertex_index"][np.fromiter(vertices, dtype=np.int64, count=len(vertices))]
+        xyz = [mesh.vertex_attributes(vertex, "xyz") for vertex in vertices]
+        return rows, np.array(xyz, dtype=np.float32).reshape(-1, 3)
 
-    def _backfaces_data(self):
+    def _dependent_rows(self, rows):
+        # the centroids of faces with more than 4 vertices move with their vertices
+        arrays = self._buffer_arrays
+        large = arrays["large"]
+        if not len(large):
+            return rows
+        xyz = arrays["xyz"]
+        n = len(xyz) - len(large)
+        centroids = self._centroid_values(arrays, xyz[:n]).astype(xyz.dtype)
+        changed = np.nonzero((centroids != xyz[n:]).any(axis=1))[0]
+        xyz[n + changed] = centroids[changed]
+        return np.concatenate([rows, n + changed])
+
+    def _face_sides(self):
+        """The rows of ``"xyz"`` of the unique sides of the displayed faces, as a flat array of pairs."""
+        arrays = self._mesh_arrays()
+        corners, offsets, degrees = arrays["corners"], arrays["offsets"], arrays["degrees"]
+        face = np.repeat(np.arange(len(degrees)), degrees)
+        k = np.arange(len(corners)) - offsets[face]
+        u = corners
+        v = corners[offsets[face] + (k + 1) % degrees[face]]
+        n = len(arrays["vertex_index"])
+        keys = np.unique(np.minimum(u, v) * n + np.maximum(u, v))
+        return np.stack([keys // n, keys % n], axis=1).reshape(-1)
+
+    def _is_coplanar_edge(self, u, v):
+        """Verify that an interior edge separates two coplanar faces."""
         mesh = self._mesh
-        vertex_xyz = {vertex: mesh.vertex_attributes(vertex, "xyz") for vertex in mesh.vertices()}
-        if self.use_vertex_color:
-            vertex_color = {
-                vertex: mesh.vertex_attribute(vertex, "color") or Color.grey() for vertex in mesh.vertices()
-            }
-        positions = []
-        colors = []
-        elements = []
-        i = 0
-        faces = self.faces or mesh.faces()
-        for face in faces:
-            vertices = mesh.face_vertices(face)[::-1]
-            color = self.facecolors.get(face, self.facecolor)
-            if len(vertices) == 3:
-                a, b, c = vertices
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[b])
-                positions.append(vertex_xyz[c])
-                if self.use_vertex_color:
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[b])
-                    colors.append(vertex_color[c])
-                else:
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                elements.append([i + 0, i + 1, i + 2])
-                i += 3
-            elif len(vertices) == 4:
-                a, b, c, d = vertices
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[b])
-                positions.append(vertex_xyz[c])
-                positions.append(vertex_xyz[a])
-                positions.append(vertex_xyz[c])
-                positions.append(vertex_xyz[d])
-                if self.use_vertex_color:
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[b])
-                    colors.append(vertex_color[c])
-                    colors.append(vertex_color[a])
-                    colors.append(vertex_color[c])
-                    colors.append(vertex_color[d])
-                else:
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                    colors.append(color)
-                elements.append([i + 0, i + 1, i + 2])
-                elements.append([i + 3, i + 4, i + 5])
-                i += 6
+        if mesh.is_edge_on_boundary(u, v):
+            return False
+        fkeys = mesh.edge_faces(u, v)
+        ps = [mesh.face_center(fkeys[0]), mesh.face_center(fkeys[1]), *mesh.edge_coordinates(u, v)]
+        return is_coplanar(ps, tol=1e-5)
+
+    def _faces_arrays(self):
+        """The positions, colors and triangles of the faces, shared by the front and back faces.
+
+        In indexed mode, the positions are the shared vertex positions of the mesh,
+        unless faces have different colors.
+        In that case, only the vertices on the boundaries between differently colored faces are duplicated.
+        Otherwise, every triangle corner has its own position and color.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            Positions and colors of shape (n, 3), and the rows of the positions per triangle, of shape (T, 3).
+        """
+        arrays = self._mesh_arrays()
+        if "faces_arrays" in arrays:
+            return arrays["faces_arrays"]
+
+        xyz = arrays["xyz"]
+        triangles = arrays["triangles"]
+        if not self.indexed:
+            corners = triangles.reshape(-1)
+            positions = xyz[corners]
+            self._register_source(positions, corners)
+            if self.use_vertex_color:
+                colors = self._vertex_colors()[corners]
             else:
-                points = [vertex_xyz[vertex] for vertex in vertices]
-                c = centroid_points(points)
-                for a, b in pairwise(points + points[:1]):
-                    positions.append(a)
-                    positions.append(b)
-                    positions.append(c)
-                    if self.use_vertex_color:
-                        colors.append(vertex_color[a])
-                        colors.append(vertex_color[b])
-                        colors.append(vertex_color[c])
-                    else:
-                        colors.append(color)
-                        colors.append(color)
-                        colors.append(color)
-                    elements.append([i + 0, i + 1, i + 2])
-                    i += 3
-        return positions, colors, elements
+                colors = self._colors_array(arrays["faces"], self.facecolors, self.facecolor)
+                colors = np.repeat(colors[arrays["triangle_face"]], 3, axis=0)
+            triangles = np.arange(len(corners)).reshape(-1, 3)
+        elif self.use_vertex_color:
+            positions = xyz
+            colors = self._vertex_colors()
+        else:
+            colors = self._colors_array(arrays["faces"], self.facecolors, self.facecolor)
+            if self.facecolors:
+                # rows of three float32 values are compared as 12-byte values
+                keys = np.ascontiguousarray(colors).view(np.dtype((np.void, colors.itemsize * 3))).reshape(-1)
+                _, first, face_color = np.unique(keys, return_index=True, return_inverse=True)
+                palette = colors[first]
+            else:
+                palette = colors[:1]
+            if len(palette) <= 1:
+                positions = xyz
+                colors = _tile(palette[0] if len(palette) else self.facecolor, len(xyz))
+            else:
+                # a vertex gets a copy per distinct color of the faces around it
+                n = len(palette)
+                keys = triangles * n + face_color.reshape(-1)[arrays["triangle_face"], None]
+                unique, inverse = np.unique(keys.reshape(-1), return_inverse=True)
+                positions = xyz[unique // n]
+                self._register_source(positions, unique // n)
+                colors = palette[unique % n]
+                triangles = inverse.reshape(-1, 3)
+
+        arrays["faces_arrays"] = positions, colors, triangles
+        return arrays["faces_arrays"]
+
+    def _frontfaces_data(self):
+        positions, colors, triangles = self._faces_arrays()
+        return positions, colors, triangles.reshape(-1)
+
+    def _backfaces_data(self):
+        positions, colors, triangles = self._faces_arrays()
+        return positions, colors, triangles[:, ::-1].reshape(-1)
+
+
+def _tile(color, n):
+    """Repeat a single color n times, as an array of shape (n, 3)."""
+    return np.tile(np.array(color, dtype=np.float32), (n, 1))
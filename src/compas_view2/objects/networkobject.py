@@ -1,11 +1,28 @@
+from itertools import chain
+
+import numpy as np
+
 from .bufferobject import BufferObject
 
 
 class NetworkObject(BufferObject):
-    """Object for displaying COMPAS network data structures."""
+    """Object for displaying COMPAS network data structures.
+
+    Parameters
+    ----------
+    data : :class: `compas.datastructures.Network`
+        Network for the viewer
+    show_points : bool
+        True to show nodes
+    indexed : bool
+        True to upload the node positions once and share them between points and lines.
+        False to give every line end its own position and color.
+
+    """
 
-    def __init__(self, data, show_points: bool = True, **kwargs):
+    def __init__(self, data, show_points: bool = True, indexed: bool = True, **kwargs):
         super().__init__(data, show_points=show_points, **kwargs)
+        self.indexed = indexed
 
     @property
     def nodes(self):
@@ -15,32 +32,74 @@ class NetworkObject(BufferObject):
     def edges(self):
         return self._edges
 
+    def _network_arrays(self):
+        """Compute the node coordinates of the network, once per buffer (re)build."""
+        if self._arrays is None:
+            data = self._data
+            nodes = list(data.nodes())
+            self._arrays = {
+                "nodes": nodes,
+                "node_index": {node: index for index, node in enumerate(nodes)},
+                "xyz": np.array(data.nodes_attributes("xyz"), dtype=np.float32).reshape(-1, 3),
+            }
+        return self._arrays
+
+    def set_vertex_positions(self, nodes, xyz):
+        """Move nodes of the network, and upload only the affected ranges of the buffers.
+
+        Parameters
+        ----------
+        nodes : list[hashable]
+            The identifiers of the nodes.
+        xyz : list[list[float]] | :class:`numpy.ndarray`
+            The new coordinates per node.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The coordinates are also set in the network data structure.
+
+        """
+        nodes = list(nodes)
+        for node, point in zip(nodes, np.asarray(xyz).reshape(-1, 3).tolist()):
+            self._data.node_attributes(node, "xyz", point)
+        self.update(vertices=nodes)
+
+    def _vertex_positions(self, nodes):
+        node_index = self._buffer_arrays["node_index"]
+        rows = [node_index[node] for node in nodes]
+        xyz = [self._data.node_attributes(node, "xyz") for node in nodes]
+        return rows, np.array(xyz, dtype=np.float32).reshape(-1, 3)
+
+    def _element_index(self, kind, count):
+        if kind == "vertices":
+            return np.arange(count), self._arrays["nodes"]
+        return np.arange(count), self._arrays["edges"]
+
     def _points_data(self):
-        data = self._data
-        node_xyz = {node: data.node_attributes(node, "xyz") for node in data.nodes()}
-        # nodes
-        positions = []
-        colors = []
-        elements = []
-        for i, node in enumerate(data.nodes()):
-            positions.append(node_xyz[node])
-            colors.append(self.pointcolors.get(node, self.pointcolor))
-            elements.append([i])
-        return positions, colors, elements
+        arrays = self._network_arrays()
+        nodes = arrays["nodes"]
+        positions = arrays["xyz"]
+        colors = np.array([self.pointcolors.get(node, self.pointcolor) for node in nodes], dtype=np.float32)
+        elements = np.arange(len(nodes), dtype=np.uint32)
+        return positions, colors.reshape(-1, 3), elements
 
     def _lines_data(self):
-        data = self._data
-        node_xyz = {node: data.node_attributes(node, "xyz") for node in data.nodes()}
-        positions = []
-        colors = []
-        elements = []
-        i = 0
-        for u, v in data.edges():
-            positions.append(node_xyz[u])
-            positions.append(node_xyz[v])
-            color = self.linecolors.get((u, v), self.linecolor)
-            colors.append(color)
-            colors.append(color)
-            elements.append([i + 0, i + 1])
-            i += 2
+        arrays = self._network_arrays()
+        edges = list(self._data.edges())
+        arrays["edges"] = edges
+        index = np.fromiter(map(arrays["node_index"].__getitem__, chain.from_iterable(edges)), dtype=np.int64)
+        if self.indexed and not self.linecolors:
+            # without individual edge colors, the lines index into the node positions shared with the points
+            positions = arrays["xyz"]
+            colors = np.tile(np.array(self.linecolor, dtype=np.float32), (len(positions), 1))
+            return positions, colors, index
+        positions = arrays["xyz"][index]
+        self._register_source(positions, index)
+        colors = np.array([self.linecolors.get(edge, self.linecolor) for edge in edges], dtype=np.float32)
+        colors = np.repeat(colors.reshape(-1, 3), 2, axis=0)
+        elements = np.arange(len(index), dtype=np.uint32)
         return positions, colors, elements
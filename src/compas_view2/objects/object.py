@@ -10,6 +10,8 @@ from compas.geometry import decompose_matrix
 from compas.geometry import identity_matrix
 from compas.colors import Color
 from compas.data import Data
+from compas_view2.gl import Buffer
+from compas_view2.gl import Texture
 
 from typing import Dict, Union
 
@@ -18,6 +20,29 @@ ABC = abc.ABCMeta("ABC", (object,), {"__slots__": ()})
 
 DATA_OBJECT = {}
 
+# attributes that change how an object is drawn from its buffers
+DRAW_ATTRIBUTES = frozenset(
+    [
+        "show_points",
+        "show_lines",
+        "show_faces",
+        "pointcolor",
+        "linecolor",
+        "facecolor",
+        "pointcolors",
+        "linecolors",
+        "facecolors",
+        "linewidth",
+        "pointsize",
+        "opacity",
+        "background",
+        "use_vertex_color",
+    ]
+)
+
+# attributes that toggle whether an object is drawn, or how it is highlighted
+DISPLAY_ATTRIBUTES = frozenset(["is_visible", "is_selected"])
+
 
 def _get_object_cls(data):
     dtype = type(data)
@@ -74,6 +99,9 @@ class Object(ABC):
     opacity : float, optional
         The opacity of the object.
         Default to 1.0.
+    animated : bool, optional
+        Whether the geometry of the object is updated frequently, e.g. in every frame of a simulation.
+        Default to False.
     **kwargs : dict, optional
         Additional visualization options for specific objects.
 
@@ -107,6 +135,9 @@ class Object(ABC):
         The point size to be drawn on screen.
     opacity : float
         The opacity of the object.
+    animated : bool
+        Whether the geometry of the object is updated frequently.
+        The GL buffers of animated objects are optimized for dynamic access.
     background : bool
         Whether the object is drawn on the backgound with depth test disabled.
     bounding_box : :class:`numpy.array`, read-only
@@ -123,11 +154,22 @@ class Object(ABC):
         The scale vector of the object.
     properties : list, read-only
         The list of object-specific properties.
+    version : int, read-only
+        A counter that is incremented whenever the geometry, transformation or drawing attributes of the object change.
+    vram : int, read-only
+        The number of bytes of GPU memory allocated for the buffers and textures of the object.
     otype : class
         The data class of the object.
+    replaceable_data : bool, read-only
+        Whether the data of the object can be replaced by data of the same type,
+        after which the object can be updated in place.
 
     """
 
+    changes = 0
+    version = 0
+    replaceable_data = True
+
     default_color_points = Color(0.2, 0.2, 0.2)
     default_color_lines = Color(0.4, 0.4, 0.4)
     default_color_faces = Color(0.8, 0.8, 0.8)
@@ -146,6 +188,23 @@ class Object(ABC):
             raise TypeError("Type {} is not supported by the viewer.".format(type(data)))
         return obj
 
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in DRAW_ATTRIBUTES:
+            self._touch()
+        elif name in DISPLAY_ATTRIBUTES:
+            Object.changes += 1
+
+    def _touch(self):
+        """Record that the way the object is drawn has changed.
+
+        The version of the object, and the global count of changes of all objects, are incremented.
+        Renderers that cache the drawing state of objects, such as batches of static objects,
+        compare these counters to find out whether their caches are stale.
+        """
+        self.__dict__["version"] = self.__dict__.get("version", 0) + 1
+        Object.changes += 1
+
     def __init__(
         self,
         data: Data,
@@ -162,6 +221,7 @@ class Object(ABC):
         linewidth: int = 1,
         pointsize: int = 10,
         opacity: float = 1.0,
+        animated: bool = False,
     ):
         self._data = data
         self._app = app
@@ -197,6 +257,7 @@ class Object(ABC):
         self.linewidth = linewidth
         self.pointsize = pointsize
         self.opacity = opacity
+        self.animated = animated
         self.background = False
 
         self._instance_color = None
@@ -208,6 +269,7 @@ class Object(ABC):
 
         self._bounding_box = None
         self._bounding_box_center = None
+        self._local_bounding_box = None
         self._is_collection = False
 
     @property
@@ -218,6 +280,19 @@ class Object(ABC):
     def bounding_box_center(self):
         return self._bounding_box_center
 
+    @property
+    def data(self):
+        """The data of the object.
+
+        The data can be replaced by data of the same type,
+        after which :meth:`update` updates the object from the new data.
+        """
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
     @property
     def otype(self):
         return DATA_OBJECT[self._data.__class__]
@@ -237,6 +312,51 @@ class Object(ABC):
     def create(self):
         pass
 
+    def _buffers(self):
+        """The distinct GL buffers and textures in the buffer dicts of the object."""
+        buffers = {}
+        for key, value in vars(self).items():
+            if key.endswith("_buffer") and isinstance(value, dict):
+                for item in value.values():
+                    if isinstance(item, (Buffer, Texture)) and not item.is_deleted:
+                        buffers[type(item), int(item)] = item
+        return list(buffers.values())
+
+    @property
+    def vram(self):
+        return sum(buffer.capacity for buffer in self._buffers())
+
+    def delete_buffers(self):
+        """Delete the GL buffers and textures of the object.
+
+        The GL context of the view should be current.
+
+        Returns
+        -------
+        None
+
+        """
+        for buffer in self._buffers():
+            buffer.delete()
+        for key, value in list(vars(self).items()):
+            if key.endswith("_buffer") and isinstance(value, dict):
+                delattr(self, key)
+
+    def dispose(self):
+        """Release all GL resources of the object and of its children.
+
+        The object can be initialised again afterwards.
+        The GL context of the view should be current.
+
+        Returns
+        -------
+        None
+
+        """
+        for child in list(self.children):
+            child.dispose()
+        self.delete_buffers()
+
     @property
     def properties(self):
         return None
@@ -293,6 +413,7 @@ class Object(ABC):
 
     def _update_matrix(self):
         """Update the matrix from object's translation, rotation and scale"""
+        self._touch()
         if (not self.parent or self.parent._matrix_buffer is None) and (
             self.translation == [0, 0, 0] and self.rotation == [0, 0, 0] and self.scale == [1, 1, 1]
         ):
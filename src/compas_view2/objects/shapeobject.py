@@ -0,0 +1,125 @@
+import numpy as np
+
+from .meshobject import MeshObject
+from .tessellation import SHAPE_MATRICES
+from .tessellation import Tessellation
+from .tessellation import TessellationCache
+
+
+class ShapeObject(MeshObject):
+    """Base object for displaying parametric shapes, from a shared tessellation of the shape in unit size.
+
+    The shape is tessellated in unit size, in its local coordinates,
+    and the matrix of the object maps the tessellation onto the shape.
+    Tessellations are cached per type of shape, parameters that define its proportions, and resolution,
+    such that shapes that only differ in size, position and orientation share the same tessellation,
+    and changing the resolution back and forth does not tessellate the shape again.
+
+    Parameters
+    ----------
+    data : :class:`compas.geometry.Shape`
+        The shape.
+    **kwargs : dict, optional
+        The resolution of the tessellation, for every name in :attr:`properties`,
+        and the options of :class:`MeshObject`.
+
+    Attributes
+    ----------
+    tessellations : :class:`compas_view2.objects.TessellationCache`
+        The cache of tessellations, shared by all shape objects.
+
+    Notes
+    -----
+    Subclasses implement :meth:`_unit_shape`.
+    The vertices of the tessellation can not be moved individually.
+
+    Examples
+    --------
+    >>> from compas.geometry import Sphere
+    >>> from compas_view2.objects import SphereObject
+    >>> ShapeObject.tessellations.clear()
+    >>> a = SphereObject(Sphere([0, 0, 0], 1.0), u=8, v=8)
+    >>> b = SphereObject(Sphere([5, 0, 0], 2.0), u=8, v=8)
+    >>> ShapeObject.tessellations.hits, ShapeObject.tessellations.misses
+    (1, 1)
+
+    """
+
+    tessellations = TessellationCache()
+
+    def __init__(self, data, **kwargs):
+        resolution = {name: kwargs.pop(name) for name in self.properties}
+        super().__init__(data, **kwargs)
+        for name, value in resolution.items():
+            setattr(self, name, value)
+        self._tessellation = None
+        self._shape_matrix = None
+        self._tessellate()
+
+    def _unit_shape(self):
+        """The shape in unit size, and the parameters that define its proportions.
+
+        Returns
+        -------
+        tuple[:class:`compas.geometry.Shape`, tuple]
+        """
+        raise NotImplementedError
+
+    def _tessellate(self):
+        """Get the tessellation of the shape in unit size, and the matrix that maps it onto the shape."""
+        shape = self._data
+        unit, parameters = self._unit_shape()
+        resolution = {name: getattr(self, name) for name in self.properties}
+        key = type(unit), parameters, tuple(resolution.values())
+        self._tessellation = self.tessellations.get(key, lambda: Tessellation.from_shape(unit, **resolution))
+        self._shape_matrix = SHAPE_MATRICES[type(unit)]([shape])[0]
+        self._mesh = self._tessellation.mesh
+
+    def _mesh_arrays(self):
+        if self._arrays is None and not self.faces:
+            # the arrays of the tessellation are shared, the arrays added by the data methods are not
+            self._arrays = dict(self._tessellation.arrays)
+        return super()._mesh_arrays()
+
+    def update(self):
+        """Update the object from its shape.
+
+        The shape is only tessellated again if its proportions or the resolution have changed,
+        and the tessellation is not cached.
+        """
+        tessellation = self._tessellation
+        self._tessellate()
+        if self._tessellation is tessellation:
+            super().update()
+        else:
+            super().init()
+
+    def set_vertex_positions(self, vertices, xyz):
+        raise NotImplementedError("The vertices of a shape are defined by its parameters.")
+
+    def _update_matrix(self):
+        """Update the matrix from object's translation, rotation and scale, and the matrix of the shape"""
+        super()._update_matrix()
+        matrix = self._shape_matrix
+        if self._matrix_buffer is not None:
+            matrix = np.asarray(self._matrix_buffer).reshape(4, 4) @ matrix
+        self._matrix_buffer = matrix.flatten()
+        self._transform_bounding_box()
+
+    def _update_bounding_box(self, positions=None):
+        """Update the bounding box of the object
+
+        The local bounding box is the bounding box of the tessellation in unit size,
+        and the bounding box is the bounding box of the shape, transformed by the object.
+        """
+        super()._update_bounding_box(positions)
+        self._transform_bounding_box()
+
+    def _transform_bounding_box(self):
+        if self._local_bounding_box is None:
+            return
+        # the vertices of the tessellation are transformed, which gives a tighter box than its corners
+        matrix = np.asarray(self._transformation.matrix) @ self._shape_matrix
+        xyz = self._tessellation.arrays["xyz"] @ matrix[:3, :3].T + matrix[:3, 3]
+        self._bounding_box = np.array([xyz.min(axis=0), xyz.max(axis=0)])
+        self._bounding_box_center = np.average(self._bounding_box, axis=0)
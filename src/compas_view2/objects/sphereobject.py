@@ -1,21 +1,15 @@
-from compas.datastructures import Mesh
 from compas.geometry import Sphere
-from .meshobject import MeshObject
+from .shapeobject import ShapeObject
 
 
-class SphereObject(MeshObject):
+class SphereObject(ShapeObject):
     """Object for displaying COMPAS sphere geometry."""
 
     def __init__(self, data, u=16, v=16, **kwargs):
-        super().__init__(Mesh.from_shape(data, u=u, v=v), **kwargs)
-        self.u = u
-        self.v = v
-        self._data = data
+        super().__init__(data, u=u, v=v, **kwargs)
 
-    def update(self):
-        self._mesh = Mesh.from_shape(self._data, u=self.u, v=self.v)
-        self.init()
-        super().update()
+    def _unit_shape(self):
+        return Sphere([0, 0, 0], 1), ()
 
     @property
     def properties(self):
@@ -0,0 +1,364 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Capsule
+from compas.geometry import Cone
+from compas.geometry import Cylinder
+from compas.geometry import Frame
+from compas.geometry import Plane
+from compas.geometry import Sphere
+from compas.geometry import Torus
+from compas.geometry import Transformation
+from compas_view2.shapes import Arrow
+
+from .meshobject import MeshObject
+
+# the approximate memory of a mesh data structure per vertex and per face, in bytes
+MESH_BYTES = 500
+
+
+class Tessellation:
+    """The tessellation of a shape in unit size, in the local coordinates of the shape.
+
+    Parameters
+    ----------
+    mesh : :class:`compas.datastructures.Mesh`
+        The tessellated shape.
+
+    Attributes
+    ----------
+    mesh : :class:`compas.datastructures.Mesh`
+        The tessellated shape.
+        It is shared by all objects that display the tessellation, and should not be modified.
+    arrays : dict
+        The vertex coordinates and the triangulation of the faces of the mesh as read-only arrays,
+        as computed by :meth:`compas_view2.objects.MeshObject._mesh_arrays`.
+    nbytes : int
+        The approximate memory of the tessellation, in bytes.
+
+    """
+
+    __slots__ = ("mesh", "arrays", "nbytes")
+
+    def __init__(self, mesh):
+        self.mesh = mesh
+        self.arrays = MeshObject(mesh)._mesh_arrays()
+        self.nbytes = MESH_BYTES * (mesh.number_of_vertices() + mesh.number_of_faces())
+        for array in self.arrays.values():
+            if isinstance(array, np.ndarray):
+                array.setflags(write=False)
+                self.nbytes += array.nbytes
+
+    @classmethod
+    def from_shape(cls, shape, **resolution):
+        """Tessellate a shape in unit size, and express the tessellation in the local coordinates of the shape.
+
+        Parameters
+        ----------
+        shape : :class:`compas.geometry.Shape`
+            The shape in unit size.
+        **resolution : dict, optional
+            The resolution of the tessellation, e.g. ``u`` and ``v``.
+
+        Returns
+        -------
+        :class:`Tessellation`
+        """
+        mesh = Mesh.from_shape(shape, **resolution)
+        mesh.transform(Transformation.from_frame(unit_frame(shape)).inverse())
+        return cls(mesh)
+
+
+class TessellationCache:
+    """A least recently used cache of tessellations of shapes in unit size.
+
+    Tessellations are identified by the type of the shape, the parameters that define its proportions,
+    and the resolution of the tessellation.
+    If the memory of the cached tessellations exceeds the limit,
+    the least recently used tessellations are removed from the cache.
+    Objects that still display a removed tessellation keep it.
+
+    Parameters
+    ----------
+    maxbytes : int, optional
+        The maximum memory of the cached tessellations, in bytes.
+
+    Attributes
+    ----------
+    maxbytes : int
+        The maximum memory of the cached tessellations, in bytes.
+    nbytes : int
+        The memory of the cached tessellations, in bytes.
+    hits : int
+        The number of tessellations that were found in the cache.
+    misses : int
+        The number of tessellations that had to be computed.
+    evictions : int
+        The number of tessellations that were removed from the cache to respect the memory limit.
+
+    Examples
+    --------
+    >>> from compas.geometry import Sphere
+    >>> cache = TessellationCache()
+    >>> a = cache.get((Sphere, (), (8, 8)), lambda: Tessellation.from_shape(Sphere([0, 0, 0], 1), u=8, v=8))
+    >>> b = cache.get((Sphere, (), (8, 8)), lambda: Tessellation.from_shape(Sphere([0, 0, 0], 1), u=8, v=8))
+    >>> a is b
+    True
+    >>> cache.hits, cache.misses
+    (1, 1)
+
+    """
+
+    def __init__(self, maxbytes=64 * 2**20):
+        self._maxbytes = maxbytes
+        self._tessellations = OrderedDict()
+        self._lock = threading.Lock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def maxbytes(self):
+        return self._maxbytes
+
+    @maxbytes.setter
+    def maxbytes(self, maxbytes):
+        with self._lock:
+            self._maxbytes = maxbytes
+            self._evict()
+
+    def __len__(self):
+        return len(self._tessellations)
+
+    def __contains__(self, key):
+        return key in self._tessellations
+
+    def get(self, key, tessellate):
+        """Get a tessellation from the cache, or compute and cache it if it is not cached.
+
+        Parameters
+        ----------
+        key : tuple
+            The type of the shape, the parameters that define its proportions, and the resolution.
+        tessellate : callable
+            A function without arguments that computes the tessellation.
+
+        Returns
+        -------
+        :class:`Tessellation`
+        """
+        with self._lock:
+            tessellation = self._tessellations.get(key)
+            if tessellation is not None:
+                self._tessellations.move_to_end(key)
+                self.hits += 1
+                return tessellation
+            self.misses += 1
+        tessellation = tessellate()
+        with self._lock:
+            previous = self._tessellations.pop(key, None)
+            if previous is not None:
+                # another thread cached the same tessellation in the meantime
+                self.nbytes -= previous.nbytes
+            self._tessellations[key] = tessellation
+            self.nbytes += tessellation.nbytes
+            self._evict()
+        return tessellation
+
+    def _evict(self):
+        # the most recently used tessellation is kept, even if it exceeds the limit by itself
+        while self.nbytes > self._maxbytes and len(self._tessellations) > 1:
+            _, tessellation = self._tessellations.popitem(last=False)
+            self.nbytes -= tessellation.nbytes
+            self.evictions += 1
+
+    def clear(self):
+        """Remove all tessellations from the cache, and reset the statistics.
+
+        Returns
+        -------
+        None
+        """
+        with self._lock:
+            self._tessellations.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def stats(self):
+        """The statistics of the cache.
+
+        Returns
+        -------
+        dict
+            The number of hits, misses and evictions, the hit rate,
+            the number of cached tessellations, and their memory and the limit in bytes.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "tessellations": len(self),
+            "nbytes": self.nbytes,
+            "maxbytes": self.maxbytes,
+        }
+
+
+def unit_frame(shape):
+    """The frame of the local coordinates in which a shape in unit size is tessellated.
+
+    Parameters
+    ----------
+    shape : :class:`compas.geometry.Shape`
+        The shape in unit size.
+
+    Returns
+    -------
+    :class:`compas.geometry.Frame`
+    """
+    if isinstance(shape, (Cylinder, Cone)):
+        return Frame.from_plane(shape.circle.plane)
+    if isinstance(shape, Torus):
+        return Frame.from_plane(shape.plane)
+    if isinstance(shape, Capsule):
+        return Frame.from_plane(Plane(shape.line.midpoint, shape.line.direction))
+    if isinstance(shape, Arrow):
+        return Frame.from_plane(Plane(shape.position, shape.direction))
+    return Frame.worldXY()
+
+
+def frame_matrices(points, normals):
+    """Compute the matrices of frames from points and normals, with the same axes as :meth:`Frame.from_plane`.
+
+    Parameters
+    ----------
+    points : :class:`numpy.ndarray`
+        The origins of the frames, of shape (n, 3).
+    normals : :class:`numpy.ndarray`
+        The z-axes of the frames, of shape (n, 3).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The matrices, of shape (n, 4, 4).
+    """
+    normals = normals / np.linalg.norm(normals, axis=1)[:, None]
+    x, y, z = normals.T
+    zero = np.zeros_like(x)
+    vectors = np.stack(
+        [np.stack([-y, x, zero], axis=1), np.stack([zero, -z, y], axis=1), np.stack([z, zero, -x], axis=1)]
+    )
+    index = np.argmax(np.linalg.norm(vectors, axis=2), axis=0)
+    xaxes = vectors[index, np.arange(len(normals))]
+    xaxes /= np.linalg.norm(xaxes, axis=1)[:, None]
+    yaxes = np.cross(normals, xaxes)
+    yaxes /= np.linalg.norm(yaxes, axis=1)[:, None]
+    zaxes = np.cross(xaxes, yaxes)
+    return compose_matrices(points, xaxes, yaxes, zaxes)
+
+
+def compose_matrices(points, xaxes, yaxes, zaxes, scales=None):
+    """Compose transformation matrices from origins and (scaled) axes.
+
+    Parameters
+    ----------
+    points : :class:`numpy.ndarray`
+        The origins, of shape (n, 3).
+    xaxes, yaxes, zaxes : :class:`numpy.ndarray`
+        The axes, of shape (n, 3).
+    scales : :class:`numpy.ndarray`, optional
+        The scale factors of the axes, of shape (n, 3).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The matrices, of shape (n, 4, 4).
+    """
+    matrices = np.zeros((len(points), 4, 4))
+    matrices[:, :3, 0] = xaxes
+    matrices[:, :3, 1] = yaxes
+    matrices[:, :3, 2] = zaxes
+    if scales is not None:
+        matrices[:, :3, :3] *= scales[:, None, :]
+    matrices[:, :3, 3] = points
+    matrices[:, 3, 3] = 1
+    return matrices
+
+
+def _sphere_matrices(spheres):
+    points = np.array([sphere.point[:] for sphere in spheres], dtype=float)
+    radii = np.array([sphere.radius for sphere in spheres], dtype=float)
+    scales = np.repeat(radii[:, None], 3, axis=1)
+    return compose_matrices(points, *np.identity(3)[:, None, :].repeat(len(spheres), axis=1), scales=scales)
+
+
+def _box_matrices(boxes):
+    frames = [box.frame for box in boxes]
+    points = np.array([frame.point[:] for frame in frames], dtype=float)
+    xaxes = np.array([frame.xaxis[:] for frame in frames], dtype=float)
+    yaxes = np.array([frame.yaxis[:] for frame in frames], dtype=float)
+    zaxes = np.array([frame.zaxis[:] for frame in frames], dtype=float)
+    scales = np.array([[box.xsize, box.ysize, box.zsize] for box in boxes], dtype=float)
+    return compose_matrices(points, xaxes, yaxes, zaxes, scales=scales)
+
+
+def _circular_matrices(shapes):
+    # cylinders and cones have a circle of radius 1 and a height of 1 in unit size
+    points = np.array([shape.circle.plane.point[:] for shape in shapes], dtype=float)
+    normals = np.array([shape.circle.plane.normal[:] for shape in shapes], dtype=float)
+    scales = np.array([[s.circle.radius, s.circle.radius, s.height] for s in shapes], dtype=float)
+    matrices = frame_matrices(points, normals)
+    matrices[:, :3, :3] *= scales[:, None, :]
+    return matrices
+
+
+def _torus_matrices(tori):
+    # a torus has an axis radius of 1 in unit size
+    points = np.array([torus.plane.point[:] for torus in tori], dtype=float)
+    normals = np.array([torus.plane.normal[:] for torus in tori], dtype=float)
+    radii = np.array([torus.radius_axis for torus in tori], dtype=float)
+    matrices = frame_matrices(points, normals)
+    matrices[:, :3, :3] *= radii[:, None, None]
+    return matrices
+
+
+def _capsule_matrices(capsules):
+    # a capsule has a radius of 1 in unit size
+    points = np.array([capsule.line.midpoint[:] for capsule in capsules], dtype=float)
+    directions = np.array([capsule.line.direction[:] for capsule in capsules], dtype=float)
+    radii = np.array([capsule.radius for capsule in capsules], dtype=float)
+    matrices = frame_matrices(points, directions)
+    matrices[:, :3, :3] *= radii[:, None, None]
+    return matrices
+
+
+def _arrow_matrices(arrows):
+    # an arrow has a length of 1 in unit size
+    if len({(arrow.head_portion, arrow.head_width, arrow.body_width) for arrow in arrows}) > 1:
+        raise ValueError("Arrow instances should have the same head portion, head width and body width.")
+    points = np.array([arrow.position[:] for arrow in arrows], dtype=float)
+    directions = np.array([arrow.direction[:] for arrow in arrows], dtype=float)
+    lengths = np.linalg.norm(directions, axis=1)
+    matrices = frame_matrices(points, directions)
+    matrices[:, :3, :3] *= lengths[:, None, None]
+    return matrices
+
+
+# per type of shape: the matrices that map the local coordinates of the shape in unit size onto shapes of that type
+SHAPE_MATRICES = {
+    Box: _box_matrices,
+    Sphere: _sphere_matrices,
+    Cylinder: _circular_matrices,
+    Cone: _circular_matrices,
+    Torus: _torus_matrices,
+    Capsule: _capsule_matrices,
+    Arrow: _arrow_matrices,
+}
@@ -1,116 +1,46 @@
-import os
-
-import freetype as ft
 import numpy as np
-from matplotlib import font_manager
-from OpenGL import GL
-
-from compas_view2.gl import make_index_buffer
-from compas_view2.gl import make_vertex_buffer
 
 from .object import Object
 
-here = os.path.dirname(__file__)
-fonts = os.path.join(here, "..", "fonts")
-
 
 class TextObject(Object):
-    """Object for displaying text sprites."""
+    """Object for displaying text sprites.
+
+    The texts of a view are drawn together, by :class:`compas_view2.views.text.TextRenderer`,
+    from the glyph atlases of their fonts.
+    Text objects therefore do not have GL resources of their own.
+    """
 
     def __init__(self, data, color=None, height=10, **kwargs):
         super().__init__(data, **kwargs)
         self.color = color or [0, 0, 0]
-        self.characters = []
-        self.buffers = []
         self.height = height
 
-    def init(self):
-        self.make_buffers()
-
-    def make_buffers(self):
-        self._text_buffer = {
-            "positions": make_vertex_buffer(self._data.position),
-            "elements": make_index_buffer([0]),
-            "text_texture": self.make_text_texture(),
-            "n": 1,
-        }
-
-    def make_text_texture(self):
-        # change the filename if necessary
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name == "color":
+            self._touch()
 
-        font_dir = os.path.join(fonts, "FreeSans.ttf")
-        if self._data.font:
-            for font in font_manager.fontManager.ttflist:
-                if font.name == self._data.font:
-                    font_dir = font.fname
-                    break
-        face = ft.Face(font_dir)
-
-        char_width = 48
-        char_height = 80
-        # the size is specified in 1/64 pixel
-        face.set_char_size(64 * char_width)
-
-        text = self._data.text
-        string_buffer = np.zeros(shape=(char_height, char_width * len(text)))
-
-        for i, c in enumerate(text):
-            if c == " ":
-                continue
-            face.load_char(c, ft.FT_LOAD_FLAGS["FT_LOAD_RENDER"])
-            glyph = face.glyph
-            bitmap = glyph.bitmap
-            char = np.array(bitmap.buffer)
-            char = char.reshape((bitmap.rows, bitmap.width))
-            string_buffer[-char.shape[0] :, i * char_width : i * char_width + char.shape[1]] = char
-
-        string_buffer = string_buffer.reshape((string_buffer.shape[0] * string_buffer.shape[1]))
-
-        # create glyph texture
-        texture = GL.glGenTextures(1)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
-        GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
-        GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
-        GL.glTexImage2D(
-            GL.GL_TEXTURE_2D,
-            0,
-            GL.GL_R8,
-            char_width * len(text),
-            char_height,
-            0,
-            GL.GL_RED,
-            GL.GL_UNSIGNED_BYTE,
-            string_buffer,
-        )
-        return texture
+    def init(self):
+        self._update_matrix()
 
-    def calculate_text_height(self, camera_position):
-        if self._data.absolute_height:
-            return int(
-                (10 * self._data.height)
-                / np.linalg.norm(
-                    np.array(self._data.position) - np.array([camera_position.x, camera_position.y, camera_position.z])
-                )
-            )
+    def world_position(self):
+        """The position of the text, transformed by the world matrix of the object.
 
-        else:
-            return self._data.height
+        Returns
+        -------
+        list[float]
+        """
+        position = list(self._data.position)
+        if self._matrix_buffer is None:
+            return position
+        matrix = np.asarray(self._matrix_buffer).reshape(4, 4)
+        return (matrix[:3, :3] @ position + matrix[:3, 3]).tolist()
 
     def draw(self, shader, camera_position):
-        """Draw the object from its buffers"""
-        shader.enable_attribute("position")
-        shader.uniform4x4("transform", self.matrix)
-        shader.uniform1f("object_opacity", self.opacity)
-        shader.uniform1i("text_height", self.calculate_text_height(camera_position))
-        shader.uniform1i("text_num", len(self._data.text))
-        shader.uniform3f("text_color", self.color)
-        shader.uniformTex("text_texture", self._text_buffer["text_texture"])
-        shader.bind_attribute("position", self._text_buffer["positions"])
-        shader.draw_texts(elements=self._text_buffer["elements"], n=self._text_buffer["n"])
-        shader.uniform1i("is_text", 0)
-        shader.uniform1f("object_opacity", 1)
-        shader.disable_attribute("position")
+        """Texts are drawn in batches, by the text renderer of the view."""
+        pass
 
     def update(self):
-        super()._update_matrix()
-        self.init()
+        """Update the object from its text, after the text, its position, height or font have changed."""
+        self._update_matrix()
@@ -1,22 +1,17 @@
-from compas.datastructures import Mesh
 from compas.geometry import Plane
 from compas.geometry import Torus
-from .meshobject import MeshObject
+from .shapeobject import ShapeObject
 
 
-class TorusObject(MeshObject):
+class TorusObject(ShapeObject):
     """Object for displaying COMPAS torus geometry."""
 
     def __init__(self, data, u=16, v=16, **kwargs):
-        super().__init__(Mesh.from_shape(data, u=u, v=v), **kwargs)
-        self.u = u
-        self.v = v
-        self._data = data
+        super().__init__(data, u=u, v=v, **kwargs)
 
-    def update(self):
-        self._mesh = Mesh.from_shape(self._data, u=self.u, v=self.v)
-        self.init()
-        super().update()
+    def _unit_shape(self):
+        ratio = self._data.radius_pipe / self._data.radius_axis
+        return Torus(Plane([0, 0, 0], [0, 0, 1]), 1, ratio), (ratio,)
 
     @property
     def properties(self):
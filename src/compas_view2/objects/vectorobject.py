@@ -18,6 +18,7 @@ class VectorObject(Object):
         self._update_matrix()
 
     def make_buffers(self):
+        self.delete_buffers()
         self._vector_buffer = {
             "positions": make_vertex_buffer(list(self.position)),
             "directions": make_vertex_buffer(list(self._data)),
@@ -7,6 +7,7 @@ from numpy import dot
 from numpy import float32
 from numpy import pi
 from numpy.linalg import det
+from numpy.linalg import inv
 from numpy.linalg import norm
 
 from compas.geometry import Rotation
@@ -354,6 +355,32 @@ class Camera:
         W = T * R
         return asfortranarray(W.inverted(), dtype=float32)
 
+    def ray(self, x, y, width, height):
+        """Compute the ray from the camera through a pixel of the view.
+
+        Parameters
+        ----------
+        x : float
+            The horizontal coordinate of the pixel, from the left.
+        y : float
+            The vertical coordinate of the pixel, from the top.
+        width : float
+            Width of the viewer.
+        height : float
+            Height of the viewer.
+
+        Returns
+        -------
+        tuple[np.array, np.array]
+            The origin of the ray on the near clipping plane, and its unit direction, in world coordinates.
+
+        """
+        # the views import the camera, so the picking module of the views is imported when it is needed
+        from compas_view2.views.picking import unproject
+
+        inverse = inv(dot(array(self.projection(width, height), dtype=float), array(self.viewworld(), dtype=float)))
+        return unproject(inverse, x, y, width, height)
+
     def zoom_extents(self, objects: List[Object] = None):
         objects = objects or self.view.objects.values()
 
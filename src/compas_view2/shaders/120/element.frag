@@ -0,0 +1,8 @@
+#version 120
+
+varying vec4 vertex_id;
+
+void main()
+{
+    gl_FragColor = vertex_id;
+}
@@ -0,0 +1,16 @@
+#version 120
+
+attribute vec3 position;
+attribute vec4 element_id;
+
+uniform mat4 projection;
+uniform mat4 viewworld;
+uniform mat4 transform;
+
+varying vec4 vertex_id;
+
+void main()
+{
+    vertex_id = element_id;
+    gl_Position = projection * viewworld * transform * vec4(position, 1.0);
+}
@@ -1,8 +1,8 @@
 #version 120
 
-uniform vec3 instance_color;
+uniform vec4 instance_color;
 
 void main()
 {
-    gl_FragColor = vec4(instance_color, 1);
+    gl_FragColor = instance_color;
 }
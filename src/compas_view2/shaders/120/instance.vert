@@ -1,12 +1,18 @@
 #version 120
 
 attribute vec3 position;
+attribute mat4 instance_matrix;
 
 uniform mat4 projection;
 uniform mat4 viewworld;
 uniform mat4 transform;
+uniform bool is_instanced;
 
 void main()
 {
-    gl_Position = projection * viewworld * transform * vec4(position, 1.0);
+    mat4 model = transform;
+    if (is_instanced) {
+        model = transform * instance_matrix;
+    }
+    gl_Position = projection * viewworld * model * vec4(position, 1.0);
 }
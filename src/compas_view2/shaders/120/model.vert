@@ -2,18 +2,24 @@
 
 attribute vec3 position;
 attribute vec3 color;
+attribute mat4 instance_matrix;
 
 uniform mat4 projection;
 uniform mat4 viewworld;
 uniform mat4 transform;
+uniform bool is_instanced;
 
 varying vec3 vertex_color;
 varying vec3 ec_pos;
 
 void main()
 {
+    mat4 model = transform;
+    if (is_instanced) {
+        model = transform * instance_matrix;
+    }
     vertex_color = color;
-    gl_Position = projection * viewworld * transform * vec4(position, 1.0);
-    ec_pos = vec3(viewworld * transform * vec4(position, 1.0));
+    gl_Position = projection * viewworld * model * vec4(position, 1.0);
+    ec_pos = vec3(viewworld * model * vec4(position, 1.0));
     
 }
@@ -1,21 +1,15 @@
 #version 120
 
+uniform sampler2D text_texture;
 
-uniform sampler2D tex;
-uniform int text_num;
-uniform vec3 text_color;
+varying vec2 glyph_texcoord;
+varying vec4 text_color;
 
 void main()
-{   
-    vec2 xy = gl_PointCoord;
-    xy.y -= 0.5;
-    xy.y *= text_num;
-    if (xy.y > 0 || xy.y < -0.5) {
-        discard;
-    }
-    float a = texture2D(tex, xy).r;
-    gl_FragColor = vec4(text_color, a);
-    if (a <= 0){
+{
+    float a = texture2D(text_texture, glyph_texcoord).r * text_color.a;
+    if (a <= 0.0) {
         discard;
     }
+    gl_FragColor = vec4(text_color.rgb, a);
 }
@@ -1,16 +1,31 @@
 #version 120
 
 attribute vec3 position;
+attribute vec2 corner;
+attribute vec2 texcoord;
+attribute vec4 color;
+attribute vec2 size;
 
 uniform mat4 projection;
 uniform mat4 viewworld;
-uniform mat4 transform;
 
-uniform int text_height;
-uniform int text_num;
+uniform vec3 camera_position;
+uniform vec2 viewport;
+uniform vec2 atlas_size;
+
+varying vec2 glyph_texcoord;
+varying vec4 text_color;
 
 void main()
-{   
-    gl_PointSize = text_height * text_num;
-    gl_Position = projection * viewworld * transform * vec4(position, 1.0);
+{
+    // the height of the text in pixels, or inversely proportional to the distance to the camera
+    float height = size.x;
+    if (size.y > 0.5) {
+        height = 10.0 * size.x / distance(position, camera_position);
+    }
+    gl_Position = projection * viewworld * vec4(position, 1.0);
+    // the corners of the glyph quads are offset from the position of the text in screen space
+    gl_Position.xy += corner * height * 2.0 / viewport * gl_Position.w;
+    glyph_texcoord = texcoord / atlas_size;
+    text_color = color;
 }
@@ -1,13 +1,69 @@
+import ctypes
 import os
+
+import numpy as np
 from OpenGL import GL
 
+# the unwrapped entry points skip the argument conversion and error checking of PyOpenGL,
+# which is safe for calls that only pass offsets into bound buffers, and much faster for calls made per draw item
+from OpenGL.raw.GL.VERSION.GL_1_1 import glDrawElements as raw_draw_elements
+from OpenGL.raw.GL.VERSION.GL_2_0 import glVertexAttribPointer as raw_vertex_attrib_pointer
+
+from compas_view2.gl import instancing
+
 
 class Shader:
-    """The shader used by the OpenGL view."""
+    """The shader used by the OpenGL view.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the shader source files, relative to the shaders folder.
+
+    Attributes
+    ----------
+    program : int
+        The ID of the shader program.
+    uniforms : dict[str, int]
+        The locations of the active uniforms of the program, introspected once after linking.
+    attributes : dict[str, int]
+        The locations of the active attributes of the program, introspected once after linking.
+    locations : dict[str, int]
+        The locations of the currently enabled attributes.
+    instances : int | None
+        The number of instances drawn by the draw calls of the shader,
+        or None if the draw calls are not instanced.
+
+    Notes
+    -----
+    The shader remembers the last value it uploaded to each uniform,
+    and skips uploading a uniform if its value has not changed.
+    Uniforms should therefore only be set through the shader object.
+
+    The divisors of the vertex attributes are part of the state of the GL context, which all its programs share.
+    The shader remembers the divisors it has set, and resets them when it disables the attributes,
+    such that the attributes at the same locations are not read per instance by the other programs of the context.
+
+    """
 
     def __init__(self, name="120/mesh"):
         self.program = make_shader_program(name)
+        self.uniforms = active_uniforms(self.program)
+        self.attributes = active_attributes(self.program)
         self.locations = {}
+        self.instances = None
+        self._values = {}
+        self._divisors = {}
+
+    def _changed(self, name, value):
+        """Verify that a uniform is active and that its value differs from the last uploaded value."""
+        location = self.uniforms.get(name, -1)
+        if location == -1:
+            return False
+        if self._values.get(name) == value:
+            return False
+        self._values[name] = value
+        return True
 
     def uniform4x4(self, name, value):
         """Store a uniform 4x4 transformation matrix in the shader program at a named location.
@@ -19,8 +75,9 @@ class Shader:
         value: array-like
             A 4x4 transformation matrix in column-major ordering.
         """
-        loc = GL.glGetUniformLocation(self.program, name)
-        GL.glUniformMatrix4fv(loc, 1, True, value)
+        value = np.asarray(value, dtype=np.float32)
+        if self._changed(name, value.tobytes()):
+            GL.glUniformMatrix4fv(self.uniforms[name], 1, True, value)
 
     def uniform1i(self, name, value):
         """Store a uniform integer in the shader program at a named location.
@@ -32,8 +89,9 @@ class Shader:
         value: int
             An integer value.
         """
-        loc = GL.glGetUniformLocation(self.program, name)
-        GL.glUniform1i(loc, value)
+        value = int(value)
+        if self._changed(name, value):
+            GL.glUniform1i(self.uniforms[name], value)
 
     def uniform1f(self, name, value):
         """Store a uniform float in the shader program at a named location.
@@ -45,8 +103,23 @@ class Shader:
         value: float
             A float value.
         """
-        loc = GL.glGetUniformLocation(self.program, name)
-        GL.glUniform1f(loc, value)
+        value = float(value)
+        if self._changed(name, value):
+            GL.glUniform1f(self.uniforms[name], value)
+
+    def uniform2f(self, name, value):
+        """Store a uniform list of 2 floats in the shader program at a named location.
+
+        Parameters
+        ----------
+        name: str
+            The name of the location in the shader program.
+        value: (float, float) | list[float]
+            An iterable of 2 floats.
+        """
+        value = tuple(float(v) for v in value)
+        if self._changed(name, value):
+            GL.glUniform2f(self.uniforms[name], *value)
 
     def uniform3f(self, name, value):
         """Store a uniform list of 3 floats in the shader program at a named location.
@@ -58,8 +131,23 @@ class Shader:
         value: (float, float, float) | list[float]
             An iterable of 3 floats.
         """
-        loc = GL.glGetUniformLocation(self.program, name)
-        GL.glUniform3f(loc, *value)
+        value = tuple(float(v) for v in value)
+        if self._changed(name, value):
+            GL.glUniform3f(self.uniforms[name], *value)
+
+    def uniform4f(self, name, value):
+        """Store a uniform list of 4 floats in the shader program at a named location.
+
+        Parameters
+        ----------
+        name: str
+            The name of the location in the shader program.
+        value: (float, float, float, float) | list[float]
+            An iterable of 4 floats.
+        """
+        value = tuple(float(v) for v in value)
+        if self._changed(name, value):
+            GL.glUniform4f(self.uniforms[name], *value)
 
     def uniformTex(self, name, texture):
         # loc = GL.glGetUniformLocation(self.program, name)
@@ -77,46 +165,145 @@ class Shader:
         GL.glUseProgram(0)
 
     def enable_attribute(self, name):
-        location = GL.glGetAttribLocation(self.program, name)
+        location = self.attributes.get(name)
+        if location is None:
+            location = GL.glGetAttribLocation(self.program, name)
         GL.glEnableVertexAttribArray(location)
         self.locations[name] = location
 
-    def bind_attribute(self, name, value, step=3):
+    def bind_attribute(self, name, value, step=3, divisor=0, gltype=GL.GL_FLOAT, normalized=False, offset=0):
         location = self.locations[name]
         GL.glBindBuffer(GL.GL_ARRAY_BUFFER, value)
-        GL.glVertexAttribPointer(location, step, GL.GL_FLOAT, False, 0, None)
+        # several attributes can be read from consecutive ranges of the same buffer
+        raw_vertex_attrib_pointer(location, step, gltype, normalized, 0, ctypes.c_void_p(offset) if offset else None)
+        self._divisor(location, divisor)
 
     def disable_attribute(self, name):
-        GL.glDisableVertexAttribArray(self.locations[name])
-        del self.locations[name]
+        location = self.locations.pop(name)
+        GL.glDisableVertexAttribArray(location)
+        self._divisor(location, 0)
+
+    def _divisor(self, location, divisor):
+        """Set the rate at which an attribute advances during instanced drawing, if it differs from the current rate."""
+        if self._divisors.get(location, 0) != divisor:
+            instancing()[1](location, divisor)
+            self._divisors[location] = divisor
+
+    def enable_instances(self, matrices, n, name="instance_matrix"):
+        """Draw instances with the subsequent draw calls, each with its own transformation matrix.
 
-    def draw_triangles(self, elements=None, n=0, background=False):
+        Parameters
+        ----------
+        matrices : int
+            The ID of a buffer with a 4x4 matrix per instance, in column-major ordering.
+        n : int
+            The number of instances.
+        name : str, optional
+            The name of the mat4 attribute of the instance matrices.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        A mat4 attribute occupies four consecutive locations, one per column of the matrix.
+
+        """
+        location = self.attributes[name]
+        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, matrices)
+        for column in range(4):
+            GL.glEnableVertexAttribArray(location + column)
+            GL.glVertexAttribPointer(location + column, 4, GL.GL_FLOAT, False, 64, ctypes.c_void_p(16 * column))
+            self._divisor(location + column, 1)
+        self.instances = n
+
+    def disable_instances(self, name="instance_matrix"):
+        """Stop drawing instances with the subsequent draw calls.
+
+        Parameters
+        ----------
+        name : str, optional
+            The name of the mat4 attribute of the instance matrices.
+
+        Returns
+        -------
+        None
+
+        """
+        location = self.attributes[name]
+        for column in range(4):
+            GL.glDisableVertexAttribArray(location + column)
+            self._divisor(location + column, 0)
+        self.instances = None
+
+    def _draw_elements(self, mode, n, offset):
+        """Draw the elements of the bound element buffer, once or once per instance."""
+        if self.instances is None:
+            raw_draw_elements(mode, n, GL.GL_UNSIGNED_INT, _element_offset(offset))
+        elif self.instances:
+            instancing()[0](mode, n, GL.GL_UNSIGNED_INT, _element_offset(offset), self.instances)
+
+    def draw_elements(self, mode, elements, n, offset=0):
+        """Draw elements with the currently bound vertex buffers, without changing any other state.
+
+        Parameters
+        ----------
+        mode : int
+            The GL primitive type of the elements, e.g. ``GL.GL_TRIANGLES``.
+        elements : int
+            The ID of the element buffer.
+        n : int
+            The number of indices to draw.
+        offset : int, optional
+            The index of the first index to draw.
+        """
+        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, elements)
+        self._draw_elements(mode, n, offset)
+
+    def draw_arrays(self, mode, n, first=0):
+        """Draw consecutive vertices of the currently bound vertex buffers, without changing any other state.
+
+        Parameters
+        ----------
+        mode : int
+            The GL primitive type, e.g. ``GL.GL_TRIANGLES``.
+        n : int
+            The number of vertices to draw.
+        first : int, optional
+            The index of the first vertex to draw.
+        """
+        GL.glDrawArrays(mode, first, n)
+
+    def draw_triangles(self, elements=None, n=0, background=False, offset=0):
         if elements:
             if background:
                 GL.glDisable(GL.GL_DEPTH_TEST)
             GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, elements)
-            GL.glDrawElements(GL.GL_TRIANGLES, n, GL.GL_UNSIGNED_INT, None)
+            self._draw_elements(GL.GL_TRIANGLES, n, offset)
+            GL.glEnable(GL.GL_DEPTH_TEST)
         else:
             GL.glDrawArrays(GL.GL_TRIANGLES, 0, GL.GL_BUFFER_SIZE)
 
-    def draw_lines(self, elements=None, n=0, width=1, background=False):
+    def draw_lines(self, elements=None, n=0, width=1, background=False, offset=0):
         if elements:
             if background:
                 GL.glDisable(GL.GL_DEPTH_TEST)
             GL.glLineWidth(width)
             GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, elements)
-            GL.glDrawElements(GL.GL_LINES, n, GL.GL_UNSIGNED_INT, None)
+            self._draw_elements(GL.GL_LINES, n, offset)
             GL.glEnable(GL.GL_DEPTH_TEST)
         else:
             GL.glDrawArrays(GL.GL_LINES, 0, GL.GL_BUFFER_SIZE)
 
-    def draw_points(self, size=1, elements=None, n=0, background=False):
+    def draw_points(self, size=1, elements=None, n=0, background=False, offset=0):
         GL.glPointSize(size)
         if elements:
             if background:
                 GL.glDisable(GL.GL_DEPTH_TEST)
             GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, elements)
-            GL.glDrawElements(GL.GL_POINTS, n, GL.GL_UNSIGNED_INT, None)
+            self._draw_elements(GL.GL_POINTS, n, offset)
+            GL.glEnable(GL.GL_DEPTH_TEST)
         else:
             GL.glDrawArrays(GL.GL_POINTS, 0, GL.GL_BUFFER_SIZE)
 
@@ -164,6 +351,11 @@ class Shader:
         GL.glEnd()
 
 
+def _element_offset(offset):
+    """The byte offset into a bound element buffer of uint32 indices, as expected by glDrawElements."""
+    return ctypes.c_void_p(4 * offset) if offset else None
+
+
 def make_shader_program(name):
     vsource = os.path.join(os.path.dirname(__file__), "{}.vert".format(name))
     fsource = os.path.join(os.path.dirname(__file__), "{}.frag".format(name))
@@ -177,6 +369,9 @@ def make_shader_program(name):
     program = GL.glCreateProgram()
     GL.glAttachShader(program, vertex)
     GL.glAttachShader(program, fragment)
+    # in compatibility profiles, drawing requires the array of attribute 0 to be enabled,
+    # which is guaranteed by giving that location to the position of the vertices
+    GL.glBindAttribLocation(program, 0, "position")
     GL.glLinkProgram(program)
     GL.glValidateProgram(program)
     result = GL.glGetProgramiv(program, GL.GL_LINK_STATUS)
@@ -187,6 +382,52 @@ def make_shader_program(name):
     return program
 
 
+def active_uniforms(program):
+    """Find the locations of the active uniforms of a linked shader program.
+
+    Parameters
+    ----------
+    program : int
+        The ID of the shader program.
+
+    Returns
+    -------
+    dict[str, int]
+        The location per uniform name.
+        Uniform arrays are listed by the name of the array.
+
+    """
+    uniforms = {}
+    for index in range(GL.glGetProgramiv(program, GL.GL_ACTIVE_UNIFORMS)):
+        name = GL.glGetActiveUniform(program, index)[0]
+        name = name.decode() if isinstance(name, bytes) else name
+        name = name.split("[")[0]
+        uniforms[name] = GL.glGetUniformLocation(program, name)
+    return uniforms
+
+
+def active_attributes(program):
+    """Find the locations of the active attributes of a linked shader program.
+
+    Parameters
+    ----------
+    program : int
+        The ID of the shader program.
+
+    Returns
+    -------
+    dict[str, int]
+        The location per attribute name.
+
+    """
+    attributes = {}
+    for index in range(GL.glGetProgramiv(program, GL.GL_ACTIVE_ATTRIBUTES)):
+        name = GL.glGetActiveAttrib(program, index)[0]
+        name = name.decode() if isinstance(name, bytes) else name
+        attributes[name] = GL.glGetAttribLocation(program, name)
+    return attributes
+
+
 def compile_vertex_shader(source):
     shader = GL.glCreateShader(GL.GL_VERTEX_SHADER)
     GL.glShaderSource(shader, source)
@@ -29,7 +29,7 @@ class Arrow(Shape):
 
     Examples
     --------
-    >>> from compas.geometry import Arrow
+    >>> from compas_view2.shapes import Arrow
     >>> arrow = Arrow([0, 0, 0], [0, 0, 1])
 
     """
@@ -86,7 +86,7 @@ class Arrow(Shape):
 
         Examples
         --------
-        >>> from compas.geometry import Arrow
+        >>> from compas_view2.shapes import Arrow
         >>> from compas.geometry import Vector
         >>> data = {'position': Vector(0, 0, 0), 'direction': Vector(0, 0, 1)}
         >>> arrow = Arrow.from_data(data)
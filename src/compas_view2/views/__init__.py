@@ -1,3 +1,4 @@
 from .view import View  # noqa: F401
 from .view120 import View120  # noqa: F401
 from .view330 import View330  # noqa: F401
+from .offscreen import OffscreenRenderer  # noqa: F401
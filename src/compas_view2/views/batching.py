@@ -0,0 +1,523 @@
+import numpy as np
+
+from compas_view2.gl import make_index_buffer
+from compas_view2.gl import make_vertex_buffer
+from compas_view2.objects import BufferObject
+from compas_view2.objects import Object
+
+FACES = ("frontfaces", "backfaces")
+KINDS = ("frontfaces", "backfaces", "lines", "points")
+
+
+class Batch:
+    """Merged buffers of static, opaque objects that are drawn with the same state.
+
+    The buffers are built from the data of the objects on the CPU, as returned by
+    :meth:`compas_view2.objects.BufferObject.buffer_data`.
+    Their positions are transformed to world coordinates, and their colors are resolved per vertex,
+    such that all objects of the batch can be drawn with a single draw call per kind of element.
+    The elements of every object occupy a contiguous range of the merged element buffers,
+    which allows individual objects to be left out of the draw calls without rebuilding the batch.
+
+    Parameters
+    ----------
+    objects : list[:class:`compas_view2.objects.BufferObject`]
+        The objects of the batch.
+    show_points : bool
+        Whether the points of the objects are shown.
+    show_lines : bool
+        Whether the lines of the objects are shown.
+    show_faces : bool
+        Whether the faces of the objects are shown.
+    linewidth : int
+        The line width of the objects.
+    pointsize : int
+        The point size of the objects.
+
+    Attributes
+    ----------
+    objects : list[:class:`compas_view2.objects.BufferObject`]
+        The objects of the batch.
+    versions : list[int]
+        The versions of the objects when the batch was built.
+    included : :class:`numpy.ndarray`
+        Whether each of the objects is drawn by the batch.
+    runs : dict[str, list[tuple[int, int]]]
+        The start and size of the ranges of elements that are drawn, per kind of element.
+
+    """
+
+    def __init__(self, objects, show_points, show_lines, show_faces, linewidth, pointsize):
+        self.objects = list(objects)
+        self.versions = [obj.version for obj in self.objects]
+        self.show_points = show_points
+        self.show_lines = show_lines
+        self.show_faces = show_faces
+        self.linewidth = linewidth
+        self.pointsize = pointsize
+        self.buffers = {}
+        self.ranges = {}
+        self.included = np.zeros(len(self.objects), dtype=bool)
+        self.runs = {}
+        self.make_buffers()
+
+    def make_buffers(self):
+        """Merge the data of the objects into one set of buffers per kind of element."""
+        merged = {kind: ([], [], []) for kind in KINDS}
+        counts = {kind: np.zeros(len(self.objects), dtype=np.int64) for kind in KINDS}
+        offsets = dict.fromkeys(KINDS, 0)
+        for index, obj in enumerate(self.objects):
+            matrix = obj._matrix_buffer
+            if matrix is not None:
+                matrix = np.asarray(matrix, dtype=np.float32).reshape(4, 4)
+            data = obj.buffer_data()
+            transformed = {}
+            for kind in KINDS:
+                if kind not in data or not len(data[kind][2]):
+                    continue
+                positions, colors, elements = data[kind]
+                positions = _transform(positions, matrix, transformed)
+                color = _single_color(obj, kind)
+                if color is not None:
+                    colors = np.empty((len(positions), 3), dtype=np.float32)
+                    colors[:] = color
+                all_positions, all_colors, all_elements = merged[kind]
+                all_positions.append(positions)
+                all_colors.append(colors)
+                all_elements.append(elements + offsets[kind])
+                offsets[kind] += len(positions)
+                counts[kind][index] = len(elements)
+        for kind, (positions, colors, elements) in merged.items():
+            if not elements:
+                continue
+            elements = np.concatenate(elements)
+            self.buffers[kind] = {
+                "positions": make_vertex_buffer(np.concatenate(positions)),
+                "colors": make_vertex_buffer(np.concatenate(colors)),
+                "elements": make_index_buffer(elements),
+                "n": len(elements),
+            }
+            self.ranges[kind] = np.cumsum(counts[kind]) - counts[kind], counts[kind]
+
+    def refresh(self, objects, culled=()):
+        """Leave out the objects that are no longer part of the view, hidden, selected, edited or culled.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        culled : set[:class:`compas_view2.objects.Object`], optional
+            The objects that lie outside the view frustum.
+
+        Returns
+        -------
+        list[:class:`compas_view2.objects.BufferObject`]
+            The objects that are drawn by the batch.
+        """
+        included = np.array(
+            [
+                obj in objects
+                and obj.is_visible
+                and not obj.is_selected
+                and obj.version == version
+                and obj not in culled
+                for obj, version in zip(self.objects, self.versions)
+            ],
+            dtype=bool,
+        )
+        self.included = included
+        for kind, (starts, counts) in self.ranges.items():
+            self.runs[kind] = _runs(starts, counts, included)
+        return [obj for obj, include in zip(self.objects, included) if include]
+
+    def draw(self, shader, wireframe=False, is_lighted=False):
+        """Draw the objects of the batch with the model shader.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The model shader.
+        wireframe : bool, optional
+            Whether to draw only the lines of the objects.
+        is_lighted : bool, optional
+            Whether to shade the faces of the objects.
+        """
+        shader.enable_attribute("position")
+        shader.enable_attribute("color")
+        shader.uniform1i("is_selected", 0)
+        shader.uniform4x4("transform", np.identity(4).flatten())
+        shader.uniform1f("object_opacity", 1)
+        shader.uniform1i("use_single_color", 0)
+        if self.show_faces and not wireframe:
+            shader.uniform1i("is_lighted", is_lighted)
+            shader.uniform1i("element_type", 2)
+            for kind in FACES:
+                for start, count in self._bind(shader, kind):
+                    shader.draw_triangles(elements=self.buffers[kind]["elements"], n=count, offset=start)
+        shader.uniform1i("is_lighted", False)
+        if self.show_lines or wireframe:
+            shader.uniform1i("element_type", 1)
+            for start, count in self._bind(shader, "lines"):
+                shader.draw_lines(
+                    width=self.linewidth, elements=self.buffers["lines"]["elements"], n=count, offset=start
+                )
+        if self.show_points:
+            shader.uniform1i("element_type", 0)
+            for start, count in self._bind(shader, "points"):
+                shader.draw_points(
+                    size=self.pointsize, elements=self.buffers["points"]["elements"], n=count, offset=start
+                )
+        shader.disable_attribute("position")
+        shader.disable_attribute("color")
+
+    def draw_instances(self, shader, wireframe=False):
+        """Draw the objects of the batch with their instance colors, for picking.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The instance shader.
+        wireframe : bool, optional
+            Whether to draw only the lines of the objects.
+
+        Returns
+        -------
+        list[:class:`compas_view2.objects.BufferObject`]
+            The objects that are drawn by the batch.
+        """
+        drawn = [obj for obj, include in zip(self.objects, self.included) if include]
+        if not drawn:
+            return drawn
+        shader.enable_attribute("position")
+        shader.uniform4x4("transform", np.identity(4).flatten())
+        kinds = []
+        if self.show_points:
+            kinds.append(("points", shader.draw_points, {"size": self.pointsize}))
+        if self.show_lines or wireframe:
+            kinds.append(("lines", shader.draw_lines, {"width": self.linewidth}))
+        if self.show_faces and not wireframe:
+            kinds += [(kind, shader.draw_triangles, {}) for kind in FACES]
+        for kind, draw, options in kinds:
+            if kind not in self.buffers:
+                continue
+            shader.bind_attribute("position", self.buffers[kind]["positions"])
+            starts, counts = self.ranges[kind]
+            for index in np.nonzero(self.included & (counts > 0))[0].tolist():
+                shader.uniform4f("instance_color", self.objects[index]._instance_color)
+                draw(
+                    elements=self.buffers[kind]["elements"], n=int(counts[index]), offset=int(starts[index]), **options
+                )
+        shader.uniform4f("instance_color", [0, 0, 0, 0])
+        shader.disable_attribute("position")
+        return drawn
+
+    def _bind(self, shader, kind):
+        """Bind the vertex buffers of a kind of element, and return the ranges of elements to draw."""
+        runs = self.runs.get(kind)
+        if not runs:
+            return []
+        shader.bind_attribute("position", self.buffers[kind]["positions"])
+        shader.bind_attribute("color", self.buffers[kind]["colors"])
+        return runs
+
+    def dispose(self):
+        """Delete the GL buffers of the batch."""
+        for buffer in self.buffers.values():
+            for item in buffer.values():
+                if hasattr(item, "delete"):
+                    item.delete()
+        self.buffers = {}
+        self.ranges = {}
+        self.included = np.zeros(len(self.objects), dtype=bool)
+        self.runs = {}
+
+
+class Batcher:
+    """Group the static, opaque objects of a view into batches that are drawn with a few draw calls.
+
+    Objects are batched if they are drawn with the default drawing of a :class:`compas_view2.objects.BufferObject`,
+    are opaque, are not drawn on the background, and are not animated.
+    Objects with the same visibility of points, lines and faces, line width and point size share a batch.
+
+    Hidden, selected and culled objects are left out of the draw calls of their batch.
+    Objects that are edited after the batch was built are left out as well, and drawn individually meanwhile.
+    The batches are rebuilt once objects have been added to or removed from the view, or objects have been edited,
+    and the objects of the view have not changed for a few frames.
+    The batches of removed objects are deleted right away, and their other objects are drawn individually meanwhile.
+
+    The objects that are drawn by a batch release their own GL buffers,
+    which are restored from the data of the objects as soon as they are drawn individually again.
+
+    Parameters
+    ----------
+    min_size : int, optional
+        The minimum number of objects in a batch.
+    delay : int, optional
+        The number of frames the objects of the view should remain the same before the batches are rebuilt.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether objects are batched.
+    batches : list[:class:`Batch`]
+        The current batches.
+    unbatched : list[:class:`compas_view2.objects.Object`]
+        The objects of the view that are not drawn by any of the batches.
+
+    """
+
+    def __init__(self, min_size=2, delay=10):
+        self.enabled = True
+        self.min_size = min_size
+        self.delay = delay
+        self.batches = []
+        self.unbatched = []
+        self._members = None
+        self._opacity = None
+        self._changes = None
+        self._culled = set()
+        self._batched = set()
+        self._versions = None
+        self._stable = 0
+        self._dirty = True
+        self._built = False
+
+    @staticmethod
+    def batch_key(obj, opacity=1.0):
+        """The drawing state that an object shares with the other objects of its batch.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            An object of the view.
+        opacity : float, optional
+            The opacity of the view.
+
+        Returns
+        -------
+        tuple | None
+            The visibility of points, lines and faces, the line width and the point size of the object,
+            or None if the object can not be batched.
+        """
+        if not isinstance(obj, BufferObject) or type(obj).draw is not BufferObject.draw:
+            return None
+        if obj.animated or obj.background or obj.opacity * opacity < 1:
+            return None
+        return obj.show_points, obj.show_lines, obj.show_faces, obj.linewidth, obj.pointsize
+
+    def update(self, objects, opacity=1.0, culled=None):
+        """Bring the batches up to date with the objects of the view.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        opacity : float, optional
+            The opacity of the view.
+        culled : set[:class:`compas_view2.objects.Object`], optional
+            The objects that lie outside the view frustum.
+
+        Returns
+        -------
+        list[:class:`compas_view2.objects.Object`]
+            The objects of the view that are not drawn by any of the batches.
+        """
+        if not self.enabled:
+            if self.batches:
+                self.clear()
+            for obj in objects.values():
+                if isinstance(obj, BufferObject):
+                    obj.restore_buffers()
+            return list(objects.values())
+        if self._members is None or objects.keys() != self._members or opacity != self._opacity:
+            if self._members is not None:
+                # the batches of removed objects are deleted right away, only rebuilding them is delayed
+                self.discard(self._members.difference(objects))
+            self._members = set(objects)
+            self._opacity = opacity
+            self._changes = None
+            self._versions = None
+            self._stable = 0
+            self._dirty = True
+        else:
+            self._stable += 1
+        culled = culled or set()
+        if self._changes != Object.changes:
+            self._find_edits(objects, opacity)
+        if self._dirty and (not self._built or self._stable >= self.delay):
+            self._culled = culled
+            self.build(objects, opacity)
+        elif self._changes != Object.changes or culled != self._culled:
+            self._culled = culled
+            self.refresh(objects)
+        return self.unbatched
+
+    def _find_edits(self, objects, opacity):
+        """Mark the batches for a rebuild if objects that are, or can be, batched have been edited."""
+        versions = {obj: obj.version for obj in objects.values()}
+        if self._versions is not None:
+            for obj, version in versions.items():
+                if version == self._versions.get(obj, version):
+                    continue
+                if obj in self._batched or self.batch_key(obj, opacity) is not None:
+                    # rebuilding the batches is delayed until the edits stop
+                    self._dirty = True
+                    self._stable = 0
+                    break
+        self._versions = versions
+
+    def build(self, objects, opacity=1.0):
+        """Rebuild the batches from the objects of the view.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        opacity : float, optional
+            The opacity of the view.
+        """
+        self.clear()
+        groups = {}
+        for obj in objects.values():
+            key = self.batch_key(obj, opacity)
+            if key is not None:
+                groups.setdefault(key, []).append(obj)
+        self.batches = [Batch(group, *key) for key, group in groups.items() if len(group) >= self.min_size]
+        self._batched = {obj for batch in self.batches for obj in batch.objects}
+        self._dirty = False
+        self._built = True
+        self.refresh(objects)
+
+    def refresh(self, objects):
+        """Update which objects are drawn by the batches, and which have to be drawn individually.
+
+        The objects that are drawn by the batches release their GL buffers,
+        and the visible objects that are drawn individually have theirs restored.
+        The GL context of the view should be current.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        """
+        batched = set()
+        for batch in self.batches:
+            batched.update(batch.refresh(objects, self._culled))
+        self.unbatched = [obj for obj in objects.values() if obj not in batched]
+        for obj in batched:
+            obj.release_buffers()
+        for obj in self.unbatched:
+            if isinstance(obj, BufferObject) and obj.is_visible and obj not in self._culled:
+                obj.restore_buffers()
+        self._changes = Object.changes
+
+    def draw(self, shader, wireframe=False, is_lighted=False):
+        """Draw all batches with the model shader.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The model shader.
+        wireframe : bool, optional
+            Whether to draw only the lines of the objects.
+        is_lighted : bool, optional
+            Whether to shade the faces of the objects.
+        """
+        for batch in self.batches:
+            batch.draw(shader, wireframe, is_lighted)
+
+    def draw_instances(self, shader, wireframe=False):
+        """Draw the objects of all batches with their instance colors, for picking.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The instance shader.
+        wireframe : bool, optional
+            Whether to draw only the lines of the objects.
+
+        Returns
+        -------
+        set[:class:`compas_view2.objects.BufferObject`]
+            The objects that are drawn by the batches, and should not be drawn individually.
+        """
+        drawn = set()
+        for batch in self.batches:
+            drawn.update(batch.draw_instances(shader, wireframe))
+        return drawn
+
+    def discard(self, objects):
+        """Delete the batches that contain any of the given objects, and their GL buffers.
+
+        The other objects of these batches are drawn individually until the batches are rebuilt,
+        with the GL buffers they restore on the next update.
+
+        Parameters
+        ----------
+        objects : iterable[:class:`compas_view2.objects.Object`]
+            The objects, e.g. objects that were removed from the view.
+        """
+        objects = set(objects)
+        if not objects:
+            return
+        batches = []
+        for batch in self.batches:
+            if objects.isdisjoint(batch.objects):
+                batches.append(batch)
+            else:
+                batch.dispose()
+        if len(batches) < len(self.batches):
+            self.batches = batches
+            self._batched = {obj for batch in self.batches for obj in batch.objects}
+            self._changes = None
+
+    def clear(self):
+        """Delete all batches and their GL buffers.
+
+        The objects of the batches restore their GL buffers on the next update.
+        """
+        for batch in self.batches:
+            batch.dispose()
+        self.batches = []
+        self._batched = set()
+        self.unbatched = []
+        self._changes = None
+        self._dirty = True
+
+
+def _transform(positions, matrix, transformed):
+    """Transform positions to world coordinates with a 4x4 matrix, once per distinct array of an object."""
+    if matrix is None:
+        return positions
+    key = id(positions)
+    if key not in transformed:
+        transformed[key] = positions @ matrix[:3, :3].T + matrix[:3, 3]
+    return transformed[key]
+
+
+def _single_color(obj, kind):
+    """The single color with which an object draws a kind of element, or None if it uses its vertex colors."""
+    if obj._is_collection:
+        return None
+    if kind in FACES:
+        if obj.facecolors or getattr(obj, "use_vertex_color", False):
+            return None
+        return list(obj.facecolor)
+    if kind == "lines":
+        return None if obj.linecolors else list(obj.linecolor)
+    return None if obj.pointcolors else list(obj.pointcolor)
+
+
+def _runs(starts, counts, included):
+    """Merge the ranges of elements of consecutive included objects into runs of (start, count)."""
+    index = np.nonzero(included & (counts > 0))[0]
+    if not len(index):
+        return []
+    ends = starts[index] + counts[index]
+    # a run continues as long as the next range starts where the previous one ended
+    breaks = np.nonzero(starts[index[1:]] != ends[:-1])[0]
+    first = np.concatenate([[0], breaks + 1])
+    last = np.concatenate([breaks, [len(index) - 1]])
+    run_starts = starts[index[first]]
+    run_ends = ends[last]
+    return list(zip(run_starts.tolist(), (run_ends - run_starts).tolist()))
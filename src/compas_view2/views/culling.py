@@ -0,0 +1,185 @@
+import numpy as np
+
+from compas_view2.objects import Object
+
+# the indices of the min (0) or max (1) coordinates of the corners of a box
+CORNERS = np.array([[i, j, k] for i in (0, 1) for j in (0, 1) for k in (0, 1)])
+
+
+class Culler:
+    """Find the objects of a view whose bounding boxes lie entirely outside the view frustum of the camera.
+
+    The world-space axis-aligned bounding boxes of the objects are computed from their local bounding boxes
+    and their world transformations, and are cached per version of the objects.
+    All boxes are tested against the six clipping planes of the frustum at once.
+
+    Objects without a bounding box are never culled.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether objects are culled.
+    drawn : int
+        The number of visible objects that were inside the frustum during the last test.
+    culled : int
+        The number of visible objects that were outside the frustum during the last test.
+
+    """
+
+    def __init__(self):
+        self.enabled = True
+        self.drawn = 0
+        self.culled = 0
+        self._objects = []
+        self._boxes = np.zeros((0, 2, 3))
+        self._bounded = np.zeros(0, dtype=bool)
+        self._visible = np.zeros(0, dtype=bool)
+        self._cache = {}
+        self._members = None
+        self._changes = None
+
+    @property
+    def objects(self):
+        """list[:class:`compas_view2.objects.Object`]: The objects of the view, as of the last update."""
+        return self._objects
+
+    @property
+    def boxes(self):
+        """:class:`numpy.ndarray`: The world-space bounding boxes of the objects, as of the last update.
+
+        The array is replaced, not modified, by updates that change any of the boxes.
+        """
+        return self._boxes
+
+    @property
+    def pickable(self):
+        """:class:`numpy.ndarray`: Whether each object is visible and has a bounding box, as of the last update."""
+        return self._bounded & self._visible
+
+    def update(self, objects):
+        """Bring the bounding boxes up to date with the objects of the view.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        """
+        if self._members is not None and objects.keys() == self._members and self._changes == Object.changes:
+            return
+        if self._members is None or objects.keys() != self._members:
+            self._members = set(objects)
+            self._cache = {obj: self._cache[obj] for obj in self._cache if obj in self._members}
+        self._changes = Object.changes
+        self._objects = list(objects.values())
+        boxes = np.zeros((len(self._objects), 2, 3))
+        bounded = np.zeros(len(self._objects), dtype=bool)
+        for index, obj in enumerate(self._objects):
+            box = self._world_bounding_box(obj)
+            if box is not None:
+                boxes[index] = box
+                bounded[index] = True
+        self._boxes = boxes
+        self._bounded = bounded
+        self._visible = np.array([obj.is_visible for obj in self._objects], dtype=bool)
+
+    def _world_bounding_box(self, obj):
+        """The world-space axis-aligned bounding box of an object, recomputed only if the object has changed."""
+        version = obj.version
+        cached = self._cache.get(obj)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        box = getattr(obj, "_local_bounding_box", None)
+        matrix = getattr(obj, "_matrix_buffer", None)
+        if box is not None and matrix is not None:
+            box = world_bounding_boxes(box[None], np.asarray(matrix, dtype=float).reshape(1, 4, 4))[0]
+        self._cache[obj] = version, box
+        return box
+
+    def cull(self, objects, projection, viewworld):
+        """Find the visible objects of the view that lie entirely outside the view frustum.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        projection : array-like
+            The 4x4 projection matrix of the camera.
+        viewworld : array-like
+            The 4x4 view-world matrix of the camera.
+
+        Returns
+        -------
+        set[:class:`compas_view2.objects.Object`]
+            The culled objects.
+        """
+        if not self.enabled:
+            self.drawn = sum(1 for obj in objects.values() if obj.is_visible)
+            self.culled = 0
+            return set()
+        self.update(objects)
+        matrix = np.asarray(projection, dtype=float) @ np.asarray(viewworld, dtype=float)
+        outside = outside_frustum(self._boxes, matrix) & self._bounded & self._visible
+        culled = {self._objects[index] for index in np.nonzero(outside)[0]}
+        self.culled = len(culled)
+        self.drawn = int(self._visible.sum()) - self.culled
+        return culled
+
+
+def world_bounding_boxes(boxes, matrices):
+    """Compute the axis-aligned bounding boxes of transformed boxes.
+
+    Parameters
+    ----------
+    boxes : :class:`numpy.ndarray`
+        The min and max corners of the boxes, of shape (n, 2, 3).
+    matrices : :class:`numpy.ndarray`
+        The transformation matrices of the boxes, of shape (n, 4, 4).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The min and max corners of the transformed boxes, of shape (n, 2, 3).
+
+    """
+    corners = boxes[:, CORNERS, [0, 1, 2]]
+    corners = corners @ matrices[:, :3, :3].transpose(0, 2, 1) + matrices[:, None, :3, 3]
+    return np.stack([corners.min(axis=1), corners.max(axis=1)], axis=1)
+
+
+def outside_frustum(boxes, matrix):
+    """Test which boxes lie entirely outside the view frustum of a camera.
+
+    Parameters
+    ----------
+    boxes : :class:`numpy.ndarray`
+        The min and max corners of the boxes in world coordinates, of shape (n, 2, 3).
+    matrix : :class:`numpy.ndarray`
+        The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        A boolean per box.
+
+    Notes
+    -----
+    A box is outside the frustum if all its corners lie on the outer side of the same clipping plane.
+    In clip coordinates, the clipping planes are ``x = -w``, ``x = w``, ``y = -w``, ``y = w``, ``z = -w`` and ``z = w``.
+    Their equations in world coordinates are sums and differences of the rows of the matrix,
+    and a box lies on the outer side of a plane if the corner that is furthest along the plane normal does.
+    The test is conservative: boxes that intersect the frustum are never culled,
+    but some boxes near the edges of the frustum may not be culled although they lie outside of it.
+
+    Examples
+    --------
+    >>> boxes = np.array([[[-1, -1, -1], [1, 1, 1]], [[4, 4, 4], [5, 5, 5]]], dtype=float)
+    >>> outside_frustum(boxes, np.diag([0.5, 0.5, 0.5, 1]))
+    array([False,  True])
+
+    """
+    matrix = np.asarray(matrix, dtype=float)
+    planes = np.concatenate([matrix[3] + matrix[:3], matrix[3] - matrix[:3]])
+    centers = (boxes[:, 0] + boxes[:, 1]) / 2
+    extents = (boxes[:, 1] - boxes[:, 0]) / 2
+    distances = centers @ planes[:, :3].T + extents @ np.abs(planes[:, :3]).T + planes[:, 3]
+    return (distances < 0).any(axis=1)
@@ -0,0 +1,506 @@
+import numpy as np
+from OpenGL import GL
+
+from compas_view2.gl import Buffer
+from compas_view2.objects import Object
+
+from .text import ATTRIBUTES
+from .text import QUAD
+from .text import GlyphAtlas
+from .text import pack_attributes
+
+# a label is behind the geometry if it is further from the camera than the surface around it,
+# by more than this fraction of its distance
+OCCLUSION_TOLERANCE = 0.01
+
+# the radius in pixels of the square around a label in which the depth buffer is sampled,
+# such that thin lines in front of a label do not hide it
+OCCLUSION_RADIUS = 1
+
+
+class LabelLayer:
+    """The vertex buffer with the glyph quads of all labels of a labels object, and the selection of labels to draw.
+
+    Attributes
+    ----------
+    buffer : :class:`compas_view2.gl.Buffer` | None
+        The vertex buffer, with the attributes of the glyph quads one after the other, as for texts.
+    elements : :class:`compas_view2.gl.Buffer` | None
+        The element buffer, with the indices of the vertices of the labels that are drawn.
+    atlas : :class:`compas_view2.views.text.GlyphAtlas` | None
+        The glyph atlas of the font of the labels.
+    counts : :class:`numpy.ndarray`
+        The number of vertices of the glyph quads of every label.
+    extents : :class:`numpy.ndarray`
+        The corners (left, bottom, right, top) of the glyphs of every label, relative to its anchor,
+        in units of the em size, of shape (n, 4).
+    visible : :class:`numpy.ndarray` | None
+        Whether every label is drawn.
+    n : int
+        The number of indices in the element buffer.
+
+    """
+
+    def __init__(self):
+        self.buffer = None
+        self.elements = None
+        self.atlas = None
+        self.offsets = {}
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.extents = np.zeros((0, 4), dtype=np.float32)
+        self.visible = None
+        self.n = 0
+        self.layout_version = None
+        self.version = None
+
+    def update(self, labels):
+        """Lay out the glyphs of the labels again if their texts or glyphs have changed,
+        or only move them if their positions have changed.
+
+        Parameters
+        ----------
+        labels : :class:`compas_view2.objects.LabelsObject`
+            The labels.
+
+        Returns
+        -------
+        None
+        """
+        if labels.layout_version != self.layout_version:
+            self.build(labels)
+        elif labels.version != self.version and self.counts.sum():
+            positions = np.repeat(labels.world_positions(), self.counts, axis=0).astype(np.float32)
+            self.buffer.write(positions.reshape(-1), self.offsets["position"])
+        self.layout_version = labels.layout_version
+        self.version = labels.version
+
+    def build(self, labels):
+        """Build the vertex buffer from the glyph quads of the labels.
+
+        Parameters
+        ----------
+        labels : :class:`compas_view2.objects.LabelsObject`
+            The labels.
+
+        Returns
+        -------
+        None
+        """
+        self.atlas = atlas = GlyphAtlas.get(labels.font)
+        layouts = [atlas.layout(text) for text in labels.texts]
+        quads = np.fromiter((len(corners) for corners, _ in layouts), dtype=np.int64, count=len(layouts))
+        self.counts = 6 * quads
+        self.extents = np.zeros((len(layouts), 4), dtype=np.float32)
+        self.visible = None
+        self.n = 0
+        if not quads.sum():
+            return
+        corners = np.concatenate([corners for corners, _ in layouts])
+        texcoords = np.concatenate([texcoords for _, texcoords in layouts])
+        # the extents of the labels without glyphs remain empty
+        labelled = quads > 0
+        first = (np.cumsum(quads) - quads)[labelled]
+        self.extents[labelled, :2] = np.minimum.reduceat(corners[:, :2], first)
+        self.extents[labelled, 2:] = np.maximum.reduceat(corners[:, 2:], first)
+        total = int(self.counts.sum())
+        color = list(labels.color)[:3] + [labels.opacity]
+        size = [labels.height, 1.0 if labels.absolute_height else 0.0]
+        data, self.offsets = pack_attributes(
+            {
+                "position": np.repeat(labels.world_positions(), self.counts, axis=0),
+                "corner": corners[:, QUAD].reshape(-1, 2),
+                "texcoord": texcoords[:, QUAD].reshape(-1, 2),
+                "color": np.tile(np.array(color, dtype=np.float32), (total, 1)),
+                "size": np.tile(np.array(size, dtype=np.float32), (total, 1)),
+            }
+        )
+        if self.buffer is None:
+            self.buffer = Buffer(dynamic=True)
+            self.elements = Buffer(GL.GL_ELEMENT_ARRAY_BUFFER, dynamic=True)
+        self.buffer.write(data)
+
+    def show(self, visible):
+        """Select the labels to draw, and write the indices of their vertices to the element buffer if they changed.
+
+        Parameters
+        ----------
+        visible : :class:`numpy.ndarray`
+            Whether every label is drawn.
+
+        Returns
+        -------
+        None
+        """
+        if self.visible is not None and np.array_equal(visible, self.visible):
+            return
+        self.visible = visible
+        counts = self.counts[visible]
+        first = (np.cumsum(self.counts) - self.counts)[visible]
+        self.n = int(counts.sum())
+        if self.n:
+            # the consecutive vertices of the glyph quads of every visible label
+            indices = np.arange(self.n) + np.repeat(first - (np.cumsum(counts) - counts), counts)
+            self.elements.write(indices.astype(np.uint32))
+
+    def delete(self):
+        """Delete the vertex and element buffers.
+
+        Returns
+        -------
+        None
+        """
+        for buffer in (self.buffer, self.elements):
+            if buffer is not None:
+                buffer.delete()
+        self.buffer = None
+        self.elements = None
+        self.layout_version = None
+
+
+class LabelRenderer:
+    """Draw the label layers of a view, with the glyph atlases and the textures of its text renderer.
+
+    Every layer has its own vertex buffer with the glyph quads of all its labels,
+    which is built once per layout of the labels, and of which only the positions are rewritten when labels move.
+    The labels to draw are selected on the CPU, with the positions of the labels as one array per layer,
+    and only when the camera or the scene has changed:
+    labels outside the view frustum are culled,
+    labels behind the geometry that has been drawn are culled by comparing their depth with the depth buffer,
+    and overlapping labels are thinned out in screen space, such that the labels nearest to the camera remain.
+    The vertices of the selected labels are drawn through an element buffer, with one draw call per layer.
+    Labels of objects without occlusion are drawn in front of all geometry.
+
+    Parameters
+    ----------
+    text_renderer : :class:`compas_view2.views.text.TextRenderer`
+        The text renderer of the view, which owns the textures of the glyph atlases.
+
+    Attributes
+    ----------
+    layers : dict[:class:`compas_view2.objects.LabelsObject`, :class:`LabelLayer`]
+        The layer of every labels object.
+    drawn : int
+        The number of labels drawn in the last frame.
+    culled : int
+        The number of labels outside the view frustum or behind the geometry in the last frame.
+    thinned : int
+        The number of labels that were thinned out in the last frame.
+
+    """
+
+    def __init__(self, text_renderer):
+        self.text_renderer = text_renderer
+        self.layers = {}
+        self.drawn = 0
+        self.culled = 0
+        self.thinned = 0
+        self._key = None
+
+    def draw(self, shader, labels, projection, viewworld, camera_position, width, height):
+        """Draw the visible labels of the labels objects of the view.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The text shader, bound.
+        labels : list[:class:`compas_view2.objects.LabelsObject`]
+            The labels objects of the view.
+        projection : array-like
+            The 4x4 projection matrix of the camera.
+        viewworld : array-like
+            The 4x4 view-world matrix of the camera.
+        camera_position : :class:`compas.geometry.Point`
+            The position of the camera.
+        width : int
+            The width of the view.
+        height : int
+            The height of the view.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The depth buffer should contain the geometry of the scene, but not the texts.
+        The labels are drawn without depth test,
+        such that labels in front of the geometry are never partially hidden by the surfaces around their anchors.
+        """
+        for obj in list(self.layers):
+            if obj not in labels:
+                self.layers.pop(obj).delete()
+        labels = [obj for obj in labels if obj.is_visible]
+        if not labels:
+            return
+        projection = np.asarray(projection, dtype=float)
+        viewworld = np.asarray(viewworld, dtype=float)
+        key = projection.tobytes(), viewworld.tobytes(), width, height, Object.changes, tuple(labels)
+        if key != self._key:
+            self._key = key
+            self.select(labels, projection, viewworld, camera_position, width, height)
+        shader.uniform3f("camera_position", camera_position)
+        shader.uniform2f("viewport", [width, height])
+        for name, _ in ATTRIBUTES:
+            shader.enable_attribute(name)
+        # labels are hidden as a whole if they are behind the geometry, and are not cut by it
+        GL.glDisable(GL.GL_DEPTH_TEST)
+        for obj in labels:
+            layer = self.layers[obj]
+            if not layer.n:
+                continue
+            for name, step in ATTRIBUTES:
+                shader.bind_attribute(name, layer.buffer, step=step, offset=layer.offsets[name])
+            shader.uniformTex("text_texture", self.text_renderer.texture(layer.atlas))
+            shader.uniform2f("atlas_size", layer.atlas.image.shape[::-1])
+            shader.draw_elements(GL.GL_TRIANGLES, layer.elements, layer.n)
+        GL.glEnable(GL.GL_DEPTH_TEST)
+        for name, _ in ATTRIBUTES:
+            shader.disable_attribute(name)
+
+    def select(self, labels, projection, viewworld, camera_position, width, height):
+        """Bring the layers up to date with their labels, and select the labels to draw.
+
+        Parameters
+        ----------
+        labels : list[:class:`compas_view2.objects.LabelsObject`]
+            The visible labels objects of the view.
+        projection : :class:`numpy.ndarray`
+            The 4x4 projection matrix of the camera.
+        viewworld : :class:`numpy.ndarray`
+            The 4x4 view-world matrix of the camera.
+        camera_position : :class:`compas.geometry.Point`
+            The position of the camera.
+        width : int
+            The width of the view.
+        height : int
+            The height of the view.
+
+        Returns
+        -------
+        None
+        """
+        matrix = projection @ viewworld
+        depth = read_depth() if any(obj.occlusion for obj in labels) else None
+        self.drawn = self.culled = self.thinned = 0
+        for obj in labels:
+            layer = self.layers.get(obj)
+            if layer is None:
+                layer = self.layers[obj] = LabelLayer()
+            layer.update(obj)
+            positions = obj.world_positions()
+            screen, w = project(positions, matrix, width, height)
+            size = np.full(len(positions), float(obj.height))
+            if obj.absolute_height:
+                size = 10 * size / np.linalg.norm(positions - np.asarray(camera_position, dtype=float), axis=1)
+            rects = layer.extents * size[:, None] + np.tile(screen[:, :2], 2)
+            visible = (layer.counts > 0) & (w > 0) & (np.abs(screen[:, 2]) <= 1)
+            visible &= (rects[:, 2] >= 0) & (rects[:, 0] <= width) & (rects[:, 3] >= 0) & (rects[:, 1] <= height)
+            if obj.occlusion and depth is not None:
+                index = np.nonzero(visible)[0]
+                visible[index[occluded(screen[index], depth, width, height, projection)]] = False
+            candidates = int(visible.sum())
+            if obj.thinning:
+                index = np.nonzero(visible)[0]
+                keep = thin_labels(rects[index], np.argsort(w[index], kind="stable"), obj.spacing)
+                visible[index[~keep]] = False
+            layer.show(visible)
+            self.culled += int((layer.counts > 0).sum()) - candidates
+            self.thinned += candidates - int(visible.sum())
+            self.drawn += int(visible.sum())
+
+    def clear(self):
+        """Delete the buffers of all layers.
+
+        Returns
+        -------
+        None
+        """
+        for layer in self.layers.values():
+            layer.delete()
+        self.layers = {}
+        self._key = None
+
+
+def project(positions, matrix, width, height):
+    """Project points onto the screen.
+
+    Parameters
+    ----------
+    positions : :class:`numpy.ndarray`
+        The points, of shape (n, 3).
+    matrix : :class:`numpy.ndarray`
+        The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+    width : int
+        The width of the view.
+    height : int
+        The height of the view.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The pixel coordinates of the points from the bottom left of the view,
+        and their depth in normalized device coordinates, of shape (n, 3),
+        and the w coordinates of the points in clip space, which are positive in front of the camera.
+
+    Examples
+    --------
+    >>> screen, w = project(np.array([[0.0, 0.0, 0.0], [1.0, 1.0, 0.0]]), np.eye(4), 200, 100)
+    >>> screen.tolist()
+    [[100.0, 50.0, 0.0], [200.0, 100.0, 0.0]]
+
+    """
+    positions = np.asarray(positions, dtype=float)
+    clip = positions @ matrix[:3, :3].T + matrix[:3, 3]
+    w = positions @ matrix[3, :3] + matrix[3, 3]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ndc = clip / w[:, None]
+    screen = np.empty_like(ndc)
+    screen[:, 0] = (ndc[:, 0] + 1) * width / 2
+    screen[:, 1] = (ndc[:, 1] + 1) * height / 2
+    screen[:, 2] = ndc[:, 2]
+    return screen, w
+
+
+def read_depth():
+    """Read the depth buffer of the current framebuffer back.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The depth of every pixel in window coordinates, between 0 and 1, of shape (height, width),
+        with the bottom row first.
+    """
+    _, _, width, height = GL.glGetIntegerv(GL.GL_VIEWPORT)
+    GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 4)
+    depth = GL.glReadPixels(0, 0, width, height, GL.GL_DEPTH_COMPONENT, GL.GL_FLOAT)
+    return np.asarray(depth, dtype=np.float32).reshape(height, width)
+
+
+def eye_distance(depth, projection):
+    """Convert depths in normalized device coordinates to distances from the camera along the view direction.
+
+    Parameters
+    ----------
+    depth : :class:`numpy.ndarray`
+        The depths, between -1 and 1.
+    projection : :class:`numpy.ndarray`
+        The 4x4 perspective or orthographic projection matrix of the camera.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+
+    Examples
+    --------
+    >>> near, far = 0.1, 1000.0
+    >>> projection = np.zeros((4, 4))
+    >>> projection[2, 2:] = -(far + near) / (far - near), -2 * far * near / (far - near)
+    >>> projection[3, 2] = -1
+    >>> eye_distance(np.array([-1.0, 1.0]), projection).round(6).tolist()
+    [0.1, 1000.0]
+
+    """
+    return (depth * projection[3, 3] - projection[2, 3]) / (depth * projection[3, 2] - projection[2, 2])
+
+
+def occluded(screen, depth, width, height, projection):
+    """Test which points are behind the geometry in the depth buffer.
+
+    Parameters
+    ----------
+    screen : :class:`numpy.ndarray`
+        The pixel coordinates and the depths in normalized device coordinates of the points, of shape (n, 3),
+        as returned by :func:`project`.
+    depth : :class:`numpy.ndarray`
+        The depth buffer, as returned by :func:`read_depth`.
+        Its size can be a multiple of the size of the view, on high resolution displays.
+    width : int
+        The width of the view.
+    height : int
+        The height of the view.
+    projection : :class:`numpy.ndarray`
+        The 4x4 projection matrix of the camera.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        A boolean per point.
+
+    Notes
+    -----
+    A point is occluded if it is further from the camera than the furthest surface
+    in a small square of pixels around it, by more than a fraction of its distance.
+    Points on the surfaces that have been drawn are therefore not occluded by them.
+
+    """
+    rows, columns = depth.shape
+    x = (screen[:, 0] * columns / width).astype(np.int64)
+    y = (screen[:, 1] * rows / height).astype(np.int64)
+    surface = np.zeros(len(screen), dtype=np.float32)
+    offsets = range(-OCCLUSION_RADIUS, OCCLUSION_RADIUS + 1)
+    for dy in offsets:
+        for dx in offsets:
+            sample = depth[np.clip(y + dy, 0, rows - 1), np.clip(x + dx, 0, columns - 1)]
+            surface = np.maximum(surface, sample)
+    surface = eye_distance(2 * surface.astype(float) - 1, projection)
+    distance = eye_distance(screen[:, 2], projection)
+    return distance > surface * (1 + OCCLUSION_TOLERANCE)
+
+
+def thin_labels(rects, order, spacing=0.0):
+    """Select labels that do not overlap each other, in order of priority.
+
+    Parameters
+    ----------
+    rects : :class:`numpy.ndarray`
+        The screen rectangles (left, bottom, right, top) of the labels, in pixels, of shape (n, 4).
+    order : :class:`numpy.ndarray`
+        The indices of the labels in order of priority.
+    spacing : float, optional
+        The minimum distance between the selected labels, in pixels.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        Whether every label is selected.
+
+    Notes
+    -----
+    Labels are selected greedily, if they do not overlap any of the labels selected before them.
+    Only the first label is considered of labels whose lower left corners lie in the same cell of a grid
+    with the size of the smallest label, since all of them overlap the first,
+    such that the number of labels that are compared with each other is limited by the size of the view.
+    Selected labels are looked up in a grid with the size of the largest label,
+    in which only labels in neighbouring cells can overlap.
+
+    Examples
+    --------
+    >>> rects = np.array([[0, 0, 10, 5], [5, 0, 15, 5], [20, 0, 30, 5]], dtype=float)
+    >>> thin_labels(rects, np.arange(3)).tolist()
+    [True, False, True]
+    >>> thin_labels(rects, np.array([1, 0, 2])).tolist()
+    [False, True, True]
+
+    """
+    keep = np.zeros(len(rects), dtype=bool)
+    if not len(rects):
+        return keep
+    rects = rects[order] + np.array([-1, -1, 1, 1]) * spacing / 2
+    size = rects[:, 2:] - rects[:, :2]
+    cells = np.floor(rects[:, :2] / np.maximum(size.min(axis=0), 1.0)).astype(np.int64)
+    cells -= cells.min(axis=0)
+    _, first = np.unique(cells[:, 0] * (cells[:, 1].max() + 1) + cells[:, 1], return_index=True)
+    candidates = np.sort(first)
+    cell = np.maximum(size.max(axis=0), 1.0)
+    grid = {}
+    selected = []
+    boxes = dict(zip(candidates.tolist(), rects[candidates].tolist()))
+    for i, (x0, y0, x1, y1) in boxes.items():
+        cx, cy = int(x0 // cell[0]), int(y0 // cell[1])
+        neighbours = (j for dx in (-1, 0, 1) for dy in (-1, 0, 1) for j in grid.get((cx + dx, cy + dy), ()))
+        if any(boxes[j][0] < x1 and x0 < boxes[j][2] and boxes[j][1] < y1 and y0 < boxes[j][3] for j in neighbours):
+            continue
+        grid.setdefault((cx, cy), []).append(i)
+        selected.append(i)
+    keep[np.asarray(order)[selected]] = True
+    return keep
@@ -0,0 +1,474 @@
+import ctypes
+import json
+import os
+
+import numpy as np
+from OpenGL import GL
+from qtpy import QtGui
+
+from compas_view2.gl import Framebuffer
+from compas_view2.objects import GridObject
+from compas_view2.objects import LabelsObject
+from compas_view2.objects import Object
+from compas_view2.scene import Camera
+
+from .batching import Batcher
+from .culling import Culler
+from .labels import LabelRenderer
+from .profiling import Profiler
+from .renderqueue import RenderQueue
+from .text import TextRenderer
+from .view import View
+from .view120 import Renderer120
+
+CONFIG = os.path.join(os.path.dirname(os.path.dirname(__file__)), "app", "config_default.json")
+
+
+class OffscreenContext:
+    """A GL context without a window or a display, created with EGL or OSMesa.
+
+    The context is created for the platform PyOpenGL was loaded for,
+    which is selected with the environment variable ``PYOPENGL_PLATFORM``.
+    It has to be set to "egl" or "osmesa" before :mod:`compas_view2` is imported.
+
+    Attributes
+    ----------
+    platform : "egl" | "osmesa"
+        The platform of the context.
+
+    Notes
+    -----
+    With EGL, the context renders on the GPU, or with a software renderer if Mesa provides none.
+    On Linux machines without a display server, Mesa needs ``EGL_PLATFORM=surfaceless``.
+    With OSMesa, the context always renders on the CPU.
+
+    """
+
+    def __init__(self):
+        self.platform = os.environ.get("PYOPENGL_PLATFORM", "").lower()
+        if self.platform == "egl":
+            self._create_egl()
+        elif self.platform == "osmesa":
+            self._create_osmesa()
+        else:
+            raise RuntimeError(
+                "Offscreen rendering requires the environment variable PYOPENGL_PLATFORM to be 'egl' or 'osmesa', "
+                "before compas_view2 is imported."
+            )
+
+    def _create_egl(self):
+        from OpenGL import EGL
+
+        self._display = EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        if not EGL.eglInitialize(self._display, None, None):
+            raise RuntimeError("The EGL display could not be initialized.")
+        attributes = [
+            EGL.EGL_SURFACE_TYPE,
+            EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RED_SIZE,
+            8,
+            EGL.EGL_GREEN_SIZE,
+            8,
+            EGL.EGL_BLUE_SIZE,
+            8,
+            EGL.EGL_DEPTH_SIZE,
+            24,
+            EGL.EGL_RENDERABLE_TYPE,
+            EGL.EGL_OPENGL_BIT,
+            EGL.EGL_NONE,
+        ]
+        config = EGL.EGLConfig()
+        count = EGL.EGLint()
+        EGL.eglChooseConfig(
+            self._display, (EGL.EGLint * len(attributes))(*attributes), ctypes.pointer(config), 1, ctypes.pointer(count)
+        )
+        if not count.value:
+            raise RuntimeError("No EGL configuration supports OpenGL rendering.")
+        # the images are rendered into framebuffer objects, the surface is only needed to make the context current
+        size = [EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE]
+        self._surface = EGL.eglCreatePbufferSurface(self._display, config, (EGL.EGLint * len(size))(*size))
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        self._context = EGL.eglCreateContext(self._display, config, EGL.EGL_NO_CONTEXT, None)
+        if not self._context:
+            raise RuntimeError("The EGL context could not be created.")
+
+    def _create_osmesa(self):
+        from OpenGL import arrays
+        from OpenGL import osmesa
+
+        self._context = osmesa.OSMesaCreateContextExt(osmesa.OSMESA_RGBA, 24, 0, 0, None)
+        if not self._context:
+            raise RuntimeError("The OSMesa context could not be created.")
+        # the images are rendered into framebuffer objects, the buffer is only needed to make the context current
+        self._buffer = arrays.GLubyteArray.zeros((1, 1, 4))
+
+    def make_current(self):
+        """Make the context current in the calling thread.
+
+        Returns
+        -------
+        None
+        """
+        if self.platform == "egl":
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(self._display, self._surface, self._surface, self._context)
+        else:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaMakeCurrent(self._context, self._buffer, GL.GL_UNSIGNED_BYTE, 1, 1)
+
+    def delete(self):
+        """Destroy the context.
+
+        Returns
+        -------
+        None
+        """
+        if self._context is None:
+            return
+        if self.platform == "egl":
+            from OpenGL import EGL
+
+            EGL.eglMakeCurrent(self._display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+            EGL.eglDestroyContext(self._display, self._context)
+            EGL.eglDestroySurface(self._display, self._surface)
+        else:
+            from OpenGL import osmesa
+
+            osmesa.OSMesaDestroyContext(self._context)
+        self._context = None
+
+
+class OffscreenRenderer(Renderer120):
+    """Render objects into images, without a window or any widgets.
+
+    The renderer draws with the same shaders and object buffers as :class:`compas_view2.views.View120`,
+    into a framebuffer object of a context created with EGL or OSMesa (see :class:`OffscreenContext`).
+
+    Parameters
+    ----------
+    width : int, optional
+        The width of the images in pixels.
+    height : int, optional
+        The height of the images in pixels.
+    view_config : dict, optional
+        The view configuration, with the same keys as the "view" section of the config of the app.
+        Defaults to the default configuration of the app.
+
+    Attributes
+    ----------
+    width : int
+        The width of the images in pixels.
+    height : int
+        The height of the images in pixels.
+    objects : dict
+        The objects added to the renderer.
+    camera : :class:`compas_view2.scene.Camera`
+        The default camera of the renderer.
+    context : :class:`OffscreenContext`
+        The GL context of the renderer.
+    profiler : :class:`compas_view2.views.profiling.Profiler`
+        The profiler of the stages of rendering, which is disabled by default.
+
+    Examples
+    --------
+    .. code-block:: python
+
+        import os
+
+        os.environ["PYOPENGL_PLATFORM"] = "egl"
+
+        import compas
+        from compas.datastructures import Mesh
+        from compas_view2.views import OffscreenRenderer
+
+        renderer = OffscreenRenderer(400, 300)
+        image = renderer.render([Mesh.from_obj(compas.get("faces.obj"))], zoom_extents=True)
+
+    """
+
+    VIEWPORTS = View.VIEWPORTS
+
+    def __init__(self, width=800, height=500, view_config=None):
+        if view_config is None:
+            with open(CONFIG) as f:
+                view_config = json.load(f)["view"]
+        self.width = width
+        self.height = height
+        self.context = OffscreenContext()
+        self.context.make_current()
+        self._current = self.VIEWPORTS[view_config["viewport"]]
+        self._opacity = 1.0
+        self.shader_model = None
+        self.mode = view_config["viewmode"]
+        self.color = view_config["background_color"]
+        self.selection_color = view_config["selection_color"]
+        self.show_grid = view_config["show_grid"]
+        self.camera = Camera(self, **view_config["camera"])
+        self.grid = GridObject(1, 10, 10)
+        self.grid.init()
+        self.objects = {}
+        self.culler = Culler()
+        self.batcher = Batcher()
+        self.queue = RenderQueue()
+        self.text_renderer = TextRenderer()
+        self.label_renderer = LabelRenderer(self.text_renderer)
+        self.profiler = Profiler()
+        self.framebuffer = Framebuffer()
+        self.framebuffer.resize(width, height)
+        GL.glPolygonOffset(1.0, 1.0)
+        GL.glEnable(GL.GL_POLYGON_OFFSET_FILL)
+        GL.glEnable(GL.GL_CULL_FACE)
+        GL.glCullFace(GL.GL_BACK)
+        GL.glEnable(GL.GL_DEPTH_TEST)
+        GL.glDepthFunc(GL.GL_LESS)
+        GL.glEnable(GL.GL_BLEND)
+        GL.glBlendFunc(GL.GL_SRC_ALPHA, GL.GL_ONE_MINUS_SRC_ALPHA)
+        GL.glEnable(GL.GL_POINT_SMOOTH)
+        GL.glEnable(GL.GL_LINE_SMOOTH)
+        self.init_shaders(width, height)
+
+    @property
+    def mode(self):
+        return self._mode
+
+    @mode.setter
+    def mode(self, mode):
+        self._mode = mode
+        self._opacity = 0.7 if mode == "ghosted" else 1.0
+        if self.shader_model:
+            self.shader_model.bind()
+            self.shader_model.uniform1f("opacity", self._opacity)
+            self.shader_model.release()
+
+    @property
+    def current(self):
+        return self._current
+
+    @current.setter
+    def current(self, current):
+        self._current = current
+
+    @property
+    def opacity(self):
+        return self._opacity
+
+    def add(self, data, **kwargs):
+        """Add a COMPAS object.
+
+        Parameters
+        ----------
+        data : :class:`compas.data.Data`
+            A COMPAS data object.
+        **kwargs : dict, optional
+            The visualization options of the object, as in :meth:`compas_view2.app.App.add`.
+
+        Returns
+        -------
+        :class:`compas_view2.objects.Object`
+            The added object.
+        """
+        self.context.make_current()
+        obj = Object.build(data, **kwargs)
+        obj.init()
+        self.objects[obj] = obj
+        return obj
+
+    def add_labels(self, data, element="vertices", text=None, **kwargs):
+        """Add the labels of the vertices, faces or edges of a mesh or network, as one layer of labels.
+
+        Parameters
+        ----------
+        data : :class:`compas.datastructures.Mesh` | :class:`compas.datastructures.Network`
+            The mesh or network.
+        element : Literal["vertices", "faces", "edges"], optional
+            The labelled elements.
+        text : callable | dict | None, optional
+            The texts of the labels, as in :meth:`compas_view2.app.App.add_labels`.
+        **kwargs : dict, optional
+            The options of :class:`compas_view2.objects.LabelsObject`.
+
+        Returns
+        -------
+        :class:`compas_view2.objects.LabelsObject`
+            The added labels.
+        """
+        self.context.make_current()
+        obj = LabelsObject(data, element=element, text=text, **kwargs)
+        obj.init()
+        self.objects[obj] = obj
+        return obj
+
+    def remove(self, obj):
+        """Remove an object, and release its GL resources.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            An object of the renderer.
+
+        Returns
+        -------
+        None
+        """
+        self.context.make_current()
+        del self.objects[obj]
+        self.batcher.discard([obj])
+        obj.dispose()
+
+    def resize(self, width, height):
+        """Change the size of the images.
+
+        Parameters
+        ----------
+        width : int
+            The width of the images in pixels.
+        height : int
+            The height of the images in pixels.
+
+        Returns
+        -------
+        None
+        """
+        self.context.make_current()
+        self.width = width
+        self.height = height
+        self.framebuffer.resize(width, height)
+
+    def render(self, scene=None, camera=None, zoom_extents=False):
+        """Render a scene into an image.
+
+        Parameters
+        ----------
+        scene : list | dict, optional
+            The COMPAS data objects or viewer objects to render.
+            Data objects are rendered with default visualization options, and are released afterwards.
+            Defaults to the objects added to the renderer.
+        camera : :class:`compas_view2.scene.Camera`, optional
+            The camera to render the scene with.
+            Defaults to the camera of the renderer.
+        zoom_extents : bool, optional
+            Whether to move the camera such that the scene fits the image first.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The RGB image as unsigned bytes, of shape (height, width, 3), with the top row first.
+        """
+        self.context.make_current()
+        objects = self.objects
+        built = []
+        if scene is not None:
+            objects = {}
+            for item in scene.values() if isinstance(scene, dict) else scene:
+                if not isinstance(item, Object):
+                    item = Object.build(item)
+                    item.init()
+                    built.append(item)
+                objects[item] = item
+        default = self.camera
+        self.camera = camera or self.camera
+        try:
+            if zoom_extents:
+                self.camera.zoom_extents(list(objects.values()))
+            return self._paint(objects)
+        finally:
+            self.camera = default
+            self.batcher.discard(built)
+            for obj in built:
+                obj.dispose()
+
+    def _paint(self, objects):
+        """Paint objects into the framebuffer and read the image back."""
+        width, height = self.width, self.height
+        self.profiler.begin_frame()
+        self.framebuffer.bind()
+        GL.glClearColor(*self.color)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        self.update_projection(width, height)
+        viewworld = self.camera.viewworld()
+        if self.show_grid:
+            self.shader_grid.bind()
+            self.shader_grid.uniform4x4("viewworld", viewworld)
+            self.grid.draw(self.shader_grid)
+            self.shader_grid.release()
+        self.paint_objects(objects, viewworld, width, height)
+        with self.profiler.stage("readback"):
+            GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+            pixels = GL.glReadPixels(0, 0, width, height, GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
+        self.profiler.end_frame()
+        return np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 3)[::-1]
+
+    def save(self, filepath, scene=None, camera=None, zoom_extents=False):
+        """Render a scene and save the image to a file.
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the image file.
+            The format is derived from the extension, e.g. ".png" or ".jpg".
+        scene : list | dict, optional
+            The COMPAS data objects or viewer objects to render.
+            Defaults to the objects added to the renderer.
+        camera : :class:`compas_view2.scene.Camera`, optional
+            The camera to render the scene with.
+        zoom_extents : bool, optional
+            Whether to move the camera such that the scene fits the image first.
+
+        Returns
+        -------
+        None
+        """
+        image = np.ascontiguousarray(self.render(scene, camera, zoom_extents))
+        qimage = QtGui.QImage(image.data, self.width, self.height, 3 * self.width, QtGui.QImage.Format_RGB888)
+        if not qimage.save(filepath):
+            raise IOError("The image could not be saved to {}".format(filepath))
+
+    def export(self, scenes, filepaths, camera=None, zoom_extents=True):
+        """Render a batch of scenes, and save the images to files.
+
+        Parameters
+        ----------
+        scenes : iterable
+            The scenes, each a COMPAS data object, or a list or dict of data objects or viewer objects.
+        filepaths : str | list[str]
+            The paths of the image files,
+            or a pattern that is formatted with the index of the scene, e.g. "thumbnails/{:04d}.png".
+        camera : :class:`compas_view2.scene.Camera`, optional
+            The camera to render the scenes with.
+        zoom_extents : bool, optional
+            Whether to move the camera such that each scene fits its image.
+
+        Returns
+        -------
+        list[str]
+            The paths of the saved images.
+        """
+        saved = []
+        for index, scene in enumerate(scenes):
+            if isinstance(scene, Object) or not isinstance(scene, (list, tuple, dict)):
+                scene = [scene]
+            filepath = filepaths.format(index) if isinstance(filepaths, str) else filepaths[index]
+            self.save(filepath, scene, camera, zoom_extents)
+            saved.append(filepath)
+        return saved
+
+    def delete(self):
+        """Release the GL resources of the objects and of the renderer, and destroy the context.
+
+        Returns
+        -------
+        None
+        """
+        self.context.make_current()
+        for obj in self.objects:
+            obj.dispose()
+        self.objects = {}
+        self.batcher.clear()
+        self.label_renderer.clear()
+        self.text_renderer.clear()
+        self.grid.dispose()
+        self.framebuffer.delete()
+        self.profiler.delete()
+        self.context.delete()
@@ -0,0 +1,1050 @@
+from operator import itemgetter
+
+import numpy as np
+from OpenGL import GL
+
+from compas_view2.gl import Buffer
+from compas_view2.gl import Framebuffer
+from compas_view2.objects import BufferObject
+
+from .culling import CORNERS
+
+# per kind of element: the GL primitive
+PRIMITIVES = {"vertices": GL.GL_POINTS, "edges": GL.GL_LINES, "faces": GL.GL_TRIANGLES}
+
+IDENTITY = np.identity(4).flatten()
+
+# the capabilities that would mix the colors of IDs, and are disabled while IDs are drawn
+ID_DISABLED = (GL.GL_BLEND, GL.GL_POINT_SMOOTH, GL.GL_LINE_SMOOTH, GL.GL_DITHER)
+# the capabilities that are changed while IDs are drawn, and are restored afterwards
+STATE_CAPABILITIES = ID_DISABLED + (GL.GL_SCISSOR_TEST,)
+
+
+def encode_id(index):
+    """Encode an integer ID as the RGBA color of an ID buffer.
+
+    Parameters
+    ----------
+    index : int
+        An ID between 0 and 2**32 - 1.
+        The ID 0 is reserved for the background.
+
+    Returns
+    -------
+    list[float]
+        The normalized red, green, blue and alpha components,
+        i.e. the bytes of the ID from least to most significant, divided by 255.
+
+    Examples
+    --------
+    >>> [round(component * 255) for component in encode_id(258)]
+    [2, 1, 0, 0]
+
+    """
+    return [((index >> shift) & 255) / 255 for shift in (0, 8, 16, 24)]
+
+
+def encode_ids(ids):
+    """Encode integer IDs as the RGBA colors of an ID buffer, as unsigned bytes.
+
+    Parameters
+    ----------
+    ids : array-like
+        IDs between 0 and 2**32 - 1.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The red, green, blue and alpha components per ID, of shape (n, 4).
+
+    Examples
+    --------
+    >>> encode_ids([258, 1])
+    array([[2, 1, 0, 0],
+           [1, 0, 0, 0]], dtype=uint8)
+
+    """
+    return np.asarray(ids, dtype="<u4").reshape(-1, 1).view(np.uint8)
+
+
+def decode_ids(pixels):
+    """Decode the RGBA pixels of an ID buffer into integer IDs.
+
+    Parameters
+    ----------
+    pixels : :class:`numpy.ndarray`
+        The pixels as unsigned bytes, of shape (..., 4).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The IDs as unsigned 32-bit integers, of shape (...).
+
+    Examples
+    --------
+    >>> decode_ids(np.array([[2, 1, 0, 0], [0, 0, 0, 0]], dtype=np.uint8))
+    array([258,   0], dtype=uint32)
+
+    """
+    pixels = np.ascontiguousarray(pixels, dtype=np.uint8)
+    return pixels.view("<u4")[..., 0].astype(np.uint32)
+
+
+class IDBuffer(Framebuffer):
+    """An offscreen framebuffer into which the objects of a view are drawn with the color of their ID.
+
+    The framebuffer has a color attachment with 8 bits per RGBA component, such that a pixel holds a 32-bit ID,
+    and a depth attachment, such that every pixel holds the ID of the nearest object.
+    The attachments are (re)allocated with :meth:`resize` when the size of the view changes.
+
+    Attributes
+    ----------
+    width : int
+        The width of the framebuffer in pixels.
+    height : int
+        The height of the framebuffer in pixels.
+
+    """
+
+    def begin(self, x, y, width, height):
+        """Bind the framebuffer and clear a region of it, to which drawing is restricted.
+
+        Parameters
+        ----------
+        x : int
+            The horizontal pixel coordinate of the lower left corner of the region.
+        y : int
+            The vertical pixel coordinate of the lower left corner of the region, from the bottom.
+        width : int
+            The width of the region in pixels.
+        height : int
+            The height of the region in pixels.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Blending, smoothing and dithering would mix the colors of IDs, and are disabled until :meth:`end`,
+        which restores the state they had before.
+        """
+        self._enabled = {capability: GL.glIsEnabled(capability) for capability in STATE_CAPABILITIES}
+        self.bind()
+        GL.glEnable(GL.GL_SCISSOR_TEST)
+        GL.glScissor(x, y, width, height)
+        GL.glClearColor(0, 0, 0, 0)
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)
+        for capability in ID_DISABLED:
+            GL.glDisable(capability)
+
+    def read(self, x, y, width, height):
+        """Read the IDs of a region of the framebuffer.
+
+        Parameters
+        ----------
+        x : int
+            The horizontal pixel coordinate of the lower left corner of the region.
+        y : int
+            The vertical pixel coordinate of the lower left corner of the region, from the bottom.
+        width : int
+            The width of the region in pixels.
+        height : int
+            The height of the region in pixels.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The IDs of the pixels, of shape (height, width), with the bottom row first.
+        """
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        pixels = GL.glReadPixels(x, y, width, height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE)
+        pixels = np.frombuffer(pixels, dtype=np.uint8).reshape(height, width, 4)
+        return decode_ids(pixels)
+
+    def end(self, framebuffer, width, height, color):
+        """Restore the framebuffer and the state of the view.
+
+        Parameters
+        ----------
+        framebuffer : int
+            The framebuffer of the view.
+        width : int
+            The width of the view in pixels.
+        height : int
+            The height of the view in pixels.
+        color : tuple[float, float, float, float]
+            The clear color of the view.
+
+        Returns
+        -------
+        None
+        """
+        for capability, enabled in self._enabled.items():
+            if enabled:
+                GL.glEnable(capability)
+            else:
+                GL.glDisable(capability)
+        GL.glClearColor(*color)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, framebuffer)
+        GL.glViewport(0, 0, width, height)
+
+
+class BVH:
+    """A bounding volume hierarchy over axis-aligned boxes.
+
+    The boxes are split recursively at the median of their centers along the longest axis of the centers,
+    until a node contains at most ``leaf_size`` boxes.
+
+    Parameters
+    ----------
+    boxes : :class:`numpy.ndarray`
+        The min and max corners of the boxes, of shape (n, 2, 3).
+    leaf_size : int, optional
+        The maximum number of boxes per leaf.
+
+    Attributes
+    ----------
+    bounds : :class:`numpy.ndarray`
+        The min and max corners of the nodes, of shape (m, 2, 3).
+    children : :class:`numpy.ndarray`
+        The indices of the two children of the nodes, of shape (m, 2), or -1 for leaves.
+    ranges : :class:`numpy.ndarray`
+        The start and end of the boxes of the nodes in :attr:`order`, of shape (m, 2).
+    order : :class:`numpy.ndarray`
+        The indices of the boxes, ordered per node.
+
+    """
+
+    def __init__(self, boxes, leaf_size=8):
+        self.boxes = np.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        self.leaf_size = leaf_size
+        self.order = np.arange(len(self.boxes))
+        bounds = []
+        children = []
+        ranges = []
+        centers = self.boxes.mean(axis=1)
+        stack = [(0, len(self.boxes), None, 0)]
+        while stack:
+            start, end, parent, side = stack.pop()
+            node = len(bounds)
+            if parent is not None:
+                children[parent][side] = node
+            indices = self.order[start:end]
+            boxes = self.boxes[indices]
+            if len(boxes):
+                bounds.append([boxes[:, 0].min(axis=0), boxes[:, 1].max(axis=0)])
+            else:
+                bounds.append([[np.inf] * 3, [-np.inf] * 3])
+            children.append([-1, -1])
+            ranges.append([start, end])
+            if end - start <= leaf_size:
+                continue
+            axis = np.ptp(centers[indices], axis=0).argmax()
+            middle = (end - start) // 2
+            split = np.argpartition(centers[indices, axis], middle)
+            self.order[start:end] = indices[split]
+            stack.append((start + middle, end, node, 1))
+            stack.append((start, start + middle, node, 0))
+        self.bounds = np.array(bounds, dtype=float).reshape(-1, 2, 3)
+        self.children = np.array(children, dtype=int).reshape(-1, 2)
+        self.ranges = np.array(ranges, dtype=int).reshape(-1, 2)
+
+    def intersect_ray(self, origin, direction):
+        """Find the boxes that are hit by a ray.
+
+        Parameters
+        ----------
+        origin : array-like
+            The origin of the ray.
+        direction : array-like
+            The direction of the ray.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            The parameters along the ray at which it enters the boxes that it hits, in increasing order,
+            and the indices of these boxes.
+        """
+        origin = np.asarray(origin, dtype=float)
+        with np.errstate(divide="ignore"):
+            inverse = 1 / np.asarray(direction, dtype=float)
+        entries = []
+        indices = []
+        stack = [0] if len(self.boxes) else []
+        while stack:
+            node = stack.pop()
+            if intersect_ray_boxes(origin, inverse, self.bounds[node : node + 1])[0] == np.inf:
+                continue
+            left, right = self.children[node]
+            if left < 0:
+                start, end = self.ranges[node]
+                boxes = self.order[start:end]
+                hits = intersect_ray_boxes(origin, inverse, self.boxes[boxes])
+                hit = hits < np.inf
+                entries.append(hits[hit])
+                indices.append(boxes[hit])
+            else:
+                stack += [left, right]
+        if not entries:
+            return np.zeros(0), np.zeros(0, dtype=int)
+        entries = np.concatenate(entries)
+        indices = np.concatenate(indices)
+        order = np.argsort(entries, kind="stable")
+        return entries[order], indices[order]
+
+
+class ElementIndex:
+    """The vertices, edges and faces of an object, for picking them individually.
+
+    The elements are collected with :meth:`compas_view2.objects.BufferObject.element_data` for one version of the object.
+    Their world-space positions, and a :class:`BVH` over the triangles of the faces, are computed when first needed.
+
+    Parameters
+    ----------
+    obj : :class:`compas_view2.objects.BufferObject`
+        The object.
+
+    Attributes
+    ----------
+    version : int
+        The version of the object.
+    positions : dict[str, :class:`numpy.ndarray`]
+        Per kind of element, the positions of the corners of its primitives, in the coordinates of the object.
+    ids : dict[str, :class:`numpy.ndarray`]
+        Per kind of element, the index of the element of every corner.
+    keys : dict[str, list]
+        Per kind of element, the key of every element.
+
+    """
+
+    def __init__(self, obj):
+        self.version = obj.version
+        self.positions = {}
+        self.ids = {}
+        self.keys = {}
+        for kind, (positions, ids, keys) in obj.element_data().items():
+            self.positions[kind] = np.asarray(positions, dtype=np.float32).reshape(-1, 3)
+            self.ids[kind] = np.asarray(ids, dtype=np.int64)
+            self.keys[kind] = keys
+        matrix = obj._matrix_buffer
+        self._matrix = None if matrix is None else np.asarray(matrix, dtype=float).reshape(4, 4)
+        self._world = {}
+        self._bvh = None
+
+    def world(self, kind):
+        """The positions of the corners of the primitives of a kind of element, in world coordinates.
+
+        Parameters
+        ----------
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The positions, of shape (n, 3).
+        """
+        if kind not in self._world:
+            positions = self.positions.get(kind, np.zeros((0, 3))).astype(float)
+            if self._matrix is not None:
+                positions = positions @ self._matrix[:3, :3].T + self._matrix[:3, 3]
+            self._world[kind] = positions
+        return self._world[kind]
+
+    def centers(self, kind):
+        """The average position of the corners of every element of a kind, in world coordinates.
+
+        Parameters
+        ----------
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            The centers, of shape (n, 3), and whether every element has any primitives.
+        """
+        positions = self.world(kind)
+        ids = self.ids.get(kind, np.zeros(0, dtype=np.int64))
+        count = len(self.keys.get(kind, ()))
+        corners = np.bincount(ids, minlength=count)
+        centers = np.stack([np.bincount(ids, positions[:, axis], count) for axis in range(3)], axis=1)
+        return centers / np.maximum(corners, 1)[:, None], corners > 0
+
+    def intersect_ray(self, origin, direction):
+        """Find the nearest face that is hit by a ray.
+
+        Parameters
+        ----------
+        origin : :class:`numpy.ndarray`
+            The origin of the ray.
+        direction : :class:`numpy.ndarray`
+            The direction of the ray.
+
+        Returns
+        -------
+        tuple[float, int] | tuple[float, None]
+            The parameter of the nearest hit along the ray and the index of the face, or infinity and None.
+        """
+        triangles = self.world("faces").reshape(-1, 3, 3)
+        if not len(triangles):
+            return np.inf, None
+        if self._bvh is None:
+            self._bvh = BVH(np.stack([triangles.min(axis=1), triangles.max(axis=1)], axis=1), leaf_size=64)
+        _, candidates = self._bvh.intersect_ray(origin, direction)
+        if not len(candidates):
+            return np.inf, None
+        parameters = intersect_ray_triangles(origin, direction, triangles[candidates])
+        nearest = parameters.argmin()
+        if parameters[nearest] == np.inf:
+            return np.inf, None
+        return float(parameters[nearest]), int(self.ids["faces"][3 * candidates[nearest]])
+
+
+class RayPicker:
+    """Pick the objects of a view, or their vertices, edges and faces, on the CPU.
+
+    Candidate objects are found with a :class:`BVH` over the world-space bounding boxes of the visible objects,
+    which is rebuilt only when objects change.
+    A ray through a pixel is then intersected with the faces of the candidates, from near to far,
+    until no remaining candidate can be nearer than the nearest hit.
+    The faces of every object have a :class:`BVH` of their own in its :class:`ElementIndex`,
+    which is computed on the first pick after every change of the object.
+    Vertices and edges are picked in screen space, within a tolerance, if no face hides them.
+    No drawing is involved, so that objects and elements can be picked without a redraw of the view.
+
+    Only the elements of :class:`compas_view2.objects.BufferObject` objects that are drawn as they are can be picked.
+
+    Parameters
+    ----------
+    culler : :class:`compas_view2.views.culling.Culler`
+        The culler of the view, which keeps the world-space bounding boxes of the objects up to date.
+
+    """
+
+    def __init__(self, culler):
+        self.culler = culler
+        self._bvh = None
+        self._boxes = None
+        self._objects = []
+        self._indices = {}
+
+    @staticmethod
+    def accepts(obj):
+        """Verify that the elements of an object can be picked.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            An object of the view.
+
+        Returns
+        -------
+        bool
+            True if the object is a :class:`compas_view2.objects.BufferObject` that is picked as it is drawn.
+        """
+        return isinstance(obj, BufferObject) and type(obj).draw_instance is BufferObject.draw_instance
+
+    def index(self, obj):
+        """The elements of an object, collected again only if the object has changed.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.BufferObject`
+            An object of the view.
+
+        Returns
+        -------
+        :class:`ElementIndex`
+        """
+        index = self._indices.get(obj)
+        if index is None or index.version != obj.version:
+            index = self._indices[obj] = ElementIndex(obj)
+        return index
+
+    def candidates(self, objects, origin, direction):
+        """Find the visible objects whose bounding boxes are hit by a ray.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        origin : array-like
+            The origin of the ray.
+        direction : array-like
+            The direction of the ray.
+
+        Returns
+        -------
+        list[tuple[float, :class:`compas_view2.objects.Object`]]
+            The parameter along the ray at which it enters the bounding box of an object, and the object,
+            from near to far.
+        """
+        self.culler.update(objects)
+        if self._bvh is None or self._boxes is not self.culler.boxes:
+            self._rebuild()
+        entries, indices = self._bvh.intersect_ray(origin, direction)
+        return [(entry, self._objects[index]) for entry, index in zip(entries.tolist(), indices.tolist())]
+
+    def cast(self, objects, origin, direction):
+        """Find the nearest face of the visible objects that is hit by a ray.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        origin : array-like
+            The origin of the ray.
+        direction : array-like
+            The direction of the ray.
+
+        Returns
+        -------
+        tuple[:class:`compas_view2.objects.Object`, hashable, float] | tuple[None, None, float]
+            The object, the key of the face and the parameter of the hit along the ray,
+            or None, None and infinity if no face is hit.
+        """
+        origin = np.asarray(origin, dtype=float)
+        direction = np.asarray(direction, dtype=float)
+        nearest = None, None, np.inf
+        for entry, obj in self.candidates(objects, origin, direction):
+            if entry > nearest[2]:
+                break
+            if not self.accepts(obj) or not obj.show_faces:
+                continue
+            index = self.index(obj)
+            parameter, face = index.intersect_ray(origin, direction)
+            if parameter < nearest[2]:
+                nearest = obj, index.keys["faces"][face], parameter
+        return nearest
+
+    def pick(self, objects, origin, direction):
+        """Find the nearest object that is hit by a ray.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        origin : array-like
+            The origin of the ray.
+        direction : array-like
+            The direction of the ray.
+
+        Returns
+        -------
+        tuple[:class:`compas_view2.objects.Object`, float] | tuple[None, None]
+            The nearest object and the parameter of the hit along the ray, if any.
+        """
+        obj, _, parameter = self.cast(objects, origin, direction)
+        if obj is None:
+            return None, None
+        return obj, parameter
+
+    def pick_element(self, objects, kind, matrix, width, height, x, y, tolerance=5):
+        """Find the nearest element of a kind at a pixel of the view.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+        matrix : array-like
+            The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+        width : float
+            Width of the view.
+        height : float
+            Height of the view.
+        x : float
+            The horizontal coordinate of the pixel, from the left.
+        y : float
+            The vertical coordinate of the pixel, from the top.
+        tolerance : float, optional
+            The largest distance in pixels between the pixel and the drawn point of a vertex or line of an edge.
+
+        Returns
+        -------
+        tuple[:class:`compas_view2.objects.Object`, hashable] | tuple[None, None]
+            The object and the key of the element, if any.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        inverse = np.linalg.inv(matrix)
+        if kind == "faces":
+            obj, key, _ = self.cast(objects, *unproject(inverse, x, y, width, height))
+            return obj, key
+        size = 1 if kind == "vertices" else 2
+        candidates = []
+        for obj in objects.values():
+            if not obj.is_visible or not self.accepts(obj):
+                continue
+            index = self.index(obj)
+            corners = index.world(kind).reshape(-1, size, 3)
+            if not len(corners):
+                continue
+            pixels, front = project_points(corners.reshape(-1, 3), matrix, width, height)
+            pixels = pixels.reshape(-1, size, 2)
+            front = front.reshape(-1, size).all(axis=1)
+            start = pixels[:, 0]
+            along = pixels[:, -1] - start
+            lengths = (along**2).sum(axis=1)
+            # the parameter of the point of a primitive that is closest to the pixel
+            parameters = ((np.array([x, y]) - start) * along).sum(axis=1)
+            parameters = np.clip(np.divide(parameters, lengths, out=np.zeros_like(lengths), where=lengths > 0), 0, 1)
+            distances = np.hypot(*(start + parameters[:, None] * along - [x, y]).T)
+            ids = index.ids[kind][::size]
+            # points and lines are picked wherever they are drawn
+            reach = tolerance + (obj.pointsize if kind == "vertices" else obj.linewidth) / 2
+            for primitive in np.nonzero(front & (distances <= reach))[0].tolist():
+                a, b = corners[primitive, 0], corners[primitive, -1]
+                point = a + parameters[primitive] * (b - a)
+                candidates.append((distances[primitive], obj, index.keys[kind][ids[primitive]], point))
+        candidates.sort(key=itemgetter(0))
+        for _, obj, key, point in candidates:
+            if not self._is_hidden(objects, matrix, inverse, width, height, point):
+                return obj, key
+        return None, None
+
+    def _is_hidden(self, objects, matrix, inverse, width, height, point):
+        """Verify that a point is hidden behind any face, seen from the camera."""
+        pixel, _ = project_points(point[None], matrix, width, height)
+        origin, direction = unproject(inverse, pixel[0, 0], pixel[0, 1], width, height)
+        distance = (point - origin) @ direction
+        _, _, parameter = self.cast(objects, origin, direction)
+        return parameter < distance - 1e-4 * max(distance, 1)
+
+    def select_elements(self, objects, kind, matrix, width, height, box):
+        """Find the elements of a kind whose centers lie inside a box of the view, whether they are hidden or not.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+        matrix : array-like
+            The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+        width : float
+            Width of the view.
+        height : float
+            Height of the view.
+        box : list[float]
+            The corners of the box, as [x1, y1, x2, y2], in pixels from the top left.
+
+        Returns
+        -------
+        dict[:class:`compas_view2.objects.Object`, list]
+            The keys of the elements per object.
+        """
+        matrix = np.asarray(matrix, dtype=float)
+        selection = {}
+        for obj in objects.values():
+            if not obj.is_visible or not self.accepts(obj):
+                continue
+            index = self.index(obj)
+            centers, valid = index.centers(kind)
+            if not len(centers):
+                continue
+            inside = np.nonzero(valid & _inside(centers, matrix, width, height, box))[0]
+            if len(inside):
+                keys = index.keys[kind]
+                selection[obj] = [keys[element] for element in inside.tolist()]
+        return selection
+
+    def select(self, objects, matrix, width, height, box, window=False):
+        """Find the visible objects whose bounding box centers, or entire bounding boxes, lie inside a box of the view.
+
+        Parameters
+        ----------
+        objects : dict
+            The objects of the view.
+        matrix : array-like
+            The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+        width : float
+            Width of the view.
+        height : float
+            Height of the view.
+        box : list[float]
+            The corners of the box, as [x1, y1, x2, y2], in pixels from the top left.
+        window : bool, optional
+            Whether to find only the objects whose bounding boxes lie entirely inside the box,
+            instead of those whose bounding box centers do.
+
+        Returns
+        -------
+        list[:class:`compas_view2.objects.Object`]
+            The objects.
+        """
+        self.culler.update(objects)
+        matrix = np.asarray(matrix, dtype=float)
+        if window:
+            corners = self.culler.boxes[:, CORNERS, [0, 1, 2]]
+            inside = _inside(corners.reshape(-1, 3), matrix, width, height, box).reshape(-1, 8).all(axis=1)
+        else:
+            inside = _inside(self.culler.boxes.mean(axis=1), matrix, width, height, box)
+        inside &= self.culler.pickable
+        return [self.culler.objects[index] for index in np.nonzero(inside)[0]]
+
+    def _rebuild(self):
+        """Rebuild the hierarchy over the bounding boxes of the visible objects, and forget removed objects."""
+        culler = self.culler
+        indices = np.nonzero(culler.pickable)[0]
+        self._objects = [culler.objects[index] for index in indices]
+        self._bvh = BVH(culler.boxes[indices])
+        self._boxes = culler.boxes
+        members = set(culler.objects)
+        self._indices = {obj: index for obj, index in self._indices.items() if obj in members}
+
+
+class ElementPass:
+    """Draw the vertices, edges or faces of the objects of a view with the colors of IDs that are unique in the view.
+
+    The elements of every object get consecutive IDs per pass, after the elements of the previous objects.
+    Since GLSL 1.20 has no primitive IDs, the ID of every corner of every primitive is a vertex attribute
+    of four unsigned bytes, which is only rewritten when the first ID of the object changes.
+    Vertices and edges are drawn after the faces have been drawn into the depth buffer only,
+    such that they are hidden behind faces, like they are in the view.
+
+    Parameters
+    ----------
+    picker : :class:`RayPicker`
+        The picker that collects the elements of the objects.
+
+    Attributes
+    ----------
+    kind : "vertices" | "edges" | "faces"
+        The kind of element of the last pass.
+
+    """
+
+    def __init__(self, picker):
+        self.picker = picker
+        self.kind = None
+        self._buffers = {}
+        self._starts = np.zeros(0, dtype=np.int64)
+        self._drawn = []
+
+    def draw(self, shader, objects, kind):
+        """Draw the elements of a kind of the visible objects with the colors of their IDs.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The element shader.
+        objects : dict
+            The objects of the view.
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+
+        Returns
+        -------
+        None
+        """
+        for obj in [obj for obj in self._buffers if obj not in objects or obj.version != self._buffers[obj][0]]:
+            self._delete(obj)
+        drawn = [obj for obj in objects.values() if obj.is_visible and self.picker.accepts(obj)]
+        indices = [self.picker.index(obj) for obj in drawn]
+        counts = [len(index.keys.get(kind, ())) for index in indices]
+        self._starts = np.cumsum([1] + counts)[:-1]
+        self._drawn = list(zip(drawn, indices))
+        self.kind = kind
+        shader.enable_attribute("position")
+        if kind != "faces":
+            GL.glColorMask(False, False, False, False)
+            for obj, index in self._drawn:
+                if obj.show_faces:
+                    self._draw(shader, obj, index, "faces")
+            GL.glColorMask(True, True, True, True)
+        shader.enable_attribute("element_id")
+        for (obj, index), start in zip(self._drawn, self._starts.tolist()):
+            if kind != "faces" or obj.show_faces:
+                self._draw(shader, obj, index, kind, start)
+        shader.disable_attribute("element_id")
+        shader.disable_attribute("position")
+        shader.uniform4x4("transform", IDENTITY)
+
+    def _draw(self, shader, obj, index, kind, start=None):
+        """Draw the primitives of a kind of element of an object, with their IDs if the first ID is given."""
+        if kind not in index.positions or not len(index.positions[kind]):
+            return
+        version, buffers = self._buffers.setdefault(obj, (obj.version, {}))
+        if kind not in buffers:
+            positions = Buffer(GL.GL_ARRAY_BUFFER)
+            positions.write(index.positions[kind])
+            buffers[kind] = [positions, Buffer(GL.GL_ARRAY_BUFFER), None]
+        positions, ids, first = buffers[kind]
+        shader.uniform4x4("transform", obj._matrix_buffer if obj._matrix_buffer is not None else IDENTITY)
+        shader.bind_attribute("position", positions)
+        if start is not None:
+            if first != start:
+                ids.write(encode_ids(index.ids[kind] + start))
+                buffers[kind][2] = start
+            shader.bind_attribute("element_id", ids, step=4, gltype=GL.GL_UNSIGNED_BYTE, normalized=True)
+        if kind == "vertices":
+            GL.glPointSize(obj.pointsize)
+        elif kind == "edges":
+            GL.glLineWidth(obj.linewidth)
+        shader.draw_arrays(PRIMITIVES[kind], len(index.positions[kind]))
+
+    def decode(self, ids):
+        """Find the elements with given IDs of the last pass.
+
+        Parameters
+        ----------
+        ids : array-like
+            The IDs, e.g. the pixels of an ID buffer.
+            The ID 0 of the background is ignored.
+
+        Returns
+        -------
+        dict[:class:`compas_view2.objects.Object`, list]
+            The keys of the elements per object.
+        """
+        ids = np.unique(np.asarray(ids, dtype=np.int64))
+        ids = ids[ids > 0]
+        drawn = np.searchsorted(self._starts, ids, side="right") - 1
+        selection = {}
+        for position in np.unique(drawn).tolist():
+            obj, index = self._drawn[position]
+            keys = index.keys[self.kind]
+            elements = ids[drawn == position] - self._starts[position]
+            selection[obj] = [keys[element] for element in elements.tolist() if element < len(keys)]
+        return selection
+
+    def _delete(self, obj):
+        """Delete the buffers of an object."""
+        _, buffers = self._buffers.pop(obj)
+        for positions, ids, _ in buffers.values():
+            positions.delete()
+            ids.delete()
+
+    def delete(self):
+        """Delete the buffers of all objects.
+
+        Returns
+        -------
+        None
+        """
+        for obj in list(self._buffers):
+            self._delete(obj)
+
+
+def intersect_ray_boxes(origin, inverse, boxes):
+    """Intersect a ray with axis-aligned boxes, with the slab method.
+
+    Parameters
+    ----------
+    origin : :class:`numpy.ndarray`
+        The origin of the ray.
+    inverse : :class:`numpy.ndarray`
+        The componentwise inverse of the direction of the ray.
+    boxes : :class:`numpy.ndarray`
+        The min and max corners of the boxes, of shape (n, 2, 3).
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The parameter along the ray at which it enters every box, 0 if the origin is inside the box,
+        or infinity if the ray misses the box.
+
+    Examples
+    --------
+    >>> boxes = np.array([[[2, -1, -1], [3, 1, 1]], [[2, 2, 2], [3, 3, 3]]], dtype=float)
+    >>> intersect_ray_boxes(np.zeros(3), np.array([1, np.inf, np.inf]), boxes)
+    array([ 2., inf])
+
+    """
+    with np.errstate(invalid="ignore"):
+        near = (boxes[:, 0] - origin) * inverse
+        far = (boxes[:, 1] - origin) * inverse
+    # a ray parallel to a slab within its bounds gives nan (0 * inf) and is unconstrained by it
+    near, far = np.fmin(near, far), np.fmax(near, far)
+    entry = np.fmax(np.nanmax(np.where(np.isnan(near), -np.inf, near), axis=1), 0)
+    exit = np.nanmin(np.where(np.isnan(far), np.inf, far), axis=1)
+    return np.where(entry <= exit, entry, np.inf)
+
+
+def intersect_ray_triangles(origin, direction, triangles, epsilon=1e-12):
+    """Intersect a ray with triangles, with the Möller–Trumbore algorithm.
+
+    Parameters
+    ----------
+    origin : :class:`numpy.ndarray`
+        The origin of the ray.
+    direction : :class:`numpy.ndarray`
+        The direction of the ray.
+    triangles : :class:`numpy.ndarray`
+        The corners of the triangles, of shape (n, 3, 3).
+    epsilon : float, optional
+        The tolerance for rays parallel to the planes of triangles.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        The parameter along the ray at which it hits every triangle, from either side,
+        or infinity if the ray misses the triangle.
+
+    Examples
+    --------
+    >>> triangles = np.array([[[0, -1, -1], [0, 1, -1], [0, 0, 1]], [[5, 5, 5], [6, 5, 5], [5, 6, 5]]], dtype=float)
+    >>> intersect_ray_triangles(np.array([-2.0, 0, 0]), np.array([1.0, 0, 0]), triangles)
+    array([ 2., inf])
+
+    """
+    a = triangles[:, 0]
+    ab = triangles[:, 1] - a
+    ac = triangles[:, 2] - a
+    p = np.cross(direction, ac)
+    determinant = np.einsum("ij,ij->i", ab, p)
+    valid = np.abs(determinant) > epsilon
+    inverse = np.divide(1.0, determinant, out=np.zeros_like(determinant), where=valid)
+    s = origin - a
+    u = np.einsum("ij,ij->i", s, p) * inverse
+    q = np.cross(s, ab)
+    v = (q @ direction) * inverse
+    t = np.einsum("ij,ij->i", ac, q) * inverse
+    hit = valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t >= 0)
+    return np.where(hit, t, np.inf)
+
+
+def nearest_id(ids):
+    """Find the ID nearest to the center of a map of IDs, ignoring the background.
+
+    Parameters
+    ----------
+    ids : :class:`numpy.ndarray`
+        The IDs of the pixels of a region, of shape (height, width).
+
+    Returns
+    -------
+    int
+        The ID of the nearest pixel that is not the background, or 0.
+
+    Examples
+    --------
+    >>> nearest_id(np.array([[0, 0, 0], [0, 0, 7], [5, 0, 0]]))
+    7
+
+    """
+    rows, columns = np.nonzero(ids)
+    if not len(rows):
+        return 0
+    height, width = ids.shape
+    nearest = ((rows - height // 2) ** 2 + (columns - width // 2) ** 2).argmin()
+    return int(ids[rows[nearest], columns[nearest]])
+
+
+def id_coverage(ids, box=None):
+    """Count the pixels of every ID in a box of a map of IDs, and the fraction of all its pixels in the map they are.
+
+    Parameters
+    ----------
+    ids : :class:`numpy.ndarray`
+        The IDs of the pixels of a region, of shape (height, width), with the top row first.
+    box : list[int], optional
+        The corners of a box in the region, as [x1, y1, x2, y2], in pixels from the top left of the region.
+        Defaults to the whole region.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The IDs that appear in the box, ignoring the background, in ascending order,
+        their numbers of pixels in the box, and the fractions of their pixels in the region that lie in the box.
+
+    Notes
+    -----
+    The pixels are counted with :func:`numpy.bincount`, without sorting them.
+    The IDs are expected to be small, e.g. sequential IDs of objects.
+
+    Examples
+    --------
+    >>> ids = np.array([[0, 1, 1], [2, 1, 0], [2, 2, 3]], dtype=np.uint32)
+    >>> id_coverage(ids, [0, 0, 2, 2])
+    (array([1, 2]), array([2, 1]), array([0.66666667, 0.33333333]))
+
+    """
+    ids = np.asarray(ids)
+    if not ids.size:
+        return np.zeros(0, dtype=int), np.zeros(0, dtype=int), np.zeros(0)
+    total = counts = np.bincount(ids.ravel())
+    if box is not None:
+        x1, y1, x2, y2 = box
+        inside = ids[max(min(y1, y2), 0) : max(y1, y2), max(min(x1, x2), 0) : max(x1, x2)]
+        counts = np.bincount(inside.ravel(), minlength=len(total))
+    found = np.nonzero(counts)[0]
+    found = found[found > 0]
+    return found, counts[found], counts[found] / total[found]
+
+
+def project_points(points, matrix, width, height):
+    """Project points to the pixels of a view.
+
+    Parameters
+    ----------
+    points : :class:`numpy.ndarray`
+        The points in world coordinates, of shape (n, 3).
+    matrix : :class:`numpy.ndarray`
+        The 4x4 matrix that transforms world coordinates to clip coordinates, i.e. projection times view-world.
+    width : float
+        Width of the view.
+    height : float
+        Height of the view.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The pixel coordinates of the points from the top left, of shape (n, 2),
+        and whether the points lie between the near and the far clipping planes.
+
+    Examples
+    --------
+    >>> pixels, inside = project_points(np.array([[0.0, 0.0, 0.0]]), np.identity(4), 100, 50)
+    >>> pixels.tolist(), inside.tolist()
+    ([[49.5, 24.5]], [True])
+
+    """
+    clip = points @ matrix[:, :3].T + matrix[:, 3]
+    w = clip[:, 3]
+    inside = (w > 0) & (np.abs(clip[:, 2]) <= w)
+    w = np.where(w > 0, w, 1)
+    x = (clip[:, 0] / w + 1) * width / 2 - 0.5
+    y = (1 - clip[:, 1] / w) * height / 2 - 0.5
+    return np.stack([x, y], axis=1), inside
+
+
+def unproject(inverse, x, y, width, height):
+    """Compute the ray through a pixel of a view.
+
+    Parameters
+    ----------
+    inverse : :class:`numpy.ndarray`
+        The inverse of the matrix that transforms world coordinates to clip coordinates.
+    x : float
+        The horizontal coordinate of the pixel, from the left.
+    y : float
+        The vertical coordinate of the pixel, from the top.
+    width : float
+        Width of the view.
+    height : float
+        Height of the view.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+        The origin of the ray on the near clipping plane, and its unit direction, in world coordinates.
+    """
+    ndc = [2 * (x + 0.5) / width - 1, 1 - 2 * (y + 0.5) / height]
+    near = inverse @ (ndc + [-1, 1])
+    far = inverse @ (ndc + [1, 1])
+    near = near[:3] / near[3]
+    far = far[:3] / far[3]
+    return near, (far - near) / np.linalg.norm(far - near)
+
+
+def _inside(points, matrix, width, height, box):
+    """Whether points project into a box of the view, given as [x1, y1, x2, y2] in pixels from the top left."""
+    x1, y1, x2, y2 = box
+    pixels, inside = project_points(points, matrix, width, height)
+    inside &= (pixels[:, 0] >= min(x1, x2)) & (pixels[:, 0] <= max(x1, x2))
+    inside &= (pixels[:, 1] >= min(y1, y2)) & (pixels[:, 1] <= max(y1, y2))
+    return inside
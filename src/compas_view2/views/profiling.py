@@ -0,0 +1,455 @@
+import contextlib
+import ctypes
+import json
+import time
+from collections import deque
+
+import numpy as np
+from OpenGL import GL
+from OpenGL.raw.GL.VERSION.GL_3_3 import glGetQueryObjectui64v
+
+# the stage that contains all other stages of a frame
+FRAME = "frame"
+
+# the profiler does nothing while it is disabled
+NULL_STAGE = contextlib.nullcontext()
+
+
+class Profiler:
+    """Measure the time spent in the stages of painting the frames of a view.
+
+    Every frame, and every named stage within a frame, is timed on the CPU,
+    and, where the GL context supports timer queries, on the GPU.
+    GPU timings are read back a few frames later, when the results of the queries are available,
+    such that measuring them does not stall the pipeline.
+    The costs of drawing individual objects are measured on the CPU,
+    which is the time spent submitting their draw calls.
+
+    The timings of the last frames are kept, and can be summarized, or exported as JSON
+    or as a trace of events for Chrome's trace viewer (chrome://tracing) or Perfetto.
+
+    Parameters
+    ----------
+    history : int, optional
+        The number of frames to keep.
+    gpu : bool, optional
+        Whether to use GL timer queries, if they are supported.
+
+    Attributes
+    ----------
+    enabled : bool
+        Whether frames are measured.
+    frames : deque[dict]
+        The timings of the last frames, with the start of the frame in seconds,
+        the interval since the start of the previous frame, the CPU and GPU time per stage,
+        and the CPU time per object, in milliseconds.
+    stages : list[str]
+        The names of the measured stages, in the order in which they were first measured.
+
+    Examples
+    --------
+    >>> profiler = Profiler(gpu=False)
+    >>> profiler.enabled = True
+    >>> profiler.begin_frame()
+    >>> with profiler.stage("culling"):
+    ...     pass
+    >>> profiler.end_frame()
+    >>> profiler.stages
+    ['frame', 'culling']
+
+    """
+
+    def __init__(self, history=300, gpu=True):
+        self.enabled = False
+        self.gpu = gpu
+        self.frames = deque(maxlen=history)
+        self.stages = [FRAME]
+        self._frame = None
+        self._frame_state = None
+        self._depth = 0
+        self._events = deque(maxlen=history * 64)
+        self._queries = []
+        self._pending = deque()
+        self._timer_queries = None
+
+    @property
+    def history(self):
+        """int: The number of frames that are kept."""
+        return self.frames.maxlen
+
+    # ==========================================================================
+    # measuring
+    # ==========================================================================
+
+    def begin_frame(self):
+        """Start measuring a frame.
+
+        Returns
+        -------
+        None
+        """
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        previous = self.frames[-1]["start"] if self.frames else None
+        self._frame = {
+            "start": now,
+            "interval": None if previous is None else (now - previous) * 1000,
+            "cpu": {},
+            "gpu": {},
+            "depth": {},
+            "objects": {},
+        }
+        self._depth = 0
+        self._collect()
+        self._frame_state = self._enter(FRAME)
+        self._frame["gpu_query"] = self._frame_state[2]
+
+    def end_frame(self):
+        """Finish measuring a frame.
+
+        Returns
+        -------
+        None
+        """
+        if self._frame is None:
+            return
+        self._exit(*self._frame_state)
+        self.frames.append(self._frame)
+        self._frame = None
+
+    def stage(self, name):
+        """Measure a stage of the current frame.
+
+        Parameters
+        ----------
+        name : str
+            The name of the stage.
+            The times of stages with the same name within one frame are added up.
+
+        Returns
+        -------
+        context manager
+        """
+        if self._frame is None:
+            return NULL_STAGE
+        return _Stage(self, name)
+
+    def add_object(self, obj, seconds):
+        """Add to the drawing cost of an object in the current frame.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            The object.
+        seconds : float
+            The time spent drawing the object, in seconds.
+
+        Returns
+        -------
+        None
+        """
+        if self._frame is None:
+            return
+        objects = self._frame["objects"]
+        name = obj.name
+        objects[name] = objects.get(name, 0) + seconds * 1000
+
+    def measure(self, obj):
+        """Measure the drawing cost of an object in the current frame.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            The object.
+
+        Returns
+        -------
+        context manager
+        """
+        if self._frame is None:
+            return NULL_STAGE
+        return _ObjectStage(self, obj)
+
+    def _enter(self, name):
+        if name not in self.stages:
+            self.stages.append(name)
+        self._frame["depth"].setdefault(name, self._depth)
+        self._depth += 1
+        query = self._timestamp()
+        return name, time.perf_counter(), query
+
+    def _exit(self, name, start, query):
+        end = time.perf_counter()
+        self._depth -= 1
+        frame = self._frame
+        cpu = frame["cpu"]
+        cpu[name] = cpu.get(name, 0) + (end - start) * 1000
+        self._events.append((name, start, end - start, "cpu"))
+        if query is not None:
+            self._pending.append((frame, name, query, self._timestamp()))
+
+    # ==========================================================================
+    # timer queries
+    # ==========================================================================
+
+    def _supports_timer_queries(self):
+        if self._timer_queries is None:
+            try:
+                self._timer_queries = bool(GL.glQueryCounter) and bool(GL.glGenQueries)
+            except Exception:
+                self._timer_queries = False
+        return self._timer_queries
+
+    def _timestamp(self):
+        """Record the GPU time at which the commands issued so far are completed, and return the query."""
+        if not self.gpu or not self._supports_timer_queries():
+            return None
+        query = self._queries.pop() if self._queries else int(GL.glGenQueries(1)[0])
+        GL.glQueryCounter(query, GL.GL_TIMESTAMP)
+        return query
+
+    def _collect(self):
+        """Add the GPU times of the stages of earlier frames whose queries have completed."""
+        while self._pending:
+            frame, name, first, last = self._pending[0]
+            if not GL.glGetQueryObjectiv(last, GL.GL_QUERY_RESULT_AVAILABLE):
+                break
+            self._pending.popleft()
+            begin = _query_result(first)
+            duration = (_query_result(last) - begin) / 1e9
+            if "gpu_origin" not in frame:
+                # the start of the frame on the CPU and on the GPU
+                frame["gpu_origin"] = frame["start"], _query_result(frame["gpu_query"])
+            origin = frame["gpu_origin"]
+            gpu = frame["gpu"]
+            gpu[name] = gpu.get(name, 0) + duration * 1000
+            self._events.append((name, origin[0] + (begin - origin[1]) / 1e9, duration, "gpu"))
+            self._queries += [first, last]
+
+    def delete(self):
+        """Delete the timer queries.
+
+        This requires the GL context in which the queries were created to be current.
+
+        Returns
+        -------
+        None
+        """
+        queries = self._queries + [query for pending in self._pending for query in pending[2:]]
+        if queries:
+            GL.glDeleteQueries(len(queries), queries)
+        self._queries = []
+        self._pending.clear()
+
+    # ==========================================================================
+    # results
+    # ==========================================================================
+
+    def reset(self):
+        """Forget all measured frames.
+
+        Returns
+        -------
+        None
+        """
+        self.frames.clear()
+        self._events.clear()
+        self.stages = [FRAME]
+
+    def times(self, stage=FRAME, gpu=False):
+        """The times of a stage in the measured frames.
+
+        Parameters
+        ----------
+        stage : str, optional
+            The name of the stage, or "interval" for the time between the starts of subsequent frames.
+        gpu : bool, optional
+            If True, return the GPU times instead of the CPU times.
+
+        Returns
+        -------
+        :class:`numpy.ndarray`
+            The times in milliseconds, with NaN for frames without a measurement.
+        """
+        if stage == "interval":
+            values = [frame["interval"] for frame in self.frames]
+        else:
+            key = "gpu" if gpu else "cpu"
+            values = [frame[key].get(stage) for frame in self.frames]
+        return np.array([np.nan if value is None else value for value in values], dtype=float)
+
+    def histogram(self, stage=FRAME, bins=20, gpu=False):
+        """The distribution of the times of a stage in the measured frames.
+
+        Parameters
+        ----------
+        stage : str, optional
+            The name of the stage.
+        bins : int, optional
+            The number of bins.
+        gpu : bool, optional
+            If True, use the GPU times instead of the CPU times.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            The number of frames per bin, and the edges of the bins in milliseconds.
+        """
+        times = self.times(stage, gpu)
+        times = times[~np.isnan(times)]
+        if not len(times):
+            return np.zeros(bins, dtype=int), np.zeros(bins + 1)
+        return np.histogram(times, bins=bins, range=(0, max(times.max(), 1e-3)))
+
+    def summary(self):
+        """Statistics of the times of every stage in the measured frames.
+
+        Returns
+        -------
+        dict
+            Per stage, the depth of the stage, and the mean, median, 95th percentile and maximum
+            of its CPU and GPU times in milliseconds.
+        """
+        summary = {}
+        for stage in ["interval"] + self.stages:
+            depth = next((frame["depth"][stage] for frame in self.frames if stage in frame["depth"]), 0)
+            summary[stage] = {"depth": depth, "cpu": _statistics(self.times(stage))}
+            if stage != "interval":
+                summary[stage]["gpu"] = _statistics(self.times(stage, gpu=True))
+        return summary
+
+    def object_costs(self, n=None):
+        """The mean drawing costs of the objects over the measured frames.
+
+        Parameters
+        ----------
+        n : int, optional
+            The number of most expensive objects to return.
+            Default is all objects.
+
+        Returns
+        -------
+        list[tuple[str, float]]
+            The names of the objects and their mean CPU times in milliseconds, with the most expensive first.
+        """
+        totals = {}
+        for frame in self.frames:
+            for name, cost in frame["objects"].items():
+                totals[name] = totals.get(name, 0) + cost
+        costs = sorted(((name, total / len(self.frames)) for name, total in totals.items()), key=lambda c: -c[1])
+        return costs[:n]
+
+    def to_data(self):
+        """Convert the measurements to a JSON serializable dict.
+
+        Returns
+        -------
+        dict
+        """
+        frames = []
+        for frame in self.frames:
+            frame = {key: value for key, value in frame.items() if key not in ("depth", "gpu_query", "gpu_origin")}
+            frames.append(frame)
+        return {"summary": self.summary(), "objects": self.object_costs(), "frames": frames}
+
+    def to_json(self, filepath):
+        """Save the measurements as JSON.
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the file.
+
+        Returns
+        -------
+        None
+        """
+        with open(filepath, "w") as f:
+            json.dump(self.to_data(), f, indent=2)
+
+    def to_trace(self, filepath):
+        """Save the measured stages as a trace of events, in the Chrome trace event format.
+
+        The CPU and GPU timings are shown as two threads of one process.
+        GPU events are aligned with the CPU events of the same frame at the start of their first stage.
+
+        Parameters
+        ----------
+        filepath : str
+            The path of the file.
+
+        Returns
+        -------
+        None
+        """
+        threads = {"cpu": 1, "gpu": 2}
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name.upper()}}
+            for name, tid in threads.items()
+        ]
+        for name, start, duration, thread in self._events:
+            events.append(
+                {
+                    "name": name,
+                    "cat": thread,
+                    "ph": "X",
+                    "ts": start * 1e6,
+                    "dur": duration * 1e6,
+                    "pid": 1,
+                    "tid": threads[thread],
+                }
+            )
+        with open(filepath, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+class _Stage:
+    """Context manager of a measured stage."""
+
+    __slots__ = ("profiler", "name", "state")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.state = self.profiler._enter(self.name)
+
+    def __exit__(self, *args):
+        self.profiler._exit(*self.state)
+
+
+class _ObjectStage:
+    """Context manager of the measured drawing of an object."""
+
+    __slots__ = ("profiler", "obj", "start")
+
+    def __init__(self, profiler, obj):
+        self.profiler = profiler
+        self.obj = obj
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *args):
+        self.profiler.add_object(self.obj, time.perf_counter() - self.start)
+
+
+def _query_result(query):
+    # the wrapper of PyOpenGL cannot convert 64-bit results
+    value = ctypes.c_uint64()
+    glGetQueryObjectui64v(query, GL.GL_QUERY_RESULT, ctypes.byref(value))
+    return value.value
+
+
+def _statistics(times):
+    times = times[~np.isnan(times)]
+    if not len(times):
+        return None
+    return {
+        "mean": float(times.mean()),
+        "median": float(np.median(times)),
+        "p95": float(np.percentile(times, 95)),
+        "max": float(times.max()),
+    }
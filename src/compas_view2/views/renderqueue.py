@@ -0,0 +1,187 @@
+import time
+from operator import itemgetter
+
+import numpy as np
+from OpenGL import GL
+
+from compas_view2.objects import BufferObject
+
+FACES = ("frontfaces", "backfaces")
+
+# per kind of element: the GL primitive, the element type of the model shader, and the rank in the drawing order
+PRIMITIVES = {
+    "frontfaces": (GL.GL_TRIANGLES, 2, 0),
+    "backfaces": (GL.GL_TRIANGLES, 2, 0),
+    "lines": (GL.GL_LINES, 1, 1),
+    "points": (GL.GL_POINTS, 0, 2),
+}
+
+IDENTITY = np.identity(4).flatten()
+
+
+class RenderQueue:
+    """Collect the draw calls of opaque objects, and issue them sorted by drawing state.
+
+    Every visible kind of element of every object is a draw item,
+    with a sort key of depth mode, primitive type, line width or point size, and vertex buffer.
+    Items are drawn in the order of their keys, and only the state that differs from the previous item is set.
+    Objects on the background are drawn first, without depth testing, such that all other objects are drawn over them.
+    Since opaque objects are depth tested, the order in which they are drawn does not change the image,
+    except where their elements coincide.
+
+    Attributes
+    ----------
+    items : list[tuple]
+        The sort key, the object and the kind of element of every draw item.
+    state_changes : int
+        The number of state changes of the last call to :meth:`draw`.
+
+    """
+
+    def __init__(self):
+        self.items = []
+        self.state_changes = 0
+
+    @staticmethod
+    def accepts(obj, opacity=1.0):
+        """Verify that an object can be drawn by the queue.
+
+        Parameters
+        ----------
+        obj : :class:`compas_view2.objects.Object`
+            An object of the view.
+        opacity : float, optional
+            The opacity of the view.
+
+        Returns
+        -------
+        bool
+            True if the object is drawn with the default drawing of a :class:`compas_view2.objects.BufferObject`,
+            and is opaque.
+        """
+        if not isinstance(obj, BufferObject) or type(obj).draw is not BufferObject.draw:
+            return False
+        return obj.opacity * opacity >= 1
+
+    def collect(self, objects, wireframe=False):
+        """Collect and sort the draw items of objects.
+
+        Parameters
+        ----------
+        objects : list[:class:`compas_view2.objects.BufferObject`]
+            The objects to draw.
+        wireframe : bool, optional
+            Whether to draw only the lines of the objects.
+
+        Returns
+        -------
+        None
+        """
+        items = []
+        for obj in objects:
+            kinds = []
+            if obj.show_faces and not wireframe:
+                kinds += FACES
+            if obj.show_lines or wireframe:
+                kinds.append("lines")
+            if obj.show_points:
+                kinds.append("points")
+            for kind in kinds:
+                buffer = getattr(obj, "_{}_buffer".format(kind), None)
+                if not buffer or not buffer["n"]:
+                    continue
+                rank = PRIMITIVES[kind][2]
+                size = obj.pointsize if kind == "points" else obj.linewidth if kind == "lines" else 0
+                key = (not obj.background, rank, size, int(buffer["positions"]))
+                items.append((key, obj, kind))
+        items.sort(key=itemgetter(0))
+        self.items = items
+
+    def draw(self, shader, is_lighted=False, profiler=None):
+        """Draw the collected items with the model shader.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The model shader.
+        is_lighted : bool, optional
+            Whether to shade the faces of the objects.
+        profiler : :class:`compas_view2.views.profiling.Profiler`, optional
+            A profiler to which the time spent drawing the items of each object is added.
+
+        Returns
+        -------
+        None
+        """
+        if not self.items:
+            return
+        shader.enable_attribute("position")
+        shader.enable_attribute("color")
+        changes = 0
+        depth = rank = size = positions = colors = owner = None
+        timed = profiler is not None and profiler.enabled
+        for (depth_test, item_rank, item_size, _), obj, kind in self.items:
+            if timed:
+                start = time.perf_counter()
+            buffer = getattr(obj, "_{}_buffer".format(kind))
+            primitive, element_type, _ = PRIMITIVES[kind]
+            if depth_test != depth:
+                if depth_test:
+                    GL.glEnable(GL.GL_DEPTH_TEST)
+                else:
+                    GL.glDisable(GL.GL_DEPTH_TEST)
+                depth = depth_test
+                changes += 1
+            if item_rank != rank:
+                shader.uniform1i("element_type", element_type)
+                shader.uniform1i("is_lighted", is_lighted and kind in FACES)
+                rank = item_rank
+                size = None
+                changes += 1
+            if item_size != size:
+                if kind == "lines":
+                    GL.glLineWidth(item_size)
+                elif kind == "points":
+                    GL.glPointSize(item_size)
+                size = item_size
+                changes += 1
+            if obj is not owner:
+                shader.uniform4x4("transform", obj._matrix_buffer if obj._matrix_buffer is not None else IDENTITY)
+                shader.uniform1i("is_selected", obj.is_selected)
+                shader.uniform1f("object_opacity", obj.opacity)
+                owner = obj
+                changes += 1
+            single_color, use_single_color = _single_color(obj, kind)
+            shader.uniform1i("use_single_color", use_single_color)
+            if use_single_color:
+                shader.uniform3f("single_color", single_color)
+            if buffer["positions"] != positions:
+                shader.bind_attribute("position", buffer["positions"])
+                positions = buffer["positions"]
+                changes += 1
+            if buffer["colors"] != colors:
+                shader.bind_attribute("color", buffer["colors"])
+                colors = buffer["colors"]
+                changes += 1
+            shader.draw_elements(primitive, buffer["elements"], buffer["n"])
+            if timed:
+                profiler.add_object(obj, time.perf_counter() - start)
+        if not depth:
+            GL.glEnable(GL.GL_DEPTH_TEST)
+        shader.uniform1i("is_lighted", False)
+        shader.uniform1i("is_selected", 0)
+        shader.uniform1f("object_opacity", 1)
+        shader.uniform4x4("transform", IDENTITY)
+        shader.disable_attribute("position")
+        shader.disable_attribute("color")
+        self.state_changes = changes
+
+
+def _single_color(obj, kind):
+    """The single color of a kind of element of an object, and whether it is used instead of the vertex colors."""
+    if kind in FACES:
+        use = not obj.facecolors and not obj._is_collection and not getattr(obj, "use_vertex_color", False)
+        return obj.facecolor, use
+    if kind == "lines":
+        return obj.linecolor, not obj.linecolors and not obj._is_collection
+    return obj.pointcolor, not obj.pointcolors and not obj._is_collection
@@ -0,0 +1,414 @@
+import os
+from functools import lru_cache
+
+import freetype as ft
+import numpy as np
+from matplotlib import font_manager
+from OpenGL import GL
+
+from compas_view2.gl import Buffer
+from compas_view2.gl import Texture
+from compas_view2.objects import Object
+
+HERE = os.path.dirname(__file__)
+DEFAULT_FONT = os.path.join(HERE, "..", "fonts", "FreeSans.ttf")
+
+# the size of the rasterized glyphs, in pixels per em
+GLYPH_SIZE = 48
+
+# the empty pixels around every glyph in the atlas, such that neighbouring glyphs do not bleed into each other
+PADDING = 1
+
+# the number of floats per vertex of a glyph quad, per attribute
+ATTRIBUTES = (("position", 3), ("corner", 2), ("texcoord", 2), ("color", 4), ("size", 2))
+
+# the corners of a glyph quad per vertex of its two triangles, as indices into (left, bottom, right, top)
+QUAD = np.array([[0, 1], [2, 1], [2, 3], [0, 1], [2, 3], [0, 3]])
+
+
+@lru_cache(maxsize=None)
+def _font_files():
+    """The font files known to matplotlib, per font name, looked up once."""
+    files = {}
+    for font in font_manager.fontManager.ttflist:
+        files.setdefault(font.name, font.fname)
+    return files
+
+
+def find_font(name=None):
+    """Find the file of a font by its name.
+
+    Parameters
+    ----------
+    name : str, optional
+        The name of the font, e.g. "Times New Roman".
+
+    Returns
+    -------
+    str
+        The path of the font file, or of the default font if the font is not found.
+    """
+    if not name:
+        return DEFAULT_FONT
+    return _font_files().get(name, DEFAULT_FONT)
+
+
+@lru_cache(maxsize=None)
+def load_face(filename):
+    """Open a font file once, and share the FreeType face.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the font file.
+
+    Returns
+    -------
+    :class:`freetype.Face`
+    """
+    face = ft.Face(filename)
+    # the size is specified in 1/64 pixel
+    face.set_char_size(64 * GLYPH_SIZE)
+    return face
+
+
+def pack_attributes(arrays):
+    """Concatenate the vertex attributes of glyph quads into the data of one vertex buffer, one after the other.
+
+    Parameters
+    ----------
+    arrays : dict[str, :class:`numpy.ndarray`]
+        The values of every attribute in :data:`ATTRIBUTES`, per vertex.
+
+    Returns
+    -------
+    tuple[:class:`numpy.ndarray`, dict[str, int]]
+        The data of the buffer, and the offset in bytes of every attribute.
+    """
+    data = []
+    offsets = {}
+    offset = 0
+    for name, _ in ATTRIBUTES:
+        array = np.ascontiguousarray(arrays[name], dtype=np.float32).reshape(-1)
+        offsets[name] = offset
+        offset += array.nbytes
+        data.append(array)
+    return np.concatenate(data), offsets
+
+
+class GlyphAtlas:
+    """The glyphs of a font, rasterized once and packed into the rows of a single image.
+
+    Glyphs are added to the atlas the first time they are used.
+    If the image is full, its height is doubled.
+
+    Parameters
+    ----------
+    filename : str
+        The path of the font file.
+    width : int, optional
+        The width of the image, in pixels.
+
+    Attributes
+    ----------
+    image : :class:`numpy.ndarray`
+        The coverage of the glyphs, of shape (height, width).
+    glyphs : dict[str, tuple]
+        Per character, the position and the size of its bitmap in the image,
+        the offset of the bitmap from the pen position, and the advance of the pen, in pixels.
+    version : int
+        Incremented every time glyphs are added to the image.
+
+    Examples
+    --------
+    >>> atlas = GlyphAtlas.get()
+    >>> x, y, w, h, left, top, advance = atlas.glyph("A")
+    >>> advance > 0
+    True
+    >>> atlas.glyph("A") == atlas.glyph("A")
+    True
+
+    """
+
+    atlases = {}
+
+    def __init__(self, filename, width=1024):
+        self.face = load_face(filename)
+        self.image = np.zeros((64, width), dtype=np.uint8)
+        self.glyphs = {}
+        self.version = 0
+        self._x = 0
+        self._y = 0
+        self._row = 0
+
+    @classmethod
+    def get(cls, font=None):
+        """Get the atlas of a font, shared by all texts and views.
+
+        Parameters
+        ----------
+        font : str, optional
+            The name of the font.
+
+        Returns
+        -------
+        :class:`GlyphAtlas`
+        """
+        filename = find_font(font)
+        atlas = cls.atlases.get(filename)
+        if atlas is None:
+            atlas = cls.atlases[filename] = cls(filename)
+        return atlas
+
+    def glyph(self, char):
+        """The glyph of a character, rasterized and added to the atlas if needed.
+
+        Parameters
+        ----------
+        char : str
+            The character.
+
+        Returns
+        -------
+        tuple
+            The position (x, y) and the size (w, h) of the bitmap of the glyph in the image,
+            the horizontal (left) and vertical (top) offset of the bitmap from the pen position,
+            and the horizontal advance of the pen, in pixels.
+        """
+        glyph = self.glyphs.get(char)
+        if glyph is None:
+            glyph = self.glyphs[char] = self._add(char)
+        return glyph
+
+    def _add(self, char):
+        self.face.load_char(char, ft.FT_LOAD_FLAGS["FT_LOAD_RENDER"])
+        glyph = self.face.glyph
+        bitmap = glyph.bitmap
+        w, h = bitmap.width, bitmap.rows
+        advance = glyph.advance.x / 64
+        if not w or not h:
+            return 0, 0, 0, 0, 0, 0, advance
+        if self._x + w + PADDING > self.image.shape[1]:
+            self._x = 0
+            self._y += self._row
+            self._row = 0
+        while self._y + h + PADDING > self.image.shape[0]:
+            self.image = np.concatenate([self.image, np.zeros_like(self.image)])
+        x, y = self._x, self._y
+        # the rows of the bitmap buffer can be longer than the width of the glyph
+        pixels = np.array(bitmap.buffer, dtype=np.uint8).reshape(h, bitmap.pitch)[:, :w]
+        self.image[y : y + h, x : x + w] = pixels
+        self._x += w + PADDING
+        self._row = max(self._row, h + PADDING)
+        self.version += 1
+        return x, y, w, h, glyph.bitmap_left, glyph.bitmap_top, advance
+
+    def layout(self, text):
+        """The glyph quads of a line of text, centered horizontally on the pen position.
+
+        Parameters
+        ----------
+        text : str
+            The text.
+
+        Returns
+        -------
+        tuple[:class:`numpy.ndarray`, :class:`numpy.ndarray`]
+            The corners (left, bottom, right, top) of the quads, relative to the pen position in units of the em size,
+            and the corners of the bitmaps of the glyphs in the image, in pixels, both of shape (n, 4).
+        """
+        corners = []
+        texcoords = []
+        pen = 0
+        for char in text:
+            x, y, w, h, left, top, advance = self.glyph(char)
+            if w and h:
+                corners.append([pen + left, top - h, pen + left + w, top])
+                # the first row of the image is the first row of the texture
+                texcoords.append([x, y + h, x + w, y])
+            pen += advance
+        corners = np.array(corners, dtype=np.float32).reshape(-1, 4)
+        corners[:, [0, 2]] -= pen / 2
+        return corners / GLYPH_SIZE, np.array(texcoords, dtype=np.float32).reshape(-1, 4)
+
+
+class TextRenderer:
+    """Draw the texts of a view in batches, from one vertex buffer with the glyph quads of all texts.
+
+    The glyphs of every font are taken from its :class:`GlyphAtlas`,
+    which is uploaded as a single texture per font and per view.
+    The texts of a font are drawn with a single draw call.
+    The vertex buffer is rebuilt only if texts have been added, removed, hidden, shown or updated.
+
+    The height of a text is the size of its font in pixels,
+    or, if the text has an absolute height, inversely proportional to its distance to the camera.
+    Texts are centered horizontally on their position, and their baseline passes through it.
+
+    Attributes
+    ----------
+    buffer : :class:`compas_view2.gl.Buffer` | None
+        The vertex buffer, with the positions, corners, texture coordinates, colors and sizes of the glyph quads,
+        one attribute after the other.
+    textures : dict[:class:`GlyphAtlas`, list]
+        The texture of the atlas of every font, and the version of the atlas it was uploaded from.
+    ranges : list[tuple]
+        The atlas, the first vertex and the number of vertices of the texts of every font in the buffer.
+
+    """
+
+    def __init__(self):
+        self.buffer = None
+        self.textures = {}
+        self.ranges = []
+        self._offsets = {}
+        self._members = None
+        self._versions = None
+        self._changes = None
+
+    def update(self, texts):
+        """Rebuild the vertex buffer if the texts have changed since it was built.
+
+        Parameters
+        ----------
+        texts : list[:class:`compas_view2.objects.TextObject`]
+            The visible texts of the view.
+
+        Returns
+        -------
+        None
+        """
+        if texts == self._members and Object.changes == self._changes:
+            return
+        versions = [text.version for text in texts]
+        if texts != self._members or versions != self._versions:
+            self.build(texts)
+        self._members = texts
+        self._versions = versions
+        self._changes = Object.changes
+
+    def build(self, texts):
+        """Build the vertex buffer from the glyph quads of the texts.
+
+        Parameters
+        ----------
+        texts : list[:class:`compas_view2.objects.TextObject`]
+            The visible texts of the view.
+
+        Returns
+        -------
+        None
+        """
+        fonts = {}
+        for text in texts:
+            fonts.setdefault(GlyphAtlas.get(text._data.font), []).append(text)
+        arrays = {name: [] for name, _ in ATTRIBUTES}
+        self.ranges = []
+        first = 0
+        for atlas, group in fonts.items():
+            n = 0
+            for text in group:
+                data = text._data
+                corners, texcoords = atlas.layout(data.text)
+                if not len(corners):
+                    continue
+                quads = len(corners)
+                position = np.asarray(text.world_position(), dtype=np.float32)
+                arrays["position"].append(np.tile(position, (6 * quads, 1)))
+                arrays["corner"].append(corners[:, QUAD].reshape(-1, 2))
+                arrays["texcoord"].append(texcoords[:, QUAD].reshape(-1, 2))
+                color = np.array(list(text.color)[:3] + [text.opacity], dtype=np.float32)
+                arrays["color"].append(np.tile(color, (6 * quads, 1)))
+                size = np.array([data.height, 1.0 if data.absolute_height else 0.0], dtype=np.float32)
+                arrays["size"].append(np.tile(size, (6 * quads, 1)))
+                n += 6 * quads
+            if n:
+                self.ranges.append((atlas, first, n))
+                first += n
+        if not first:
+            return
+        if self.buffer is None:
+            self.buffer = Buffer(dynamic=True)
+        data, self._offsets = pack_attributes({name: np.concatenate(arrays[name]) for name in arrays})
+        self.buffer.write(data)
+
+    def texture(self, atlas):
+        """The texture of the atlas of a font, uploaded again if glyphs have been added to the atlas.
+
+        Parameters
+        ----------
+        atlas : :class:`GlyphAtlas`
+            The atlas.
+
+        Returns
+        -------
+        :class:`compas_view2.gl.Texture`
+        """
+        texture, version = self.textures.get(atlas, (None, None))
+        if texture is None:
+            texture = Texture()
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+            GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+            GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
+            GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP_TO_EDGE)
+            GL.glTexParameterf(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP_TO_EDGE)
+        if version != atlas.version:
+            height, width = atlas.image.shape
+            GL.glBindTexture(GL.GL_TEXTURE_2D, texture)
+            GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+            GL.glTexImage2D(
+                GL.GL_TEXTURE_2D, 0, GL.GL_R8, width, height, 0, GL.GL_RED, GL.GL_UNSIGNED_BYTE, atlas.image
+            )
+            texture.capacity = atlas.image.nbytes
+            self.textures[atlas] = texture, atlas.version
+        return texture
+
+    def draw(self, shader, texts, camera_position, width, height):
+        """Draw the texts, with one draw call per font.
+
+        Parameters
+        ----------
+        shader : :class:`compas_view2.shaders.Shader`
+            The text shader, bound.
+        texts : list[:class:`compas_view2.objects.TextObject`]
+            The visible texts of the view.
+        camera_position : :class:`compas.geometry.Point`
+            The position of the camera.
+        width : int
+            The width of the framebuffer.
+        height : int
+            The height of the framebuffer.
+
+        Returns
+        -------
+        None
+        """
+        self.update(texts)
+        if not texts or not self.ranges:
+            return
+        shader.uniform3f("camera_position", camera_position)
+        shader.uniform2f("viewport", [width, height])
+        for name, step in ATTRIBUTES:
+            shader.enable_attribute(name)
+            shader.bind_attribute(name, self.buffer, step=step, offset=self._offsets[name])
+        for atlas, first, n in self.ranges:
+            shader.uniformTex("text_texture", self.texture(atlas))
+            shader.uniform2f("atlas_size", atlas.image.shape[::-1])
+            shader.draw_arrays(GL.GL_TRIANGLES, n, first)
+        for name, _ in ATTRIBUTES:
+            shader.disable_attribute(name)
+
+    def clear(self):
+        """Delete the vertex buffer and the textures.
+
+        Returns
+        -------
+        None
+        """
+        if self.buffer is not None:
+            self.buffer.delete()
+            self.buffer = None
+        for texture, _ in self.textures.values():
+            texture.delete()
+        self.textures = {}
+        self.ranges = []
+        self._members = None
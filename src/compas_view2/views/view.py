@@ -7,6 +7,16 @@ from qtpy import QtWidgets
 from compas_view2.objects import GridObject
 from compas_view2.scene import Camera
 
+from .batching import Batcher
+from .culling import Culler
+from .labels import LabelRenderer
+from .picking import ElementPass
+from .picking import IDBuffer
+from .picking import RayPicker
+from .profiling import Profiler
+from .renderqueue import RenderQueue
+from .text import TextRenderer
+
 
 class View(QtWidgets.QOpenGLWidget):
     """Base OpenGL view widget.
@@ -21,6 +31,9 @@ class View(QtWidgets.QOpenGLWidget):
 
     VIEWPORTS = {"front": 1, "right": 2, "top": 3, "perspective": 4}
 
+    # emitted with the instance map, right after it is painted for a selection
+    picked = QtCore.Signal(object)
+
     def __init__(self, app, view_config):
         super().__init__()
         self.setFocusPolicy(QtCore.Qt.StrongFocus)
@@ -35,6 +48,15 @@ class View(QtWidgets.QOpenGLWidget):
         self.camera = Camera(self, **view_config["camera"])
         self.grid = GridObject(1, 10, 10)
         self.objects = {}
+        self.batcher = Batcher()
+        self.culler = Culler()
+        self.queue = RenderQueue()
+        self.text_renderer = TextRenderer()
+        self.label_renderer = LabelRenderer(self.text_renderer)
+        self.idbuffer = IDBuffer()
+        self.picker = RayPicker(self.culler)
+        self.element_pass = ElementPass(self.picker)
+        self.profiler = Profiler()
         self.keys = {"shift": False, "control": False, "f": False}
         self._frames = 0
         self._now = time.time()
@@ -150,20 +172,23 @@ class View(QtWidgets.QOpenGLWidget):
 
         Notes
         -----
-        This method also paints the instance map used by the selector to identify selected objects.
-        The instance map is immediately cleared again, after which the real scene objects are drawn.
+        This method also paints the instance map used by the selector to identify selected objects,
+        into an offscreen ID buffer, before the real scene objects are drawn.
+        If the profiler of the view is enabled, the frame and the stages of painting it are measured.
 
         References
         ----------
         .. [1] https://doc.qt.io/qtforpython-5.12/PySide2/QtWidgets/QOpenGLWidget.html#PySide2.QtWidgets.PySide2.QtWidgets.QOpenGLWidget.paintGL
 
         """
+        self.profiler.begin_frame()
         self.clear()
         self.paint()
+        self.profiler.end_frame()
         self._frames += 1
         if time.time() - self._now > 1:
             self._now = time.time()
-            self.app.fps(self._frames)
+            self.app.fps(self._frames, self.culler.drawn, self.culler.culled)
             self._frames = 0
 
     def paint(self):
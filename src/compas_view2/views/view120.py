@@ -1,30 +1,64 @@
-import os
-
 import numpy as np
 from OpenGL import GL
 
 from compas.geometry import transform_points_numpy
 from compas_view2.objects import BufferObject
+from compas_view2.objects import LabelsObject
 from compas_view2.objects import TextObject
 from compas_view2.objects import VectorObject
 from compas_view2.shaders import Shader
 
 from .view import View
 
-# from PIL import Image
 
+class Renderer120:
+    """Draw the objects of a scene into the current framebuffer, with the shaders for GLSL 120.
 
-class View120(View):
-    """View widget for OpenGL version 2.1 and GLSL 120 with a Compatibility Profile."""
+    This is shared by :class:`View120` and :class:`compas_view2.views.OffscreenRenderer`,
+    which provide the attributes below and a current GL context.
 
-    def init(self):
-        self.grid.init()
-        # init the buffers
-        for guid in self.objects:
-            obj = self.objects[guid]
-            obj.init()
+    Attributes
+    ----------
+    objects : dict
+        The objects of the scene.
+    camera : :class:`compas_view2.scene.Camera`
+        The camera of the scene.
+    culler : :class:`compas_view2.views.culling.Culler`
+        The culler of the objects outside the view frustum.
+    batcher : :class:`compas_view2.views.batching.Batcher`
+        The batcher of static opaque objects.
+    queue : :class:`compas_view2.views.renderqueue.RenderQueue`
+        The render queue of the other opaque objects.
+    text_renderer : :class:`compas_view2.views.text.TextRenderer`
+        The renderer of the texts.
+    label_renderer : :class:`compas_view2.views.labels.LabelRenderer`
+        The renderer of the label layers.
+    mode : str
+        The view mode.
+    opacity : float
+        The opacity of the view mode.
+    selection_color : list[float]
+        The color of selected objects.
+    profiler : :class:`compas_view2.views.profiling.Profiler`
+        The profiler of the stages of painting.
+
+    """
+
+    def init_shaders(self, width, height):
+        """Create the shader programs.
+
+        Parameters
+        ----------
+        width : int
+            The width of the framebuffer.
+        height : int
+            The height of the framebuffer.
 
-        projection = self.camera.projection(self.app.width, self.app.height)
+        Returns
+        -------
+        None
+        """
+        projection = self.camera.projection(width, height)
         viewworld = self.camera.viewworld()
         transform = np.identity(4)
         # create the program
@@ -52,7 +86,7 @@ class View120(View):
         self.shader_arrow.uniform4x4("viewworld", viewworld)
         self.shader_arrow.uniform4x4("transform", transform)
         self.shader_arrow.uniform1f("opacity", self.opacity)
-        self.shader_arrow.uniform1f("aspect", self.app.width / self.app.height)
+        self.shader_arrow.uniform1f("aspect", width / height)
         self.shader_arrow.release()
 
         self.shader_instance = Shader(name="120/instance")
@@ -62,6 +96,13 @@ class View120(View):
         self.shader_instance.uniform4x4("transform", transform)
         self.shader_instance.release()
 
+        self.shader_element = Shader(name="120/element")
+        self.shader_element.bind()
+        self.shader_element.uniform4x4("projection", projection)
+        self.shader_element.uniform4x4("viewworld", viewworld)
+        self.shader_element.uniform4x4("transform", transform)
+        self.shader_element.release()
+
         self.shader_grid = Shader(name="120/grid")
         self.shader_grid.bind()
         self.shader_grid.uniform4x4("projection", projection)
@@ -69,10 +110,7 @@ class View120(View):
         self.shader_grid.uniform4x4("transform", transform)
         self.shader_grid.release()
 
-    def update_projection(self, w=None, h=None):
-        w = w or self.app.width
-        h = h or self.app.height
-
+    def update_projection(self, w, h):
         projection = self.camera.projection(w, h)
         self.shader_model.bind()
         self.shader_model.uniform4x4("projection", projection)
@@ -91,20 +129,29 @@ class View120(View):
         self.shader_instance.uniform4x4("projection", projection)
         self.shader_instance.release()
 
+        self.shader_element.bind()
+        self.shader_element.uniform4x4("projection", projection)
+        self.shader_element.release()
+
         self.shader_grid.bind()
         self.shader_grid.uniform4x4("projection", projection)
         self.shader_grid.release()
 
-    def resize(self, w, h):
-        self.update_projection(w, h)
+    def sort_objects_from_viewworld(self, viewworld, objects=None):
+        """Sort objects by the distances from their bounding box centers to camera location
 
-    def sort_objects_from_viewworld(self, viewworld):
-        """Sort objects by the distances from their bounding box centers to camera location"""
+        Parameters
+        ----------
+        viewworld : array-like
+            The view-world matrix of the camera.
+        objects : list[:class:`compas_view2.objects.Object`], optional
+            The objects to sort.
+            Default is all objects of the view.
+        """
         opaque_objects = []
         transparent_objects = []
         centers = []
-        for guid in self.objects:
-            obj = self.objects[guid]
+        for obj in self.objects.values() if objects is None else objects:
             if isinstance(obj, BufferObject):
                 if obj.opacity * self.opacity < 1 and obj.bounding_box_center is not None:
                     transparent_objects.append(obj)
@@ -117,106 +164,239 @@ class View120(View):
             transparent_objects, _ = zip(*transparent_objects)
         return opaque_objects + list(transparent_objects)
 
-    def paint(self):
-        viewworld = self.camera.viewworld()
-        if self.current != self.VIEWPORTS["perspective"]:
-            self.update_projection()
+    def paint_objects(self, objects, viewworld, width, height):
+        """Draw the model objects, arrows and texts of a scene.
 
-        # Draw instance maps
-        if self.app.selector.enabled:
-            self.shader_instance.bind()
-            # set projection matrix
-            self.shader_instance.uniform4x4("viewworld", viewworld)
-            if self.app.selector.select_from == "pixel":
-                self.app.selector.instance_map = self.paint_instances()
-            if self.app.selector.select_from == "box":
-                self.app.selector.instance_map = self.paint_instances(self.app.selector.box_select_coords)
-            self.app.selector.enabled = False
-            self.clear()
-            self.shader_instance.release()
-
-        # Draw grid
-        self.shader_grid.bind()
-        self.shader_grid.uniform4x4("viewworld", viewworld)
-        if self.app.selector.wait_for_selection_on_plane:
-            self.app.selector.uv_plane_map = self.paint_plane()
-            self.clear()
-        if self.show_grid:
-            self.grid.draw(self.shader_grid)
-        self.shader_grid.release()
+        Parameters
+        ----------
+        objects : dict
+            The objects of the scene.
+        viewworld : array-like
+            The view-world matrix of the camera.
+        width : int
+            The width of the framebuffer.
+        height : int
+            The height of the framebuffer.
 
+        Returns
+        -------
+        None
+        """
         # Draw model objects in the scene
+        # objects outside the view frustum are skipped
+        # static opaque objects are drawn in batches,
+        # the other opaque objects through the render queue, sorted by drawing state,
+        # and the remaining objects one by one, sorted by distance
+        profiler = self.profiler
         self.shader_model.bind()
         self.shader_model.uniform4x4("viewworld", viewworld)
-        for obj in self.sort_objects_from_viewworld(viewworld):
-            if obj.is_visible:
-                obj.draw(self.shader_model, self.mode == "wireframe", self.mode == "lighted")
+        with profiler.stage("culling"):
+            culled = self.culler.cull(objects, self.camera.projection(width, height), viewworld)
+        with profiler.stage("batching"):
+            unbatched = self.batcher.update(objects, self.opacity, culled)
+        queued = []
+        others = []
+        for obj in unbatched:
+            if obj.is_visible and obj not in culled:
+                (queued if self.queue.accepts(obj, self.opacity) else others).append(obj)
+        with profiler.stage("queue"):
+            self.queue.collect(queued, self.mode == "wireframe")
+            self.queue.draw(self.shader_model, self.mode == "lighted", profiler)
+        with profiler.stage("batches"):
+            self.batcher.draw(self.shader_model, self.mode == "wireframe", self.mode == "lighted")
+        with profiler.stage("sorting"):
+            others = self.sort_objects_from_viewworld(viewworld, others)
+        with profiler.stage("objects"):
+            for obj in others:
+                with profiler.measure(obj):
+                    obj.draw(self.shader_model, self.mode == "wireframe", self.mode == "lighted")
         self.shader_model.release()
 
         # draw arrow sprites
-        self.shader_arrow.bind()
-        self.shader_arrow.uniform4x4("viewworld", viewworld)
-        for guid in self.objects:
-            obj = self.objects[guid]
-            if isinstance(obj, VectorObject):
-                if obj.is_visible:
-                    obj.draw(self.shader_arrow)
-        self.shader_arrow.release()
+        with profiler.stage("arrows"):
+            self.shader_arrow.bind()
+            self.shader_arrow.uniform4x4("viewworld", viewworld)
+            for guid in objects:
+                obj = objects[guid]
+                if isinstance(obj, VectorObject):
+                    if obj.is_visible:
+                        with profiler.measure(obj):
+                            obj.draw(self.shader_arrow)
+            self.shader_arrow.release()
 
-        # draw text sprites
-        self.shader_text.bind()
-        self.shader_text.uniform4x4("viewworld", viewworld)
+        # draw the label layers, before the texts, such that labels are hidden by the geometry only,
+        # and the texts in batches, one per font
+        with profiler.stage("texts"):
+            texts = [obj for obj in objects.values() if isinstance(obj, TextObject) and obj.is_visible]
+            labels = [obj for obj in objects.values() if isinstance(obj, LabelsObject)]
+            self.shader_text.bind()
+            self.shader_text.uniform4x4("viewworld", viewworld)
+            # the layers of removed labels are deleted by the label renderer, also after the last one is removed
+            if labels or self.label_renderer.layers:
+                projection = self.camera.projection(width, height)
+                self.label_renderer.draw(
+                    self.shader_text, labels, projection, viewworld, self.camera.position, width, height
+                )
+            self.text_renderer.draw(self.shader_text, texts, self.camera.position, width, height)
+            self.shader_text.release()
+
+
+class View120(View, Renderer120):
+    """View widget for OpenGL version 2.1 and GLSL 120 with a Compatibility Profile."""
+
+    def init(self):
+        self.grid.init()
+        # init the buffers
         for guid in self.objects:
             obj = self.objects[guid]
-            if isinstance(obj, TextObject):
-                if obj.is_visible:
-                    obj.draw(self.shader_text, self.camera.position)
-        self.shader_text.release()
+            obj.init()
+        self.init_shaders(self.app.width, self.app.height)
+
+    def update_projection(self, w=None, h=None):
+        super().update_projection(w or self.app.width, h or self.app.height)
+
+    def resize(self, w, h):
+        self.update_projection(w, h)
+
+    def paint(self):
+        viewworld = self.camera.viewworld()
+        if self.current != self.VIEWPORTS["perspective"]:
+            self.update_projection()
+
+        # Draw instance maps
+        # only the pixel under the mouse, or the selection box, is painted and read back
+        # unless the box selection relates the pixels inside the box to all visible pixels of the objects
+        # vertices and edges are picked from a region around the mouse, within the tolerance of the selector
+        if self.app.selector.enabled:
+            with self.profiler.stage("picking"):
+                elements = self.app.selector.elements
+                if self.app.selector.select_from == "pixel":
+                    x = self.app.controller.mouse.last_pos.x()
+                    y = self.app.controller.mouse.last_pos.y()
+                    t = self.app.selector.tolerance if elements in ("vertices", "edges") else 0
+                    box = [x - t, y - t, x + t + 1, y + t + 1]
+                if self.app.selector.select_from == "box":
+                    box = None if self.app.selector.paints_whole_view else self.app.selector.box_select_coords
+                if elements:
+                    instance_map = self.paint_elements(elements, box)
+                else:
+                    instance_map = self.paint_instances(box)
+                self.app.selector.enabled = False
+                self.picked.emit(instance_map)
+
+        # Draw grid
+        with self.profiler.stage("grid"):
+            self.shader_grid.bind()
+            self.shader_grid.uniform4x4("viewworld", viewworld)
+            if self.app.selector.wait_for_selection_on_plane:
+                self.app.selector.uv_plane_map = self.paint_plane()
+                self.clear()
+            if self.show_grid:
+                self.grid.draw(self.shader_grid)
+            self.shader_grid.release()
+
+        self.paint_objects(self.objects, viewworld, self.app.width, self.app.height)
 
         # draw 2D box for multi-selection
         if self.app.selector.select_from == "box":
             self.shader_model.draw_2d_box(self.app.selector.box_select_coords, self.app.width, self.app.height)
 
+        # the frame is read back and handed to the encoder of the recorder
         if self.app.record:
-            # r = self.devicePixelRatio()
-            # x, y, width, height = 0, 0, self.app.width, self.app.height
-            # buffer = GL.glReadPixels(x*r, y*r, width*r, height*r, GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
-            # arr = np.frombuffer(buffer, dtype=np.uint8).reshape(height*r, width*r, 3)
-            # arr = arr[::-r, ::r, :]
-            # im = Image.fromarray(arr, mode="RGB")
-            # im = im.convert(mode='RGB', dither=0)
-            # print("recording frame:", self.app.frame_count)
-            # self.app.recorded_frames.append(im)
-            qimage = self.grabFramebuffer()
-            qimage.save(os.path.join(self.app.tempdir, f"{self.app.frame_count}.png"), "png")
+            with self.profiler.stage("recording"):
+                # the device pixel ratio is a float on Qt6, but the size of the framebuffer is a whole number of pixels
+                r = self.devicePixelRatio()
+                width, height = int(round(self.app.width * r)), int(round(self.app.height * r))
+                self.app.recorder.capture(width, height, self.app.frame_count)
 
     def paint_instances(self, cropped_box=None):
-        GL.glDisable(GL.GL_POINT_SMOOTH)
-        GL.glDisable(GL.GL_LINE_SMOOTH)
+        """Paint the IDs of the visible objects into the offscreen ID buffer, and read them back.
+
+        Parameters
+        ----------
+        cropped_box : list[int], optional
+            The corners of the region of the view to paint, as [x1, y1, x2, y2], in pixels from the top left.
+            Defaults to the whole view.
+
+        Returns
+        -------
+        np.array
+            The IDs of the pixels of the region, of shape (height, width), with the top row first.
+            The ID of the background is 0.
+        """
+        region = self._begin_ids(cropped_box)
+        self.shader_instance.bind()
+        self.shader_instance.uniform4x4("viewworld", self.camera.viewworld())
+        # the objects that are drawn by batches have released their own buffers
+        batched = self.batcher.draw_instances(self.shader_instance, self.mode == "wireframe")
+        for guid in self.objects:
+            obj = self.objects[guid]
+            if obj in batched:
+                continue
+            if hasattr(obj, "draw_instance"):
+                if obj.is_visible:
+                    obj.draw_instance(self.shader_instance, self.mode == "wireframe")
+        self.shader_instance.release()
+        return self._end_ids(region)
+
+    def paint_elements(self, kind, cropped_box=None):
+        """Paint the IDs of the vertices, edges or faces of the visible objects into the offscreen ID buffer,
+        and read them back.
+
+        Parameters
+        ----------
+        kind : "vertices" | "edges" | "faces"
+            The kind of element.
+        cropped_box : list[int], optional
+            The corners of the region of the view to paint, as [x1, y1, x2, y2], in pixels from the top left.
+            Defaults to the whole view.
+
+        Returns
+        -------
+        np.array
+            The IDs of the pixels of the region, of shape (height, width), with the top row first.
+            The IDs are decoded into elements with :meth:`compas_view2.views.picking.ElementPass.decode`.
+        """
+        region = self._begin_ids(cropped_box)
+        self.shader_element.bind()
+        self.shader_element.uniform4x4("viewworld", self.camera.viewworld())
+        self.element_pass.draw(self.shader_element, self.objects, kind)
+        self.shader_element.release()
+        return self._end_ids(region)
+
+    def _pixel_ratio(self):
+        """The device pixel ratio of the view, as a whole number, for sizes, offsets and strides in device pixels."""
+        # the device pixel ratio is a float on Qt6
+        return max(int(round(self.devicePixelRatio())), 1)
+
+    def _begin_ids(self, cropped_box):
+        """Bind the ID buffer, restricted to a region of the view, and return the region in device pixels."""
         if cropped_box is None:
             x, y, width, height = 0, 0, self.app.width, self.app.height
         else:
             x1, y1, x2, y2 = cropped_box
             x, y = min(x1, x2), self.app.height - max(y1, y2)
             width, height = abs(x1 - x2), abs(y1 - y2)
-        for guid in self.objects:
-            obj = self.objects[guid]
-            if hasattr(obj, "draw_instance"):
-                if obj.is_visible:
-                    obj.draw_instance(self.shader_instance, self.mode == "wireframe")
-        # create map
-        r = self.devicePixelRatio()
-        instance_buffer = GL.glReadPixels(x * r, y * r, width * r, height * r, GL.GL_RGB, GL.GL_UNSIGNED_BYTE)
-        instance_map = np.frombuffer(instance_buffer, dtype=np.uint8).reshape(height * r, width * r, 3)
-        instance_map = instance_map[::-r, ::r, :]
-        GL.glEnable(GL.GL_POINT_SMOOTH)
-        GL.glEnable(GL.GL_LINE_SMOOTH)
-        return instance_map
+        # regions outside of the view are undefined
+        x, y = min(max(x, 0), self.app.width - 1), min(max(y, 0), self.app.height - 1)
+        width, height = max(min(width, self.app.width - x), 1), max(min(height, self.app.height - y), 1)
+        r = self._pixel_ratio()
+        region = x * r, y * r, width * r, height * r
+        self.idbuffer.resize(self.app.width * r, self.app.height * r)
+        self.idbuffer.begin(*region)
+        return region
+
+    def _end_ids(self, region):
+        """Read the IDs of a region of the ID buffer back, and restore the framebuffer of the view."""
+        r = self._pixel_ratio()
+        ids = self.idbuffer.read(*region)
+        self.idbuffer.end(self.defaultFramebufferObject(), self.app.width * r, self.app.height * r, self.color)
+        return ids[::-r, ::r]
 
     def paint_plane(self):
         x, y, width, height = 0, 0, self.app.width, self.app.height
         self.grid.draw_plane(self.shader_grid)
-        r = self.devicePixelRatio()
+        r = self._pixel_ratio()
         plane_uv_map = GL.glReadPixels(x * r, y * r, width * r, height * r, GL.GL_RGB, GL.GL_FLOAT)
         plane_uv_map = plane_uv_map.reshape(height * r, width * r, 3)
         plane_uv_map = plane_uv_map[::-r, ::r, :]
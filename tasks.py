@@ -7,6 +7,24 @@ from compas_invocations import docs
 from compas_invocations import style
 from compas_invocations import tests
 from invoke import Collection
+from invoke import task
+
+
+@task(
+    help={
+        "large": "Also run the benchmarks with a million elements.",
+        "compare": "Compare the results with those of the last saved run, and fail if a mean is more than 10% slower.",
+    }
+)
+def benchmark(ctx, large=False, compare=False):
+    """Run the benchmarks, and save the results in .benchmarks."""
+    options = []
+    if large:
+        options.append("--large")
+    if compare:
+        options += ["--benchmark-compare", "--benchmark-compare-fail=mean:10%"]
+    ctx.run("pytest benchmarks {}".format(" ".join(options)))
+
 
 ns = Collection(
     docs.help,
@@ -18,6 +36,7 @@ ns = Collection(
     tests.test,
     tests.testdocs,
     tests.testcodeblocks,
+    benchmark,
     build.prepare_changelog,
     build.clean,
     build.release,
@@ -0,0 +1,169 @@
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.gl import Buffer
+from compas_view2.gl import live_handles
+from compas_view2.views.batching import Batcher
+from compas_view2.views.picking import IDBuffer
+from compas_view2.views.picking import encode_id
+
+
+def boxes(renderer, n):
+    return [renderer.add(Box(Frame([i, 0, 0], [1, 0, 0], [0, 1, 0]), 0.5, 0.5, 0.5)) for i in range(n)]
+
+
+def test_remove(renderer):
+    baseline = live_handles()
+    objects = boxes(renderer, 4)
+    added = live_handles()
+    renderer.render()
+    assert renderer.batcher.batches
+    # the objects of the batch release their own buffers, which the merged buffers replace
+    assert live_handles()["buffers"] < added["buffers"]
+    assert not any(hasattr(obj, "_frontfaces_buffer") for obj in objects)
+    # removing an object deletes its batch right away
+    renderer.remove(objects[0])
+    assert not renderer.batcher.batches
+    for obj in objects[1:]:
+        renderer.remove(obj)
+    assert live_handles() == baseline
+
+
+def test_update(renderer):
+    objects = boxes(renderer, 4)
+    view = {obj: obj for obj in objects}
+    batcher = Batcher(delay=10)
+    batcher.update(view)
+    assert len(batcher.batches) == 1
+    batch = batcher.batches[0]
+
+    del view[objects[0]]
+    unbatched = batcher.update(view)
+    # the batch of the missing object is deleted immediately, and its other objects are drawn individually
+    assert not batcher.batches
+    assert not batch.buffers
+    assert set(unbatched) == set(objects[1:])
+    assert all(hasattr(obj, "_frontfaces_buffer") for obj in objects[1:])
+
+    # the batches are rebuilt once the objects of the view have not changed for a few frames
+    for _ in range(batcher.delay):
+        batcher.update(view)
+    assert len(batcher.batches) == 1
+    assert objects[0] not in batcher.batches[0].objects
+    assert batcher.update(view) == []
+
+    batcher.clear()
+    for obj in objects:
+        renderer.remove(obj)
+
+
+def test_cpu_data(renderer, monkeypatch):
+    objects = boxes(renderer, 3)
+    objects[1].translation = [0, 0, 2]
+    objects[1]._update_matrix()
+    renderer.context.make_current()
+
+    # the merged buffers are built from the data of the objects, without reading buffers back from the GPU
+    def read(self, dtype=None):
+        raise AssertionError("The buffers of the objects are read back.")
+
+    monkeypatch.setattr(Buffer, "read", read)
+    batcher = Batcher()
+    batcher.update({obj: obj for obj in objects})
+    monkeypatch.undo()
+
+    positions = batcher.batches[0].buffers["frontfaces"]["positions"].read(np.float32).reshape(-1, 3)
+    # the positions are in world coordinates
+    assert np.allclose(positions.min(axis=0), [-0.25, -0.25, -0.25])
+    assert np.allclose(positions.max(axis=0), [2.25, 0.25, 2.25])
+
+    batcher.clear()
+    for obj in objects:
+        renderer.remove(obj)
+
+
+def test_edit(renderer):
+    objects = boxes(renderer, 3)
+    view = {obj: obj for obj in objects}
+    renderer.context.make_current()
+    batcher = Batcher(delay=2)
+    batcher.update(view)
+    batch = batcher.batches[0]
+
+    # an edited object is drawn individually, with its own buffers, until the edits stop for a few frames
+    for z in (1, 2, 3):
+        objects[0].translation = [0, 0, z]
+        objects[0]._update_matrix()
+        assert batcher.update(view) == [objects[0]]
+        assert hasattr(objects[0], "_frontfaces_buffer")
+        assert batcher.batches == [batch]
+    for _ in range(batcher.delay):
+        batcher.update(view)
+
+    # the batch is rebuilt with the edited object, in its new position, and the object releases its buffers again
+    assert batcher.batches[0] is not batch
+    assert batcher.update(view) == []
+    assert not hasattr(objects[0], "_frontfaces_buffer")
+    positions = batcher.batches[0].buffers["frontfaces"]["positions"].read(np.float32).reshape(-1, 3)
+    assert np.isclose(positions[:, 2].max(), 3.25)
+
+    # a selected object is drawn individually, without rebuilding the batch
+    batch = batcher.batches[0]
+    objects[1].is_selected = True
+    assert batcher.update(view) == [objects[1]]
+    assert hasattr(objects[1], "_frontfaces_buffer")
+    objects[1].is_selected = False
+    for _ in range(batcher.delay + 1):
+        assert batcher.update(view) == []
+    assert batcher.batches == [batch]
+    assert not hasattr(objects[1], "_frontfaces_buffer")
+
+    batcher.clear()
+    for obj in objects:
+        renderer.remove(obj)
+
+
+def test_render(renderer):
+    objects = boxes(renderer, 4)
+    objects[2].is_selected = True
+    objects[3].is_visible = False
+    for _ in range(renderer.batcher.delay + 1):
+        image = renderer.render(zoom_extents=True)
+    assert renderer.batcher.batches
+
+    # the batches draw the same image as the objects do individually
+    renderer.batcher.enabled = False
+    assert np.array_equal(renderer.render(), image)
+    assert all(hasattr(obj, "_frontfaces_buffer") for obj in objects[:3])
+    renderer.batcher.enabled = True
+    for obj in objects:
+        renderer.remove(obj)
+
+
+def test_instances(renderer):
+    objects = boxes(renderer, 4)
+    for index, obj in enumerate(objects):
+        obj._instance_color = encode_id(index + 1)
+    objects[3].is_selected = True
+    for _ in range(renderer.batcher.delay + 1):
+        renderer.render(zoom_extents=True)
+
+    # the objects drawn by the batch are picked from the merged buffers, the others from their own buffers
+    idbuffer = IDBuffer()
+    idbuffer.resize(renderer.width, renderer.height)
+    idbuffer.begin(0, 0, renderer.width, renderer.height)
+    renderer.shader_instance.bind()
+    renderer.shader_instance.uniform4x4("viewworld", renderer.camera.viewworld())
+    batched = renderer.batcher.draw_instances(renderer.shader_instance)
+    assert batched == set(objects[:3])
+    objects[3].draw_instance(renderer.shader_instance)
+    renderer.shader_instance.release()
+    ids = idbuffer.read(0, 0, renderer.width, renderer.height)
+    idbuffer.end(renderer.framebuffer._framebuffer, renderer.width, renderer.height, renderer.color)
+    assert set(np.unique(ids).tolist()) == {0, 1, 2, 3, 4}
+
+    idbuffer.delete()
+    for obj in objects:
+        renderer.remove(obj)
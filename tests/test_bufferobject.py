@@ -0,0 +1,42 @@
+import numpy as np
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.collections import Collection
+from compas_view2.objects import BufferObject
+from compas_view2.objects import MeshObject
+from compas_view2.objects import Object
+
+
+class LinesAndFacesObject(BufferObject):
+    """An object without points, of which the lines and faces are the edges and faces of a box."""
+
+    def _mesh_object(self):
+        return MeshObject(Mesh.from_shape(self._data))
+
+    def _lines_data(self):
+        return self._mesh_object()._lines_data()
+
+    def _frontfaces_data(self):
+        return self._mesh_object()._frontfaces_data()
+
+
+def test_update_bounding_box(renderer):
+    box = Box(Frame.worldXY(), 1, 1, 1)
+    obj = LinesAndFacesObject(box)
+    renderer.context.make_current()
+    obj.init()
+    assert np.allclose(obj.bounding_box, [[-0.5, -0.5, -0.5], [0.5, 0.5, 0.5]])
+
+    obj.data = Box(Frame([1, 0, 0], [1, 0, 0], [0, 1, 0]), 2, 4, 6)
+    obj.update()
+    assert np.allclose(obj.bounding_box, [[0, -2, -3], [2, 2, 3]])
+    obj.dispose()
+
+
+def test_replaceable_data():
+    box = Box(Frame.worldXY(), 1, 1, 1)
+    assert Object.build(box).replaceable_data
+    assert not Object.build(Collection([box, box])).replaceable_data
@@ -0,0 +1,22 @@
+import numpy as np
+
+from compas_view2.views.picking import project_points
+
+
+def test_ray(renderer):
+    camera = renderer.camera
+    width, height = 401, 301
+    matrix = np.array(camera.projection(width, height), dtype=float) @ np.array(camera.viewworld(), dtype=float)
+
+    # the ray through the center of the view points from the camera to its target
+    origin, direction = camera.ray((width - 1) / 2, (height - 1) / 2, width, height)
+    target = np.array(camera.target) - np.array(camera.position)
+    assert np.allclose(direction, target / np.linalg.norm(target))
+
+    # the points of the ray through a pixel, beyond the near clipping plane, project onto that pixel
+    origin, direction = camera.ray(20, 250, width, height)
+    assert np.isclose(np.linalg.norm(direction), 1)
+    points = origin + np.outer([1, 10, 100], direction)
+    pixels, inside = project_points(points, matrix, width, height)
+    assert inside.all()
+    assert np.allclose(pixels, [[20, 250]] * 3, atol=1e-3)
@@ -0,0 +1,73 @@
+import numpy as np
+
+from compas_view2.views.culling import CORNERS
+from compas_view2.views.culling import outside_frustum
+
+
+def box(center, size):
+    center = np.asarray(center, dtype=float)
+    return np.array([center - size / 2, center + size / 2])
+
+
+def outside_any_plane(boxes, matrix):
+    """Whether all corners of each box lie on the outer side of the same clipping plane, in clip coordinates."""
+    corners = boxes[:, CORNERS, [0, 1, 2]]
+    clip = np.concatenate([corners, np.ones(corners.shape[:2] + (1,))], axis=-1) @ matrix.T
+    xyz, w = clip[..., :3], clip[..., 3:]
+    return ((xyz < -w) | (xyz > w)).all(axis=1).any(axis=1)
+
+
+def test_unit_cube():
+    # with the identity matrix, the frustum is the cube between -1 and 1
+    boxes = np.array(
+        [
+            box([0, 0, 0], 1),
+            box([1, 1, 1], 1),
+            box([0, 0, 0], 10),
+            box([2, 0, 0], 1),
+            box([0, -2, 0], 1),
+            box([0, 0, 1.6], 1),
+            box([1.5, 0.5, 0], 1),
+            box([3, 3, 0], 1),
+        ]
+    )
+    expected = [False, False, False, True, True, True, False, True]
+    assert outside_frustum(boxes, np.identity(4)).tolist() == expected
+
+
+def test_camera(renderer):
+    camera = renderer.camera
+    matrix = np.array(camera.projection(400, 300), dtype=float) @ np.array(camera.viewworld(), dtype=float)
+    position = np.array(camera.position, dtype=float)
+    direction = np.array(camera.target, dtype=float) - position
+    distance = np.linalg.norm(direction)
+    direction /= distance
+    side = np.cross(direction, [0, 0, 1] if abs(direction[2]) < 0.9 else [1, 0, 0])
+    side /= np.linalg.norm(side)
+
+    boxes = np.array(
+        [
+            # at the target, and around the camera
+            box(camera.target, 1),
+            box(position, 1),
+            # behind the camera, beyond the far plane, and far to the side of the target
+            box(position - 2 * direction, 1),
+            box(position + (camera.far + 10) * direction, 1),
+            box(position + distance * direction + 10 * distance * side, 1),
+        ]
+    )
+    assert outside_frustum(boxes, matrix).tolist() == [False, False, True, True, True]
+
+
+def test_planes(renderer):
+    camera = renderer.camera
+    matrix = np.array(camera.projection(400, 300), dtype=float) @ np.array(camera.viewworld(), dtype=float)
+    rng = np.random.default_rng(0)
+    centers = np.array(camera.target, dtype=float) + rng.uniform(-60, 60, (500, 3))
+    sizes = rng.uniform(0.1, 10, (500, 3))
+    boxes = np.stack([centers - sizes / 2, centers + sizes / 2], axis=1)
+
+    # a box is culled if and only if all its corners lie outside the same clipping plane
+    outside = outside_frustum(boxes, matrix)
+    assert outside.any() and not outside.all()
+    assert np.array_equal(outside, outside_any_plane(boxes, matrix))
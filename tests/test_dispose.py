@@ -0,0 +1,57 @@
+import pytest
+
+from compas.datastructures import Mesh
+from compas.datastructures import Network
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Pointcloud
+from compas.geometry import Polyline
+from compas.geometry import Sphere
+
+from compas_view2.collections import Collection
+from compas_view2.gl import live_handles
+from compas_view2.shapes import Text
+
+DATA = {
+    "mesh": lambda: Mesh.from_polyhedron(12),
+    "network": lambda: Network.from_lines([([0, 0, 0], [1, 0, 0]), ([1, 0, 0], [1, 1, 0])]),
+    "box": lambda: Box(Frame.worldXY(), 1, 2, 3),
+    "sphere": lambda: Sphere([0, 0, 0], 1),
+    "polyline": lambda: Polyline([[0, 0, 0], [1, 0, 0], [1, 1, 0]]),
+    "pointcloud": lambda: Pointcloud.from_bounds(10, 10, 10, 50),
+    "text": lambda: Text("dispose", [0, 0, 0]),
+    "collection": lambda: Collection([Box(Frame.worldXY(), 1, 1, 1), Sphere([2, 0, 0], 1)]),
+}
+
+
+@pytest.mark.parametrize("name", list(DATA))
+def test_remove(renderer, name):
+    baseline = live_handles()
+    obj = renderer.add(DATA[name]())
+    if name != "text":
+        assert live_handles()["buffers"] > baseline["buffers"]
+    renderer.remove(obj)
+    assert live_handles() == baseline
+
+
+@pytest.mark.parametrize("name", list(DATA))
+def test_dispose(renderer, name):
+    baseline = live_handles()
+    obj = renderer.add(DATA[name]())
+    added = live_handles()
+    obj.dispose()
+    assert live_handles() == baseline
+    # disposing twice releases nothing twice
+    obj.dispose()
+    assert live_handles() == baseline
+    # a disposed object can be initialised again
+    obj.init()
+    assert live_handles() == added
+    renderer.remove(obj)
+    assert live_handles() == baseline
+
+
+def test_render_scene(renderer):
+    baseline = live_handles()
+    renderer.render([Mesh.from_polyhedron(6), Box(Frame.worldXY(), 1, 1, 1)], zoom_extents=True)
+    assert live_handles() == baseline
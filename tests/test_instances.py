@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from OpenGL import GL
+
+from compas.colors import Color
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.collections import Instances
+from compas_view2.gl import instancing
+from compas_view2.objects import instancesobject
+
+
+def divisor(location):
+    """The divisor of a vertex attribute in the current context."""
+    return int(GL.glGetVertexAttribiv(location, GL.GL_VERTEX_ATTRIB_ARRAY_DIVISOR).flat[0])
+
+
+def instances(renderer):
+    boxes = [Box(Frame([i, i % 3, 0], [1, 0, 0], [0, 1, 0]), 0.6, 0.4, 0.2 * (i + 1)) for i in range(6)]
+    colors = [Color.from_i(i / 6) for i in range(6)]
+    return renderer.add(Instances(boxes, colors=colors), show_lines=True)
+
+
+def test_draw(renderer, monkeypatch):
+    renderer.context.make_current()
+    if not instancing():
+        pytest.skip("No instanced drawing")
+    obj = instances(renderer)
+    instanced = renderer.render(zoom_extents=True)
+    assert len(np.unique(instanced.reshape(-1, 3), axis=0)) > 6
+
+    # without instanced drawing, the instances are drawn one by one, with the same result
+    monkeypatch.setattr(instancesobject, "instancing", lambda: None)
+    separate = renderer.render()
+    assert np.mean(np.any(instanced != separate, axis=-1)) < 0.001
+    renderer.remove(obj)
+
+
+def test_divisors(renderer):
+    renderer.context.make_current()
+    if not instancing():
+        pytest.skip("No instanced drawing")
+    obj = instances(renderer)
+    renderer.render(zoom_extents=True)
+
+    # the matrices and colors of the instances are read per instance while they are drawn only
+    shader = renderer.shader_model
+    location = shader.attributes["instance_matrix"]
+    assert all(divisor(location + column) == 0 for column in range(4))
+    assert divisor(shader.attributes["color"]) == 0
+    assert not any(shader._divisors.values())
+    assert shader.instances is None
+    renderer.remove(obj)
@@ -0,0 +1,141 @@
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+from compas.datastructures import Network
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.objects import LabelsObject
+from compas_view2.views.labels import LabelLayer
+from compas_view2.views.labels import thin_labels
+
+
+def grid(n=5, spacing=1.0):
+    """A mesh of n by n vertices on the XY plane, centered on the origin."""
+    offset = (n - 1) * spacing / 2
+    vertices = [[i * spacing - offset, j * spacing - offset, 0] for j in range(n) for i in range(n)]
+    faces = [
+        [j * n + i, j * n + i + 1, (j + 1) * n + i + 1, (j + 1) * n + i] for j in range(n - 1) for i in range(n - 1)
+    ]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def overlap(a, b):
+    return a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]
+
+
+def test_positions():
+    mesh = Mesh.from_polyhedron(12)
+    vertices = LabelsObject(mesh)
+    assert vertices.keys == list(mesh.vertices())
+    assert vertices.texts == [str(vertex) for vertex in mesh.vertices()]
+    assert np.allclose(vertices.positions, [mesh.vertex_coordinates(vertex) for vertex in mesh.vertices()])
+
+    edges = LabelsObject(mesh, element="edges", text=lambda edge: "{}-{}".format(*edge))
+    assert edges.texts[0] == "{}-{}".format(*edges.keys[0])
+    assert np.allclose(edges.positions, [mesh.edge_midpoint(u, v) for u, v in mesh.edges()])
+
+    faces = LabelsObject(mesh, element="faces", text={0: "first", 3: "fourth"})
+    assert faces.keys == [0, 3] and faces.texts == ["first", "fourth"]
+    assert np.allclose(faces.positions, [mesh.face_centroid(face) for face in (0, 3)])
+
+    network = Network.from_lines([([0, 0, 0], [1, 0, 0]), ([1, 0, 0], [1, 2, 0])])
+    nodes = LabelsObject(network, text={1: "corner"})
+    assert np.allclose(nodes.positions, [[1, 0, 0]])
+    assert np.allclose(LabelsObject(network, element="edges").positions, [[0.5, 0, 0], [1, 1, 0]])
+    with pytest.raises(ValueError):
+        LabelsObject(network, element="faces")
+    with pytest.raises(ValueError):
+        LabelsObject(mesh, element="halfedges")
+
+
+def test_update():
+    mesh = grid(3)
+    labels = LabelsObject(mesh, element="faces")
+    version = labels.layout_version
+    positions = labels.positions
+
+    # moved vertices only move the labels, in place
+    mesh.vertex_attribute(0, "z", 1.0)
+    labels.update()
+    assert labels.layout_version == version and labels.positions is positions
+    assert np.isclose(labels.positions[0, 2], 0.25)
+    # changed elements, texts or glyphs change the layout
+    mesh.delete_face(3)
+    labels.update()
+    assert labels.layout_version > version and labels.keys == [0, 1, 2]
+    version = labels.layout_version
+    labels.update(texts=True)
+    labels.height = 20
+    assert labels.layout_version == version + 2
+
+
+def test_thinning():
+    rng = np.random.default_rng(0)
+    corners = rng.uniform(0, 400, (300, 2))
+    sizes = rng.uniform(5, 40, (300, 2))
+    rects = np.hstack([corners, corners + sizes])
+    order = rng.permutation(300)
+    keep = thin_labels(rects, order, spacing=2)
+
+    # the selected labels do not overlap, with their spacing,
+    # and every label that is thinned out overlaps a label of a higher priority
+    padded = rects + np.array([-1, -1, 1, 1])
+    selected = np.nonzero(keep)[0]
+    assert 0 < len(selected) < 300
+    assert not any(overlap(padded[i], padded[j]) for i in selected for j in selected if i < j)
+    priority = np.argsort(order)
+    for i in np.nonzero(~keep)[0]:
+        assert any(overlap(padded[i], padded[j]) for j in order[: priority[i]])
+
+
+def test_render(renderer, monkeypatch):
+    mesh = grid(5)
+    box = renderer.add(Box(Frame.worldXY(), 2.5, 2.5, 2.5))
+    builds = []
+    draws = []
+    build = LabelLayer.build
+    monkeypatch.setattr(LabelLayer, "build", lambda self, labels: builds.append(labels) or build(self, labels))
+    draw_elements = renderer.shader_text.draw_elements
+    monkeypatch.setattr(
+        renderer.shader_text,
+        "draw_elements",
+        lambda *args, **kwargs: draws.append(args) or draw_elements(*args, **kwargs),
+    )
+    label_renderer = renderer.label_renderer
+
+    # the labels inside the box are hidden by it
+    labels = renderer.add_labels(mesh, height=8, thinning=False)
+    renderer.render(zoom_extents=True)
+    layer = label_renderer.layers[labels]
+    inside = [i for i, (x, y, _) in enumerate(labels.positions) if abs(x) < 1.25 and abs(y) < 1.25]
+    assert len(inside) == 9
+    assert not layer.visible[inside].any()
+    assert label_renderer.culled >= 9 and label_renderer.drawn == 25 - label_renderer.culled
+    assert len(draws) == 1 and builds == [labels]
+    labels.occlusion = False
+    renderer.render()
+    assert label_renderer.drawn == 25 and label_renderer.culled == 0
+
+    # moved labels are not laid out again
+    mesh.vertices_attribute("z", 0.5)
+    labels.update()
+    renderer.render()
+    assert builds == [labels]
+    renderer.remove(labels)
+
+    # large labels are thinned out, and every layer is drawn with one draw call
+    edges = renderer.add_labels(mesh, element="edges", occlusion=False, thinning=False)
+    faces = renderer.add_labels(mesh, element="faces", height=200, occlusion=False)
+    draws.clear()
+    renderer.render()
+    assert len(draws) == 2
+    assert label_renderer.layers[edges].visible.all() and len(edges.keys) == 40
+    assert label_renderer.thinned > 0 and label_renderer.drawn == 40 + 16 - label_renderer.thinned
+    assert labels not in label_renderer.layers
+
+    for obj in (edges, faces, box):
+        renderer.remove(obj)
+    renderer.render()
+    assert not label_renderer.layers
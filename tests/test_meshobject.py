@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+from compas.colors import Color
+from compas.datastructures import Mesh
+from compas.geometry import centroid_points
+from compas.utilities import pairwise
+
+from compas_view2.objects import MeshObject
+
+
+def make_mesh():
+    """A mesh with triangles, a non-planar quad, a pentagon and a hexagon."""
+    vertices = [
+        [0, 0, 0],
+        [1, 0, 0],
+        [2, 0, 0.3],
+        [3, 0, 0],
+        [4, 0, 0],
+        [0, 1, 0],
+        [1, 1, 0.2],
+        [2, 1, 0],
+        [3, 1, 0.1],
+        [4, 1, 0],
+        [2.5, 2, 0],
+        [3.5, 1.8, 0.2],
+    ]
+    faces = [[0, 1, 6], [0, 6, 5], [1, 2, 7, 6], [2, 3, 8, 10, 7], [3, 4, 9, 11, 10, 8]]
+    return Mesh.from_vertices_and_faces(vertices, faces)
+
+
+def per_face_frontfaces(mesh, facecolor, facecolors=None, vertex_colors=None):
+    """The positions and colors of every triangle corner, computed face by face, as before vectorization."""
+    facecolors = facecolors or {}
+    positions = []
+    colors = []
+    for face in mesh.faces():
+        vertices = mesh.face_vertices(face)
+        points = [mesh.vertex_coordinates(vertex) for vertex in vertices]
+        if len(vertices) == 3:
+            triangles = [[0, 1, 2]]
+        elif len(vertices) == 4:
+            triangles = [[0, 1, 2], [0, 2, 3]]
+        else:
+            points.append(centroid_points(points))
+            triangles = [[a, b, len(vertices)] for a, b in pairwise(list(range(len(vertices))) + [0])]
+        for triangle in triangles:
+            for corner in triangle:
+                positions.append(points[corner])
+                if vertex_colors:
+                    colors.append(list(vertex_colors[vertices[corner]]))
+                else:
+                    colors.append(list(facecolors.get(face, facecolor)))
+    return np.array(positions), np.array(colors)
+
+
+def corners(data):
+    positions, colors, elements = data
+    return positions[elements], colors[elements]
+
+
+FACECOLORS = {None: None, "single": {0: Color.red(), 3: Color.red()}, "mixed": {0: Color.red(), 3: Color.blue()}}
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+@pytest.mark.parametrize("facecolors", list(FACECOLORS))
+def test_frontfaces(indexed, facecolors):
+    mesh = make_mesh()
+    obj = MeshObject(mesh, indexed=indexed, facecolor=FACECOLORS[facecolors])
+    positions, colors = corners(obj.buffer_data()["frontfaces"])
+    expected_positions, expected_colors = per_face_frontfaces(mesh, obj.facecolor, obj.facecolors)
+    assert np.allclose(positions, expected_positions, atol=1e-6)
+    assert np.allclose(colors, expected_colors, atol=1e-6)
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+@pytest.mark.parametrize("facecolors", list(FACECOLORS))
+def test_backfaces(indexed, facecolors):
+    obj = MeshObject(make_mesh(), indexed=indexed, facecolor=FACECOLORS[facecolors])
+    data = obj.buffer_data()
+    front_positions, front_colors = corners(data["frontfaces"])
+    back_positions, back_colors = corners(data["backfaces"])
+    # the back faces are the front faces with the opposite orientation
+    assert np.allclose(back_positions.reshape(-1, 3, 3), front_positions.reshape(-1, 3, 3)[:, ::-1])
+    assert np.allclose(back_colors.reshape(-1, 3, 3), front_colors.reshape(-1, 3, 3)[:, ::-1])
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_vertex_colors(indexed):
+    mesh = Mesh.from_meshgrid(dx=3, nx=3)
+    mesh.insert_vertex(0)
+    for vertex in mesh.vertices():
+        mesh.vertex_attribute(vertex, "color", Color.from_i(vertex / mesh.number_of_vertices()))
+    obj = MeshObject(mesh, indexed=indexed, use_vertex_color=True)
+    positions, colors = corners(obj.buffer_data()["frontfaces"])
+    vertex_colors = {vertex: mesh.vertex_attribute(vertex, "color") for vertex in mesh.vertices()}
+    expected_positions, expected_colors = per_face_frontfaces(mesh, obj.facecolor, vertex_colors=vertex_colors)
+    assert np.allclose(positions, expected_positions, atol=1e-6)
+    assert np.allclose(colors, expected_colors, atol=1e-6)
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_points(indexed):
+    mesh = make_mesh()
+    obj = MeshObject(mesh, indexed=indexed, vertices=[8, 2, 5])
+    positions, _ = corners(obj.buffer_data()["points"])
+    assert np.allclose(positions, [mesh.vertex_coordinates(vertex) for vertex in [8, 2, 5]])
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_lines(indexed):
+    mesh = make_mesh()
+    obj = MeshObject(mesh, indexed=indexed)
+    positions, _ = corners(obj.buffer_data()["lines"])
+
+    def segments(points):
+        return {
+            frozenset(map(tuple, pair))
+            for pair in np.round(np.asarray(points, dtype=np.float32), 4).reshape(-1, 2, 3).tolist()
+        }
+
+    expected = [mesh.vertex_coordinates(vertex) for edge in mesh.edges() for vertex in edge]
+    assert len(positions) == len(expected)
+    assert segments(positions) == segments(expected)
+
+
+def read_positions(obj):
+    """Read the distinct position buffers of an object back from the GPU."""
+    buffers = {}
+    for name in ("points", "lines", "frontfaces", "backfaces"):
+        buffer = getattr(obj, "_{}_buffer".format(name))["positions"]
+        buffers[int(buffer)] = buffer.read().reshape(-1, 3).copy()
+    return buffers
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+@pytest.mark.parametrize("facecolors", list(FACECOLORS))
+def test_update_vertices(renderer, indexed, facecolors):
+    mesh = make_mesh()
+    obj = renderer.add(mesh, indexed=indexed, facecolor=FACECOLORS[facecolors])
+    before = read_positions(obj)
+    # the positions of all buffers can be traced back to the vertices of the mesh
+    assert obj._vertex_buffers is not None
+
+    # the vertex is shared by the pentagon and the hexagon, whose centroids move with it
+    obj.set_vertex_positions([8], [[3, 1, 1.0]])
+    after = read_positions(obj)
+
+    # the buffers are updated in place, and equal to those of an object of the moved mesh
+    assert after.keys() == before.keys()
+    data = MeshObject(mesh, indexed=indexed, facecolor=FACECOLORS[facecolors]).buffer_data()
+    expected = {}
+    for name, (positions, _, _) in data.items():
+        expected[int(getattr(obj, "_{}_buffer".format(name))["positions"])] = positions
+    for key, positions in after.items():
+        old = before[key]
+        assert np.allclose(positions, expected[key])
+        # only the rows of the moved vertex and of the centroids have changed
+        changed = np.nonzero((positions != old).any(axis=1))[0]
+        moved = np.nonzero((expected[key] != old).any(axis=1))[0]
+        assert len(changed) < len(old)
+        assert np.array_equal(changed, moved)
+
+    renderer.remove(obj)
@@ -0,0 +1,117 @@
+import itertools
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from OpenGL import GL
+
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.views import View120
+from compas_view2.views.picking import ID_DISABLED
+from compas_view2.views.picking import IDBuffer
+from compas_view2.views.picking import RayPicker
+from compas_view2.views.picking import STATE_CAPABILITIES
+from compas_view2.views.picking import id_coverage
+from compas_view2.views.picking import project_points
+
+
+class IDView:
+    """The ID passes of :class:`View120`, on the framebuffer of an offscreen renderer."""
+
+    _pixel_ratio = View120._pixel_ratio
+    _begin_ids = View120._begin_ids
+    _end_ids = View120._end_ids
+
+    def __init__(self, renderer, ratio):
+        self.renderer = renderer
+        self.ratio = ratio
+        self.app = SimpleNamespace(width=renderer.width, height=renderer.height)
+        self.color = renderer.color
+        self.idbuffer = IDBuffer()
+
+    def devicePixelRatio(self):
+        return self.ratio
+
+    def defaultFramebufferObject(self):
+        return self.renderer.framebuffer._framebuffer
+
+
+@pytest.mark.parametrize("ratio", [1.0, 2.0])
+def test_id_region(renderer, ratio):
+    renderer.context.make_current()
+    view = IDView(renderer, ratio)
+    # the device pixel ratio is a float on Qt6
+    region = view._begin_ids([10, 20, 50, 40])
+    assert all(isinstance(value, int) for value in region)
+    ids = view._end_ids(region)
+    assert ids.shape == (20, 40)
+    assert not ids.any()
+
+    ids = view._end_ids(view._begin_ids(None))
+    assert ids.shape == (renderer.height, renderer.width)
+    view.idbuffer.delete()
+
+
+@pytest.mark.parametrize("enabled", [False, True])
+def test_id_state(renderer, enabled):
+    renderer.context.make_current()
+    idbuffer = IDBuffer()
+    idbuffer.resize(renderer.width, renderer.height)
+    for capability in STATE_CAPABILITIES:
+        (GL.glEnable if enabled else GL.glDisable)(capability)
+
+    idbuffer.begin(0, 0, 10, 10)
+    assert not any(GL.glIsEnabled(capability) for capability in ID_DISABLED)
+    idbuffer.read(0, 0, 10, 10)
+    idbuffer.end(renderer.framebuffer._framebuffer, renderer.width, renderer.height, renderer.color)
+    # the state of the renderer is restored as it was, and not as a view enables it
+    assert all(GL.glIsEnabled(capability) == enabled for capability in STATE_CAPABILITIES)
+
+    # the state of the renderer
+    for capability in ID_DISABLED:
+        GL.glEnable(capability)
+    GL.glDisable(GL.GL_SCISSOR_TEST)
+    idbuffer.delete()
+
+
+def test_id_coverage():
+    ids = np.array([[1, 2, 0, 2], [1, 0, 0, 3], [1, 2, 0, 3], [1, 0, 0, 0]], dtype=np.uint32)
+    found, pixels, fractions = id_coverage(ids, [0, 0, 2, 4])
+    assert found.tolist() == [1, 2]
+    assert pixels.tolist() == [4, 2]
+    assert fractions.tolist() == [1.0, 2 / 3]
+
+    # boxes dragged in any direction are the same, and are clipped to the region
+    for box in ([2, 4, 0, 0], [-5, -5, 2, 4]):
+        assert [array.tolist() for array in id_coverage(ids, box)] == [[1, 2], [4, 2], [1.0, 2 / 3]]
+    # without a box, the whole region is counted
+    assert id_coverage(ids)[0].tolist() == [1, 2, 3]
+    assert np.all(id_coverage(ids)[2] == 1)
+    assert all(not len(array) for array in id_coverage(np.zeros((0, 0), dtype=np.uint32)))
+    assert all(not len(array) for array in id_coverage(ids, [2, 1, 3, 2]))
+
+
+def test_select_window(renderer):
+    near = renderer.add(Box(Frame.worldXY(), 2, 2, 2))
+    far = renderer.add(Box(Frame([20, 0, 0], [1, 0, 0], [0, 1, 0]), 2, 2, 2))
+    renderer.camera.zoom_extents()
+    width, height = renderer.width, renderer.height
+    matrix = np.array(renderer.camera.projection(width, height)) @ np.array(renderer.camera.viewworld())
+    picker = RayPicker(renderer.culler)
+
+    # a box around the projection of the bounding box selects the object in both modes
+    corners = np.array(list(itertools.product([-1, 1], repeat=3)), dtype=float)
+    pixels, _ = project_points(corners, matrix, width, height)
+    (x1, y1), (x2, y2) = pixels.min(axis=0) - 1, pixels.max(axis=0) + 1
+    for window in (False, True):
+        assert picker.select(renderer.objects, matrix, width, height, [x1, y1, x2, y2], window) == [near]
+    # a smaller box around its center only selects it in crossing mode
+    x, y = (x1 + x2) / 2, (y1 + y2) / 2
+    box = [x - 2, y - 2, x + 2, y + 2]
+    assert picker.select(renderer.objects, matrix, width, height, box) == [near]
+    assert picker.select(renderer.objects, matrix, width, height, box, window=True) == []
+
+    for obj in (near, far):
+        renderer.remove(obj)
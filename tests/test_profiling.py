@@ -0,0 +1,93 @@
+import json
+import time
+
+import numpy as np
+
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.views.profiling import NULL_STAGE
+from compas_view2.views.profiling import Profiler
+
+
+def frame(profiler, sleep=0.002):
+    profiler.begin_frame()
+    with profiler.stage("outer"):
+        time.sleep(sleep)
+        with profiler.stage("inner"):
+            time.sleep(sleep)
+    # the times of stages with the same name are added up
+    for _ in range(2):
+        with profiler.stage("other"):
+            time.sleep(sleep)
+    profiler.end_frame()
+
+
+def test_stages():
+    profiler = Profiler(history=3, gpu=False)
+    frame(profiler)
+    assert not profiler.frames
+    assert profiler.stage("outer") is NULL_STAGE
+
+    profiler.enabled = True
+    for _ in range(4):
+        frame(profiler)
+    assert len(profiler.frames) == 3
+    assert profiler.stages == ["frame", "outer", "inner", "other"]
+    times = {stage: profiler.times(stage) for stage in profiler.stages}
+    assert np.all(times["inner"] >= 2) and np.all(times["outer"] >= 4) and np.all(times["other"] >= 4)
+    assert np.all(times["inner"] < times["outer"])
+    assert np.all(times["outer"] + times["other"] <= times["frame"])
+    # the interval of a frame starts with the previous frame
+    assert np.all(profiler.times("interval")[1:] >= times["frame"][:-1])
+    assert np.all(np.isnan(profiler.times("outer", gpu=True)))
+
+    summary = profiler.summary()
+    assert [summary[stage]["depth"] for stage in profiler.stages] == [0, 1, 2, 1]
+    assert summary["outer"]["gpu"] is None
+    assert summary["frame"]["cpu"]["max"] == times["frame"].max()
+    counts, edges = profiler.histogram(bins=5)
+    assert counts.sum() == 3 and len(edges) == 6
+
+    profiler.reset()
+    assert not profiler.frames and profiler.stages == ["frame"]
+
+
+def test_export(tmp_path):
+    profiler = Profiler(gpu=False)
+    profiler.enabled = True
+    frame(profiler, 0)
+
+    profiler.to_json(tmp_path / "profile.json")
+    with open(tmp_path / "profile.json") as f:
+        data = json.load(f)
+    assert set(data["frames"][0]["cpu"]) == {"frame", "outer", "inner", "other"}
+    profiler.to_trace(tmp_path / "trace.json")
+    with open(tmp_path / "trace.json") as f:
+        events = json.load(f)["traceEvents"]
+    assert sorted(event["name"] for event in events if event["ph"] == "X") == sorted(
+        ["frame", "outer", "inner", "other", "other"]
+    )
+
+
+def test_render(renderer):
+    obj = renderer.add(Box(Frame.worldXY(), 1, 1, 1), name="box")
+    profiler = renderer.profiler
+    profiler.enabled = True
+    renderer.batcher.enabled = False
+    try:
+        renderer.render(zoom_extents=True)
+        for _ in range(4):
+            renderer.render()
+        assert {"frame", "culling", "batching", "queue", "objects", "readback"} <= set(profiler.stages)
+        assert np.all(profiler.times("readback") < profiler.times())
+        assert profiler.object_costs()[0][0] == "box"
+        # the times on the GPU are read back in later frames
+        if profiler._supports_timer_queries():
+            assert not np.all(np.isnan(profiler.times(gpu=True)))
+            assert np.nanmax(profiler.times("culling", gpu=True)) >= 0
+    finally:
+        profiler.enabled = False
+        profiler.reset()
+        renderer.batcher.enabled = True
+    renderer.remove(obj)
@@ -0,0 +1,63 @@
+import struct
+
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+
+from compas_view2.app import Recorder
+
+
+class ListEncoder:
+    """Keep the frames of the last recording in memory."""
+
+    frames = []
+
+    def __init__(self, path, width, height, fps):
+        ListEncoder.frames = []
+
+    def write(self, frame):
+        ListEncoder.frames.append(frame.copy())
+
+    def close(self):
+        pass
+
+
+@pytest.mark.parametrize("pbo", [False, True])
+def test_capture(renderer, pbo):
+    recorder = Recorder("frames.list", fps=10, pbo=pbo)
+    recorder.ENCODERS = {".list": ListEncoder}
+    images = []
+    mesh = Mesh.from_polyhedron(6)
+    for frame in range(3):
+        mesh.transform([[1, 0, 0, 0.1], [0, 1, 0, 0], [0, 0, 1, 0], [0, 0, 0, 1]])
+        images.append(renderer.render([mesh], zoom_extents=frame == 0))
+        # the size of the framebuffer in device pixels, as computed with a float device pixel ratio on Qt6
+        recorder.capture(renderer.width * 1.0, renderer.height * 1.0, frame)
+        # a frame is captured only once
+        recorder.capture(renderer.width * 1.0, renderer.height * 1.0, frame)
+    recorder.close()
+
+    assert recorder.frames == 3
+    assert recorder._size == (renderer.width, renderer.height)
+    assert len(ListEncoder.frames) == 3
+    for image, frame in zip(images, ListEncoder.frames):
+        # the frames are read bottom row first
+        assert np.array_equal(frame[::-1], image)
+
+
+def test_apng(renderer, tmp_path):
+    path = str(tmp_path / "out.png")
+    recorder = Recorder(path, fps=10)
+    for frame in range(2):
+        renderer.render()
+        recorder.capture(renderer.width, renderer.height, frame)
+    recorder.close()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    assert data.startswith(b"\x89PNG\r\n\x1a\n")
+    width, height = struct.unpack(">II", data[16:24])
+    assert (width, height) == (renderer.width, renderer.height)
+    frames, _ = struct.unpack(">II", data[data.index(b"acTL") + 4 :][:8])
+    assert frames == 2
@@ -0,0 +1,64 @@
+import numpy as np
+
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Frame
+
+from compas_view2.views.renderqueue import PRIMITIVES
+from compas_view2.views.renderqueue import RenderQueue
+
+
+def scene(renderer):
+    objects = []
+    for i, (linewidth, pointsize) in enumerate([(3, 10), (1, 5), (3, 5), (2, 10)]):
+        box = Box(Frame([2 * i, 0, 0], [1, 0, 0], [0, 1, 0]), 1, 1, 1)
+        objects.append(renderer.add(box, show_points=True, linewidth=linewidth, pointsize=pointsize))
+    mesh = Mesh.from_polyhedron(8)
+    mesh.transform([[1, 0, 0, 0], [0, 1, 0, 3], [0, 0, 1, 0], [0, 0, 0, 1]])
+    objects.append(renderer.add(mesh, linewidth=2))
+    objects[2].background = True
+    return objects
+
+
+def test_order(renderer):
+    objects = scene(renderer)
+    queue = RenderQueue()
+    queue.collect(reversed(objects))
+    keys = [key for key, _, _ in queue.items]
+    assert keys == sorted(keys)
+
+    # the items on the background come first, then the faces, the lines by width, and the points by size
+    background = [(obj, kind) for _, obj, kind in queue.items[:4]]
+    assert background == [(objects[2], kind) for kind in ("frontfaces", "backfaces", "lines", "points")]
+    ranks = [(PRIMITIVES[kind][2], size) for (_, _, size, _), _, kind in queue.items[4:]]
+    assert ranks == [(0, 0)] * 8 + [(1, 1), (1, 2), (1, 2), (1, 3), (2, 5), (2, 10), (2, 10)]
+    # the items that read the same vertex buffer are drawn one after the other
+    faces = [obj for _, obj, _ in queue.items[4:12]]
+    assert faces[::2] == faces[1::2]
+
+    # the faces are not drawn in wireframe mode
+    queue.collect(objects, wireframe=True)
+    assert sorted(kind for _, _, kind in queue.items) == ["lines"] * len(objects) + ["points"] * 4
+    for obj in objects:
+        renderer.remove(obj)
+
+
+def test_draw(renderer, monkeypatch):
+    objects = scene(renderer)
+    objects[2].background = False
+    renderer.batcher.enabled = False
+    try:
+        image = renderer.render(zoom_extents=True)
+        items = len(renderer.queue.items)
+        assert items == 4 * 4 + 3
+        # every item would otherwise set its depth test, primitive, size, transformation and vertex buffers
+        assert renderer.queue.state_changes < 6 * items
+        # the queue draws the same image as the objects do one by one,
+        # except for the smoothed edges of lines and points, which are blended with what was drawn before them
+        monkeypatch.setattr(RenderQueue, "accepts", staticmethod(lambda obj, opacity=1.0: False))
+        assert np.mean(np.any(renderer.render() != image, axis=-1)) < 0.001
+        assert not renderer.queue.items
+    finally:
+        renderer.batcher.enabled = True
+    for obj in objects:
+        renderer.remove(obj)
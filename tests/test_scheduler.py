@@ -0,0 +1,134 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip("ryvencore_qt")
+
+from compas_view2.flow import Scheduler  # noqa: E402
+
+
+class Port:
+    def __init__(self):
+        self.connections = []
+
+
+class FlowNode:
+    """A node of a flow, with the interface the scheduler uses."""
+
+    def __init__(self, name, function, upstream=()):
+        self.name = name
+        self.function = function
+        self.block_updates = False
+        self.inputs = [Port() for _ in upstream]
+        self.outputs = [Port()]
+        self.statuses = []
+        self.outputs_received = []
+        self.output = None
+        for port, node in zip(self.inputs, upstream):
+            connection = SimpleNamespace(out=SimpleNamespace(node=node), inp=SimpleNamespace(node=self))
+            port.connections.append(connection)
+            node.outputs[0].connections.append(connection)
+
+    def prepare(self):
+        inputs = [port.connections[0].out.node.output for port in self.inputs]
+        return inputs, tuple(inputs)
+
+    def set_status(self, status):
+        self.statuses.append(status)
+
+    def finish(self, keys, output=None, elapsed=None, error=None):
+        self.output = error if error is not None else output
+        self.outputs_received.append(self.output)
+
+
+def make_scheduler(nodes, max_workers=None):
+    flow = SimpleNamespace(flow_view=SimpleNamespace(node_items=set(nodes)))
+    return Scheduler(flow, max_workers=max_workers)
+
+
+def test_dependencies(qapp):
+    # the two branches only finish if they run at the same time
+    barrier = threading.Barrier(2, timeout=5)
+
+    def branch(value, factor):
+        barrier.wait()
+        return value * factor
+
+    a = FlowNode("a", lambda: 1)
+    b = FlowNode("b", lambda value: branch(value, 2), [a])
+    c = FlowNode("c", lambda value: branch(value, 3), [a])
+    d = FlowNode("d", lambda x, y: x + y, [b, c])
+    scheduler = make_scheduler([a, b, c, d], max_workers=2)
+
+    scheduler.request([a])
+    assert scheduler.wait(5)
+    # every node runs once, after the nodes upstream of it
+    assert [node.outputs_received for node in (a, b, c, d)] == [[1], [2], [3], [5]]
+    assert scheduler.cancelled == 0
+    scheduler.shutdown()
+
+
+def test_stale(qapp):
+    release = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(len(calls))
+        release.wait(5)
+        return len(calls)
+
+    a = FlowNode("a", slow)
+    b = FlowNode("b", lambda value: value * 10, [a])
+    scheduler = make_scheduler([a, b])
+
+    scheduler.request([a])
+    assert a in scheduler.jobs and b in scheduler.pending
+    # requesting the node again while it is running makes its running job stale
+    scheduler.request([a])
+    assert scheduler.cancelled == 1
+    assert a.statuses == ["running", "cancelled", "running"]
+    assert scheduler.pending.count(b) == 1
+
+    release.set()
+    assert scheduler.wait(5)
+    # the result of the stale job is discarded
+    assert a.outputs_received == [2]
+    assert b.outputs_received == [20]
+    scheduler.shutdown()
+
+
+def test_wait(qapp):
+    release = threading.Event()
+    a = FlowNode("a", lambda: release.wait(5))
+    scheduler = make_scheduler([a])
+
+    scheduler.request([a])
+    assert scheduler.running
+    assert not scheduler.wait(0.05)
+    release.set()
+    assert scheduler.wait(5)
+    assert not scheduler.running
+    assert a.outputs_received == [True]
+    scheduler.shutdown()
+
+
+def test_shutdown(qapp):
+    release = threading.Event()
+    a = FlowNode("a", lambda: release.wait(5))
+    b = FlowNode("b", lambda: 1)
+    c = FlowNode("c", lambda value: value, [a])
+    scheduler = make_scheduler([a, b, c], max_workers=1)
+
+    scheduler.request([a, b])
+    jobs = dict(scheduler.jobs)
+    scheduler.shutdown()
+    # the job waiting for a worker is cancelled, the running job is left to finish, and its result is discarded
+    assert jobs[b].future.cancelled()
+    assert not scheduler.running
+    assert scheduler._executor is None
+    assert c.statuses == ["cancelled"]
+    release.set()
+    assert jobs[a].future.result(5)[0] is True
+    scheduler._poll()
+    assert a.outputs_received == []
@@ -0,0 +1,161 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from qtpy import QtCore
+
+from compas.geometry import Box
+from compas.geometry import Frame
+from compas.geometry import Sphere
+
+from compas_view2.app.selector import Selector
+from compas_view2.objects import Object
+
+
+class View(QtCore.QObject):
+    """The parts of a view that the selector uses."""
+
+    picked = QtCore.Signal(object)
+
+    def __init__(self):
+        super().__init__()
+        self.grid = SimpleNamespace(x_cells=10, y_cells=10, cell_size=1)
+        self.updates = 0
+
+    def update(self):
+        self.updates += 1
+
+
+@pytest.fixture
+def selector(qapp):
+    app = SimpleNamespace(view=View(), dock_slots={"propertyform": None, "sceneform": None}, on_object_selected=[])
+    selector = Selector(app)
+    app.selector = selector
+    return selector
+
+
+def add_objects(selector):
+    box = Object.build(Box(Frame.worldXY(), 1, 1, 1))
+    sphere = Object.build(Sphere([0, 0, 0], 1))
+    return [(selector.add(obj), obj) for obj in (box, sphere)]
+
+
+def pick(selector, index):
+    """Hand the selector the instance map of a region around the mouse, with an object at its center."""
+    instance_map = np.zeros((3, 3), dtype=np.uint32)
+    instance_map[1, 1] = index
+    selector.on_picked(instance_map)
+
+
+def test_selection(selector):
+    (box_id, box), (sphere_id, sphere) = add_objects(selector)
+    future = selector.request_selection(types=[Box], returns="data")
+    assert selector.wait_for_selection and selector.mode == "multi"
+    assert not future.done()
+
+    # only objects of the requested types are selected, until the session is finished
+    pick(selector, box_id)
+    pick(selector, sphere_id)
+    assert box.is_selected and not sphere.is_selected
+    assert not future.done()
+    selector.finish_selection()
+    assert future.result(0) == [box.data]
+    assert not selector.wait_for_selection and selector.mode == "single"
+    assert not box.is_selected
+
+    future = selector.request_selection(returns="object")
+    pick(selector, sphere_id)
+    selector.finish_selection()
+    assert future.result(0) == [sphere]
+
+    with pytest.raises(ValueError):
+        selector.request_selection(returns="keys")
+
+
+def test_wait(selector):
+    (box_id, box), _ = add_objects(selector)
+    results = []
+    thread = threading.Thread(target=lambda: results.append(selector.start_selection(returns="object")))
+    thread.start()
+    while not selector.wait_for_selection:
+        thread.join(0.001)
+
+    # the waiting thread sleeps until the session is finished
+    thread.join(0.05)
+    assert thread.is_alive()
+    pick(selector, box_id)
+    selector.finish_selection()
+    thread.join(5)
+    assert results == [[box]]
+
+
+def test_async(selector):
+    (box_id, box), _ = add_objects(selector)
+
+    def finish():
+        pick(selector, box_id)
+        selector.finish_selection()
+
+    async def main():
+        asyncio.get_running_loop().call_later(0.01, finish)
+        return await selector.select_async(returns="object")
+
+    assert asyncio.run(main()) == [box]
+
+
+def test_plane(selector):
+    future = selector.request_selection_on_plane(snap_to_grid=True)
+    assert selector.wait_for_selection_on_plane
+    selector.uv_plane_map = np.ones((4, 4, 3))
+    selector.uv_plane_map[2, 1] = [0.62, 0.5, 0]
+
+    selector.finish_selection_on_plane(1, 2)
+    assert future.result(0) == [2, 0, 0]
+    assert not selector.wait_for_selection_on_plane
+
+    # outside of the grid, and when the selection is finished otherwise, there is no location
+    future = selector.request_selection_on_plane()
+    selector.finish_selection_on_plane(0, 0)
+    assert future.result(0) is None
+    future = selector.request_selection_on_plane()
+    selector.location_on_plane = None
+    selector.finish_selection()
+    assert future.result(0) is None
+
+
+def test_box_modes(selector):
+    (first_id, first), (second_id, second) = add_objects(selector)
+    # the first object lies inside the box, half of the second one outside of it
+    instance_map = np.zeros((4, 4), dtype=np.uint32)
+    instance_map[:, 0] = first_id
+    instance_map[[0, 2], 1] = second_id
+    instance_map[[1, 2], 3] = second_id
+    selector.mode = "multi"
+
+    def select_box(box_mode, coords=(0, 0, 2, 4), min_coverage=0.0):
+        selector.deselect()
+        selector.box_mode = box_mode
+        selector.min_coverage = min_coverage
+        selector.box_select_coords = np.array(coords)
+        selector.select_from = "box"
+        selector.on_picked(instance_map)
+        assert selector.select_from == "pixel"
+        return [obj for obj in (first, second) if obj.is_selected]
+
+    assert select_box("crossing") == [first, second]
+    assert select_box("crossing", min_coverage=0.5) == [first]
+    assert selector.coverage == {first: (4, 1.0), second: (2, 0.5)}
+    assert select_box("window") == [first]
+    # boxes dragged from left to right are window selections
+    assert select_box("auto", (0, 0, 2, 4)) == [first]
+    assert select_box("auto", (2, 4, 0, 0)) == [first, second]
+
+    # the whole view is painted only if the pixels outside the box matter
+    selector.select_from = "box"
+    selector.box_mode = "crossing"
+    selector.min_coverage = 0.0
+    assert not selector.paints_whole_view
+    selector.min_coverage = 0.5
+    assert selector.paints_whole_view
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from OpenGL import GL
+
+from compas_view2.gl import Buffer
+from compas_view2.gl import instancing
+from compas_view2.shaders import Shader
+
+
+def shaders(renderer):
+    return {name: shader for name, shader in vars(renderer).items() if isinstance(shader, Shader)}
+
+
+def divisor(location):
+    """The divisor of a vertex attribute in the current context."""
+    return int(GL.glGetVertexAttribiv(location, GL.GL_VERTEX_ATTRIB_ARRAY_DIVISOR).flat[0])
+
+
+def test_locations(renderer):
+    renderer.context.make_current()
+    assert shaders(renderer)
+    for shader in shaders(renderer).values():
+        assert shader.uniforms and shader.attributes
+        # the locations introspected after linking are those the program reports by name
+        for name, location in shader.uniforms.items():
+            assert location == GL.glGetUniformLocation(shader.program, name)
+        for name, location in shader.attributes.items():
+            assert location == GL.glGetAttribLocation(shader.program, name)
+        assert GL.glGetUniformLocation(shader.program, "undefined") == -1
+        assert not shader._changed("undefined", 1)
+
+
+def test_divisors(renderer):
+    renderer.context.make_current()
+    if not instancing():
+        pytest.skip("No instanced drawing")
+    first = Shader(name="120/model")
+    second = Shader(name="120/model")
+    buffer = Buffer(GL.GL_ARRAY_BUFFER)
+    buffer.write(np.zeros((3, 3), dtype=np.float32))
+
+    first.bind()
+    first.enable_attribute("color")
+    first.bind_attribute("color", buffer, divisor=1)
+    location = first.locations["color"]
+    assert divisor(location) == 1
+    # the divisors of the context are reset when the attribute is disabled
+    first.disable_attribute("color")
+    assert divisor(location) == 0
+    first.release()
+
+    # the divisors that a shader remembers are its own, and not those set by other shaders
+    second.bind()
+    second.enable_attribute("color")
+    second.bind_attribute("color", buffer, divisor=1)
+    assert divisor(location) == 1
+    second.disable_attribute("color")
+    second.release()
+
+    buffer.delete()
+    for shader in (first, second):
+        GL.glDeleteProgram(shader.program)
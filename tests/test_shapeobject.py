@@ -0,0 +1,118 @@
+import numpy as np
+import pytest
+
+from compas.datastructures import Mesh
+from compas.geometry import Circle
+from compas.geometry import Cylinder
+from compas.geometry import Plane
+from compas.geometry import Scale
+from compas.geometry import Sphere
+from compas.geometry import Translation
+
+from compas_view2.objects import Object
+from compas_view2.objects import ShapeObject
+from compas_view2.objects import TessellationCache
+from compas_view2.objects.tessellation import Tessellation
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = TessellationCache()
+    monkeypatch.setattr(ShapeObject, "tessellations", cache)
+    return cache
+
+
+def sphere(u):
+    return Tessellation.from_shape(Sphere([0, 0, 0], 1), u=u, v=u)
+
+
+def test_evictions():
+    tessellations = {u: sphere(u) for u in (8, 10, 12)}
+    cache = TessellationCache(maxbytes=tessellations[8].nbytes + tessellations[12].nbytes)
+    for u in (8, 10):
+        assert cache.get(u, lambda: tessellations[u]) is tessellations[u]
+    assert cache.get(8, sphere) is tessellations[8]
+    assert (cache.hits, cache.misses, cache.evictions) == (1, 2, 0)
+
+    # the least recently used tessellations are evicted to make room
+    cache.get(12, lambda: tessellations[12])
+    assert 8 in cache and 10 not in cache and 12 in cache
+    assert cache.evictions == 1
+    assert cache.nbytes == tessellations[8].nbytes + tessellations[12].nbytes <= cache.maxbytes
+
+    # the most recently used tessellation is kept, even if it exceeds the limit by itself
+    cache.maxbytes = 1
+    assert len(cache) == 1 and 12 in cache
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "evictions": 2,
+        "hit_rate": 0.25,
+        "tessellations": 1,
+        "nbytes": tessellations[12].nbytes,
+        "maxbytes": 1,
+    }
+    cache.clear()
+    assert not len(cache) and not cache.nbytes and not cache.hits
+
+
+def cylinder(point, radius, height):
+    return Cylinder(Circle(Plane(point, [0, 0, 1]), radius), height)
+
+
+def bounding_box(shape, transformation, **resolution):
+    """The bounding box of the tessellation of a shape in its actual size, transformed."""
+    mesh = Mesh.from_shape(shape, **resolution)
+    mesh.transform(transformation)
+    xyz = np.array(mesh.vertices_attributes("xyz"))
+    return np.array([xyz.min(axis=0), xyz.max(axis=0)])
+
+
+def test_shared(cache):
+    a = Object.build(Sphere([0, 0, 0], 1), u=8, v=8)
+    b = Object.build(Sphere([5, 0, 0], 2), u=8, v=8)
+    c = Object.build(cylinder([0, 0, 0], 1, 2))
+    d = Object.build(cylinder([1, 2, 3], 2, 4))
+    e = Object.build(cylinder([0, 0, 0], 1, 2), u=8)
+    # shapes that only differ in size, position and orientation share their tessellation
+    assert a._tessellation is b._tessellation
+    assert c._tessellation is d._tessellation
+    assert e._tessellation is not c._tessellation
+    assert (cache.hits, cache.misses) == (2, 3)
+    assert not a._tessellation.arrays["xyz"].flags.writeable
+
+    # a change of resolution back and forth hits the cache
+    tessellation = a._tessellation
+    a.u = 12
+    a.update()
+    assert a._tessellation is not tessellation
+    a.u = 8
+    a.update()
+    assert a._tessellation is tessellation
+    assert (cache.hits, cache.misses) == (3, 4)
+
+
+def test_bounding_box(renderer, cache):
+    shape = cylinder([1, 2, 3], 2, 6)
+    obj = renderer.add(shape, u=16)
+    assert np.allclose(obj.bounding_box, bounding_box(shape, Scale.from_factors([1, 1, 1]), u=16))
+
+    # the scale of the object applies to the shape, after the matrix of the shape
+    obj.scale = [2, 1, 0.5]
+    obj.translation = [1, 0, 0]
+    obj._update_matrix()
+    transformation = Translation.from_vector([1, 0, 0]) * Scale.from_factors([2, 1, 0.5])
+    expected = bounding_box(shape, transformation, u=16)
+    assert np.allclose(obj.bounding_box, expected)
+    assert np.allclose(obj.bounding_box_center, expected.mean(axis=0))
+    point = np.reshape(obj._matrix_buffer, (4, 4)) @ [0, 0, 0, 1]
+    assert np.allclose(point, [3, 2, 1.5, 1])
+    renderer.remove(obj)
+
+    # the vertices of the tessellation are transformed, instead of the corners of its bounding box
+    obj = renderer.add(Sphere([5, 0, 0], 2), u=16, v=16)
+    obj.rotation = [0, 0, np.pi / 4]
+    obj._update_matrix()
+    size = obj.bounding_box[1] - obj.bounding_box[0]
+    assert np.all(size <= 4 + 1e-9) and np.all(size > 3.9)
+    renderer.remove(obj)
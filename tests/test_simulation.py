@@ -0,0 +1,72 @@
+import time
+
+from compas_view2.app import Simulation
+from compas_view2.app import Worker
+
+
+def wait_for(condition, timeout=5):
+    end = time.perf_counter() + timeout
+    while not condition():
+        assert time.perf_counter() < end, "Timed out."
+        time.sleep(0.001)
+
+
+def test_restart(qapp):
+    simulation = Simulation(None, lambda frame: None, timeout=1)
+
+    simulation.start()
+    wait_for(lambda: simulation.steps > 0)
+    simulation.stop()
+    assert Worker.pool.waitForDone(5000)
+    steps = simulation.steps
+
+    simulation.start()
+    wait_for(lambda: simulation.steps > steps)
+    simulation.stop()
+    assert Worker.pool.waitForDone(5000)
+    simulation.timer.stop()
+
+
+def test_frames(qapp):
+    simulation = Simulation(None, lambda frame: {}, frames=5)
+
+    simulation.start()
+    assert Worker.pool.waitForDone(5000)
+    assert simulation.steps == 5
+    assert not simulation.running
+    simulation.timer.stop()
+
+
+def test_stop_start(qapp):
+    active = []
+    overlaps = []
+
+    def step(frame):
+        active.append(frame)
+        overlaps.append(len(active))
+        time.sleep(0.01)
+        active.remove(frame)
+
+    # with a single thread, the pool would only start the new worker once the stopped one has finished
+    threads = Worker.pool.maxThreadCount()
+    Worker.pool.setMaxThreadCount(max(threads, 2))
+    simulation = Simulation(None, step)
+    try:
+        simulation.start()
+        wait_for(lambda: simulation.steps > 0 and active)
+        # the worker is stopped during a step, and a new one is started before that step has finished
+        simulation.stop()
+        simulation.start()
+        steps = simulation.steps
+        wait_for(lambda: simulation.steps > steps + 3)
+
+        # the stopped worker has finished without stopping the new one, and the steps never overlapped
+        wait_for(lambda: Worker.pool.activeThreadCount() == 1)
+        assert simulation.running
+        assert max(overlaps) == 1
+    finally:
+        simulation.stop()
+        assert Worker.pool.waitForDone(5000)
+        simulation.timer.stop()
+        Worker.pool.setMaxThreadCount(threads)
+    assert not simulation.running
@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from compas_view2.shapes import Text
+from compas_view2.views.text import DEFAULT_FONT
+from compas_view2.views.text import GLYPH_SIZE
+from compas_view2.views.text import PADDING
+from compas_view2.views.text import GlyphAtlas
+from compas_view2.views.text import TextRenderer
+from compas_view2.views.text import find_font
+
+
+def test_atlas():
+    atlas = GlyphAtlas(DEFAULT_FONT, width=128)
+    chars = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789"
+    glyphs = [atlas.glyph(char) for char in chars]
+    assert atlas.version == len(chars)
+    # the image grows in height, when its rows are full
+    assert atlas.image.shape[1] == 128 and atlas.image.shape[0] > 64
+
+    # the bitmaps of the glyphs, with their padding, do not overlap and lie inside the image
+    covered = np.zeros(atlas.image.shape, dtype=int)
+    for x, y, w, h, _, _, advance in glyphs:
+        assert w and h and advance > 0
+        assert x + w + PADDING <= atlas.image.shape[1] and y + h + PADDING <= atlas.image.shape[0]
+        covered[y : y + h + PADDING, x : x + w + PADDING] += 1
+    assert covered.max() == 1
+    assert not atlas.image[covered == 0].any()
+
+    # glyphs are rasterized once, and spaces have no bitmap
+    assert [atlas.glyph(char) for char in chars] == glyphs
+    assert atlas.glyph(" ")[:4] == (0, 0, 0, 0) and atlas.glyph(" ")[6] > 0
+    assert atlas.version == len(chars)
+
+
+def test_layout():
+    atlas = GlyphAtlas(DEFAULT_FONT)
+    corners, texcoords = atlas.layout("A b")
+    assert corners.shape == texcoords.shape == (2, 4)
+    # the line of text is centered on the pen position, and its glyphs follow each other
+    pen = sum(atlas.glyph(char)[6] for char in "A b")
+    x, y, w, h, left, top, _ = atlas.glyph("b")
+    start = atlas.glyph("A")[6] + atlas.glyph(" ")[6] + left - pen / 2
+    assert np.allclose(corners[1] * GLYPH_SIZE, [start, top - h, start + w, top])
+    assert texcoords[1].tolist() == [x, y + h, x + w, y]
+    assert all(not len(array) for array in atlas.layout(" "))
+
+
+def test_batches(renderer, monkeypatch):
+    fonts = [None, "DejaVu Sans"]
+    if find_font(fonts[1]) == DEFAULT_FONT:
+        pytest.skip("No second font")
+    texts = [
+        renderer.add(Text("one", [0, 0, 0], height=20)),
+        renderer.add(Text("two", [2, 0, 0], height=20)),
+        renderer.add(Text("three", [0, 2, 0], height=20, font=fonts[1])),
+        renderer.add(Text(" ", [2, 2, 0], height=20)),
+    ]
+    builds = []
+    draws = []
+    build = TextRenderer.build
+    monkeypatch.setattr(TextRenderer, "build", lambda self, texts: builds.append(len(texts)) or build(self, texts))
+    draw_arrays = renderer.shader_text.draw_arrays
+    monkeypatch.setattr(
+        renderer.shader_text, "draw_arrays", lambda *args, **kwargs: draws.append(args) or draw_arrays(*args, **kwargs)
+    )
+
+    # the texts of a font are drawn with one draw call, from a single buffer
+    image = renderer.render(zoom_extents=True)
+    assert (image != np.array(renderer.color[:3]) * 255).any()
+    text_renderer = renderer.text_renderer
+    assert [(atlas, n) for atlas, _, n in text_renderer.ranges] == [
+        (GlyphAtlas.get(fonts[0]), 6 * 6),
+        (GlyphAtlas.get(fonts[1]), 6 * 5),
+    ]
+    assert len(draws) == 2 and builds == [4]
+    for atlas, (texture, version) in text_renderer.textures.items():
+        assert version == atlas.version
+
+    # the buffer is only built again after a change of the texts
+    assert np.array_equal(renderer.render(), image)
+    assert builds == [4]
+    texts[0].is_visible = False
+    renderer.render()
+    assert builds == [4, 3]
+    assert text_renderer.ranges[0][2] == 6 * 3
+    texts[0].is_visible = True
+    texts[1]._data.text = "twelve"
+    texts[1].update()
+    renderer.render()
+    assert builds == [4, 3, 4]
+    assert text_renderer.ranges[0][2] == 6 * 9
+
+    for text in texts:
+        renderer.remove(text)